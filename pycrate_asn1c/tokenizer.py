@@ -194,96 +194,169 @@ TOKS_OBJS_EXT  = {TOK_NULL, TOK_NTYPE, TOK_HID, TOK_ID, TOK_LID, TOK_CLAID}
 TOKS_TYPES_EXT = {TOK_HID, TOK_ID, TOK_CLAID}
 
 
-REScannerASN1 = re.Scanner([
+# scanning rules: (regexp, token identifier, token with text)
+# the order of the rules is significant, as the first matching rule is selected
+# (white spaces being the most frequent match and starting no other rule, they
+# are tested first)
+_SCAN_RULES = [
     #
-    (r'(--).*?([%s]|(--)|$)' % _NL,     lambda s, t: (TOK_CMT,   t)),
-    (r'(/\*).*?(\*/)',                  lambda s, t: (TOK_CMT,   t)),
-    (r'".*?(?<!")"(?!")',               lambda s, t: (TOK_CSTR,  t)),
+    (r'%s' % REScannerSNL,              None,       False),
     #
-    (r'::=',                            lambda s, t: TOK_ASSI),
-    (r':',                              lambda s, t: TOK_COL),
-    (r';',                              lambda s, t: TOK_SCOL),
-    (r'=',                              lambda s, t: TOK_EQU),
-    (r',',                              lambda s, t: TOK_COM),
-    (r'\(',                             lambda s, t: TOK_PARO),
-    (r'\)',                             lambda s, t: TOK_PARC),
-    (r'\[{2}',                          lambda s, t: TOK_DBRAO),
-    (r'\]{2}',                          lambda s, t: TOK_DBRAC),
-    (r'\[',                             lambda s, t: TOK_BRAO),
-    (r'\]',                             lambda s, t: TOK_BRAC),
-    (r'\{',                             lambda s, t: TOK_CBRAO),
-    (r'\}',                             lambda s, t: TOK_CBRAC),
-    (r'\.\.\.',                         lambda s, t: TOK_TDOT),
-    (r'\.\.',                           lambda s, t: TOK_DDOT),
-    (r'\.',                             lambda s, t: TOK_DOT),
-    (r'\||(?:UNION%s)' % _EXC,          lambda s, t: TOK_UNIO),
-    (r'\^|(?:INTERSECTION%s)' % _EXC,   lambda s, t: TOK_INTER),
-    (r'<',                              lambda s, t: TOK_LTHAN),
-    (r'>',                              lambda s, t: TOK_GTHAN),
-    (r'@',                              lambda s, t: TOK_ARRO),
-    (r'\!',                             lambda s, t: TOK_EXCL),
+    (r'(--).*?([%s]|(--)|$)' % _NL,     TOK_CMT,    True),
+    (r'(/\*).*?(\*/)',                  TOK_CMT,    True),
+    (r'".*?(?<!")"(?!")',               TOK_CSTR,   True),
     #
-    (r'ABSENT%s' % _EXC,                lambda s, t: TOK_ABS),
-    (r'ALL%s' % _EXC,                   lambda s, t: TOK_ALL),
-    (r'APPLICATION%s' % _EXC,           lambda s, t: TOK_TAPP),
-    (r'AUTOMATIC%s' % _EXC,             lambda s, t: TOK_AUTO),
-    (r'BEGIN%s' % _EXC,                 lambda s, t: TOK_BEG),
-    (r'BY%s' % _EXC,                    lambda s, t: TOK_BY),
-    (r'COMPONENT%s' % _EXC,             lambda s, t: TOK_COMP),
-    (r'COMPONENTS%s' % _EXC,            lambda s, t: TOK_COMPS),
-    (r'CONSTRAINED%s' % _EXC,           lambda s, t: TOK_CONST),
-    (r'CONTAINING%s' % _EXC,            lambda s, t: TOK_CONT),
-    (r'DEFAULT%s' % _EXC,               lambda s, t: TOK_DEF),
-    (r'DEFINITIONS%s' % _EXC,           lambda s, t: TOK_DEFI),
-    (r'ENCODED%s' % _EXC,               lambda s, t: TOK_ENC),
-    (r'END%s' % _EXC,                   lambda s, t: TOK_END),
-    (r'EXCEPT%s' % _EXC,                lambda s, t: TOK_EXCE),
-    (r'EXPLICIT%s' % _EXC,              lambda s, t: TOK_TEXP),
-    (r'EXPORTS%s' % _EXC,               lambda s, t: TOK_EXP),
-    (r'EXTENSIBILITY%sIMPLIED%s' % (REScannerSNL, _EXC),    lambda s, t: TOK_EXTI),
-    (r'FALSE%s' % _EXC,                 lambda s, t: TOK_FALS),
-    (r'FROM%s' % _EXC,                  lambda s, t: TOK_FROM),
-    (r'IMPLICIT%s' % _EXC,              lambda s, t: TOK_TIMP),
-    (r'IMPORTS%s' % _EXC,               lambda s, t: TOK_IMP),
-    (r'INCLUDES%s' % _EXC,              lambda s, t: TOK_INCL),
-    (r'MAX%s' % _EXC,                   lambda s, t: TOK_MAX),
-    (r'MIN%s' % _EXC,                   lambda s, t: TOK_MIN),
-    (r'MINUS-INFINITY%s' % _EXC,        lambda s, t: TOK_MINF),
-    (r'NOT-A-NUMBER%s' % _EXC,          lambda s, t: TOK_NAN),
-    (r'NULL%s' % _EXC,                  lambda s, t: (TOK_NULL, t)),
-    (r'OF%s' % _EXC,                    lambda s, t: TOK_OF),
-    (r'OPTIONAL%s' % _EXC,              lambda s, t: TOK_OPT),
-    (r'PATTERN%s' % _EXC,               lambda s, t: TOK_PAT),
-    (r'PLUS-INFINITY%s' % _EXC,         lambda s, t: TOK_PINF),
-    (r'PRESENT%s' % _EXC,               lambda s, t: TOK_PRES),
-    (r'PRIVATE%s' % _EXC,               lambda s, t: TOK_TPRI),
-    (r'SIZE%s' % _EXC,                  lambda s, t: TOK_SIZE),
-    (r'TAGS%s' % _EXC,                  lambda s, t: TOK_TAGS),
-    (r'TRUE%s' % _EXC,                  lambda s, t: TOK_TRUE),
-    (r'UNIQUE%s' % _EXC,                lambda s, t: TOK_UNIQ),
-    (r'UNIVERSAL%s' % _EXC,             lambda s, t: TOK_TUNI),
-    (r'WITH%sSYNTAX%s' % (REScannerSNL, _EXC),              lambda s, t: TOK_WSYN),
+    (r'::=',                            TOK_ASSI,   False),
+    (r':',                              TOK_COL,    False),
+    (r';',                              TOK_SCOL,   False),
+    (r'=',                              TOK_EQU,    False),
+    (r',',                              TOK_COM,    False),
+    (r'\(',                             TOK_PARO,   False),
+    (r'\)',                             TOK_PARC,   False),
+    (r'\[{2}',                          TOK_DBRAO,  False),
+    (r'\]{2}',                          TOK_DBRAC,  False),
+    (r'\[',                             TOK_BRAO,   False),
+    (r'\]',                             TOK_BRAC,   False),
+    (r'\{',                             TOK_CBRAO,  False),
+    (r'\}',                             TOK_CBRAC,  False),
+    (r'\.\.\.',                         TOK_TDOT,   False),
+    (r'\.\.',                           TOK_DDOT,   False),
+    (r'\.',                             TOK_DOT,    False),
+    (r'\||(?:UNION%s)' % _EXC,          TOK_UNIO,   False),
+    (r'\^|(?:INTERSECTION%s)' % _EXC,   TOK_INTER,  False),
+    (r'<',                              TOK_LTHAN,  False),
+    (r'>',                              TOK_GTHAN,  False),
+    (r'@',                              TOK_ARRO,   False),
+    (r'\!',                             TOK_EXCL,   False),
     #
-    (r'%s' % REScannerReal,             lambda s, t: (TOK_INT,   t)),
-    (r'%s' % REScannerInt,              lambda s, t: (TOK_REAL,  t)),
-    (r'%s' % REScannerBStr,             lambda s, t: (TOK_BSTR,  t)),
-    (r'%s' % REScannerHStr,             lambda s, t: (TOK_HSTR,  t)),
+    (r'ABSENT%s' % _EXC,                TOK_ABS,    False),
+    (r'ALL%s' % _EXC,                   TOK_ALL,    False),
+    (r'APPLICATION%s' % _EXC,           TOK_TAPP,   False),
+    (r'AUTOMATIC%s' % _EXC,             TOK_AUTO,   False),
+    (r'BEGIN%s' % _EXC,                 TOK_BEG,    False),
+    (r'BY%s' % _EXC,                    TOK_BY,     False),
+    (r'COMPONENT%s' % _EXC,             TOK_COMP,   False),
+    (r'COMPONENTS%s' % _EXC,            TOK_COMPS,  False),
+    (r'CONSTRAINED%s' % _EXC,           TOK_CONST,  False),
+    (r'CONTAINING%s' % _EXC,            TOK_CONT,   False),
+    (r'DEFAULT%s' % _EXC,               TOK_DEF,    False),
+    (r'DEFINITIONS%s' % _EXC,           TOK_DEFI,   False),
+    (r'ENCODED%s' % _EXC,               TOK_ENC,    False),
+    (r'END%s' % _EXC,                   TOK_END,    False),
+    (r'EXCEPT%s' % _EXC,                TOK_EXCE,   False),
+    (r'EXPLICIT%s' % _EXC,              TOK_TEXP,   False),
+    (r'EXPORTS%s' % _EXC,               TOK_EXP,    False),
+    (r'EXTENSIBILITY%sIMPLIED%s' % (REScannerSNL, _EXC),    TOK_EXTI,   False),
+    (r'FALSE%s' % _EXC,                 TOK_FALS,   False),
+    (r'FROM%s' % _EXC,                  TOK_FROM,   False),
+    (r'IMPLICIT%s' % _EXC,              TOK_TIMP,   False),
+    (r'IMPORTS%s' % _EXC,               TOK_IMP,    False),
+    (r'INCLUDES%s' % _EXC,              TOK_INCL,   False),
+    (r'MAX%s' % _EXC,                   TOK_MAX,    False),
+    (r'MIN%s' % _EXC,                   TOK_MIN,    False),
+    (r'MINUS-INFINITY%s' % _EXC,        TOK_MINF,   False),
+    (r'NOT-A-NUMBER%s' % _EXC,          TOK_NAN,    False),
+    (r'NULL%s' % _EXC,                  TOK_NULL,   True),
+    (r'OF%s' % _EXC,                    TOK_OF,     False),
+    (r'OPTIONAL%s' % _EXC,              TOK_OPT,    False),
+    (r'PATTERN%s' % _EXC,               TOK_PAT,    False),
+    (r'PLUS-INFINITY%s' % _EXC,         TOK_PINF,   False),
+    (r'PRESENT%s' % _EXC,               TOK_PRES,   False),
+    (r'PRIVATE%s' % _EXC,               TOK_TPRI,   False),
+    (r'SIZE%s' % _EXC,                  TOK_SIZE,   False),
+    (r'TAGS%s' % _EXC,                  TOK_TAGS,   False),
+    (r'TRUE%s' % _EXC,                  TOK_TRUE,   False),
+    (r'UNIQUE%s' % _EXC,                TOK_UNIQ,   False),
+    (r'UNIVERSAL%s' % _EXC,             TOK_TUNI,   False),
+    (r'WITH%sSYNTAX%s' % (REScannerSNL, _EXC),              TOK_WSYN,   False),
     #
-    (r'(%s)%s' % (REScannerNTypes, _EXC),                   lambda s, t: (TOK_NTYPE, t)),
-    (r'&[a-zA-Z](?:\-{0,1}[a-zA-Z0-9]{1,}){0,}%s' % _EXC,   lambda s, t: (TOK_CLAID, t)),
-    (r'[A-Z](?:\-{0,1}[A-Z0-9]{1,}){0,}%s' % _EXC,          lambda s, t: (TOK_HID,   t)),
-    (r'[A-Z](?:\-{0,1}[a-zA-Z0-9]{1,}){0,}%s' % _EXC,       lambda s, t: (TOK_ID,    t)),
-    (r'[a-z](?:\-{0,1}[a-zA-Z0-9]{1,}){0,}%s' % _EXC,       lambda s, t: (TOK_LID,   t)),
+    (r'%s' % REScannerReal,             TOK_INT,    True),
+    (r'%s' % REScannerInt,              TOK_REAL,   True),
+    (r'%s' % REScannerBStr,             TOK_BSTR,   True),
+    (r'%s' % REScannerHStr,             TOK_HSTR,   True),
     #
-    (r'%s' % REScannerSNL,              None)
-    ],
-    flags=re.DOTALL
-    )
+    (r'(%s)%s' % (REScannerNTypes, _EXC),                   TOK_NTYPE,  True),
+    # identifiers are written without nested quantifiers, which would backtrack
+    # exponentially when the lookahead fails, e.g. over a long "aBcD...-" word
+    (r'&[a-zA-Z][a-zA-Z0-9]{0,}(?:\-[a-zA-Z0-9]{1,}){0,}%s' % _EXC,   TOK_CLAID,  True),
+    (r'[A-Z][A-Z0-9]{0,}(?:\-[A-Z0-9]{1,}){0,}%s' % _EXC,             TOK_HID,    True),
+    (r'[A-Z][a-zA-Z0-9]{0,}(?:\-[a-zA-Z0-9]{1,}){0,}%s' % _EXC,       TOK_ID,     True),
+    (r'[a-z][a-zA-Z0-9]{0,}(?:\-[a-zA-Z0-9]{1,}){0,}%s' % _EXC,       TOK_LID,    True),
+    ]
+
+
+class ASN1Scanner(object):
+    """single-pass scanner for ASN.1 textual specifications
+    
+    All scanning rules are compiled into a single master regexp, each rule
+    being set in its own named group: the identifier of the rule matched at a
+    given position is then retrieved with a single lookup on the match' lastgroup.
+    
+    Tokens are returned the same way as they were with the former re.Scanner:
+    either a simple token identifier, or a 2-tuple (token identifier, text).
+    """
+    
+    def __init__(self, rules, flags=re.DOTALL):
+        pats, self._acts = [], {}
+        for i, (pat, tokid, wtext) in enumerate(rules):
+            name = 'R%i' % i
+            pats.append('(?P<%s>%s)' % (name, pat))
+            self._acts[name] = (tokid, wtext)
+        self.RE = re.compile('|'.join(pats), flags)
+    
+    def scan(self, text, wcmt=True):
+        """scan the given text and return the list of tokens, and the remaining
+        part of the text which could not be scanned
+        
+        if wcmt is False, comments are not kept within the list of tokens
+        """
+        toks, acts, match, pos, end = [], self._acts, self.RE.match, 0, len(text)
+        append = toks.append
+        while pos < end:
+            m = match(text, pos)
+            if m is None or m.end() == pos:
+                break
+            tokid, wtext = acts[m.lastgroup]
+            if tokid is None or (tokid == TOK_CMT and not wcmt):
+                pass
+            elif wtext:
+                append( (tokid, m.group()) )
+            else:
+                append( tokid )
+            pos = m.end()
+        return toks, text[pos:]
+
+
+REScannerASN1 = ASN1Scanner(_SCAN_RULES)
+
+
+def build_groups(toks):
+    """return a list with, for each token opening a group, the index of the token
+    closing it, and -1 for every other token (including unbalanced opening tokens)
+    
+    each kind of group is matched independently from the others, the same way as
+    it is done when counting the depth of a group while moving forward
+    """
+    grp   = [-1] * len(toks)
+    stack = {op: [] for op in Tokenizer.GROUP}
+    clo   = {cl: stack[op] for op, cl in Tokenizer.GROUP.items()}
+    for i, tok in enumerate(toks):
+        if tok in stack:
+            stack[tok].append(i)
+        elif tok in clo and clo[tok]:
+            grp[clo[tok].pop()] = i
+    return grp
 
 
 class Tokenizer(object):
     """handles consciously ASN.1 tokens, forward and backward, while ignoring
     ASN.1 comments
+    
+    A Tokenizer works on a window [start:stop] of a list of tokens, which is
+    shared with all the sub-Tokenizers it returns (e.g. with get_upto() or
+    get_group()): no list of tokens gets copied while parsing a specification.
+    The index of the closing token of each group is computed once, when the
+    initial Tokenizer is created, so that jumping over a group is immediate.
     """
     
     REPR_OFF = 10
@@ -296,130 +369,120 @@ class Tokenizer(object):
         TOK_BEG   : TOK_END    # BEGIN END
         }
     
-    def __init__(self, tokens=[]):
-        self.toks = tokens
-        # cursor
-        self.cur = -1
+    def __init__(self, tokens=[], grp=None, start=0, stop=None):
+        if grp is None:
+            # new list of tokens: comments are removed and groups are indexed
+            tokens = [tok for tok in tokens if tok[0] != TOK_CMT]
+            grp    = build_groups(tokens)
+        self.toks  = tokens
+        self.grp   = grp
+        self.start = start
+        self.stop  = len(tokens) if stop is None else stop
+        # cursor (absolute index in self.toks)
+        self.cur = start - 1
         # stack of previous cursor value
         self.curp = []
     
     def __repr__(self):
-        cur = self.get_cur()
-        return repr(self.toks[cur-self.REPR_OFF:cur+self.REPR_OFF])
+        cur = self.cur
+        return repr(self.toks[max(self.start, cur-self.REPR_OFF):min(self.stop, cur+self.REPR_OFF)])
+    
+    def _sub(self, start, stop):
+        return self.__class__(self.toks, self.grp, start, stop)
     
     def get_cur(self):
-        return self.cur
+        return self.cur - self.start
     
     def set_cur(self, cur):
-        if not -1 <= cur < len(self.toks):
+        if not -1 <= cur < self.stop - self.start:
             raise(ASN1TokenizerErr('invalid cursor'))
         else:
-            self.cur = cur
+            self.cur = self.start + cur
     
     def count(self):
-        return len(self.toks) - self.cur
+        return self.stop - self.cur
     
     def get_tok(self):
-        try:
-            return self.toks[self.cur]
-        except:
+        cur = self.cur
+        if self.start <= cur < self.stop:
+            return self.toks[cur]
+        elif cur == self.start - 1 and self.stop > self.start:
+            # like indexing a list with -1
+            return self.toks[self.stop-1]
+        else:
             raise(ASN1TokenizerErr('invalid cursor'))
     
     def get_next(self, off=1):
-        ind, cnt, curp = 0, 0, self.cur
-        for tok in self.toks[1+self.cur:]:
-            if tok[0] == TOK_CMT:
-                pass
-            else:
-                ind += 1
-            cnt += 1
-            if ind == off:
-                break
-        if ind < off:
+        cur = self.cur + off
+        if cur >= self.stop:
             raise(ASN1TokenizerErr('not enough tokens'))
-        self.cur += cnt
-        self.curp.append(curp)
-        return tok
+        self.curp.append(self.cur)
+        self.cur = cur
+        return self.toks[cur]
     
     def has_next(self):
-        for tok in self.toks[1+self.cur:]:
-            if tok[0] == TOK_CMT:
-                pass
-            else:
-                return True
-        return False
+        return self.cur + 1 < self.stop
     
     def get_prev(self, off=1):
-        ind, cnt, curp = 0, 0, self.cur
-        for tok in self.toks[:self.cur][::-1]:
-            if tok[0] == TOK_CMT:
-                pass
-            else:
-                ind += 1
-            cnt += 1
-            if ind == off:
-                break
-        if ind < off:
+        cur = self.cur - off
+        if cur < self.start:
             raise(ASN1TokenizerErr('not enough tokens'))
-        self.cur -= cnt
-        self.curp.append(curp)
-        return tok
+        self.curp.append(self.cur)
+        self.cur = cur
+        return self.toks[cur]
     
     def get_upto(self, target):
         curp = self.cur
-        while self.get_next() != target:
-            # do not extend the stack with previous cursor value
-            del self.curp[-1]
+        try:
+            cur = self.toks.index(target, curp+1, self.stop)
+        except ValueError:
+            if self.stop > curp+1:
+                self.cur = self.stop - 1
+            raise(ASN1TokenizerErr('not enough tokens'))
         self.curp.append(curp)
-        self.cur += 1
-        return self.__class__(self.toks[max(0, curp):self.cur-1])
+        self.cur = cur + 1
+        return self._sub(max(self.start, curp), cur)
     
     def get_group(self, wbnd=True):
-        tok, curp = self.toks[self.cur], self.cur
-        if tok in self.GROUP:
-            op, clo = tok, self.GROUP[tok]
-        else:
-            raise(ASN1TokenizerErr('invalid group opening token, %s' % tok))
-        depth = 1
-        while depth > 0:
-            tok = self.get_next()
-            # do not extend the stack with previous cursor value
-            del self.curp[-1]
-            if tok == op:
-                depth += 1
-            elif tok == clo:
-                depth -= 1
-            if depth == 0:
-                break
+        curp = self.cur
+        tok  = self.toks[curp]
+        if tok not in self.GROUP:
+            raise(ASN1TokenizerErr('invalid group opening token, %s' % (tok, )))
+        cur = self.grp[curp]
+        if not curp < cur < self.stop:
+            self.cur = self.stop - 1
+            raise(ASN1TokenizerErr('not enough tokens'))
         self.curp.append(curp)
+        self.cur = cur
         if wbnd:
-            return self.__class__(self.toks[curp:1+self.cur])
+            return self._sub(curp, 1+cur)
         else:
-            return self.__class__(self.toks[1+curp:self.cur])
+            return self._sub(1+curp, cur)
     
     def get_comps(self, sep=TOK_COM):
-        comps, curp, curlast = [], self.cur, self.cur
-        while True:
-            try:
-                tok = self.get_next()
-            except:
-                break
-            if tok in self.GROUP:
+        """return the list of components, separated with `sep' outside of
+        any group, from the current cursor up to the end
+        """
+        comps, curp, curlast = [], self.cur, self.cur + 1
+        toks, grp, cur = self.toks, self.grp, curlast
+        while cur < self.stop:
+            tok = toks[cur]
+            if tok == sep:
+                comps.append(self._sub(curlast, cur))
+                curlast = cur + 1
+            elif tok in self.GROUP and curp < grp[cur] < self.stop:
                 # jump over the group
-                grp = self.get_group()
-                # do not extend the stack with previous cursor value
-                del self.curp[-1]
-            elif tok == sep:
-                comps.append(self.__class__(self.toks[curlast:self.cur-1]))
-                curlast = self.cur
-            else:
-                pass
+                cur = grp[cur]
+            cur += 1
+        if curlast < self.stop:
+            comps.append(self._sub(curlast, self.stop))
+        self.cur = max(self.cur, self.stop - 1)
         self.curp.append(curp)
         return comps
     
     def undo(self):
         if not self.curp:
-            raise() 
+            raise(ASN1TokenizerErr('no previous cursor'))
         self.cur = self.curp[-1]
         del self.curp[-1]
 
@@ -446,7 +509,7 @@ def tokenize_text(text=u'', **kwargs):
     elif not isinstance(text, str_types):
         raise(ASN1Err('need some textual definition'))
     #
-    toks, rest = REScannerASN1.scan(text)
+    toks, rest = REScannerASN1.scan(text, wcmt=False)
     if rest:
         asnlog('%i remaining chars at the end of spec' % len(rest))
     # build the handler for the tokens
@@ -958,7 +1021,47 @@ def test():
     return M
 
 
+
+def test_perf():
+    """benchmark the scanning and tokenization of all ASN.1 specifications
+    from pycrate_asn1dir
+    """
+    import os
+    from time import time
+    from pycrate_asn1c.specdir import ASN_SPECS
+    
+    p = os.path.dirname(__file__) + os.path.sep + '..' + os.path.sep + 'pycrate_asn1dir' + os.path.sep
+    Ts, Tt, Nc, Nt, Nm = 0.0, 0.0, 0, 0, 0
+    
+    for S in sorted(set([S[0] if isinstance(S, (list, tuple)) else S for S in ASN_SPECS.values()])):
+        if S == 'IETF_SNMP':
+            continue
+        Tspec = time()
+        for fn in sorted(os.listdir( '%s%s/' % (p, S))):
+            if fn[-4:] == '.asn':
+                text = open('%s%s/%s' % (p, S, fn)).read()
+                Nc += len(text)
+                T0 = time()
+                toks, rest = REScannerASN1.scan(text)
+                T1 = time()
+                try:
+                    mods = tokenize_text(text)
+                except Exception as err:
+                    asnlog('%s/%s: %s' % (S, fn, err))
+                else:
+                    Nm += len(mods)
+                Ts += T1 - T0
+                Tt += time() - T1
+                Nt += len(toks)
+        print('%-30s: %.4f' % (S, time() - Tspec))
+    print('[+] %i chars, %i tokens, %i modules' % (Nc, Nt, Nm))
+    print('[+] scanning: %.4f, tokenizing: %.4f' % (Ts, Tt))
+
+
 if __name__ == '__main__':
     import sys
-    M = test()
+    if len(sys.argv) > 1 and sys.argv[1] == 'perf':
+        test_perf()
+    else:
+        M = test()
     sys.exit(0)
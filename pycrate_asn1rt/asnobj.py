@@ -36,6 +36,8 @@ from .setobj  import *
 from .codecs  import *
 from .codecs  import _with_json
 
+from collections import OrderedDict
+
 
 ASN1Obj_docstring = """
 Common object attributes:
@@ -125,6 +127,98 @@ Attributes used at run-time:
         decoding the object when using from_*_ws() and to_*_ws() methods.
 """
 
+class ASN1EncCache(object):
+    """
+    bounded LRU cache for encoded ASN.1 values
+    
+    Each entry is keyed with the ASN1Obj instance, the codec with its current
+    configuration, and the canonicalized value, and stores the list of fields 
+    as returned by the ASN1Obj internal encoders (_to_per(), _to_ber(), _to_oer())
+    together with its length in bits.
+    
+    It is used by ASN1Obj instances for which set_enc_cache() has been called.
+    """
+    
+    # maximum number of encodings kept in the cache
+    MAXSIZE = 4096
+    
+    def __init__(self, maxsize=None):
+        if maxsize is not None:
+            self.MAXSIZE = maxsize
+        self._lut   = OrderedDict()
+        self.hits   = 0
+        self.misses = 0
+    
+    def __len__(self):
+        return len(self._lut)
+    
+    def get(self, key):
+        try:
+            enc = self._lut.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        else:
+            # put it back at the most recently used position
+            self._lut[key] = enc
+            self.hits += 1
+            return enc
+    
+    def set(self, key, enc):
+        self._lut[key] = enc
+        if len(self._lut) > self.MAXSIZE:
+            # drop the least recently used entry
+            self._lut.popitem(last=False)
+    
+    def clear(self):
+        self._lut.clear()
+        self.hits, self.misses = 0, 0
+    
+    def get_stats(self):
+        """returns a dict with the number of hits, misses, entries and the 
+        maximum number of entries of the cache
+        """
+        return {'hits'   : self.hits,
+                'misses' : self.misses,
+                'size'   : len(self._lut),
+                'maxsize': self.MAXSIZE}
+
+
+def canon_val(val):
+    """returns a hashable representation of the ASN.1 value `val', 
+    for usage as a key in ASN1EncCache
+    
+    Raises TypeError if `val' contains an unhashable object
+    """
+    if isinstance(val, dict):
+        return (dict, tuple(sorted([(k, canon_val(v)) for k, v in val.items()])))
+    elif isinstance(val, list):
+        return (list, tuple([canon_val(v) for v in val]))
+    elif isinstance(val, tuple):
+        return tuple([canon_val(v) for v in val])
+    else:
+        hash(val)
+        return val
+
+
+def dec_budget(meth):
+    """decorator for the PER and OER decoding methods of constructed objects,
+    accounting each decoded object into the decoding budget set in 
+    Element._DEC_BUDGET
+    """
+    def _from_char_budget(self, char):
+        if self._DEC_BUDGET is None:
+            return meth(self, char)
+        self._DEC_BUDGET.enter(self._name)
+        try:
+            meth(self, char)
+        finally:
+            self._DEC_BUDGET.leave()
+    _from_char_budget.__name__ = meth.__name__
+    _from_char_budget.__doc__  = meth.__doc__
+    return _from_char_budget
+
+
 class ASN1Obj(Element):
     
     # in order to disable any asnlog() during the runtime
@@ -139,6 +233,9 @@ class ASN1Obj(Element):
     # this enables object's table constraint verification when using set_val()
     _SAFE_BNDTAB = True
     
+    # cache shared by all objects for which set_enc_cache() has been called
+    _ENC_CACHE   = ASN1EncCache()
+    
     #--------------------------------------------------------------------------#
     # class attributes, initialization and safe checking methods
     #--------------------------------------------------------------------------#
@@ -1363,6 +1460,90 @@ class ASN1Obj(Element):
     def show(self):
         return '<~ASN1~: %s>' % self.to_asn1()
     
+    ###
+    # memoization of the encoding of values
+    ###
+    
+    def set_enc_cache(self, enable=True):
+        """
+        enables (or disables) the memoization of the PER, BER (and CER, DER) and
+        OER encodings of self, into ASN1Obj._ENC_CACHE
+        
+        When enabled, encoding a value of self which has already been encoded
+        with the same codec configuration only costs a dictionary lookup.
+        This is intended for values which are repeated across many messages 
+        (e.g. PLMN identities, tracking area lists, security capabilities...).
+        With APER, the cache is only used when the encoding of self starts on 
+        an octet boundary.
+        
+        The cache is not used by the encoders generating the transfer structure
+        (to_*_ws() methods).
+        
+        Args:
+            enable: bool
+        
+        Returns:
+            None
+        """
+        if enable:
+            self._to_per = self._to_per_cached
+            self._to_ber = self._to_ber_cached
+            self._to_oer = self._to_oer_cached
+        else:
+            for attr in ('_to_per', '_to_ber', '_to_oer'):
+                if attr in self.__dict__:
+                    del self.__dict__[attr]
+    
+    def _enc_cached(self, key, encoder, aligned=False):
+        try:
+            key = key + (canon_val(self._val), )
+            enc = self._ENC_CACHE.get(key)
+        except TypeError:
+            # unhashable value, no caching
+            return encoder(self)
+        if enc is None:
+            GEN = encoder(self)
+            self._ENC_CACHE.set(key, (tuple(GEN), sum([f[2] for f in GEN])))
+            return GEN
+        else:
+            if aligned:
+                ASN1CodecPER._off[-1] += enc[1]
+            return list(enc[0])
+    
+    def _to_per_cached(self):
+        if ASN1CodecPER.ALIGNED:
+            if ASN1CodecPER._off[-1] % 8:
+                # the encoding depends on the current offset
+                return self.__class__._to_per(self)
+            return self._enc_cached((self, 'APER', ASN1CodecPER.CANONICAL),
+                                    self.__class__._to_per, True)
+        else:
+            return self._enc_cached((self, 'UPER', ASN1CodecPER.CANONICAL),
+                                    self.__class__._to_per)
+    
+    def _to_ber_cached(self):
+        return self._enc_cached((self, 'BER',
+                                 ASN1CodecBER.ENC_LLONG,
+                                 ASN1CodecBER.ENC_LUNDEF,
+                                 ASN1CodecBER.ENC_BOOLTRUE,
+                                 ASN1CodecBER.ENC_REALNR,
+                                 ASN1CodecBER.ENC_REALNR1_SPA,
+                                 ASN1CodecBER.ENC_REALNR1_ZER,
+                                 ASN1CodecBER.ENC_REALNR2_SPA,
+                                 ASN1CodecBER.ENC_REALNR2_ZER,
+                                 ASN1CodecBER.ENC_REALNR2_ZERTRAIL,
+                                 ASN1CodecBER.ENC_OID_LEXT,
+                                 ASN1CodecBER.ENC_TAG_LEXT,
+                                 ASN1CodecBER.ENC_BSTR_FRAG,
+                                 ASN1CodecBER.ENC_OSTR_FRAG,
+                                 ASN1CodecBER.ENC_TIME_CANON,
+                                 ASN1CodecBER.ENC_DEF_CANON),
+                                self.__class__._to_ber)
+    
+    def _to_oer_cached(self):
+        return self._enc_cached((self, 'OER', ASN1CodecOER.CANONICAL),
+                                self.__class__._to_oer)
+    
     ###
     # conversion between internal value and ASN.1 PER encoding
     ###
@@ -1374,6 +1555,11 @@ class ASN1Obj(Element):
         raise(ASN1NotSuppErr(self.fullname()))
     
     def from_uper(self, buf):
+        if self._DEC_BUDGET is not None and self._DEC_BUDGET.start(buf, self._name):
+            try:
+                return self.from_uper(buf)
+            finally:
+                self._DEC_BUDGET.stop()
         ASN1CodecPER.ALIGNED = False
         if isinstance(buf, bytes_types):
             char = Charpy(buf)
@@ -1408,6 +1594,11 @@ class ASN1Obj(Element):
             return None
     
     def from_aper(self, buf):
+        if self._DEC_BUDGET is not None and self._DEC_BUDGET.start(buf, self._name):
+            try:
+                return self.from_aper(buf)
+            finally:
+                self._DEC_BUDGET.stop()
         ASN1CodecPER.ALIGNED = True
         ASN1CodecPER._off.append(0)
         if isinstance(buf, bytes_types):
@@ -1451,6 +1642,11 @@ class ASN1Obj(Element):
         raise(ASN1NotSuppErr(self.fullname()))
     
     def from_uper_ws(self, buf):
+        if self._DEC_BUDGET is not None and self._DEC_BUDGET.start(buf, self._name):
+            try:
+                return self.from_uper_ws(buf)
+            finally:
+                self._DEC_BUDGET.stop()
         ASN1CodecPER.ALIGNED = False
         if isinstance(buf, bytes_types):
             char = Charpy(buf)
@@ -1493,6 +1689,11 @@ class ASN1Obj(Element):
             return None
     
     def from_aper_ws(self, buf):
+        if self._DEC_BUDGET is not None and self._DEC_BUDGET.start(buf, self._name):
+            try:
+                return self.from_aper_ws(buf)
+            finally:
+                self._DEC_BUDGET.stop()
         ASN1CodecPER.ALIGNED = True
         ASN1CodecPER._off.append(0)
         if isinstance(buf, bytes_types):
@@ -1604,6 +1805,11 @@ class ASN1Obj(Element):
         self._decode_ber_cont(char, tlv)
     
     def from_ber(self, buf, single=True):
+        if self._DEC_BUDGET is not None and self._DEC_BUDGET.start(buf, self._name):
+            try:
+                return self.from_ber(buf, single)
+            finally:
+                self._DEC_BUDGET.stop()
         if isinstance(buf, bytes_types):
             char = Charpy(buf)
         else:
@@ -1732,6 +1938,11 @@ class ASN1Obj(Element):
         self._struct = TLV
     
     def from_ber_ws(self, buf, single=True):
+        if self._DEC_BUDGET is not None and self._DEC_BUDGET.start(buf, self._name):
+            try:
+                return self.from_ber_ws(buf, single)
+            finally:
+                self._DEC_BUDGET.stop()
         if isinstance(buf, bytes_types):
             char = Charpy(buf)
         else:
@@ -2002,6 +2213,11 @@ class ASN1Obj(Element):
         raise (ASN1NotSuppErr(self.fullname()))
 
     def from_oer(self, buf):
+        if self._DEC_BUDGET is not None and self._DEC_BUDGET.start(buf, self._name):
+            try:
+                return self.from_oer(buf)
+            finally:
+                self._DEC_BUDGET.stop()
         # ASN1CodecOER.CANONICAL = False
         if isinstance(buf, bytes_types):
             char = Charpy(buf)
@@ -2014,6 +2230,11 @@ class ASN1Obj(Element):
             self._safechk_bnd(self._val)
 
     def from_oer_ws(self, buf):
+        if self._DEC_BUDGET is not None and self._DEC_BUDGET.start(buf, self._name):
+            try:
+                return self.from_oer_ws(buf)
+            finally:
+                self._DEC_BUDGET.stop()
         # ASN1CodecOER.CANONICAL = False
         if isinstance(buf, bytes_types):
             char = Charpy(buf)
@@ -131,6 +131,7 @@ Specific attributes:
     # conversion between internal value and ASN.1 PER encoding
     ###
     
+    @dec_budget
     def _from_per_ws(self, char):
         GEN = []
         if self._ext is not None:
@@ -200,6 +201,7 @@ Specific attributes:
         self._struct = Envelope(self._name, GEN=tuple(GEN))
         return
     
+    @dec_budget
     def _from_per(self, char):
         GEN = []
         if self._ext is not None:
@@ -651,6 +653,7 @@ Specific attributes:
         self._struct = Envelope(self._name, GEN=tuple(temp))
         return self._struct
 
+    @dec_budget
     def _from_oer(self, char):
         tag_class, tag = ASN1CodecOER.decode_tag(char)
         try:
@@ -685,6 +688,7 @@ Specific attributes:
                 raise(ASN1OERDecodeErr('CHOICE._from_oer: %s, unknown extension tag %r' \
                       % (self.fullname(), (tag_class, tag))))
 
+    @dec_budget
     def _from_oer_ws(self, char):
         tag_class, tag, tag_struct = ASN1CodecOER.decode_tag_ws(char)
         try:
@@ -800,6 +804,7 @@ class _CONSTRUCT(ASN1Obj):
     # conversion between internal value and ASN.1 PER encoding
     ###
     
+    @dec_budget
     def _from_per_ws(self, char):
         GEN, val = [], {}
         if not self._cont and self._ext is None:
@@ -912,6 +917,7 @@ class _CONSTRUCT(ASN1Obj):
         self._struct = Envelope(self._name, GEN=tuple(GEN))
         return
     
+    @dec_budget
     def _from_per(self, char):
         GEN, val = [], {}
         if not self._cont and self._ext is None:
@@ -1581,6 +1587,7 @@ class _CONSTRUCT(ASN1Obj):
         self._struct = Envelope(self._name, GEN=tuple(GEN))
         return self._struct
     
+    @dec_budget
     def _from_oer(self, char):
         GEN, val = [], {}
         if not self._cont and self._ext is None:
@@ -1666,6 +1673,7 @@ class _CONSTRUCT(ASN1Obj):
         self._val = val
         return
     
+    @dec_budget
     def _from_oer_ws(self, char):
         GEN, val = [], {}
         if not self._cont and self._ext is None:
@@ -2689,6 +2697,7 @@ class _CONSTRUCT_OF(ASN1Obj):
     # conversion between internal value and ASN.1 PER encoding
     ###
     
+    @dec_budget
     def _from_per_ws(self, char):
         GEN = []
         if self._const_sz:
@@ -2725,6 +2734,8 @@ class _CONSTRUCT_OF(ASN1Obj):
                 val = []
                 _par = self._cont._parent
                 self._cont._parent = self
+                if self._DEC_BUDGET is not None:
+                    self._DEC_BUDGET.add_nodes(ldet, self._name)
                 for i in range(ldet):
                     self._cont._from_per_ws(char)
                     GEN.append(self._cont._struct)
@@ -2750,6 +2761,8 @@ class _CONSTRUCT_OF(ASN1Obj):
         self._cont._parent = self
         while ldet in (65536, 49152, 32768, 16384):
             # requires defragmentation
+            if self._DEC_BUDGET is not None:
+                self._DEC_BUDGET.add_nodes(ldet, self._name)
             for i in range(ldet):
                 self._cont._from_per_ws(char)
                 GEN.append(self._cont._struct)
@@ -2761,6 +2774,8 @@ class _CONSTRUCT_OF(ASN1Obj):
             L += ldet
             if L > ASN1CodecPER.DEC_MAXL:
                 raise(ASN1PERDecodeErr('too much fragments, {0!r}'.format(L)))
+        if self._DEC_BUDGET is not None:
+            self._DEC_BUDGET.add_nodes(ldet, self._name)
         for i in range(ldet):
             self._cont._from_per_ws(char)
             GEN.append(self._cont._struct)
@@ -2769,6 +2784,7 @@ class _CONSTRUCT_OF(ASN1Obj):
         self._val    = val
         self._struct = Envelope(self._name, GEN=tuple(GEN))
     
+    @dec_budget
     def _from_per(self, char):
         GEN = []
         if self._const_sz:
@@ -2802,6 +2818,8 @@ class _CONSTRUCT_OF(ASN1Obj):
                 val = []
                 _par = self._cont._parent
                 self._cont._parent = self
+                if self._DEC_BUDGET is not None:
+                    self._DEC_BUDGET.add_nodes(ldet, self._name)
                 for i in range(ldet):
                     self._cont._from_per(char)
                     val.append(self._cont._val)
@@ -2824,6 +2842,8 @@ class _CONSTRUCT_OF(ASN1Obj):
         self._cont._parent = self
         while ldet in (65536, 49152, 32768, 16384):
             # requires defragmentation
+            if self._DEC_BUDGET is not None:
+                self._DEC_BUDGET.add_nodes(ldet, self._name)
             for i in range(ldet):
                 self._cont._from_per(char)
                 val.append(self._cont._val)
@@ -2833,6 +2853,8 @@ class _CONSTRUCT_OF(ASN1Obj):
             L += ldet
             if L > ASN1CodecPER.DEC_MAXL:
                 raise(ASN1PERDecodeErr('too much fragments, {0!r}'.format(L)))
+        if self._DEC_BUDGET is not None:
+            self._DEC_BUDGET.add_nodes(ldet, self._name)
         for i in range(ldet):
             self._cont._from_per(char)
             val.append(self._cont._val)
@@ -3238,6 +3260,7 @@ class _CONSTRUCT_OF(ASN1Obj):
         self._struct = Envelope(self._name, GEN=tuple(GEN))
         return self._struct
     
+    @dec_budget
     def _from_oer(self, char):
         l_size = ASN1CodecOER.decode_length_determinant(char)
         ldet = char.get_uint(l_size*8)
@@ -3247,6 +3270,8 @@ class _CONSTRUCT_OF(ASN1Obj):
         Comp._parent = self
         val = []
         if ldet:
+            if self._DEC_BUDGET is not None:
+                self._DEC_BUDGET.add_nodes(ldet, self._name)
             for i in range(ldet):
                 Comp._from_oer(char)
                 val.append(Comp._val)
@@ -3254,6 +3279,7 @@ class _CONSTRUCT_OF(ASN1Obj):
         Comp._parent = _par
         self._val = val
     
+    @dec_budget
     def _from_oer_ws(self, char):
         GEN = []
         l_size, l_size_struct = ASN1CodecOER.decode_length_determinant_ws(char)
@@ -3269,6 +3295,8 @@ class _CONSTRUCT_OF(ASN1Obj):
         Comp._parent = self
         val = []
         if ldet:
+            if self._DEC_BUDGET is not None:
+                self._DEC_BUDGET.add_nodes(ldet, self._name)
             for i in range(ldet):
                 Comp._from_oer_ws(char)
                 GEN.append(Comp._struct)
@@ -250,6 +250,7 @@ Single value: Python 2-tuple
     # conversion between internal value and ASN.1 PER encoding
     ###
     
+    @dec_budget
     def _from_per_ws(self, char):
         # try to get a defined object from a table constraint
         if self._TAB_LUT and self._const_tab and self._const_tab_at:
@@ -289,6 +290,7 @@ Single value: Python 2-tuple
         self._struct = Envelope(self._name, GEN=tuple(GEN))
         return
     
+    @dec_budget
     def _from_per(self, char):
         # try to get a defined object from a table constraint
         if self._TAB_LUT and self._const_tab and self._const_tab_at:
@@ -398,6 +400,8 @@ Single value: Python 2-tuple
             for Obj in Objs:
                 try:
                     Obj._from_ber_ws(char, [tlv])
+                except DecBudgetErr:
+                    raise
                 except Exception:
                     # decoding failed
                     char._cur, char._len_bit = char_cur, char_lb
@@ -492,6 +496,8 @@ Single value: Python 2-tuple
             for Obj in Objs:
                 try:
                     Obj._from_ber(char, [tlv])
+                except DecBudgetErr:
+                    raise
                 except Exception:
                     char._cur, char._len_bit = char_cur, char_lb
                 else:
@@ -646,6 +652,7 @@ Single value: Python 2-tuple
     # conversion between internal value and ASN.1 OER/COER encoding
     ###
     
+    @dec_budget
     def _from_oer(self, char):
         # try to get a defined object from a table constraint
         if self._TAB_LUT and self._const_tab and self._const_tab_at:
@@ -684,6 +691,7 @@ Single value: Python 2-tuple
                 self._val = (Obj.TYPE, val)
         return
     
+    @dec_budget
     def _from_oer_ws(self, char):
         # try to get a defined object from a table constraint
         if self._TAB_LUT and self._const_tab and self._const_tab_at:
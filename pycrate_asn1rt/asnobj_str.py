@@ -418,6 +418,8 @@ Specific constraints attributes:
                         self._const_cont.from_aper_ws(char)
                     else:
                         self._const_cont.from_uper_ws(char)
+                except DecBudgetErr:
+                    raise
                 except Exception:
                     if not self._SILENT:
                         asnlog('BIT_STR.__from_per_ws_buf: %s, CONTAINING object decoding failed'\
@@ -516,6 +518,8 @@ Specific constraints attributes:
                         self._const_cont.from_aper(char)
                     else:
                         self._const_cont.from_uper(char)
+                except DecBudgetErr:
+                    raise
                 except Exception:
                     if not self._SILENT:
                         asnlog('BIT_STR.__from_per_buf: %s, CONTAINING object decoding failed'\
@@ -851,6 +855,8 @@ Specific constraints attributes:
                 Obj._parent = self._parent
                 try:
                     Obj.from_ber(char, single=False)
+                except DecBudgetErr:
+                    raise
                 except Exception:
                     if not self._SILENT:
                         asnlog('BIT_STR.__from_ber_buf: %s, CONTAINING object decoding failed'\
@@ -1689,6 +1695,8 @@ Specific constraints attributes:
                 Obj._parent = self._parent
                 try:
                     Obj.from_ber(char, single=False)
+                except DecBudgetErr:
+                    raise
                 except Exception:
                     if not self._SILENT:
                         asnlog('OCT_STR.__from_ber_buf: %s, CONTAINING object decoding failed'\
@@ -1522,6 +1522,18 @@ class ASN1CodecBER(ASN1Codec):
             # short format
             return [(T_UINT, 0, 1), (T_UINT, l, 7)]
     
+    @classmethod
+    def decode_value_ws(cla, char, lval):
+        # decode the value of a constructed TLV (can have an undefinite length)
+        if lval == -1:
+            return cla.decode_all_ws(char, lundef=True)
+        else:
+            char_lb = char._len_bit
+            char._len_bit = char._cur + 8*lval
+            V = cla.decode_all_ws(char, lundef=False)
+            char._len_bit = char_lb
+            return V
+    
     @classmethod
     def decode_single_ws(cla, char, lundef=False):
         EOS = False
@@ -1534,16 +1546,19 @@ class ASN1CodecBER(ASN1Codec):
         # value
         if pc == 1:
             # constructed (can have an undefinite length)
-            if lval == -1:
-                V = cla.decode_all_ws(char, lundef=True)
+            if Element._DEC_BUDGET is not None:
+                Element._DEC_BUDGET.enter('TLV')
+                try:
+                    V = cla.decode_value_ws(char, lval)
+                finally:
+                    Element._DEC_BUDGET.leave()
             else:
-                char_lb = char._len_bit
-                char._len_bit = char._cur + 8*lval
-                V = cla.decode_all_ws(char, lundef=False)
-                char._len_bit = char_lb
+                V = cla.decode_value_ws(char, lval)
             TLV = [Tag, cl, pc, tval, Len, lval, V, ccur]
         else:
             # primitive
+            if Element._DEC_BUDGET is not None:
+                Element._DEC_BUDGET.add_nodes(1, 'TLV')
             if (cl, pc, tval, lval) == (0, 0, 0, 0):
                 # EOC marker
                 TLV = [Tag, cl, pc, tval, Len, lval, 0, ccur]
@@ -1567,6 +1582,18 @@ class ASN1CodecBER(ASN1Codec):
                 break
         return TLVs
     
+    @classmethod
+    def decode_value(cla, char, lval):
+        # decode the value of a constructed TLV (can have an undefinite length)
+        if lval == -1:
+            return cla.decode_all(char, lundef=True)
+        else:
+            char_lb = char._len_bit
+            char._len_bit = char._cur + 8*lval
+            V = cla.decode_all(char, lundef=False)
+            char._len_bit = char_lb
+            return V
+    
     @classmethod
     def decode_single(cla, char, lundef=False):
         EOS = False
@@ -1579,16 +1606,19 @@ class ASN1CodecBER(ASN1Codec):
         # value
         if pc == 1:
             # constructed (can have an undefinite length)
-            if lval == -1:
-                V = cla.decode_all(char, lundef=True)
+            if Element._DEC_BUDGET is not None:
+                Element._DEC_BUDGET.enter('TLV')
+                try:
+                    V = cla.decode_value(char, lval)
+                finally:
+                    Element._DEC_BUDGET.leave()
             else:
-                char_lb = char._len_bit
-                char._len_bit = char._cur + 8*lval
-                V = cla.decode_all(char, lundef=False)
-                char._len_bit = char_lb
+                V = cla.decode_value(char, lval)
             TLV = [cl, pc, tval, lval, V, ccur]
         else:
             # primitive
+            if Element._DEC_BUDGET is not None:
+                Element._DEC_BUDGET.add_nodes(1, 'TLV')
             if (cl, pc, tval, lval) == (0, 0, 0, 0):
                 # EOC marker
                 TLV = [cl, pc, tval, lval, 0, ccur]
@@ -0,0 +1,257 @@
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.4
+# *
+# * Copyright 2026. Benoit Michau. P1Sec.
+# *
+# * This library is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU Lesser General Public
+# * License as published by the Free Software Foundation; either
+# * version 2.1 of the License, or (at your option) any later version.
+# *
+# * This library is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# * Lesser General Public License for more details.
+# *
+# * You should have received a copy of the GNU Lesser General Public
+# * License along with this library; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+# * MA 02110-1301  USA
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_asn1rt/profiler.py
+# * Created : 2026-10-19
+# * Authors : Benoit Michau
+# *--------------------------------------------------------
+#*/
+
+try:
+    from time import perf_counter as _clock
+except ImportError:
+    # Python2
+    from time import time as _clock
+
+from .utils  import *
+from .err    import *
+from .codecs import ASN1CodecPER
+from .asnobj import ASN1Obj
+# ensure all ASN.1 object classes are defined
+from .asnobj_basic     import *
+from .asnobj_str       import *
+from .asnobj_construct import *
+from .asnobj_class     import *
+from .asnobj_ext       import *
+
+
+# internal codec methods instrumented, with their codec and direction
+_PROF_METH = {
+    '_from_per'   : ('PER', 'dec'),
+    '_from_per_ws': ('PER', 'dec'),
+    '_from_ber'   : ('BER', 'dec'),
+    '_from_ber_ws': ('BER', 'dec'),
+    '_from_oer'   : ('OER', 'dec'),
+    '_from_oer_ws': ('OER', 'dec'),
+    '_from_jval'  : ('JER', 'dec'),
+    '_to_per'     : ('PER', 'enc'),
+    '_to_per_ws'  : ('PER', 'enc'),
+    '_to_ber'     : ('BER', 'enc'),
+    '_to_ber_ws'  : ('BER', 'enc'),
+    '_to_oer'     : ('OER', 'enc'),
+    '_to_oer_ws'  : ('OER', 'enc'),
+    '_to_jval'    : ('JER', 'enc'),
+    }
+
+
+def _subclasses(cla):
+    yield cla
+    for sub in cla.__subclasses__():
+        for c in _subclasses(sub):
+            yield c
+
+
+class ASN1Profiler(object):
+    """
+    per-type profiler for the ASN.1 encoders and decoders
+
+    When enabled, the internal encoding and decoding methods of all ASN.1 object
+    classes are wrapped, in order to record for each codec, direction (encoding
+    or decoding) and fully-qualified object name:
+    - the number of calls,
+    - the cumulative time, including the time spent in inner objects,
+    - the self time, excluding the time spent in inner objects,
+    - the number of bytes decoded (PER, OER, BER) or encoded (PER, OER, BER
+      without transfer structure)
+
+    Nothing is wrapped while the profiler is disabled, hence there is no cost
+    for the encoders and decoders in this case.
+
+    Example:
+        Prof = ASN1Profiler()
+        Prof.enable()
+        PDU.from_aper(buf)
+        Prof.disable()
+        print(Prof.report(limit=20))
+        Prof.save_collapsed('ngap.folded') # to be used with flamegraph.pl
+    """
+
+    # currently enabled profiler, only a single one can be enabled at a time
+    _ENABLED = None
+
+    def __init__(self):
+        self._meth   = []
+        # (name, codec, dir) -> [calls, cumulative time, self time, bits]
+        self._stats  = {}
+        # stack of frames (frame name) -> self time
+        self._stacks = {}
+        # active frames: [obj, key, start time, inner time]
+        self._frames = []
+
+    def reset(self):
+        """resets all the recorded statistics
+        """
+        # containers are cleared in place, as they are bound to the wrappers
+        # when enabled
+        self._stats.clear()
+        self._stacks.clear()
+
+    def is_enabled(self):
+        return self._ENABLED is self
+
+    def enable(self):
+        """wraps the encoding and decoding methods of all ASN.1 object classes
+        to record statistics into self
+
+        Raises:
+            ASN1Err, if another profiler is already enabled
+        """
+        if ASN1Profiler._ENABLED is self:
+            return
+        elif ASN1Profiler._ENABLED is not None:
+            raise(ASN1Err('another ASN1Profiler is already enabled'))
+        for cla in set(_subclasses(ASN1Obj)):
+            for name, (codec, dir) in _PROF_METH.items():
+                if name in cla.__dict__:
+                    meth = cla.__dict__[name]
+                    self._meth.append( (cla, name, meth) )
+                    setattr(cla, name, self._wrap(meth, codec, dir, name[-3:] == '_ws'))
+        ASN1Profiler._ENABLED = self
+
+    def disable(self):
+        """restores the original encoding and decoding methods of all ASN.1 object
+        classes
+        """
+        if ASN1Profiler._ENABLED is not self:
+            return
+        for cla, name, meth in self._meth:
+            setattr(cla, name, meth)
+        self._meth = []
+        del self._frames[:]
+        ASN1Profiler._ENABLED = None
+
+    def _wrap(self, meth, codec, dir, ws):
+        frames, stats, stacks = self._frames, self._stats, self._stacks
+        if dir == 'dec':
+            if codec == 'BER':
+                # the TLV list provides the length of the value decoded
+                def get_bits(obj, args, ret, cur):
+                    try:
+                        lval = args[1][0][-3]
+                    except (IndexError, TypeError):
+                        return 0
+                    return 8*lval if isinstance(lval, integer_types) and lval > 0 else 0
+            elif codec == 'JER':
+                get_bits = None
+            else:
+                def get_bits(obj, args, ret, cur):
+                    return args[0]._cur - cur
+        elif ws or codec == 'JER':
+            get_bits = None
+        else:
+            def get_bits(obj, args, ret, cur):
+                return sum([f[2] for f in ret])
+        #
+        def wrapper(obj, *args):
+            if frames and frames[-1][0] is obj:
+                # method of a parent class called from the subclass one
+                return meth(obj, *args)
+            if codec == 'PER':
+                key = (obj._mod + '.' + obj.fullname() if obj._mod else obj.fullname(),
+                       'APER' if ASN1CodecPER.ALIGNED else 'UPER', dir)
+            else:
+                key = (obj._mod + '.' + obj.fullname() if obj._mod else obj.fullname(),
+                       codec, dir)
+            cur = args[0]._cur if get_bits is not None and dir == 'dec' and codec != 'BER' else 0
+            frame = [obj, key, _clock(), 0.0]
+            frames.append(frame)
+            try:
+                ret = meth(obj, *args)
+            finally:
+                del frames[-1]
+                cum = _clock() - frame[2]
+                slf = cum - frame[3]
+                if frames:
+                    frames[-1][3] += cum
+                try:
+                    st = stats[key]
+                except KeyError:
+                    st = [0, 0.0, 0.0, 0]
+                    stats[key] = st
+                st[0] += 1
+                if not any([f[1] == key for f in frames]):
+                    # not a recursive call, cumulative time not accounted yet
+                    st[1] += cum
+                st[2] += slf
+                path = tuple(['%s.%s' % (key[1], key[2])] + [f[1][0] for f in frames] + [key[0]])
+                stacks[path] = stacks.get(path, 0.0) + slf
+            if get_bits is not None:
+                st[3] += get_bits(obj, args, ret, cur)
+            return ret
+        #
+        wrapper.__name__ = meth.__name__
+        wrapper.__doc__  = meth.__doc__
+        return wrapper
+
+    def get_stats(self):
+        """returns the recorded statistics
+
+        Returns:
+            dict: (name, codec, dir) -> (calls, cumulative time, self time, bytes)
+                  bytes being a float, as PER encodings are not octet-aligned
+        """
+        return dict([(k, (s[0], s[1], s[2], s[3]/8.0)) for k, s in self._stats.items()])
+
+    def report(self, sort='self', limit=None):
+        """returns a textual report of the recorded statistics, sorted
+        decreasingly according to `sort', which can be 'calls', 'cum', 'self' or
+        'bytes'
+        """
+        ind = {'calls': 0, 'cum': 1, 'self': 2, 'bytes': 3}[sort]
+        stats = sorted(self.get_stats().items(), key=lambda x: x[1][ind], reverse=True)
+        if limit is not None:
+            stats = stats[:limit]
+        lines = ['%10s %12s %12s %10s  %-9s %s' % ('calls', 'cum (ms)', 'self (ms)', 'bytes',
+                                                   'codec', 'name')]
+        for (name, codec, dir), (calls, cum, slf, byt) in stats:
+            lines.append('%10i %12.3f %12.3f %10.1f  %-9s %s'\
+                         % (calls, 1000*cum, 1000*slf, byt, '%s.%s' % (codec, dir), name))
+        return '\n'.join(lines)
+
+    def get_collapsed(self):
+        """returns the recorded stacks in the collapsed format used by
+        flamegraph tools, with self times in microseconds
+        """
+        lines = []
+        for path, slf in sorted(self._stacks.items()):
+            us = int(round(1000000*slf))
+            if us:
+                lines.append('%s %i' % (';'.join(path), us))
+        return '\n'.join(lines) + '\n'
+
+    def save_collapsed(self, path):
+        """writes the recorded stacks in the collapsed format used by flamegraph
+        tools into the file `path'
+        """
+        with open(path, 'w') as fd:
+            fd.write(self.get_collapsed())
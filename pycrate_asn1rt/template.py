@@ -0,0 +1,243 @@
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.4
+# *
+# * Copyright 2026. Benoit Michau. P1Sec.
+# *
+# * This library is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU Lesser General Public
+# * License as published by the Free Software Foundation; either
+# * version 2.1 of the License, or (at your option) any later version.
+# *
+# * This library is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# * Lesser General Public License for more details.
+# *
+# * You should have received a copy of the GNU Lesser General Public
+# * License along with this library; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+# * MA 02110-1301  USA
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_asn1rt/template.py
+# * Created : 2026-10-19
+# * Authors : Benoit Michau
+# *--------------------------------------------------------
+#*/
+
+from .utils  import *
+from .err    import *
+from .codecs import ASN1CodecPER, ASN1CodecOER
+
+
+class ASN1Template(object):
+    """
+    pre-encoded ASN.1 value, with patchable fields
+
+    The value `val' of the ASN.1 object `obj' is encoded once with the transfer
+    structure (to_*_ws() method), and each field given by its value path in
+    `paths' is located within this structure. Then, new encodings only differing
+    from `val' by the value of those fields are produced by re-encoding only the
+    fields, and patching the result into the pre-encoded buffer.
+
+    A field can be patched only when its new encoding has the same length than
+    the one in the pre-encoded buffer (e.g. fixed-size INTEGER, OCTET STRING or
+    BIT STRING). Otherwise, encode() falls back to a complete encoding of the
+    value.
+
+    Patching is supported with the PER (aligned and unaligned) and OER codecs.
+    With BER, CER and DER, the transfer structure does not map to value paths,
+    hence all encodings are complete.
+
+    Example:
+        PDU = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-PDU']
+        paths = [['initiatingMessage', 'value', 'InitialUEMessage', 'protocolIEs',
+                  0, 'value', 'ENB-UE-S1AP-ID']]
+        tpl = ASN1Template(PDU, val, paths, 'aper')
+        buf = tpl.encode(1234)
+    """
+
+    CODECS = ('aper', 'uper', 'oer', 'coer', 'ber', 'cer', 'der')
+
+    def __init__(self, obj, val, paths, codec='aper'):
+        if codec not in self.CODECS:
+            raise(ASN1Err('{0}: invalid codec for template, {1!r}'.format(obj.fullname(), codec)))
+        self._obj   = obj
+        self._val   = val
+        self._paths = [list(path) for path in paths]
+        self._codec = codec
+        # objects at the given paths, raises in case of invalid path
+        obj.set_val(val)
+        self._objs  = [obj.get_at(path) for path in self._paths]
+        for path in self._paths:
+            _ = obj.get_val_at(path)
+        #
+        if codec in ('aper', 'uper', 'oer', 'coer'):
+            buf = getattr(obj, 'to_%s_ws' % codec)()
+            self._fields = [self._locate(path) for path in self._paths]
+        else:
+            buf = getattr(obj, 'to_%s' % codec)()
+            self._fields = [None] * len(self._paths)
+        self._buf = buf
+        self._bl  = 8 * len(buf)
+        self._num = bytes_to_uint(buf, self._bl)
+        #
+        # ensure each located field encodes back to the exact same bits
+        for i, fld in enumerate(self._fields):
+            if fld is not None:
+                off, bl, wrapped = fld
+                enc = self._enc_field(i, obj.get_val_at(self._paths[i]))
+                if enc != (self._get_bits(off, bl), bl):
+                    self._fields[i] = None
+
+    def __repr__(self):
+        return '<ASN1Template (%s) for %s: %i/%i patchable fields>'\
+               % (self._codec, self._obj.fullname(), len(self.get_patchable()), len(self._paths))
+
+    def get_paths(self):
+        """returns the list of value paths of the fields of the template
+        """
+        return [path[:] for path in self._paths]
+
+    def get_patchable(self):
+        """returns the list of value paths of the fields which can be patched
+        in the pre-encoded buffer
+        """
+        return [self._paths[i][:] for i, fld in enumerate(self._fields) if fld is not None]
+
+    def get_field(self, path):
+        """returns the bit offset and bit length of the field at the given value
+        path within the pre-encoded buffer, or None if it cannot be patched
+        """
+        try:
+            fld = self._fields[self._paths.index(list(path))]
+        except ValueError:
+            raise(ASN1Err('{0}: invalid template path, {1!r}'.format(self._obj.fullname(), path)))
+        if fld is None:
+            return None
+        else:
+            return fld[0], fld[1]
+
+    def encode(self, *vals):
+        """
+        returns the encoding of the template value, with the fields at the
+        template paths set with the values `vals' (in the same order)
+
+        Args:
+            vals: ASN1Obj values, one for each template path
+
+        Returns:
+            buf: bytes
+
+        Raises:
+            ASN1Err, if the number of values does not correspond to the template
+        """
+        if len(vals) != len(self._paths):
+            raise(ASN1Err('{0}: invalid number of values for template, {1}'\
+                  .format(self._obj.fullname(), len(vals))))
+        num = self._num
+        for i, val in enumerate(vals):
+            fld = self._fields[i]
+            if fld is None:
+                return self.encode_full(*vals)
+            Obj = self._objs[i]
+            if Obj._def is not None and val == Obj._def:
+                # DEFAULT value, which may be removed from the encoding
+                return self.encode_full(*vals)
+            off, bl, wrapped = fld
+            bits, nbl = self._enc_field(i, val)
+            if nbl != bl:
+                return self.encode_full(*vals)
+            shift = self._bl - off - bl
+            num = (num & ~(((1<<bl)-1) << shift)) | (bits << shift)
+        return uint_to_bytes(num, self._bl)
+
+    def encode_full(self, *vals):
+        """
+        returns the encoding of the template value, with the fields at the
+        template paths set with the values `vals' (in the same order), without
+        using the pre-encoded buffer
+
+        Args:
+            vals: ASN1Obj values, one for each template path
+
+        Returns:
+            buf: bytes
+        """
+        if len(vals) != len(self._paths):
+            raise(ASN1Err('{0}: invalid number of values for template, {1}'\
+                  .format(self._obj.fullname(), len(vals))))
+        self._obj.set_val(self._val)
+        for path, val in zip(self._paths, vals):
+            self._obj.set_val_at(path, val)
+        return getattr(self._obj, 'to_%s' % self._codec)()
+
+    def _get_bits(self, off, bl):
+        return (self._num >> (self._bl - off - bl)) & ((1<<bl)-1)
+
+    def _locate(self, path):
+        # walks the transfer structure together with the ASN.1 objects
+        # and returns the bit offset and bit length of the field at path,
+        # and if it is encoded standalone
+        Obj, Elt, off, wrapped = self._obj, self._obj._struct, 0, True
+        for p in path:
+            # contents of open types and OCTET STRING with contained types
+            # are encoded standalone
+            wrapped = Obj.TYPE in (TYPE_OPEN, TYPE_ANY, TYPE_OCT_STR)
+            if Obj.TYPE in (TYPE_SEQ_OF, TYPE_SET_OF):
+                if not isinstance(p, integer_types):
+                    return None
+                Obj, ind = Obj._cont, p
+            elif isinstance(p, str_types) and p[:5] in ('_ext_', '_unk_'):
+                return None
+            else:
+                Obj, ind = Obj.get_at([p]), 0
+            if wrapped and Obj._typeref is not None:
+                name = Obj._tr._name
+            else:
+                name = Obj._name
+            # look for the ind-th sub-structure with this name
+            found = None
+            for e in Elt._content:
+                if hasattr(e, '_content') and e._name == name:
+                    if ind == 0:
+                        found = e
+                        break
+                    ind -= 1
+                off += e.get_bl()
+            if found is None:
+                return None
+            Elt = found
+        return off, Elt.get_bl(), wrapped
+
+    def _enc_field(self, i, val):
+        # returns the encoding of the field as an unsigned integer, together
+        # with its length in bits
+        off, bl, wrapped = self._fields[i]
+        Obj = self._objs[i]
+        Obj.set_val(val)
+        if wrapped:
+            buf = getattr(Obj, 'to_%s' % self._codec)()
+            return bytes_to_uint(buf, 8*len(buf)), 8*len(buf)
+        elif self._codec in ('aper', 'uper'):
+            # codec settings are global, hence restored after the encoding
+            aligned, ASN1CodecPER.ALIGNED = ASN1CodecPER.ALIGNED, (self._codec == 'aper')
+            ASN1CodecPER._off.append(off % 8)
+            try:
+                GEN = Obj._to_per()
+            finally:
+                del ASN1CodecPER._off[-1]
+                ASN1CodecPER.ALIGNED = aligned
+        else:
+            canonical, ASN1CodecOER.CANONICAL = ASN1CodecOER.CANONICAL, (self._codec == 'coer')
+            try:
+                GEN = Obj._to_oer()
+            finally:
+                ASN1CodecOER.CANONICAL = canonical
+        nbl = sum([f[2] for f in GEN])
+        if nbl == 0:
+            return 0, 0
+        else:
+            return bytes_to_uint(pack_val(*GEN)[0], nbl), nbl
@@ -134,6 +134,9 @@ class Element(object):
     # when computing automatic values
     _SAFE_DYN = True
     
+    # resource budget enforced when decoding, DecBudget instance or None
+    _DEC_BUDGET = None
+    
     # next / prev / header / payload element selection within an envelope
     # select or not transparent element
     ENV_SEL_TRANS = True
@@ -639,6 +642,11 @@ class Element(object):
             raise(EltErr('{0} [from_bytes]: char type is {1}, expecting Charpy'\
                          .format(self._name, type(char).__name__)))
         #
+        if self._DEC_BUDGET is not None and self._DEC_BUDGET.start(char, self._name):
+            try:
+                return self.from_bytes(char)
+            finally:
+                self._DEC_BUDGET.stop()
         self._from_char(char)
     
     def to_bytes(self):
@@ -1817,8 +1825,16 @@ class Envelope(Element):
             if char._len_bit > char_lb:
                 raise(EltErr('{0} [_from_char]: bit length overflow'.format(self._name)))
         #
-        for elt in self.__iter__():
-            elt._from_char(char)
+        if self._DEC_BUDGET is not None:
+            self._DEC_BUDGET.enter(self._name)
+            try:
+                for elt in self.__iter__():
+                    elt._from_char(char)
+            finally:
+                self._DEC_BUDGET.leave()
+        else:
+            for elt in self.__iter__():
+                elt._from_char(char)
         #
         # in case of length automation, set the original length back
         if self._blauto is not None:
@@ -2720,6 +2736,8 @@ class Array(Element):
         self._val = []
         # 4) consume char and fill in self._val
         if num is not None:
+            if self._DEC_BUDGET is not None:
+                self._DEC_BUDGET.add_nodes(num, self._name)
             for i in range(num):
                 self._tmpl._from_char(char)
                 self._val.append(self._tmpl())
@@ -2727,6 +2745,8 @@ class Array(Element):
             # there is no predefined limit in the number of iteration
             # consume the charpy instance until its empty and raises
             while True:
+                if self._DEC_BUDGET is not None:
+                    self._DEC_BUDGET.add_nodes(1, self._name)
                 # remember charpy cursor position, to restore it when it raises
                 cur = char._cur
                 try:
@@ -3632,6 +3652,8 @@ class Sequence(Element):
         self._content = []
         # 4) consume char and fill in self._content
         if num is not None:
+            if self._DEC_BUDGET is not None:
+                self._DEC_BUDGET.add_nodes(num, self._name)
             for i in range(num):
                 clone = self._tmpl.clone()
                 clone._env = self
@@ -3641,6 +3663,8 @@ class Sequence(Element):
             # there is no predefined limit in the number of repeated content
             # consume the charpy instance until its empty and raises
             while True:
+                if self._DEC_BUDGET is not None:
+                    self._DEC_BUDGET.add_nodes(1, self._name)
                 # remember charpy cursor position, to restore it when it raises
                 cur = char._cur
                 clone = self._tmpl.clone()
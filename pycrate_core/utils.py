@@ -28,6 +28,8 @@
 #*/
 
 import sys
+from time       import time as _time
+from threading  import local as _local
 from .utils_py3 import *
 
 # configure max recursion
@@ -48,6 +50,276 @@ else:
 def log(msg):
     print(msg)
 
+#------------------------------------------------------------------------------#
+# decoding resource budget
+#------------------------------------------------------------------------------#
+
+class DecBudgetErr(PycrateErr):
+    pass
+
+
+class _DecBudgetCnt(_local):
+    """counters of the decoding running in the current thread
+    """
+    
+    def __init__(self):
+        self.run   = False
+        self.depth = 0
+        self.nodes = 0
+        self.bytes = 0
+        self.dec   = 0
+        self.t0    = 0.0
+
+
+class DecBudget(object):
+    """Resource budget for decoding a single (potentially hostile) buffer
+    
+    When an instance is set in Element._DEC_BUDGET, all decodings done with 
+    Element.from_bytes() and with the PER, BER and OER methods of ASN.1 objects 
+    are accounted against it, and a DecBudgetErr is raised as soon as one of
+    the limits is exceeded.
+    
+    Counters are reset when an outermost decoding starts ; decodings nested
+    into it (e.g. ASN.1 open types or contained types) add to the same counters.
+    Counters are kept per thread, hence decodings running concurrently in 
+    several threads are each accounted against their own budget.
+    
+    Attributes:
+        max_depth (int or None) : maximum nesting depth of constructed objects
+        max_nodes (int or None) : maximum number of constructed objects and 
+            list items decoded
+        max_bytes (int or None) : maximum number of bytes of buffers decoded,
+            nested decodings included
+        max_time (float or None) : maximum time in seconds spent in decoding
+        max_dec (int or None) : maximum number of decodings, nested decodings
+            included
+    """
+    
+    # the time is checked every (TIME_CHK_MASK + 1) nodes
+    TIME_CHK_MASK = 0x3f
+    
+    def __init__(self, max_depth=64, max_nodes=100000, max_bytes=1<<20, 
+                       max_time=None, max_dec=None):
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.max_time  = max_time
+        self.max_dec   = max_dec
+        self._cnt      = _DecBudgetCnt()
+    
+    def __repr__(self):
+        return '<DecBudget: depth %r/%r, nodes %r/%r, bytes %r/%r, dec %r/%r>'\
+               % (self.depth, self.max_depth, self.nodes, self.max_nodes,
+                  self.bytes, self.max_bytes, self.dec, self.max_dec)
+    
+    # counters of the last (or running) decoding of the current thread
+    
+    @property
+    def depth(self):
+        return self._cnt.depth
+    
+    @property
+    def nodes(self):
+        return self._cnt.nodes
+    
+    @property
+    def bytes(self):
+        return self._cnt.bytes
+    
+    @property
+    def dec(self):
+        return self._cnt.dec
+    
+    def reset(self):
+        """Reset all counters of the current thread"""
+        cnt = self._cnt
+        cnt.depth = 0
+        cnt.nodes = 0
+        cnt.bytes = 0
+        cnt.dec   = 0
+        cnt.t0    = _time()
+    
+    def start(self, buf, name=''):
+        """Account for the start of a decoding of `buf'
+        
+        Args:
+            buf (bytes or Charpy) : buffer to be decoded
+            name (str) : name of the decoding object, for error messages
+        
+        Returns:
+            outer (bool) : True if no decoding was running in the current 
+                thread, in this case counters are reset and the caller must
+                run its decoding and call stop() when it is done (or when it
+                raises)
+        
+        Raises:
+            DecBudgetErr : if the number of decodings or bytes is exceeded
+        """
+        cnt = self._cnt
+        if not cnt.run:
+            cnt.run = True
+            self.reset()
+            return True
+        cnt.dec += 1
+        if self.max_dec is not None and cnt.dec > self.max_dec:
+            raise(DecBudgetErr('{0}: decoding budget exceeded, {1} decodings'\
+                  .format(name, cnt.dec)))
+        if isinstance(buf, bytes_types):
+            cnt.bytes += len(buf)
+        else:
+            # Charpy
+            cnt.bytes += (buf._len_bit - buf._cur) >> 3
+        if self.max_bytes is not None and cnt.bytes > self.max_bytes:
+            raise(DecBudgetErr('{0}: decoding budget exceeded, {1} bytes'\
+                  .format(name, cnt.bytes)))
+        self._chk_time(name)
+        return False
+    
+    def stop(self):
+        """Account for the end of the outermost decoding of the current thread"""
+        self._cnt.run = False
+    
+    def enter(self, name=''):
+        """Account for the start of the decoding of a constructed object
+        
+        Raises:
+            DecBudgetErr : if the depth or the number of nodes is exceeded
+        """
+        cnt = self._cnt
+        if self.max_depth is not None and cnt.depth >= self.max_depth:
+            raise(DecBudgetErr('{0}: decoding budget exceeded, depth {1}'\
+                  .format(name, cnt.depth + 1)))
+        self.add_nodes(1, name)
+        cnt.depth += 1
+    
+    def leave(self):
+        """Account for the end of the decoding of a constructed object"""
+        self._cnt.depth -= 1
+    
+    def add_nodes(self, num, name=''):
+        """Account for `num' objects to be decoded
+        
+        Raises:
+            DecBudgetErr : if the number of nodes is exceeded
+        """
+        cnt = self._cnt
+        nodes = cnt.nodes + num
+        if self.max_nodes is not None and nodes > self.max_nodes:
+            raise(DecBudgetErr('{0}: decoding budget exceeded, {1} nodes'\
+                  .format(name, nodes)))
+        if (nodes ^ cnt.nodes) & ~self.TIME_CHK_MASK:
+            # a multiple of (TIME_CHK_MASK + 1) nodes has been crossed
+            self._chk_time(name)
+        cnt.nodes = nodes
+    
+    def _chk_time(self, name):
+        if self.max_time is not None:
+            t = _time() - self._cnt.t0
+            if t > self.max_time:
+                raise(DecBudgetErr('{0}: decoding budget exceeded, {1:.3f} s'\
+                      .format(name, t)))
+
+#------------------------------------------------------------------------------#
+# stream framing
+#------------------------------------------------------------------------------#
+
+class StreamFramer(object):
+    """Splitter of a byte stream (e.g. from a TCP or SCTP socket) into messages
+    prefixed with their length
+    
+    Chunks of the stream, of any size, are passed to feed() which returns the 
+    complete messages found so far, optionally processed by the `dec' callable
+    (e.g. a decoding function). An incomplete message at the end of a chunk 
+    is kept until the following chunks are fed.
+    
+    Each complete message is copied a single time, from the chunk or from the
+    internal buffer into a bytes object, whatever the type of the chunk (bytes, 
+    bytearray or memoryview): a reception buffer can hence be reused right 
+    after feed() returns.
+    
+    Subclasses must define HDR_LEN, MSG_MIN and _get_len().
+    
+    Attributes:
+        HDR_LEN (int) : number of bytes required to get the length of a message
+        MSG_MIN (int) : minimum length of a message
+        MSG_MAX (int) : maximum length of a message
+    """
+    
+    HDR_LEN = 4
+    MSG_MIN = 4
+    MSG_MAX = 1<<20
+    
+    def __init__(self, dec=None):
+        """Initialize the framer
+        
+        Args:
+            dec (callable or None) : called on each message buffer, its return
+                value being returned by feed() in place of the buffer
+        """
+        self._dec = dec
+        self._buf = bytearray()
+    
+    def _get_len(self, buf, off):
+        """Returns the length of the message starting at offset `off' in `buf',
+        `buf' having at least HDR_LEN bytes after `off'
+        """
+        raise(PycrateErr('not implemented'))
+    
+    def reset(self):
+        """Drop any incomplete message"""
+        del self._buf[:]
+    
+    def get_pending(self):
+        """Returns the number of bytes of the incomplete message"""
+        return len(self._buf)
+    
+    def feed(self, data):
+        """Append the chunk `data' to the stream and return the list of complete
+        messages
+        
+        Raises:
+            PycrateErr : if the length of a message is invalid, in this case
+                the stream can not be framed anymore and the framer must be
+                reset()
+        """
+        if self._buf:
+            self._buf.extend(data)
+            buf = self._buf
+        else:
+            buf = data
+        msgs, off, end = [], 0, len(buf)
+        hdr_len, msg_min, msg_max, get_len = \
+            self.HDR_LEN, self.MSG_MIN, self.MSG_MAX, self._get_len
+        with memoryview(buf) as mv:
+            while end - off >= hdr_len:
+                msg_len = get_len(buf, off)
+                if not msg_min <= msg_len <= msg_max:
+                    raise(PycrateErr('{0}: invalid message length, {1}'\
+                          .format(self.__class__.__name__, msg_len)))
+                if off + msg_len > end:
+                    break
+                msgs.append( mv[off:off+msg_len].tobytes() )
+                off += msg_len
+            if buf is self._buf:
+                # the memoryview needs to be released before resizing buf
+                mv.release()
+                del buf[:off]
+            elif off < end:
+                self._buf.extend(mv[off:])
+        if self._dec is not None:
+            return list(map(self._dec, msgs))
+        else:
+            return msgs
+    
+    def feed_iter(self, chunks):
+        """Iterate over the complete messages from the iterable of chunks 
+        `chunks', e.g. iter(lambda: sk.recv(65536), b'') for a TCP socket
+        """
+        for data in chunks:
+            for msg in self.feed(data):
+                yield msg
+
+
 #------------------------------------------------------------------------------#
 # additional bit list / str functions
 #------------------------------------------------------------------------------#
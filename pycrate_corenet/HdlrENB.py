@@ -62,16 +62,20 @@ class ENBd(object):
     Server = None
     
     
-    def _log(self, logtype, msg):
+    def _log(self, logtype, msg, *args):
         """ENBd logging facility
         
         DEBUG logtype: 'ERR', 'WNG', 'INF', 'DBG'
         TRACE logtype: 'TRACE_ASN_S1AP_[UL|DL]'
         """
         if logtype[:3] == 'TRA':
+            if args:
+                msg = msg % args
             log('[TRA] [ENB: %s.%s] [%s]\n%s%s%s'\
                 % (self.ID[0], self.ID[1], logtype[6:], TRACE_COLOR_START, msg, TRACE_COLOR_END))
         elif logtype in self.DEBUG:
+            if args:
+                msg = msg % args
             log('[%s] [ENB: %s.%s] %s' % (logtype, self.ID[0], self.ID[1], msg))
     
     def __init__(self, server, sk, sid):
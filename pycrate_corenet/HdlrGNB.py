@@ -68,17 +68,21 @@ class GNBd(object):
     Server = None
     
     
-    def _log(self, logtype, msg):
+    def _log(self, logtype, msg, *args):
         """GNBd logging facility
         
         DEBUG logtype: 'ERR', 'WNG', 'INF', 'DBG'
         TRACE logtype: 'TRACE_ASN_NGAP_[UL|DL]'
         """
         if logtype[:3] == 'TRA':
+            if args:
+                msg = msg % args
             log('[TRA] [GNB: %s.%s.%.8x] [%s]\n%s%s%s'\
                 % (self.ID[1], self.ID[0], self.ID[2][0], logtype[6:],
                    TRACE_COLOR_START, msg, TRACE_COLOR_END))
         elif logtype in self.DEBUG:
+            if args:
+                msg = msg % args
             log('[%s] [GNB: %s.%s.%.8x] %s' % (logtype, self.ID[1], self.ID[0], self.ID[2][0], msg))
     
     def __init__(self, server, sk, sid):
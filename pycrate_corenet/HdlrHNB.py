@@ -76,16 +76,20 @@ class HNBd(SigStack):
     UEREG_NOTALLOWED = ('radioNetwork', 'uE-unauthorised')
     
     
-    def _log(self, logtype, msg):
+    def _log(self, logtype, msg, *args):
         """HNBd logging facility
         
         DEBUG logtype: 'ERR', 'WNG', 'INF', 'DBG'
         TRACE logtype: 'TRACE_ASN_[HNBAP|RUA|RANAP]_[UL|DL]'
         """
         if logtype[:3] == 'TRA':
+            if args:
+                msg = msg % args
             log('[TRA] [HNB: %s.%s] [%s]\n%s%s%s'\
                 % (self.ID[0], self.ID[1], logtype[6:], TRACE_COLOR_START, msg, TRACE_COLOR_END))
         elif logtype in self.DEBUG:
+            if args:
+                msg = msg % args
             log('[%s] [HNB: %s.%s] %s' % (logtype, self.ID[0], self.ID[1], msg))
     
     def __init__(self, server, sk):
@@ -106,12 +106,16 @@ class UEd(SigStack):
     SAC  = None # uintX
     TAC  = None # uint16 (S1) or uint24 (NG)
     
-    def _log(self, logtype, msg):
+    def _log(self, logtype, msg, *args):
         if logtype[:3] == 'TRA':
+            if args:
+                msg = msg % args
             hdr, msg = msg.split('\n', 1)
             log('[TRA] [UE: %s] %s[%s]\n%s%s%s'\
                 % (self.IMSI, hdr, logtype[6:], TRACE_COLOR_START, msg, TRACE_COLOR_END))
         elif logtype in self.DEBUG:
+            if args:
+                msg = msg % args
             log('[%s] [UE: %s] %s' % (logtype, self.IMSI, msg))
     
     def __init__(self, server, imsi, **kw):
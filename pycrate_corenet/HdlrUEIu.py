@@ -61,8 +61,8 @@ class UEIuSigStack(SigStack):
     RANAP_FORCE_PAGE = False
     
     
-    def _log(self, logtype, msg):
-        self.UE._log(logtype, '[%s: %3i] %s' % (self.__class__.__name__, self.CtxId, msg))
+    def _log(self, logtype, msg, *args):
+        self.UE._log(logtype, '[%s: %3i] %s' % (self.__class__.__name__, self.CtxId, msg), *args)
     
     def __init__(self, ued, rncd, ctx_id):
         self.UE = ued
@@ -168,8 +168,8 @@ class UEMMd(SigStack):
     _INI_SCHED = 0.05
     
     
-    def _log(self, logtype, msg):
-        self.Iu._log(logtype, '[MM] %s' % msg)
+    def _log(self, logtype, msg, *args):
+        self.Iu._log(logtype, '[MM] %s' % msg, *args)
     
     def __init__(self, ued, iucsd):
         self.UE = ued
@@ -378,8 +378,8 @@ class UECCd(SigStack):
     # to bypass the process() server loop with a custom NAS PDU handler
     RX_HOOK = None
     
-    def _log(self, logtype, msg):
-        self.Iu._log(logtype, '[CC] %s' % msg)
+    def _log(self, logtype, msg, *args):
+        self.Iu._log(logtype, '[CC] %s' % msg, *args)
     
     def __init__(self, ued, iucsd):
         self.UE = ued
@@ -431,8 +431,8 @@ class UESSd(SigStack):
     # to bypass the process() server loop with a custom NAS PDU handler
     RX_HOOK = None
     
-    def _log(self, logtype, msg):
-        self.Iu._log(logtype, '[SS] %s' % msg)
+    def _log(self, logtype, msg, *args):
+        self.Iu._log(logtype, '[SS] %s' % msg, *args)
     
     def __init__(self, ued, iucsd):
         self.UE = ued
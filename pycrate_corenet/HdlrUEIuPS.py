@@ -227,8 +227,8 @@ class UEGMMd(SigStack):
     _INI_SCHED = 0.05
     
     
-    def _log(self, logtype, msg):
-        self.Iu._log(logtype, '[GMM] %s' % msg)
+    def _log(self, logtype, msg, *args):
+        self.Iu._log(logtype, '[GMM] %s' % msg, *args)
     
     def __init__(self, ued, iupsd):
         self.UE = ued
@@ -553,8 +553,8 @@ class UESMd(SigStack):
     PDP_QOS_WEXT = True
     
     
-    def _log(self, logtype, msg):
-        self.Iu._log(logtype, '[SM] %s' % msg)
+    def _log(self, logtype, msg, *args):
+        self.Iu._log(logtype, '[SM] %s' % msg, *args)
     
     def __init__(self, ued, iupsd):
         self.UE = ued
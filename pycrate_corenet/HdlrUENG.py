@@ -112,8 +112,8 @@ class UEFGMMd(SigStack):
     
     
     
-    def _log(self, logtype, msg):
-        self.NG._log(logtype, '[5GMM] %s' % msg)
+    def _log(self, logtype, msg, *args):
+        self.NG._log(logtype, '[5GMM] %s' % msg, *args)
     
     def __init__(self, ued, uengd):
         self.UE = ued
@@ -296,8 +296,8 @@ class UEFGSMd(SigStack):
     RX_HOOK = None
     
     
-    def _log(self, logtype, msg):
-        self.NG._log(logtype, '[5GSM] %s' % msg)
+    def _log(self, logtype, msg, *args):
+        self.NG._log(logtype, '[5GSM] %s' % msg, *args)
     
     def __init__(self, ued, uengd):
         self.UE = ued
@@ -484,8 +484,8 @@ class UENGd(SigStack):
     # 
     
     
-    def _log(self, logtype, msg):
-        self.UE._log(logtype, '[UENGd:   %3i] %s' % (self.CtxId, msg))
+    def _log(self, logtype, msg, *args):
+        self.UE._log(logtype, '[UENGd:   %3i] %s' % (self.CtxId, msg), *args)
     
     def __init__(self, ued, gnbd=None, ctx_id=-1, sid=None):
         self.UE  = ued
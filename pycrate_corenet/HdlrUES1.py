@@ -264,8 +264,8 @@ class UEEMMd(SigStack):
     SER_RAB_NEVER       = False
     
     
-    def _log(self, logtype, msg):
-        self.S1._log(logtype, '[EMM] %s' % msg)
+    def _log(self, logtype, msg, *args):
+        self.S1._log(logtype, '[EMM] %s' % msg, *args)
     
     def __init__(self, ued, ues1d):
         self.UE = ued
@@ -765,8 +765,8 @@ class UEESMd(SigStack):
     T3489 = 2
     
     
-    def _log(self, logtype, msg):
-        self.S1._log(logtype, '[ESM] %s' % msg)
+    def _log(self, logtype, msg, *args):
+        self.S1._log(logtype, '[ESM] %s' % msg, *args)
     
     def __init__(self, ued, ues1d):
         self.UE = ued
@@ -1223,8 +1223,8 @@ class UES1d(SigStack):
     TRA_MDT_CFG = None # comment this to send the MDT config in trace activation
     
     
-    def _log(self, logtype, msg):
-        self.UE._log(logtype, '[UES1d:   %3i] %s' % (self.CtxId, msg))
+    def _log(self, logtype, msg, *args):
+        self.UE._log(logtype, '[UES1d:   %3i] %s' % (self.CtxId, msg), *args)
     
     def __init__(self, ued, enbd=None, ctx_id=-1, sid=None):
         self.UE  = ued
@@ -1596,7 +1596,7 @@ class UES1d(SigStack):
                 secctx['UL'] = sqnmsb+ue_sqn+1
                 return True, 0x300, False, sqnmsb+ue_sqn
         else:
-            self._log('DBG', 'NAS SEC UL: MAC verified, UL count %i' % secctx['UL'])
+            self._log('DBG', 'NAS SEC UL: MAC verified, UL count %i', secctx['UL'])
             ulcnt = secctx['UL']
             secctx['UL'] += 1
             return True, 0, True, ulcnt
@@ -2162,7 +2162,7 @@ class UES1d(SigStack):
         secctx = self.get_sec_ctx()
         if secctx and 'UESecCap' in self.UE.Cap:
             # create the KeNB
-            self._log('DBG', 'NAS UL count for Kenb derivation, %i' % secctx['UL_enb'])
+            self._log('DBG', 'NAS UL count for Kenb derivation, %i', secctx['UL_enb'])
             Kenb, UESecCap = conv_401_A3(secctx['Kasme'], secctx['UL_enb']), self.UE.Cap['UESecCap'][1]
             secctx['Kenb'] = Kenb
             secctx['NCC']  = 0
@@ -56,8 +56,8 @@ class UESMSd(SigStack):
     TI_MAX_VAL = 0x7f
     
     
-    def _log(self, logtype, msg):
-        self.RAN._log(logtype, '[SMS] %s' % msg)
+    def _log(self, logtype, msg, *args):
+        self.RAN._log(logtype, '[SMS] %s' % msg, *args)
     
     def __init__(self, ued, rand):
         self.UE   = ued
@@ -0,0 +1,909 @@
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.4
+# *
+# * Copyright 2026. Benoit Michau. P1Sec.
+# *
+# * This library is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU Lesser General Public
+# * License as published by the Free Software Foundation; either
+# * version 2.1 of the License, or (at your option) any later version.
+# *
+# * This library is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# * Lesser General Public License for more details.
+# *
+# * You should have received a copy of the GNU Lesser General Public
+# * License along with this library; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+# * MA 02110-1301  USA
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_corenet/LoadGen.py
+# * Created : 2026-10-19
+# * Authors : Benoit Michau
+# *--------------------------------------------------------
+#*/
+
+#------------------------------------------------------------------------------#
+# RAN load generator for benchmarking a CorenetServer instance:
+# simulated eNodeBs connect to the S1AP server over SCTP and drive a large number
+# of simulated LTE UEs through attach, S1 release, service request and detach;
+# simulated gNodeBs connect to the NGAP server and only run the NGSetup procedure.
+#
+# It is better run in a distinct process from the CorenetServer one (e.g. with
+# tools/pycrate_corenet_loadgen.py), as it uses the same S1AP and NGAP ASN.1
+# objects and would compete with the server for the Python interpreter.
+#------------------------------------------------------------------------------#
+
+# filtering exports
+__all__ = ['UESim', 'ENBSim', 'GNBSim', 'LoadGen']
+
+from .utils import *
+
+from CryptoMobile.Milenage import Milenage
+
+
+def _percentile(vals, p):
+    # nearest-rank percentile of a sorted list
+    if not vals:
+        return 0.0
+    return vals[min(len(vals)-1, max(0, int(-(-p*len(vals)//100))-1))]
+
+
+#------------------------------------------------------------------------------#
+# simulated LTE UE
+#------------------------------------------------------------------------------#
+
+class UESim(object):
+    """simulated LTE UE, driven by an ENBSim instance
+
+    It runs a script of flows, each of them being timed by the LoadGen:
+    - attach : InitialUEMessage with an AttachRequest, until the AttachComplete
+    - release: UEContextReleaseRequest, until the UEContextReleaseCommand
+    - service: InitialUEMessage with a ServiceRequest, until the
+               InitialContextSetupRequest
+    - detach : DetachRequest, until the DetachAccept
+
+    NAS authentication, identification and security mode control are handled
+    whenever requested by the CorenetServer. The NAS security context only
+    supports EEA0 (which is the default ciphering policy of the CorenetServer),
+    and the downlink NAS MAC are not verified.
+    """
+
+    # UE network capability: EEA0, EIA1 and EIA2
+    UENETCAP = b'\x80\x60'
+    # IMEISV returned when requested by the SecurityModeCommand
+    IMEISV   = '3520990017614823'
+
+    def __init__(self, gen, imsi, K, OP=None):
+        self.Gen   = gen
+        self.IMSI  = imsi
+        self.K     = K
+        self.OP    = OP
+        #
+        # S1 connection
+        self.ENB   = None
+        self.CtxId = None
+        self.MMEId = None
+        # 'DEREG', 'CONN' or 'IDLE'
+        self.State = 'DEREG'
+        #
+        # NAS security context established and the one being established
+        # by the authentication
+        self.Sec   = None
+        self._auth = None
+        # GUTI allocated by the server, (MMEGroupID, MMEC, M-TMSI)
+        self.GUTI  = None
+        #
+        # script of flows to run and ongoing flow (name, start time)
+        self.Script = deque()
+        self.Flow   = None
+
+    def _log(self, logtype, msg, *args):
+        self.Gen._log(logtype, '[UE: %s] %s' % (self.IMSI, msg), *args)
+
+    #--------------------------------------------------------------------------#
+    # flows
+    #--------------------------------------------------------------------------#
+
+    def next(self):
+        """starts the next flow of the script, returns False when the script is
+        over
+        """
+        if not self.Script:
+            return False
+        name = self.Script.popleft()
+        self.Flow = (name, time())
+        getattr(self, '_start_%s' % name)()
+        return True
+
+    def _end_flow(self, name, success=True):
+        if self.Flow is None or self.Flow[0] != name:
+            return
+        self.Gen._flow_done(self, name, time() - self.Flow[1], success)
+
+    def fail(self, reason):
+        """aborts the ongoing flow and the remaining of the script
+        """
+        if self.Flow is not None:
+            self._log('WNG', 'flow %s failed: %s' % (self.Flow[0], reason))
+            self.Script.clear()
+            self._end_flow(self.Flow[0], False)
+
+    def _start_attach(self):
+        if self.State != 'DEREG':
+            self.fail('not deregistered')
+            return
+        self.Sec, self._auth = None, None
+        epsid = NAS.EPSID()
+        epsid.encode(NAS.IDTYPE_IMSI, self.IMSI)
+        esm = NAS.ESMPDNConnectivityRequest(val={'ESMHeader': {'PTI': 1},
+                                                 'PDNType': 1,
+                                                 'RequestType': 1})
+        msg = NAS.EMMAttachRequest(val={'NAS_KSI': (0, 7),
+                                        'EPSAttachType': 1,
+                                        'ESMContainer': esm.to_bytes()})
+        msg['EPSID']['V'].set_val(epsid.to_bytes())
+        msg['UENetCap']['V'].set_val(self.UENETCAP)
+        self.ENB.send_initial_ue(self, msg.to_bytes(), 'mo-Signalling')
+
+    def _start_release(self):
+        if self.State != 'CONN':
+            self.fail('not connected')
+            return
+        self.ENB.send_release_req(self)
+
+    def _start_service(self):
+        if self.State != 'IDLE' or self.Sec is None or self.GUTI is None:
+            self.fail('not idle')
+            return
+        sec = self.Sec
+        ulcnt = sec['UL']
+        sec['UL'] += 1
+        msg = NAS.EMMServiceRequest(val={'KSI': sec['KSI'], 'SeqnShort': ulcnt & 0x1f})
+        msg.mac_compute(sec['Knasint'], 0, sec['EIA'], ulcnt & 0xffffffe0)
+        self.ENB.send_initial_ue(self, msg.to_bytes(), 'mo-Data')
+
+    def _start_detach(self):
+        if self.State == 'DEREG' or self.Sec is None:
+            self.fail('not registered')
+            return
+        epsid = NAS.EPSID()
+        if self.GUTI is not None:
+            epsid.encode(NAS.IDTYPE_GUTI, (self.ENB.PLMN, ) + self.GUTI)
+        else:
+            epsid.encode(NAS.IDTYPE_IMSI, self.IMSI)
+        msg = NAS.EMMDetachRequestMO(val={'NAS_KSI': (0, self.Sec['KSI']),
+                                          'EPSDetachType': {'SwitchOff': 0, 'Type': 1}})
+        msg['EPSID']['V'].set_val(epsid.to_bytes())
+        if self.State == 'IDLE':
+            self.ENB.send_initial_ue(self, self._protect(msg, 1), 'mo-Signalling')
+        else:
+            self.ENB.send_ul_nas(self, self._protect(msg))
+
+    #--------------------------------------------------------------------------#
+    # NAS security
+    #--------------------------------------------------------------------------#
+
+    def _protect(self, msg, sechdr=2):
+        if self.Sec is None:
+            return msg.to_bytes()
+        sec = self.Sec
+        ulcnt = sec['UL']
+        sec['UL'] += 1
+        prot = NAS.EMMSecProtNASMessage(val={'EMMHeaderSec': {'SecHdr': sechdr},
+                                             'Seqn': ulcnt & 0xff,
+                                             'NASMessage': msg.to_bytes()})
+        prot.mac_compute(sec['Knasint'], 0, sec['EIA'], ulcnt & 0xffffff00)
+        return prot.to_bytes()
+
+    def _send_nas(self, msg):
+        self.ENB.send_ul_nas(self, self._protect(msg))
+
+    #--------------------------------------------------------------------------#
+    # S1AP events, called by the ENBSim
+    #--------------------------------------------------------------------------#
+
+    def recv_nas(self, buf):
+        if len(buf) > 6 and buf[0] & 0xf == 7 and 1 <= buf[0]>>4 <= 4:
+            # security protected, only EEA0 being supported
+            buf = buf[6:]
+        msg, err = NAS.parse_NASLTE_MT(buf)
+        if msg is None:
+            self._log('WNG', 'invalid downlink NAS message (%r): %s'\
+                      % (err, hexlify(buf).decode('ascii')))
+            return
+        elif err:
+            self._log('DBG', 'downlink NAS message %s with error %i', msg._name, err)
+        name = msg._name
+        if name == 'EMMAuthenticationRequest':
+            self._recv_auth_req(msg)
+        elif name == 'EMMSecurityModeCommand':
+            self._recv_smc(msg)
+        elif name == 'EMMIdentityRequest':
+            epsid = NAS.EPSID()
+            epsid.encode(NAS.IDTYPE_IMSI, self.IMSI)
+            resp = NAS.EMMIdentityResponse()
+            resp['ID']['V'].set_val(epsid.to_bytes())
+            self._send_nas(resp)
+        elif name == 'EMMAttachAccept':
+            self._recv_attach_accept(msg)
+        elif name == 'EMMDetachAccept':
+            self.State, self.GUTI = 'DEREG', None
+            self._end_flow('detach')
+        elif name in ('EMMAttachReject', 'EMMAuthenticationReject', 'EMMServiceReject',
+                      'EMMSecurityModeReject', 'EMMDetachRequestMT', 'EMMStatus'):
+            self.fail('%s received' % name)
+        # other messages (e.g. EMMInformation) are ignored
+
+    def _recv_auth_req(self, msg):
+        ksi  = msg['NAS_KSI'][-1]['Value'].get_val()
+        rand = msg['RAND'][-1].get_val()
+        autn = msg['AUTN'][-1].to_bytes()
+        mil  = self.Gen.Milenage
+        if self.OP is not None:
+            res, ck, ik, ak = mil.f2345(self.K, rand, self.OP)
+        else:
+            res, ck, ik, ak = mil.f2345(self.K, rand)
+        sqn = bytes([a^b for (a, b) in zip(autn[:6], ak)])
+        if self.OP is not None:
+            mac = mil.f1(self.K, rand, sqn, autn[6:8], self.OP)
+        else:
+            mac = mil.f1(self.K, rand, sqn, autn[6:8])
+        if mac != autn[8:16]:
+            self.fail('network authentication failure')
+            return
+        self._auth = (ksi, conv_401_A2(ck, ik, plmn_str_to_buf(self.ENB.PLMN), autn[:6]))
+        self._send_nas(NAS.EMMAuthenticationResponse(val={'RES': res}))
+
+    def _recv_smc(self, msg):
+        algo = msg['NASSecAlgo'][-1]
+        eea, eia = algo['CiphAlgo'].get_val(), algo['IntegAlgo'].get_val()
+        ksi = msg['NAS_KSI'][-1]['Value'].get_val()
+        if eea != 0:
+            self.fail('unsupported NAS ciphering algorithm EEA%i' % eea)
+            return
+        if self._auth is not None and self._auth[0] == ksi:
+            kasme = self._auth[1]
+        elif self.Sec is not None and self.Sec['KSI'] == ksi:
+            kasme = self.Sec['Kasme']
+        else:
+            self.fail('unknown KSI %i' % ksi)
+            return
+        self.Sec = {'KSI'    : ksi,
+                    'Kasme'  : kasme,
+                    'EIA'    : eia,
+                    'Knasint': conv_401_A7(kasme, 2, eia)[16:32],
+                    'UL'     : 0}
+        self._auth = None
+        resp = NAS.EMMSecurityModeComplete()
+        if not msg['IMEISVReq'].get_trans() and msg['IMEISVReq'][-1]['Value'].get_val():
+            imeisv = NAS.ID()
+            imeisv.encode(NAS.IDTYPE_IMEISV, self.IMEISV)
+            resp['IMEISV'].set_trans(False)
+            resp['IMEISV']['V'].set_val(imeisv.to_bytes())
+        # the SecurityModeComplete is the first message protected with the new context
+        self.ENB.send_ul_nas(self, self._protect(resp, 4))
+
+    def _recv_attach_accept(self, msg):
+        if not msg['GUTI'].get_trans():
+            guti = msg['GUTI'][-1].decode()
+            self.GUTI = guti[2:5]
+        self.State = 'CONN'
+        esm = msg['ESMContainer'][-1].get_val()
+        # EPS bearer identity from the ActDefaultEPSBearerCtxtRequest header
+        ebi = esm[0]>>4 if esm else 5
+        acc = NAS.ESMActDefaultEPSBearerCtxtAccept(val={'ESMHeader': {'EPSBearerId': ebi,
+                                                                      'PTI': 0}})
+        self._send_nas(NAS.EMMAttachComplete(val={'ESMContainer': acc.to_bytes()}))
+        self._end_flow('attach')
+
+    def recv_ctx_setup(self):
+        self.State = 'CONN'
+        self._end_flow('service')
+
+    def recv_release(self):
+        if self.State == 'CONN':
+            self.State = 'IDLE'
+        self._end_flow('release')
+
+
+#------------------------------------------------------------------------------#
+# simulated RAN nodes
+#------------------------------------------------------------------------------#
+
+class RANSim(object):
+    """SCTP client common to the simulated eNodeB and gNodeB
+    """
+
+    PPID = None
+
+    def __init__(self, gen, plmn, ranid, tac):
+        self.Gen  = gen
+        self.PLMN = plmn
+        self.ID   = ranid
+        self.TAC  = tac
+        self.SK   = None
+
+    def _log(self, logtype, msg, *args):
+        self.Gen._log(logtype, '[%s: %s.%.6x] %s' % (self.__class__.__name__,
+                                                      self.PLMN, self.ID, msg), *args)
+
+    def connect(self, addr, laddr=None):
+        """connects to the server SCTP address addr, optionally binding the
+        local address laddr first
+        """
+        self.SK = sctp.sctpsocket_tcp(socket.AF_INET)
+        self.SK.events.data_io = True
+        self.SK.events.flush()
+        if laddr:
+            self.SK.bind((laddr, 0))
+        self.SK.connect(addr)
+
+    def close(self):
+        if self.SK is not None:
+            try:
+                self.SK.close()
+            except Exception:
+                pass
+            self.SK = None
+
+    def _send(self, buf, sid):
+        try:
+            self.SK.sctp_send(buf, ppid=htonl(self.PPID), stream=sid)
+        except Exception as err:
+            self._log('ERR', 'sctp_send() failed: %s' % err)
+
+    def _recv(self):
+        try:
+            addr, flags, buf, notif = self.SK.sctp_recv(self.Gen.BUFLEN)
+        except Exception as err:
+            self._log('ERR', 'sctp_recv() failed: %s' % err)
+            return None
+        if not buf and not flags & sctp.FLAG_NOTIFICATION:
+            self._log('ERR', 'disconnected from the server')
+            self.Gen._ran_lost(self)
+            return None
+        return buf
+
+    def setup(self, timeout=5.0):
+        """runs the setup procedure and waits for its outcome, returns True on
+        success
+        """
+        self.send_pdu(self._setup_req(), 0)
+        end = time() + timeout
+        while time() < end:
+            if not select([self.SK], [], [], end - time())[0]:
+                break
+            buf = self._recv()
+            if buf:
+                pdu = self.decode_pdu(buf)
+                if pdu is not None and pdu[1]['procedureCode'] == self._SETUP_CODE:
+                    if pdu[0] != 'successfulOutcome':
+                        self._log('ERR', 'setup rejected')
+                        return False
+                    return True
+        self._log('ERR', 'setup timeout')
+        return False
+
+
+class ENBSim(RANSim):
+    """simulated eNodeB, handling the S1AP signalling of its UESim instances
+    """
+
+    PPID = SCTP_PPID_S1AP
+    _SETUP_CODE = 17
+
+    def __init__(self, gen, plmn, ranid, tac):
+        RANSim.__init__(self, gen, plmn, ranid, tac)
+        self._plmn_buf = plmn_str_to_buf(plmn)
+        self._tai = {'pLMNidentity': self._plmn_buf,
+                     'tAC': uint_to_bytes(tac, 16)}
+        self._cgi = {'pLMNidentity': self._plmn_buf,
+                     'cell-ID': ((ranid<<8) + 1, 28)}
+        # eNB-UE-S1AP-ID -> UESim, MME-UE-S1AP-ID -> UESim
+        self.UE     = {}
+        self.UEMME  = {}
+        self._ctxid = 0
+
+    #--------------------------------------------------------------------------#
+    # S1AP codec
+    #--------------------------------------------------------------------------#
+
+    def send_pdu(self, pdu, sid=1):
+        if not asn_s1ap_acquire():
+            self._log('ERR', 'unable to acquire the S1AP module')
+            return
+        PDU_S1AP.set_val(pdu)
+        buf = PDU_S1AP.to_aper()
+        asn_s1ap_release()
+        self._send(buf, sid)
+
+    def decode_pdu(self, buf):
+        if not asn_s1ap_acquire():
+            self._log('ERR', 'unable to acquire the S1AP module')
+            return None
+        try:
+            PDU_S1AP.from_aper(buf)
+        except Exception:
+            asn_s1ap_release()
+            self._log('WNG', 'invalid S1AP PDU transfer-syntax: %s'\
+                      % hexlify(buf).decode('ascii'))
+            return None
+        pdu = PDU_S1AP()
+        asn_s1ap_release()
+        return pdu
+
+    def _setup_req(self):
+        IEs = [{'id': 59, 'criticality': 'reject',
+                'value': ('Global-ENB-ID', {'pLMNidentity': self._plmn_buf,
+                                            'eNB-ID': ('macroENB-ID', (self.ID, 20))})},
+               {'id': 64, 'criticality': 'reject',
+                'value': ('SupportedTAs', [{'tAC': self._tai['tAC'],
+                                            'broadcastPLMNs': [self._plmn_buf]}])},
+               {'id': 137, 'criticality': 'ignore',
+                'value': ('PagingDRX', 'v128')}]
+        return ('initiatingMessage', {'procedureCode': 17, 'criticality': 'reject',
+                                      'value': ('S1SetupRequest', {'protocolIEs': IEs})})
+
+    @staticmethod
+    def _ue_msg(typ, code, crit, name, IEs):
+        return (typ, {'procedureCode': code, 'criticality': crit,
+                      'value': (name, {'protocolIEs': [
+                        {'id': ident, 'criticality': 'reject', 'value': val} \
+                        for (ident, val) in IEs]})})
+
+    #--------------------------------------------------------------------------#
+    # UE-associated signalling
+    #--------------------------------------------------------------------------#
+
+    def send_initial_ue(self, ue, naspdu, cause):
+        if ue.CtxId is not None:
+            self._del_ue(ue)
+        self._ctxid = (self._ctxid + 1) & 0xffffff
+        ue.ENB, ue.CtxId, ue.MMEId = self, self._ctxid, None
+        self.UE[ue.CtxId] = ue
+        IEs = [(8, ('ENB-UE-S1AP-ID', ue.CtxId)),
+               (26, ('NAS-PDU', naspdu)),
+               (67, ('TAI', self._tai)),
+               (100, ('EUTRAN-CGI', self._cgi)),
+               (134, ('RRC-Establishment-Cause', cause))]
+        if ue.State == 'IDLE' and ue.GUTI is not None:
+            IEs.append( (96, ('S-TMSI', {'mMEC': uint_to_bytes(ue.GUTI[1], 8),
+                                         'm-TMSI': uint_to_bytes(ue.GUTI[2], 32)})) )
+        self.send_pdu(self._ue_msg('initiatingMessage', 12, 'ignore',
+                                   'InitialUEMessage', IEs), self._ue_sid(ue))
+
+    def send_ul_nas(self, ue, naspdu):
+        if ue.MMEId is None:
+            ue.fail('no MME-UE-S1AP-ID')
+            return
+        IEs = [(0, ('MME-UE-S1AP-ID', ue.MMEId)),
+               (8, ('ENB-UE-S1AP-ID', ue.CtxId)),
+               (26, ('NAS-PDU', naspdu)),
+               (100, ('EUTRAN-CGI', self._cgi)),
+               (67, ('TAI', self._tai))]
+        self.send_pdu(self._ue_msg('initiatingMessage', 13, 'ignore',
+                                   'UplinkNASTransport', IEs), self._ue_sid(ue))
+
+    def send_release_req(self, ue):
+        IEs = [(0, ('MME-UE-S1AP-ID', ue.MMEId)),
+               (8, ('ENB-UE-S1AP-ID', ue.CtxId)),
+               (2, ('Cause', ('radioNetwork', 'user-inactivity')))]
+        self.send_pdu(self._ue_msg('initiatingMessage', 18, 'ignore',
+                                   'UEContextReleaseRequest', IEs), self._ue_sid(ue))
+
+    def _ue_sid(self, ue):
+        return 1 + ue.CtxId % self.Gen.SCTP_STREAMS
+
+    def _del_ue(self, ue):
+        if self.UE.get(ue.CtxId) is ue:
+            del self.UE[ue.CtxId]
+        if ue.MMEId is not None and self.UEMME.get(ue.MMEId) is ue:
+            del self.UEMME[ue.MMEId]
+        ue.CtxId, ue.MMEId = None, None
+
+    def recv(self):
+        """reads the SCTP socket and processes the S1AP PDU received
+        """
+        buf = self._recv()
+        if not buf:
+            return
+        pdu = self.decode_pdu(buf)
+        if pdu is None:
+            return
+        code = pdu[1]['procedureCode']
+        IEs  = dict([(ie['id'], ie['value'][1]) for ie in pdu[1]['value'][1]['protocolIEs']])
+        #
+        # get the UE context
+        if 8 in IEs:
+            ue = self.UE.get(IEs[8])
+        elif 99 in IEs:
+            if IEs[99][0] == 'uE-S1AP-ID-pair':
+                ue = self.UE.get(IEs[99][1]['eNB-UE-S1AP-ID'])
+            else:
+                ue = self.UEMME.get(IEs[99][1])
+        else:
+            self._log('DBG', 'non-UE-associated S1AP procedure %i ignored', code)
+            return
+        if ue is None:
+            self._log('WNG', 'S1AP procedure %i for an unknown UE' % code)
+            return
+        if 0 in IEs and ue.MMEId != IEs[0]:
+            ue.MMEId = IEs[0]
+            self.UEMME[ue.MMEId] = ue
+        #
+        if code == 11:
+            # DownlinkNASTransport
+            ue.recv_nas(IEs[26])
+        elif code == 9:
+            # InitialContextSetupRequest
+            self._recv_ctx_setup(ue, IEs)
+        elif code == 23:
+            # UEContextReleaseCommand
+            IEs = [(0, ('MME-UE-S1AP-ID', ue.MMEId)),
+                   (8, ('ENB-UE-S1AP-ID', ue.CtxId))]
+            self.send_pdu(self._ue_msg('successfulOutcome', 23, 'reject',
+                                       'UEContextReleaseComplete', IEs), self._ue_sid(ue))
+            self._del_ue(ue)
+            ue.recv_release()
+        elif code == 15:
+            # ErrorIndication
+            ue.fail('S1AP ErrorIndication, %r' % (IEs.get(2), ))
+        else:
+            self._log('DBG', 'S1AP procedure %i ignored', code)
+
+    def _recv_ctx_setup(self, ue, IEs):
+        erabs, naspdus = [], []
+        for erab in IEs.get(24, []):
+            erab = erab['value'][1]
+            erabs.append({
+                'id': 50, 'criticality': 'ignore',
+                'value': ('E-RABSetupItemCtxtSURes', {
+                    'e-RAB-ID': erab['e-RAB-ID'],
+                    'transportLayerAddress': (self.Gen._gtp_addr, 32),
+                    'gTP-TEID': uint_to_bytes((self.ID<<24) + ue.CtxId, 32)})})
+            if 'nAS-PDU' in erab:
+                naspdus.append(erab['nAS-PDU'])
+        IEs = [(0, ('MME-UE-S1AP-ID', ue.MMEId)),
+               (8, ('ENB-UE-S1AP-ID', ue.CtxId)),
+               (51, ('E-RABSetupListCtxtSURes', erabs))]
+        self.send_pdu(self._ue_msg('successfulOutcome', 9, 'reject',
+                                   'InitialContextSetupResponse', IEs), self._ue_sid(ue))
+        ue.recv_ctx_setup()
+        for naspdu in naspdus:
+            ue.recv_nas(naspdu)
+
+
+class GNBSim(RANSim):
+    """simulated gNodeB, only running the NGSetup procedure
+
+    5G UE registrations are not simulated, as the 5GMM security context
+    handling of the CorenetServer is not complete yet.
+    """
+
+    PPID = SCTP_PPID_NGAP
+    _SETUP_CODE = 21
+
+    def send_pdu(self, pdu, sid=0):
+        if not asn_ngap_acquire():
+            self._log('ERR', 'unable to acquire the NGAP module')
+            return
+        PDU_NGAP.set_val(pdu)
+        buf = PDU_NGAP.to_aper()
+        asn_ngap_release()
+        self._send(buf, sid)
+
+    def decode_pdu(self, buf):
+        if not asn_ngap_acquire():
+            self._log('ERR', 'unable to acquire the NGAP module')
+            return None
+        try:
+            PDU_NGAP.from_aper(buf)
+        except Exception:
+            asn_ngap_release()
+            self._log('WNG', 'invalid NGAP PDU transfer-syntax: %s'\
+                      % hexlify(buf).decode('ascii'))
+            return None
+        pdu = PDU_NGAP()
+        asn_ngap_release()
+        return pdu
+
+    def _setup_req(self):
+        IEs = [{'id': 27, 'criticality': 'reject',
+                'value': ('GlobalRANNodeID',
+                          globranid_to_asn((self.PLMN, 'gNB-ID', (self.ID, 32))))},
+               {'id': 102, 'criticality': 'reject',
+                'value': ('SupportedTAList',
+                          supptalist_to_asn({self.TAC: [(self.PLMN, [(1, )])]}))},
+               {'id': 21, 'criticality': 'ignore',
+                'value': ('PagingDRX', 'v128')}]
+        return ('initiatingMessage', {'procedureCode': 21, 'criticality': 'reject',
+                                      'value': ('NGSetupRequest', {'protocolIEs': IEs})})
+
+    def recv(self):
+        buf = self._recv()
+        if buf:
+            self._log('DBG', 'NGAP PDU ignored')
+
+
+#------------------------------------------------------------------------------#
+# load generator
+#------------------------------------------------------------------------------#
+
+class LoadGen(object):
+    """RAN load generator for a CorenetServer instance
+
+    It connects ENB_NUM simulated eNodeBs and GNB_NUM simulated gNodeBs to the
+    server, then runs the SCRIPT flows for UE_NUM simulated LTE UEs, with at most
+    CONCURRENCY UEs running their script at the same time. UEs are spread over
+    the eNodeBs.
+
+    The UEs' IMSI are allocated sequentially from IMSI_BASE, they all share the
+    same K and OP. They must be provisioned in the server AuC.db (see
+    get_auc_db()) and allowed by the server UE_ATTACH_FILTER and ConfigUE.
+
+    The server S1AP and NGAP addresses are given by SERVER_ENB and SERVER_GNB,
+    with the same format as in CorenetServer.
+
+    Example:
+        Gen = LoadGen()
+        Gen.UE_NUM = 10000
+        Gen.run()
+        print(Gen.report())
+    """
+
+    #--------------------------------------------------------------------------#
+    # debug level
+    #--------------------------------------------------------------------------#
+    #
+    DEBUG = ('ERR', 'WNG', 'INF')
+
+    #--------------------------------------------------------------------------#
+    # RAN configuration
+    #--------------------------------------------------------------------------#
+    #
+    SERVER_ENB = {'IP': '10.2.1.1', 'port': 36412}
+    SERVER_GNB = {'IP': '10.3.1.1', 'port': 38412}
+    # local IP address for the SCTP associations, and advertised for GTP-U
+    LOCAL_IP   = None
+    #
+    PLMN       = '00101'
+    TAC        = 0x0001
+    # eNB-ID / gNB-ID of the first RAN node, incremented for the following ones
+    RAN_ID     = 0x000100
+    ENB_NUM    = 1
+    GNB_NUM    = 0
+    # number of SCTP streams used for UE-associated signalling
+    SCTP_STREAMS = 1
+    BUFLEN     = 16384
+    #
+    #--------------------------------------------------------------------------#
+    # UE configuration
+    #--------------------------------------------------------------------------#
+    #
+    IMSI_BASE  = '001010000000001'
+    UE_NUM     = 1000
+    K          = b'\x01\x23\x45\x67\x89\xab\xcd\xef\x01\x23\x45\x67\x89\xab\xcd\xef'
+    # if None, the default AuC.OP is used
+    OP         = None
+    AUC_OP     = b'ffffffffffffffff'
+    #
+    #--------------------------------------------------------------------------#
+    # load configuration
+    #--------------------------------------------------------------------------#
+    #
+    # flows run by each UE
+    SCRIPT      = ('attach', 'release', 'service', 'detach')
+    CONCURRENCY = 100
+    # timeout for a single flow, in seconds
+    TIMEOUT     = 10.0
+    # maximum duration of the whole run, in seconds, 0 for no limit
+    DURATION    = 0
+    # scheduler resolution, in seconds
+    SCHED_RES   = 0.05
+
+    def __init__(self):
+        self.Milenage = Milenage(self.AUC_OP)
+        self.ENB, self.GNB, self.SK = [], [], {}
+        self.reset()
+
+    def _log(self, logtype, msg, *args):
+        if logtype in self.DEBUG:
+            if args:
+                msg = msg % args
+            log('[%s] [LoadGen] %s' % (logtype, msg))
+
+    def reset(self):
+        """resets the recorded statistics
+        """
+        # flow name -> list of latencies of successful flows
+        self.Lat  = {}
+        # flow name -> number of failed flows
+        self.Fail = {}
+        self.Duration = 0.0
+
+    def get_auc_db(self):
+        """returns the AuC.db lines for the simulated UEs
+        """
+        K = hexlify(self.K).decode('ascii')
+        if self.OP is not None:
+            OP = hexlify(self.OP).decode('ascii') + ';'
+        else:
+            OP = ''
+        return '\n'.join(['%s;%s;0;0;%s' % (imsi, K, OP) for imsi in self._imsis()]) + '\n'
+
+    def _imsis(self):
+        base, width = int(self.IMSI_BASE), len(self.IMSI_BASE)
+        return ['%0*i' % (width, base + i) for i in range(self.UE_NUM)]
+
+    #--------------------------------------------------------------------------#
+    # RAN nodes
+    #--------------------------------------------------------------------------#
+
+    def connect(self):
+        """connects the simulated eNodeBs and gNodeBs to the server and runs
+        their setup procedure, returns True if all of them succeeded
+        """
+        laddr = self.LOCAL_IP
+        self._gtp_addr = bytes_to_uint(socket.inet_aton(laddr if laddr else '127.0.0.1'), 32)
+        ok = True
+        for (num, Sim, srv, flow) in ((self.ENB_NUM, ENBSim, self.SERVER_ENB, 's1setup'),
+                                      (self.GNB_NUM, GNBSim, self.SERVER_GNB, 'ngsetup')):
+            for i in range(num):
+                ran = Sim(self, self.PLMN, self.RAN_ID + i, self.TAC)
+                T0 = time()
+                try:
+                    ran.connect((srv['IP'], srv['port']), laddr)
+                except Exception as err:
+                    self._log('ERR', 'unable to connect to %r: %s' % (srv, err))
+                    self._flow_stat(flow, 0.0, False)
+                    ok = False
+                    continue
+                if ran.setup():
+                    self._flow_stat(flow, time()-T0, True)
+                    (self.ENB if Sim is ENBSim else self.GNB).append(ran)
+                    self.SK[ran.SK] = ran
+                else:
+                    self._flow_stat(flow, 0.0, False)
+                    ran.close()
+                    ok = False
+        return ok
+
+    def disconnect(self):
+        for ran in self.ENB + self.GNB:
+            ran.close()
+        self.ENB, self.GNB, self.SK = [], [], {}
+
+    def _ran_lost(self, ran):
+        if ran.SK in self.SK:
+            del self.SK[ran.SK]
+        if ran in self.ENB:
+            self.ENB.remove(ran)
+            for ue in list(ran.UE.values()):
+                ue.fail('eNB disconnected')
+        elif ran in self.GNB:
+            self.GNB.remove(ran)
+        ran.close()
+
+    #--------------------------------------------------------------------------#
+    # UE flows scheduling
+    #--------------------------------------------------------------------------#
+
+    def _flow_stat(self, name, lat, success):
+        if success:
+            if name not in self.Lat:
+                self.Lat[name] = []
+            self.Lat[name].append(lat)
+        else:
+            self.Fail[name] = self.Fail.get(name, 0) + 1
+
+    def _flow_done(self, ue, name, lat, success):
+        self._flow_stat(name, lat, success)
+        ue.Flow = None
+        # the next flow is started from the main loop, in order not to be
+        # nested within the processing of the current S1AP PDU
+        self._ready.append(ue)
+
+    def _start_ue(self, ue):
+        if not ue.next():
+            # script over
+            if ue.CtxId is not None and ue.ENB is not None:
+                ue.ENB._del_ue(ue)
+            self._active.discard(ue)
+            if self._pending:
+                ue = self._pending.popleft()
+                self._active.add(ue)
+                self._start_ue(ue)
+
+    def run(self):
+        """connects the RAN nodes, runs the UEs' scripts and returns once all
+        of them are over (or after DURATION seconds)
+        """
+        for name in self.SCRIPT:
+            if not hasattr(UESim, '_start_%s' % name):
+                raise(CorenetErr('invalid flow in SCRIPT, %s' % name))
+        if not self.ENB and not self.GNB:
+            self.connect()
+        if not self.ENB:
+            self._log('ERR', 'no eNB connected')
+            return
+        #
+        self._pending, self._active, self._ready = deque(), set(), deque()
+        for i, imsi in enumerate(self._imsis()):
+            ue = UESim(self, imsi, self.K, self.OP)
+            ue.ENB = self.ENB[i % len(self.ENB)]
+            ue.Script.extend(self.SCRIPT)
+            self._pending.append(ue)
+        #
+        T0 = time()
+        Tchk, Tlog = T0, T0
+        for i in range(min(self.CONCURRENCY, len(self._pending))):
+            ue = self._pending.popleft()
+            self._active.add(ue)
+            self._start_ue(ue)
+        #
+        try:
+            while self._active and self.SK:
+                for sk in select(list(self.SK), [], [], self.SCHED_RES)[0]:
+                    if sk in self.SK:
+                        self.SK[sk].recv()
+                while self._ready:
+                    self._start_ue(self._ready.popleft())
+                #
+                T = time()
+                if T - Tchk >= self.SCHED_RES:
+                    # flows in timeout
+                    Tchk = T
+                    for ue in [ue for ue in self._active if ue.Flow is not None \
+                               and T - ue.Flow[1] > self.TIMEOUT]:
+                        ue.fail('timeout')
+                        if ue.CtxId is not None:
+                            ue.ENB._del_ue(ue)
+                        ue.State = 'DEREG'
+                if T - Tlog >= 1.0:
+                    Tlog = T
+                    self._log('INF', '%i UEs active, %i pending, %i flows completed'\
+                              % (len(self._active), len(self._pending),
+                                 sum(map(len, self.Lat.values()))))
+                if self.DURATION and T - T0 > self.DURATION:
+                    break
+        finally:
+            self.Duration += time() - T0
+
+    #--------------------------------------------------------------------------#
+    # report
+    #--------------------------------------------------------------------------#
+
+    def get_stats(self):
+        """returns a dict of statistics per flow name, with the number of
+        successful and failed flows, the rate of successful flows per second,
+        and latency percentiles in seconds
+        """
+        stats = {}
+        for name in set(self.Lat) | set(self.Fail):
+            lat = sorted(self.Lat.get(name, []))
+            stats[name] = {
+                'ok'  : len(lat),
+                'fail': self.Fail.get(name, 0),
+                'rate': len(lat) / self.Duration if self.Duration else 0.0,
+                'p50' : _percentile(lat, 50),
+                'p90' : _percentile(lat, 90),
+                'p99' : _percentile(lat, 99),
+                'max' : lat[-1] if lat else 0.0}
+        return stats
+
+    def report(self):
+        """returns a textual report of the statistics
+        """
+        lines = ['%-10s %8s %6s %10s %10s %10s %10s %10s'\
+                 % ('flow', 'ok', 'fail', 'proc/s', 'p50 (ms)', 'p90 (ms)', 'p99 (ms)', 'max (ms)')]
+        for name, st in sorted(self.get_stats().items()):
+            lines.append('%-10s %8i %6i %10.1f %10.2f %10.2f %10.2f %10.2f'\
+                         % (name, st['ok'], st['fail'], st['rate'], 1000*st['p50'],
+                            1000*st['p90'], 1000*st['p99'], 1000*st['max']))
+        lines.append('duration: %.2f s' % self.Duration)
+        return '\n'.join(lines)
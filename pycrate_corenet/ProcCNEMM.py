@@ -94,12 +94,12 @@ class EMMSigProc(NASSigProc):
             self._prepare(encod)
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            log('[TESTING] [%s] [EMMSigProc] [%s] %s' % (logtype, self.Name, msg))
+        def _log(self, logtype, msg, *args):
+            log('[TESTING] [%s] [EMMSigProc] [%s] %s' % (logtype, self.Name, msg % args if args else msg))
     
     else:
         def __init__(self, emmd, encod=None, emm_preempt=False, sec=True):
-            self._prepare(encod)
+            self._prepare(encod, emmd.UE)
             self.EMM  = emmd
             self.S1   = emmd.S1
             self.UE   = emmd.UE
@@ -109,8 +109,8 @@ class EMMSigProc(NASSigProc):
             self._sec = sec
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            self.EMM._log(logtype, '[%s] %s' % (self.Name, msg))
+        def _log(self, logtype, msg, *args):
+            self.EMM._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def output(self):
         self._log('ERR', 'output() not implemented')
@@ -132,11 +132,17 @@ class EMMSigProc(NASSigProc):
     
     def abort(self):
         # abort this procedure, and all procedures started within this one
-        ind = self.EMM.Proc.index(self)
-        if ind >= 0:
-            for p in self.EMM.Proc[ind+1:]:
-                p.abort()
-            del self.EMM.Proc[ind:]
+        try:
+            ind = self.EMM.Proc.index(self)
+        except ValueError:
+            # already removed from the stack, e.g. within the abort of a parent
+            self.release()
+            return
+        for p in self.EMM.Proc[ind+1:]:
+            p.abort()
+        for p in self.EMM.Proc[ind:]:
+            p.release()
+        del self.EMM.Proc[ind:]
         if self._emm_preempt:
             # release the EMM stack
             self.EMM.ready.set()
@@ -144,6 +150,7 @@ class EMMSigProc(NASSigProc):
     
     def rm_from_emm_stack(self):
         # remove the procedure from the EMM stack of procedures
+        self.release()
         try:
             if self.EMM.Proc[-1] == self:
                 del self.EMM.Proc[-1]
@@ -159,6 +166,7 @@ class EMMSigProc(NASSigProc):
             self.TimerValue = getattr(self.EMM, self.Timer, self.TimerDefault)
             self.TimerStart = time()
             self.TimerStop  = self.TimerStart + self.TimerValue
+            self.arm_timer()
     
     def get_timer(self):
         if self.Timer is None:
@@ -267,7 +275,7 @@ class EMMSigProc(NASSigProc):
         secctx = self.S1.get_sec_ctx()
         if secctx and 'UESecCap' in self.UE.Cap:
             # create the KeNB
-            self._log('DBG', 'NAS UL count for Kenb derivation, %i' % secctx['UL_enb'])
+            self._log('DBG', 'NAS UL count for Kenb derivation, %i', secctx['UL_enb'])
             Kenb, UESecCap = conv_401_A3(secctx['Kasme'], secctx['UL_enb']), self.UE.Cap['UESecCap'][1]
             secctx['Kenb'] = Kenb
             secctx['NCC']  = 0
@@ -502,7 +510,7 @@ class EMMAuthentication(EMMSigProc):
                 self.encode_msg(7, 84)
                 self.success = False
             else:
-                self._log('DBG', '%iG authentication accepted' % self.ctx)
+                self._log('DBG', '%iG authentication accepted', self.ctx)
                 self.success = True
                 # set the security context
                 self.EMM.set_sec_ctx(self.ksi, self.ctx, self.vect)
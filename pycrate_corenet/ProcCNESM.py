@@ -87,12 +87,12 @@ class ESMSigProc(NASSigProc):
             self._prepare(encod)
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            log('[TESTING] [%s] [EMMSigProc] [%s] %s' % (logtype, self.Name, msg))
+        def _log(self, logtype, msg, *args):
+            log('[TESTING] [%s] [EMMSigProc] [%s] %s' % (logtype, self.Name, msg % args if args else msg))
     
     else:
         def __init__(self, esmd, encod=None, sec=True, ebi=0, EMMProc=None):
-            self._prepare(encod)
+            self._prepare(encod, esmd.UE)
             self.ESM  = esmd
             self.S1   = esmd.S1
             self.UE   = esmd.UE
@@ -101,8 +101,8 @@ class ESMSigProc(NASSigProc):
             self._EMMProc = EMMProc
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            self.ESM._log(logtype, '[%s [%i]] %s' % (self.Name, self._ebi, msg))
+        def _log(self, logtype, msg, *args):
+            self.ESM._log(logtype, '[%s [%i]] %s' % (self.Name, self._ebi, msg), *args)
     
     def decode_msg(self, msg, ret):
         NASSigProc.decode_msg(self, msg, ret)
@@ -150,15 +150,22 @@ class ESMSigProc(NASSigProc):
     def abort(self):
         # abort this procedure, and all procedures started within this one
         ProcStack = self.ESM.Proc[self._ebi]
-        ind = ProcStack.index(self)
-        if ind >= 0:
-            for p in ProcStack[ind+1:]:
-                p.abort()
-            del ProcStack[ind:]
+        try:
+            ind = ProcStack.index(self)
+        except ValueError:
+            # already removed from the stack, e.g. within the abort of a parent
+            self.release()
+            return
+        for p in ProcStack[ind+1:]:
+            p.abort()
+        for p in ProcStack[ind:]:
+            p.release()
+        del ProcStack[ind:]
         self._log('INF', 'aborting')
     
     def rm_from_esm_stack(self):
         # remove the procedure from the ESM stack of procedures
+        self.release()
         try:
             ProcStack = self.ESM.Proc[self._ebi]
             if ProcStack[-1] == self:
@@ -171,6 +178,7 @@ class ESMSigProc(NASSigProc):
             self.TimerValue = getattr(self.ESM, self.Timer, self.TimerDefault)
             self.TimerStart = time()
             self.TimerStop  = self.TimerStart + self.TimerValue
+            self.arm_timer()
     
     def get_timer(self):
         if self.Timer is None:
@@ -302,7 +310,7 @@ class ESMDefaultEPSBearerCtxtAct(ESMSigProc):
             secctx = self.S1.get_sec_ctx()
             if secctx and 'UESecCap' in self.UE.Cap:
                 # create the KeNB
-                self._log('DBG', 'NAS UL count for Kenb derivation, %i' % secctx['UL_enb'])
+                self._log('DBG', 'NAS UL count for Kenb derivation, %i', secctx['UL_enb'])
                 Kenb, UESecCap = conv_401_A3(secctx['Kasme'], secctx['UL_enb']), self.UE.Cap['UESecCap'][1]
                 secctx['Kenb'] = Kenb
                 secctx['NCC']  = 0
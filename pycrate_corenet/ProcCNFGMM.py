@@ -93,12 +93,12 @@ class FGMMSigProc(NASSigProc):
             self._prepare(encod)
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            log('[TESTING] [%s] [FGMMSigProc] [%s] %s' % (logtype, self.Name, msg))
+        def _log(self, logtype, msg, *args):
+            log('[TESTING] [%s] [FGMMSigProc] [%s] %s' % (logtype, self.Name, msg % args if args else msg))
     
     else:
         def __init__(self, fgmmd, encod=None, fgmm_preempt=False, sec=True):
-            self._prepare(encod)
+            self._prepare(encod, fgmmd.UE)
             self.FGMM = fgmmd
             self.NG   = fgmmd.NG
             self.UE   = fgmmd.UE
@@ -107,8 +107,8 @@ class FGMMSigProc(NASSigProc):
                 self.FGMM.ready.clear()
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            self.FGMM._log(logtype, '[%s] %s' % (self.Name, msg))
+        def _log(self, logtype, msg, *args):
+            self.FGMM._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def output(self):
         self._log('ERR', 'output() not implemented')
@@ -130,11 +130,17 @@ class FGMMSigProc(NASSigProc):
     
     def abort(self):
         # abort this procedure, and all procedures started within this one
-        ind = self.FGMM.Proc.index(self)
-        if ind >= 0:
-            for p in self.FGMM.Proc[ind+1:]:
-                p.abort()
-            del self.FGMM.Proc[ind:]
+        try:
+            ind = self.FGMM.Proc.index(self)
+        except ValueError:
+            # already removed from the stack, e.g. within the abort of a parent
+            self.release()
+            return
+        for p in self.FGMM.Proc[ind+1:]:
+            p.abort()
+        for p in self.FGMM.Proc[ind:]:
+            p.release()
+        del self.FGMM.Proc[ind:]
         if self._fgmm_preempt:
             # release the FGMM stack
             self.FGMM.ready.set()
@@ -142,6 +148,7 @@ class FGMMSigProc(NASSigProc):
     
     def rm_from_fgmm_stack(self):
         # remove the procedure from the FGMM stack of procedures
+        self.release()
         try:
             if self.FGMM.Proc[-1] == self:
                 del self.FGMM.Proc[-1]
@@ -157,6 +164,7 @@ class FGMMSigProc(NASSigProc):
             self.TimerValue = getattr(self.FGMM, self.Timer, self.TimerDefault)
             self.TimerStart = time()
             self.TimerStop  = self.TimerStart + self.TimerValue
+            self.arm_timer()
     
     def get_timer(self):
         if self.Timer is None:
@@ -332,7 +340,7 @@ class FGMMPrimAKA(FGMMSigProc):
                 #self.encode_msg(126, 88)
                 self.success = False
             else:
-                self._log('DBG', '5G authentication accepted' % self.ctx)
+                self._log('DBG', '5G authentication accepted')
                 self.success = True
                 # set the security context
                 self.FGMM.set_sec_ctx(self.ksi, self.ctx, self.vect, self.snid)
@@ -71,12 +71,12 @@ class FGSMSigProc(NASSigProc):
             self._prepare(encod)
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            log('[TESTING] [%s] [FGSMSigProc] [%s] %s' % (logtype, self.Name, msg))
+        def _log(self, logtype, msg, *args):
+            log('[TESTING] [%s] [FGSMSigProc] [%s] %s' % (logtype, self.Name, msg % args if args else msg))
     
     else:
         def __init__(self, fgsmd, encod=None, sec=True, ebi=0, FGMMProc=None):
-            self._prepare(encod)
+            self._prepare(encod, fgsmd.UE)
             self.FGSM = fgsmd
             self.NG   = fgsmd.NG
             self.UE   = fgsmd.UE
@@ -84,8 +84,8 @@ class FGSMSigProc(NASSigProc):
             self._FGMMProc = FGMMProc
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            self.FGSM._log(logtype, '[%s [%i]] %s' % (self.Name, self._ebi, msg))
+        def _log(self, logtype, msg, *args):
+            self.FGSM._log(logtype, '[%s [%i]] %s' % (self.Name, self._ebi, msg), *args)
     
     def decode_msg(self, msg, ret):
         NASSigProc.decode_msg(self, msg, ret)
@@ -133,15 +133,22 @@ class FGSMSigProc(NASSigProc):
     def abort(self):
         # abort this procedure, and all procedures started within this one
         ProcStack = self.FGSM.Proc[self._ebi]
-        ind = ProcStack.index(self)
-        if ind >= 0:
-            for p in ProcStack[ind+1:]:
-                p.abort()
-            del ProcStack[ind:]
+        try:
+            ind = ProcStack.index(self)
+        except ValueError:
+            # already removed from the stack, e.g. within the abort of a parent
+            self.release()
+            return
+        for p in ProcStack[ind+1:]:
+            p.abort()
+        for p in ProcStack[ind:]:
+            p.release()
+        del ProcStack[ind:]
         self._log('INF', 'aborting')
     
     def rm_from_fgsm_stack(self):
         # remove the procedure from the FGSM stack of procedures
+        self.release()
         try:
             ProcStack = self.FGSM.Proc[self._ebi]
             if ProcStack[-1] == self:
@@ -154,6 +161,7 @@ class FGSMSigProc(NASSigProc):
             self.TimerValue = getattr(self.FGSM, self.Timer, self.TimerDefault)
             self.TimerStart = time()
             self.TimerStop  = self.TimerStart + self.TimerValue
+            self.arm_timer()
     
     def get_timer(self):
         if self.Timer is None:
@@ -84,12 +84,12 @@ class GMMSigProc(NASSigProc):
             self._prepare(encod)
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            log('[TESTING] [%s] [GMMSigProc] [%s] %s' % (logtype, self.Name, msg))
+        def _log(self, logtype, msg, *args):
+            log('[TESTING] [%s] [GMMSigProc] [%s] %s' % (logtype, self.Name, msg % args if args else msg))
     
     else:
         def __init__(self, gmmd, encod=None, gmm_preempt=False):
-            self._prepare(encod)
+            self._prepare(encod, gmmd.UE)
             self.GMM = gmmd
             self.Iu  = gmmd.Iu
             self.UE  = gmmd.UE
@@ -98,8 +98,8 @@ class GMMSigProc(NASSigProc):
                 self.GMM.ready.clear()
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            self.GMM._log(logtype, '[%s] %s' % (self.Name, msg))
+        def _log(self, logtype, msg, *args):
+            self.GMM._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def output(self):
         self._log('ERR', 'output() not implemented')
@@ -120,11 +120,17 @@ class GMMSigProc(NASSigProc):
     
     def abort(self):
         # abort this procedure, and all procedures started within this one
-        ind = self.GMM.Proc.index(self)
-        if ind >= 0:
-            for p in self.GMM.Proc[ind+1:]:
-                p.abort()
-            del self.GMM.Proc[ind:]
+        try:
+            ind = self.GMM.Proc.index(self)
+        except ValueError:
+            # already removed from the stack, e.g. within the abort of a parent
+            self.release()
+            return
+        for p in self.GMM.Proc[ind+1:]:
+            p.abort()
+        for p in self.GMM.Proc[ind:]:
+            p.release()
+        del self.GMM.Proc[ind:]
         if self._gmm_preempt:
             # release the GMM stack
             self.GMM.ready.set()
@@ -132,6 +138,7 @@ class GMMSigProc(NASSigProc):
     
     def rm_from_gmm_stack(self):
         # remove the procedure from the GMM stack of procedures
+        self.release()
         try:
             if self.GMM.Proc[-1] == self:
                 del self.GMM.Proc[-1]
@@ -147,6 +154,7 @@ class GMMSigProc(NASSigProc):
             self.TimerValue = getattr(self.GMM, self.Timer, self.TimerDefault)
             self.TimerStart = time()
             self.TimerStop  = self.TimerStart + self.TimerValue
+            self.arm_timer()
     
     def get_timer(self):
         if self.Timer is None:
@@ -1449,7 +1457,7 @@ class GMMServiceRequest(GMMSigProc):
                         # GTP tunnel to be activated
                         add_mobile_nsapi.append( int(Stat._name[6:]) )
             if add_mobile_nsapi:
-                self._log('DBG', 'uplink data pending for NSAPI %r' % add_mobile_nsapi)
+                self._log('DBG', 'uplink data pending for NSAPI %r', add_mobile_nsapi)
                 # initiate a RANAPRABAssignment
                 RanapProc = self.Iu.bearer_act()
                 if RanapProc:
@@ -88,8 +88,8 @@ class HNBAPSigProc(LinkSigProc):
         #
         self._log('DBG', 'instantiating procedure')
     
-    def _log(self, logtype, msg):
-        self.HNB._log(logtype, '[%s] %s' % (self.Name, msg))
+    def _log(self, logtype, msg, *args):
+        self.HNB._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def _recv(self, pdu_rx):
         if self.TRACK_PDU:
@@ -87,12 +87,12 @@ class MMSigProc(NASSigProc):
             self._prepare(encod)
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            log('[TESTING] [%s] [MMSigProc] [%s] %s' % (logtype, self.Name, msg))
+        def _log(self, logtype, msg, *args):
+            log('[TESTING] [%s] [MMSigProc] [%s] %s' % (logtype, self.Name, msg % args if args else msg))
     
     else:
         def __init__(self, mmd, encod=None, mm_preempt=False):
-            self._prepare(encod)
+            self._prepare(encod, mmd.UE)
             self.MM = mmd
             self.Iu = mmd.Iu
             self.UE = mmd.UE
@@ -102,8 +102,8 @@ class MMSigProc(NASSigProc):
                 self.MM.ready.clear()
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            self.MM._log(logtype, '[%s] %s' % (self.Name, msg))
+        def _log(self, logtype, msg, *args):
+            self.MM._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def output(self):
         self._log('ERR', 'output() not implemented')
@@ -124,11 +124,17 @@ class MMSigProc(NASSigProc):
     
     def abort(self):
         # abort this procedure, and all procedures started within this one
-        ind = self.MM.Proc.index(self)
-        if ind >= 0:
-            for p in self.MM.Proc[ind+1:]:
-                p.abort()
-            del self.MM.Proc[ind:]
+        try:
+            ind = self.MM.Proc.index(self)
+        except ValueError:
+            # already removed from the stack, e.g. within the abort of a parent
+            self.release()
+            return
+        for p in self.MM.Proc[ind+1:]:
+            p.abort()
+        for p in self.MM.Proc[ind:]:
+            p.release()
+        del self.MM.Proc[ind:]
         if self._mm_preempt:
             # release the MM stack
             self.MM.ready.set()
@@ -136,6 +142,7 @@ class MMSigProc(NASSigProc):
     
     def rm_from_mm_stack(self):
         # remove the procedure from the MM stack of procedures
+        self.release()
         try:
             if self.MM.Proc[-1] == self:
                 del self.MM.Proc[-1]
@@ -151,6 +158,7 @@ class MMSigProc(NASSigProc):
             self.TimerValue = getattr(self.MM, self.Timer, self.TimerDefault)
             self.TimerStart = time()
             self.TimerStop  = self.TimerStart + self.TimerValue
+            self.arm_timer()
     
     def get_timer(self):
         if self.Timer is None:
@@ -149,8 +149,8 @@ class NGAPSigProc(LinkSigProc):
         #
         self._log('DBG', 'instantiating procedure')
     
-    def _log(self, logtype, msg):
-        self.NG._log(logtype, '[%s] %s' % (self.Name, msg))
+    def _log(self, logtype, msg, *args):
+        self.NG._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def _recv(self, pdu):
         if self.TRACK_PDU:
@@ -216,8 +216,8 @@ class NGAPNonUESigProc(LinkSigProc):
         #
         self._log('DBG', 'instantiating procedure')
     
-    def _log(self, logtype, msg):
-        self.GNB._log(logtype, '[%s] %s' % (self.Name, msg))
+    def _log(self, logtype, msg, *args):
+        self.GNB._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def _recv(self, pdu):
         if self.TRACK_PDU:
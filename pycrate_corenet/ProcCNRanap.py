@@ -147,8 +147,8 @@ class RANAPSigProc(LinkSigProc):
         #
         self._log('DBG', 'instantiating procedure')
     
-    def _log(self, logtype, msg):
-        self.Iu._log(logtype, '[%s] %s' % (self.Name, msg))
+    def _log(self, logtype, msg, *args):
+        self.Iu._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def _recv(self, pdu_rx):
         if self.TRACK_PDU:
@@ -215,8 +215,8 @@ class RANAPConlessSigProc(LinkSigProc):
         #
         self._log('DBG', 'instantiating procedure')
     
-    def _log(self, logtype, msg):
-        self.RNC._log(logtype, '[%s] %s' % (self.Name, msg))
+    def _log(self, logtype, msg, *args):
+        self.RNC._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def _recv(self, pdu_rx):
         if self.TRACK_PDU:
@@ -148,8 +148,8 @@ class S1APSigProc(LinkSigProc):
         #
         self._log('DBG', 'instantiating procedure')
     
-    def _log(self, logtype, msg):
-        self.S1._log(logtype, '[%s] %s' % (self.Name, msg))
+    def _log(self, logtype, msg, *args):
+        self.S1._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def _recv(self, pdu):
         if self.TRACK_PDU:
@@ -215,8 +215,8 @@ class S1APNonUESigProc(LinkSigProc):
         #
         self._log('DBG', 'instantiating procedure')
     
-    def _log(self, logtype, msg):
-        self.ENB._log(logtype, '[%s] %s' % (self.Name, msg))
+    def _log(self, logtype, msg, *args):
+        self.ENB._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def _recv(self, pdu):
         if self.TRACK_PDU:
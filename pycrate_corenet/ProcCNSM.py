@@ -90,12 +90,12 @@ class SMSigProc(NASSigProc):
             self._tif   = tid >> 7
             self._ti    = tid & 0x7f
         
-        def _log(self, logtype, msg):
-            log('[TESTING] [%s] [EMMSigProc] [%s] %s' % (logtype, self.Name, msg))
+        def _log(self, logtype, msg, *args):
+            log('[TESTING] [%s] [EMMSigProc] [%s] %s' % (logtype, self.Name, msg % args if args else msg))
     
     else:
         def __init__(self, smd, tid, encod=None):
-            self._prepare(encod)
+            self._prepare(encod, smd.UE)
             self.SM     = smd
             self.Iu     = smd.Iu
             self.UE     = smd.UE
@@ -104,8 +104,8 @@ class SMSigProc(NASSigProc):
             self._ti    = tid & 0x7f
             self._log('DBG', 'instantiating procedure')
         
-        def _log(self, logtype, msg):
-            self.SM._log(logtype, '[%s] %s' % (self.Name, msg))
+        def _log(self, logtype, msg, *args):
+            self.SM._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def output(self):
         self._log('ERR', 'output() not implemented')
@@ -127,17 +127,21 @@ class SMSigProc(NASSigProc):
     
     def abort(self):
         # abort this procedure, and all procedures started within this one
-        if self._tid in self.SM.Proc:
+        if self._tid in self.SM.Proc and self in self.SM.Proc[self._tid]:
             ProcStack = self.SM.Proc[self._tid]
             ind = ProcStack.index(self)
-            if ind >= 0:
-                for p in ProcStack[ind+1:]:
-                    p.abort()
-                del ProcStack[ind:]
+            for p in ProcStack[ind+1:]:
+                p.abort()
+            for p in ProcStack[ind:]:
+                p.release()
+            del ProcStack[ind:]
+        else:
+            self.release()
         self._log('INF', 'aborting')
     
     def rm_from_sm_stack(self):
         # remove the procedure from the SM stack of procedures
+        self.release()
         try:
             if self._tid in self.SM.Proc:
                 ProcStack = self.SM.Proc[self._tid]
@@ -151,6 +155,7 @@ class SMSigProc(NASSigProc):
             self.TimerValue = getattr(self.SM, self.Timer, self.TimerDefault)
             self.TimerStart = time()
             self.TimerStop  = self.TimerStart + self.TimerValue
+            self.arm_timer()
     
     def get_timer(self):
         if self.Timer is None:
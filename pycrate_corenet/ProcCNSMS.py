@@ -63,8 +63,9 @@ class CMSMSProc(NASSigProc):
     TimerDefault = 2
     
     def __init__(self, smsd, tid=None, cpud=None):
-        self._prepare()
+        self._prepare(ued=smsd.UE)
         self.SMS = smsd
+        self.UE  = smsd.UE
         self.RAN = smsd.RAN
         self.TID = tid
         if tid is not None:
@@ -73,14 +74,15 @@ class CMSMSProc(NASSigProc):
         self._cpud = cpud
         self._log('DBG', 'instantiating procedure')
     
-    def _log(self, logtype, msg):
-        self.SMS._log(logtype, '[%s] %s' % (self.Name, msg))
+    def _log(self, logtype, msg, *args):
+        self.SMS._log(logtype, '[%s] %s' % (self.Name, msg), *args)
     
     def abort(self):
         self.rm_from_sms_stack()
         self._log('INF', 'aborting')
     
     def rm_from_sms_stack(self):
+        self.release()
         try:
             del self.SMS.Proc[self.TID]
         except Exception:
@@ -91,6 +93,7 @@ class CMSMSProc(NASSigProc):
             self.TimerValue = getattr(self.SMS, self.Timer, self.TimerDefault)
             self.TimerStart = time()
             self.TimerStop  = self.TimerStart + self.TimerValue
+            self.arm_timer()
     
     def get_timer(self):
         if self.Timer is None:
@@ -27,6 +27,8 @@
 # *--------------------------------------------------------
 #*/
 
+from time import time
+
 from pycrate_mobile.TS24007     import *
 from pycrate_corenet.utils_fmt  import *
 
@@ -42,7 +44,9 @@ class SigStack(object):
 
 # Signaling procedure handler
 class SigProc(object):
-    pass
+    
+    # metrics collector (CorenetMetrics), set by the CorenetServer at runtime
+    Metrics = None
 
 
 #------------------------------------------------------------------------------#
@@ -582,11 +586,21 @@ class NASSigProc(SigProc):
     
     #--------------------------------------------------------------------------#
     
-    def _prepare(self, encod=None):
-        # _prepare() must be called by each NASSigProc.__init__() method
+    def _prepare(self, encod=None, ued=None):
+        # _prepare() must be called by each NASSigProc.__init__() method,
+        # with the UEd instance handling the procedure, if any
         #
         self.Name = self.__class__.__name__
         #
+        M = self.Metrics
+        if M is not None:
+            self._t0 = time()
+            M.incr('corenet_proc_total', (self.Name, ))
+            M.add('corenet_proc_inflight', (self.Name, ))
+            if M.PER_UE and ued is not None:
+                self._ue_lab = (str(ued.IMSI), )
+                M.add('corenet_ue_proc_inflight', self._ue_lab)
+        #
         # set empty dicts for the NAS messages of the instance
         self.Encod = {mid: {} for mid in self.__class__.Encod}
         #
@@ -725,4 +739,45 @@ class NASSigProc(SigProc):
         """abort the procedure, e.g. due to a timeout or an error indication
         """
         pass
+    
+    def arm_timer(self):
+        """register the procedure timeout (TimerStop) into the server timer wheel
+        """
+        Server = self.UE.Server
+        if Server is not None and Server.ProcTimers is not None:
+            Server.ProcTimers.arm(self, self.TimerStop, self.timeout)
+    
+    def cancel_timer(self):
+        """remove the procedure timeout from the server timer wheel
+        """
+        Server = self.UE.Server
+        if Server is not None and Server.ProcTimers is not None:
+            Server.ProcTimers.cancel(self)
+    
+    def release(self):
+        """cancel the procedure timeout and record its duration, when the
+        procedure is removed from its stack
+        """
+        self.cancel_timer()
+        self._released = True
+        M = self.Metrics
+        if M is not None and getattr(self, '_t0', None) is not None:
+            M.observe('corenet_proc_seconds', (self.Name, ), time() - self._t0)
+            M.add('corenet_proc_inflight', (self.Name, ), -1)
+            if getattr(self, '_ue_lab', None) is not None:
+                M.add('corenet_ue_proc_inflight', self._ue_lab, -1, rem=True)
+                self._ue_lab = None
+            self._t0 = None
+    
+    def timeout(self):
+        """abort the procedure when its timer expires
+        """
+        if getattr(self, '_released', False):
+            # stale timeout, the procedure has already ended
+            return
+        self._log('WNG', 'timeout: aborting')
+        if self.Metrics is not None:
+            self.Metrics.incr('corenet_proc_timeout_total', (self.Name, ))
+        self.abort()
+        self.release()
 
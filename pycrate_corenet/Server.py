@@ -40,13 +40,16 @@
 # and connects them to specific service handler (SMS, GTPU, ...)
 #------------------------------------------------------------------------------#
 
+import selectors
+from collections import deque
+#
 from .utils      import *
 from .HdlrHNB    import HNBd
 from .HdlrENB    import ENBd
 from .HdlrGNB    import GNBd
 from .HdlrUE     import UEd
 from .ServerAuC  import AuC
-from .ServerGTPU import ARPd, GTPUd, BLACKHOLE_LAN, BLACKHOLE_WAN
+from .ServerGTPU import ARPd, GTPUd, GTPUdShards, BLACKHOLE_LAN, BLACKHOLE_WAN
 #
 from .ProcCNHnbap   import HNBAPErrorIndGW
 from .ProcCNRua     import RUAErrorInd
@@ -115,11 +118,11 @@ class CorenetServer(object):
     #SERVER_GNB = {} # disable NGAP Server
     #
     # Server scheduler resolution:
-    # This is the timeout on the main select() loop.
+    # This is the timeout on the main selector loop.
     SCHED_RES = 0.1
-    # This is the resolution (in sec) for the Server to start a thread that 
-    # checks the list of registered UE, and checks for ongoing NAS procedures 
-    # potentially in timeout.
+    # This is the resolution (in sec) of the timer wheel in which ongoing NAS
+    # procedures register their timeout, and for the Server to start a thread
+    # that aborts NAS procedures in timeout.
     # If set to 0, no check is made (so, NAS procedures can stall)
     # It is useless to make it lower than the SCHED_RES.
     SCHED_UE_TO = 0.5
@@ -132,9 +135,23 @@ class CorenetServer(object):
     # Authentication Centre
     AUCd  = AuC
     # GTPU trafic forwarder
+    # (GTPUdShards to run the forwarding over several CPU cores)
     GTPUd = GTPUd
     # SMS center
     SMSd  = None
+    #
+    # timer wheel for NAS procedures timeouts (set at runtime)
+    ProcTimers = None
+    #
+    # metrics of procedures and PDU processing (CorenetMetrics, set at runtime
+    # when METRICS is enabled), exported with Metrics.text(), and written
+    # every METRICS_PERIOD seconds into the METRICS_DUMP file, if set
+    # METRICS_UE enables per-UE metrics (e.g. ongoing NAS procedures per IMSI)
+    Metrics        = None
+    METRICS        = False
+    METRICS_UE     = False
+    METRICS_DUMP   = None
+    METRICS_PERIOD = 10
     
     #--------------------------------------------------------------------------#
     # corenet global config parameters
@@ -361,7 +378,7 @@ class CorenetServer(object):
     # logging and init methods
     #--------------------------------------------------------------------------#
     
-    def _log(self, logtype, msg):
+    def _log(self, logtype, msg, *args):
         """Server logging facility
         
         DEBUG logtype: 'ERR', 'WNG', 'INF', 'DBG'
@@ -369,6 +386,8 @@ class CorenetServer(object):
                        'TRACE_ASN_[HNBAP|RUA|S1AP|NGAP]_[UL|DL]',
         """
         if logtype[:3] == 'TRA':
+            if args:
+                msg = msg % args
             if logtype[6:8] == 'SK':
                 log('[TRA] [%s]\n%s%s%s'\
                     % (logtype[6:], TRACE_COLOR_START, hexlify(msg).decode('ascii'), TRACE_COLOR_END))
@@ -376,6 +395,8 @@ class CorenetServer(object):
                 log('[TRA] [%s]\n%s%s%s'\
                     % (logtype[6:], TRACE_COLOR_START, msg, TRACE_COLOR_END))
         elif logtype in self.DEBUG:
+            if args:
+                msg = msg % args
             log('[%s] %s' % (logtype, msg))
     
     def __init__(self, serving=True, threaded=True):
@@ -398,6 +419,11 @@ class CorenetServer(object):
             self._skc   = []
         # LUT for connected SCTP client and ENBId / HNBId
         self.SCTPCli    = {}
+        # selector for all SCTP servers and clients sockets (epoll on Linux),
+        # and queues of pending messages for the non-blocking clients sockets
+        self._sel       = selectors.DefaultSelector()
+        self._sk_wq     = {}
+        self._sk_wlock  = Lock()
         #
         # start SCTP servers, bind() and listen()
         self._start_server()
@@ -411,6 +437,19 @@ class CorenetServer(object):
         # init the UE procedure cleaner holder
         # (with a dummy thread, which will be overridden at runtime)
         self._clean_ue_proc = threadit( lambda: 1 )
+        # init the timer wheel for NAS procedures timeouts
+        if self.SCHED_UE_TO:
+            self.ProcTimers = TimerWheel(self.SCHED_UE_TO)
+        else:
+            self.ProcTimers = None
+        # init the metrics collector
+        if self.METRICS:
+            self.Metrics = CorenetMetrics()
+            self.Metrics.PER_UE = self.METRICS_UE
+            self.Metrics.Collectors.append(self._metrics_ran)
+        else:
+            self.Metrics = None
+        SigProc.Metrics = self.Metrics
         #
         # clear LAI, RAI, TAI dict
         self.LAI.clear()
@@ -467,45 +506,59 @@ class CorenetServer(object):
             self._log('INF', 'SCTP %s server started on address %r' % (srv, addr))
             setattr(self, attr, sk)
             self.SCTPServ.append(sk)
+            # new RAN SCTP clients are handled by handle_new_[hnb|enb|gnb]()
+            self._sel.register(sk, selectors.EVENT_READ, getattr(self, 'handle_new_%s' % srv.lower()))
         #
         self.SCTPServ = tuple(self.SCTPServ)
     
     def _serve(self):
-        # Main server loop, using select() to read sockets, the loop:
+        # Main server loop, using a selector to read and write sockets, the loop:
         # gets new SCTP clients,
         # gets new SCTP streams for connected SCTP clients,
+        # sends pending messages to connected SCTP clients,
         # and eventually timeouts running UE NAS procedures
-        self._running, T0 = True, time()
+        self._running, T0, T1 = True, time(), time()
         while self._running:
-            skr = []
+            events = []
             try:
-                skr = select(self.SCTPServ + tuple(self.SCTPCli), (), (), self.SCHED_RES)[0]
+                events = self._sel.select(self.SCHED_RES)
             except Exception as err:
                 self._log('ERR', 'select() error: %s' % err)
                 self._running = False
             #
-            for sk in skr:
-                if sk == self._sk_gnb:
-                    # new gNodeB SCTP client (NGSetupRequest)
-                    self.handle_new_gnb()
-                elif sk == self._sk_enb:
-                    # new eNodeB STCP client (S1SetupRequest)
-                    self.handle_new_enb()
-                elif sk == self._sk_hnb:
-                    # new Home-NodeB SCTP client (HNBRegisterRequest)
-                    self.handle_new_hnb()
-                else:
+            for key, mask in events:
+                sk = key.fileobj
+                if key.data is not None:
+                    # new gNodeB / eNodeB / Home-NodeB SCTP client
+                    # (NGSetupRequest, S1SetupRequest, HNBRegisterRequest)
+                    key.data()
+                    continue
+                if mask & selectors.EVENT_WRITE:
+                    # connected SCTP client ready for pending messages
+                    self._flush_sk(sk)
+                if mask & selectors.EVENT_READ and sk in self.SCTPCli:
                     # read from connected SCTP client for a new stream 
                     # (whatever PDU)
                     self.handle_stream_msg(sk)
             #
-            # clean-up potential signalling procedures in timeout
+            # abort signalling procedures in timeout
             if self.SCHED_UE_TO and time() - T0 > self.SCHED_UE_TO and \
             not self._clean_ue_proc.is_alive():
-                # select() timeout or more than `SCHED_RES' seconds since 
+                # select() timeout or more than `SCHED_UE_TO' seconds since 
                 # last timeout
-                self._clean_ue_proc = threadit(self.clean_ue_proc)
+                cbs = self.ProcTimers.expire()
+                if cbs:
+                    self._clean_ue_proc = threadit(self.expire_ue_proc, cbs)
                 T0 = time()
+            #
+            # dump metrics
+            if self.METRICS_DUMP and self.Metrics is not None and \
+            time() - T1 > self.METRICS_PERIOD:
+                try:
+                    self.Metrics.dump(self.METRICS_DUMP)
+                except Exception as err:
+                    self._log('ERR', 'unable to dump metrics: %s' % err)
+                T1 = time()
     
     def stop(self):
         self._running = False
@@ -528,6 +581,8 @@ class CorenetServer(object):
             cli.close()
             self.RAN[self.SCTPCli[cli]].disconnect()
         self.SCTPCli.clear()
+        self._sk_wq.clear()
+        self._sel.close()
         #
         # stop sub-servers
         try:
@@ -538,7 +593,7 @@ class CorenetServer(object):
             pass
     
     def sctp_handle_notif(self, sk, notif):
-        self._log('DBG', 'SCTP notification: type %i, flags %i' % (notif.type, notif.flags))
+        self._log('DBG', 'SCTP notification: type %i, flags %i', notif.type, notif.flags)
         # TODO
     
     def sctp_set_events(self, sk):
@@ -562,6 +617,9 @@ class CorenetServer(object):
         # to get at least ppid and stream
         try:
             addr, flags, buf, notif = sk.sctp_recv(self.SERVER_BUFLEN)
+        except BlockingIOError:
+            # spurious wake-up of the non-blocking socket
+            return None, None
         except TimeoutError as err:
             # the client disconnected
             if sk in self.SCTPCli:
@@ -591,23 +649,36 @@ class CorenetServer(object):
                 return None, None
         return buf, notif
     
+    def _add_sk(self, sk, ranid):
+        # keep track of the client, and make its socket non-blocking
+        # for handling it within the selector
+        self.SCTPCli[sk] = ranid
+        with self._sk_wlock:
+            self._sk_wq[sk] = deque()
+            sk.setblocking(False)
+            self._sel.register(sk, selectors.EVENT_READ)
+    
     def _rem_sk(self, sk):
-        # close socket
+        # remove the socket from the selector, and close it
+        with self._sk_wlock:
+            if sk in self._sk_wq:
+                del self._sk_wq[sk]
+                self._sel.unregister(sk)
         sk.close()
         # select RAN client
         cli = self.RAN[self.SCTPCli[sk]]
         if isinstance(cli, HNBd):
-            self._log('DBG', 'HNB %r closed connection' % (cli.ID,))            
+            self._log('DBG', 'HNB %r closed connection', cli.ID)
             # remove from the Server location tables
             if cli.Config:
                 self._unset_hnb_loc(cli)
         elif isinstance(cli, ENBd):
-            self._log('DBG', 'eNB %r closed connection' % (cli.ID,))
+            self._log('DBG', 'eNB %r closed connection', cli.ID)
             # remove from the Server location tables
             if cli.Config:
                 self._unset_enb_loc(cli)
         elif isinstance(cli, GNBd):
-            self._log('DBG', 'gNB %s closed connection' % (cli.ID,))
+            self._log('DBG', 'gNB %s closed connection', cli.ID)
             # remove from the Server location tables
             if cli.Config:
                 self._unset_gnb_loc(cli)
@@ -625,6 +696,31 @@ class CorenetServer(object):
             ppid = htonl(ppid)
         #if stream:
         #    stream = htonl(stream)
+        with self._sk_wlock:
+            if sk in self._sk_wq:
+                # non-blocking socket of a connected SCTP client
+                wq = self._sk_wq[sk]
+                if wq:
+                    # messages already pending, keep them ordered
+                    wq.append( (buf, ppid, stream) )
+                    return len(buf)
+                try:
+                    ret = sk.sctp_send(buf, ppid=ppid, stream=stream)
+                except BlockingIOError:
+                    # socket buffer full, the message will be sent by the 
+                    # server loop when the socket becomes writable
+                    wq.append( (buf, ppid, stream) )
+                    self._sel.modify(sk, selectors.EVENT_READ | selectors.EVENT_WRITE)
+                    return len(buf)
+                except Exception as err:
+                    self._log('ERR', 'cannot send buf to SCTP client at address %r' % (sk.getpeername(), ))
+                    if DEBUG_SK:
+                        self._skc.append( ('send', time(), buf, ppid, stream, err) )
+                    return 0
+                if DEBUG_SK:
+                    self._skc.append( ('send', time(), buf, ppid, stream) )
+                return ret
+        # blocking socket of a SCTP client not yet connected
         ret = 0
         try:
             ret = sk.sctp_send(buf, ppid=ppid, stream=stream)
@@ -637,6 +733,28 @@ class CorenetServer(object):
                 self._skc.append( ('send', time(), buf, ppid, stream) )
         return ret
     
+    def _flush_sk(self, sk):
+        # send pending messages to a connected SCTP client
+        with self._sk_wlock:
+            wq = self._sk_wq.get(sk)
+            if wq is None:
+                return
+            while wq:
+                buf, ppid, stream = wq[0]
+                try:
+                    sk.sctp_send(buf, ppid=ppid, stream=stream)
+                except BlockingIOError:
+                    return
+                except Exception as err:
+                    self._log('ERR', 'cannot send buf to SCTP client at address %r' % (sk.getpeername(), ))
+                    if DEBUG_SK:
+                        self._skc.append( ('send', time(), buf, ppid, stream, err) )
+                else:
+                    if DEBUG_SK:
+                        self._skc.append( ('send', time(), buf, ppid, stream) )
+                wq.popleft()
+            self._sel.modify(sk, selectors.EVENT_READ)
+    
     def handle_stream_msg(self, sk):
         buf, notif = self._read_sk(sk)
         if not buf:
@@ -645,6 +763,8 @@ class CorenetServer(object):
         # getting SCTP ppid, stream id and eNB/HNB handler
         ppid, sid, ranid = ntohl(notif.ppid), notif.stream, self.SCTPCli[sk]
         ran = self.RAN[ranid]
+        # for metrics: PDU received, time of reception and time after decoding
+        M, pdu_rx, T0, T1 = self.Metrics, None, time(), None
         #
         if ppid == SCTP_PPID_HNBAP:
             assert( isinstance(ran, HNBd) )
@@ -664,6 +784,7 @@ class CorenetServer(object):
                 pdu_tx = Err.send()
             else:
                 pdu_rx = PDU_HNBAP()
+                T1 = time()
                 if hnb.TRACE_ASN_HNBAP:
                     hnb._log('TRACE_ASN_HNBAP_UL', PDU_HNBAP.to_asn1())
                 asn_hnbap_release()
@@ -677,6 +798,8 @@ class CorenetServer(object):
                     pdu_tx = Err.send()
                 else:
                     pdu_tx = hnb.process_hnbap_pdu(pdu_rx)
+            if M is not None:
+                self._metrics_pdu(M, 'HNBAP', pdu_rx, T0, T1)
             for pdu in pdu_tx:
                 self.send_hnbap_pdu(hnb, pdu)
         #
@@ -698,6 +821,7 @@ class CorenetServer(object):
                 pdu_tx = Err.send()
             else:
                 pdu_rx = PDU_RUA()
+                T1 = time()
                 if hnb.TRACE_ASN_RUA:
                     hnb._log('TRACE_ASN_RUA_UL', PDU_HNBAP.to_asn1())
                 asn_rua_release()
@@ -711,6 +835,8 @@ class CorenetServer(object):
                     pdu_tx = Err.send()
                 else:
                     pdu_tx = hnb.process_rua_pdu(pdu_rx)
+            if M is not None:
+                self._metrics_pdu(M, 'RUA', pdu_rx, T0, T1)
             for pdu in pdu_tx:
                 self.send_rua_pdu(hnb, pdu)
         #
@@ -732,6 +858,7 @@ class CorenetServer(object):
                 pdu_tx = Err.send()
             else:
                 pdu_rx = PDU_S1AP()
+                T1 = time()
                 if enb.TRACE_ASN_S1AP:
                     enb._log('TRACE_ASN_S1AP_UL', PDU_S1AP.to_asn1())
                 asn_s1ap_release()
@@ -750,6 +877,8 @@ class CorenetServer(object):
                     else:
                         # UE-associated signalling
                         pdu_tx = enb.process_s1ap_ue_pdu(pdu_rx, sid)
+            if M is not None:
+                self._metrics_pdu(M, 'S1AP', pdu_rx, T0, T1)
             for pdu in pdu_tx:
                 self.send_s1ap_pdu(enb, pdu, sid)
         #
@@ -771,6 +900,7 @@ class CorenetServer(object):
                 pdu_tx = Err.send()
             else:
                 pdu_rx = PDU_NGAP()
+                T1 = time()
                 if gnb.TRACE_ASN_NGAP:
                     gnb._log('TRACE_ASN_NGAP_UL', PDU_NGAP.to_asn1())
                 asn_ngap_release()
@@ -789,6 +919,8 @@ class CorenetServer(object):
                     else:
                         # UE-associated signalling
                         pdu_tx = gnb.process_ngap_ue_pdu(pdu_rx, sid)
+            if M is not None:
+                self._metrics_pdu(M, 'NGAP', pdu_rx, T0, T1)
             for pdu in pdu_tx:
                 self.send_ngap_pdu(gnb, pdu, sid)
         #
@@ -798,6 +930,21 @@ class CorenetServer(object):
                 self._rem_sk(sk)
             return
     
+    def _metrics_pdu(self, M, proto, pdu_rx, T0, T1):
+        # decoding time of the PDU received and processing time of its procedure
+        if T1 is None or not isinstance(pdu_rx[1], dict):
+            M.incr('corenet_pdu_err_total', (proto, ))
+        else:
+            M.observe('corenet_asn_seconds', (proto, 'dec'), T1-T0)
+            M.observe('corenet_pdu_seconds', (proto, pdu_rx[1]['value'][0], pdu_rx[0]), time()-T1)
+    
+    def _metrics_ran(self, M):
+        # number of UE connected and non-UE-associated procedures ongoing per RAN
+        for ranid, ran in list(self.RAN.items()):
+            lab = ('%s.%s' % ranid if isinstance(ranid, tuple) else str(ranid), )
+            M.set('corenet_ran_ue', lab, len(getattr(ran, 'UE', ())))
+            M.set('corenet_ran_proc', lab, len(getattr(ran, 'Proc', ())))
+    
     def send_hnbap_pdu(self, hnb, pdu):
         if not asn_hnbap_acquire():
             hnb._log('ERR', 'unable to acquire the HNBAP module')
@@ -805,8 +952,11 @@ class CorenetServer(object):
         PDU_HNBAP.set_val(pdu)
         if hnb.TRACE_ASN_HNBAP:
             hnb._log('TRACE_ASN_HNBAP_DL', PDU_HNBAP.to_asn1())
+        T0  = time()
         buf = PDU_HNBAP.to_aper()
         asn_hnbap_release()
+        if self.Metrics is not None:
+            self.Metrics.observe('corenet_asn_seconds', ('HNBAP', 'enc'), time()-T0)
         return self._write_sk(hnb.SK, buf, ppid=SCTP_PPID_HNBAP)
     
     def send_rua_pdu(self, hnb, pdu):
@@ -816,8 +966,11 @@ class CorenetServer(object):
         PDU_RUA.set_val(pdu)
         if hnb.TRACE_ASN_RUA:
             hnb._log('TRACE_ASN_RUA_DL', PDU_RUA.to_asn1())
+        T0  = time()
         buf = PDU_RUA.to_aper()
         asn_rua_release()
+        if self.Metrics is not None:
+            self.Metrics.observe('corenet_asn_seconds', ('RUA', 'enc'), time()-T0)
         return self._write_sk(hnb.SK, buf, ppid=SCTP_PPID_RUA)
     
     def send_s1ap_pdu(self, enb, pdu, sid):
@@ -827,8 +980,11 @@ class CorenetServer(object):
         PDU_S1AP.set_val(pdu)
         if enb.TRACE_ASN_S1AP:
             enb._log('TRACE_ASN_S1AP_DL', PDU_S1AP.to_asn1())
+        T0  = time()
         buf = PDU_S1AP.to_aper()
         asn_s1ap_release()
+        if self.Metrics is not None:
+            self.Metrics.observe('corenet_asn_seconds', ('S1AP', 'enc'), time()-T0)
         return self._write_sk(enb.SK, buf, ppid=SCTP_PPID_S1AP, stream=sid)
     
     def send_ngap_pdu(self, gnb, pdu, sid):
@@ -838,8 +994,11 @@ class CorenetServer(object):
         PDU_NGAP.set_val(pdu)
         if gnb.TRACE_ASN_NGAP:
             gnb._log('TRACE_ASN_NGAP_DL', PDU_NGAP.to_asn1())
+        T0  = time()
         buf = PDU_NGAP.to_aper()
         asn_ngap_release()
+        if self.Metrics is not None:
+            self.Metrics.observe('corenet_asn_seconds', ('NGAP', 'enc'), time()-T0)
         return self._write_sk(gnb.SK, buf, ppid=SCTP_PPID_NGAP, stream=sid)
     
     #--------------------------------------------------------------------------#
@@ -899,7 +1058,7 @@ class CorenetServer(object):
     
     def handle_new_enb(self):
         sk, addr = self._sk_enb.accept()
-        self._log('DBG', 'New eNB client from address %r' % (addr, ))
+        self._log('DBG', 'New eNB client from address %r', addr)
         #
         buf, notif = self._read_sk(sk)
         if not buf:
@@ -969,7 +1128,7 @@ class CorenetServer(object):
         # process the initial PDU
         pdu_tx = enb.process_s1ap_pdu(pdu_rx)
         # keep track of the client
-        self.SCTPCli[sk] = ENBId
+        self._add_sk(sk, ENBId)
         # add the enb TAI to the Server location tables
         if enb.Config:
             self._set_enb_loc(enb)
@@ -1052,7 +1211,7 @@ class CorenetServer(object):
     
     def handle_new_gnb(self):
         sk, addr = self._sk_gnb.accept()
-        self._log('DBG', 'New gNB client from address %r' % (addr, ))
+        self._log('DBG', 'New gNB client from address %r', addr)
         #
         buf, notif = self._read_sk(sk)
         if not buf:
@@ -1122,7 +1281,7 @@ class CorenetServer(object):
         # process the initial PDU
         pdu_tx = gnb.process_ngap_pdu(pdu_rx)
         # keep track of the client
-        self.SCTPCli[sk] = GNBId
+        self._add_sk(sk, GNBId)
         # add the gnb TAI to the Server location tables
         if gnb.Config:
             self._set_gnb_loc(gnb)
@@ -1197,7 +1356,7 @@ class CorenetServer(object):
     
     def handle_new_hnb(self):
         sk, addr = self._sk_hnb.accept()
-        self._log('DBG', 'New HNB client from address %r' % (addr, ))
+        self._log('DBG', 'New HNB client from address %r', addr)
         #
         buf, notif = self._read_sk(sk)
         if not buf:
@@ -1267,7 +1426,7 @@ class CorenetServer(object):
         # process the initial PDU
         ret = hnb.process_hnbap_pdu(pdu)
         # keep track of the client
-        self.SCTPCli[sk] = HNBId
+        self._add_sk(sk, HNBId)
         # add the hnb LAI / RAI to the Server location tables
         if hnb.Config:
             self._set_hnb_loc(hnb)
@@ -1393,7 +1552,18 @@ class CorenetServer(object):
         # to be implemented
         return True
     
+    def expire_ue_proc(self, cbs):
+        # call the timeout() method of NAS signalling procedures expired 
+        # in the timer wheel
+        for cb in cbs:
+            try:
+                cb()
+            except Exception as err:
+                self._log('ERR', 'procedure timeout error: %s' % err)
+    
     def clean_ue_proc(self):
+        # this is not called by the server loop anymore, NAS signalling 
+        # procedures register their timeout in ProcTimers instead
         #self._log('DBG', 'clean_ue_proc()')
         # go over all UE and abort() NAS signalling procedures in timeout
         T = time()
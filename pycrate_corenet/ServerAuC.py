@@ -44,17 +44,29 @@ HOWTO:
 >>> MyAuc.synch_sqn('001010000000001', RAND=16*b'\x00', AMF=b'\x00\x00', AUTS=14*b'\x00')
 
 3) That's all !
+
+4) For large subscribers' databases, AuC.DB can be set to AuCDBSqlite: the AuC.db
+file is then imported once into an indexed sqlite3 database AuC.sqlite, in the
+same AuC.AUC_DB_PATH directory, which is used afterwards ; only the SQN updates
+are written back to it, in batch.
+
+5) When AuC.AV_POOL_DEPTH is set, 3G, 4G and 5G vectors are served from a pool of
+Milenage / TUAK output precomputed by worker processes, e.g. for hot subscribers
+listed in AuC.AV_POOL_IMSI.
 """
 
 # filtering exports
-__all__ = ['AuC']
+__all__ = ['AuC', 'AuCDBFile', 'AuCDBSqlite', 'AuCAVPool']
 
 
 import os
+import multiprocessing
+from collections import deque
 import time as timemod
 from binascii import hexlify, unhexlify
 from struct   import pack, unpack
 from time     import sleep
+from threading import Condition
 
 # random generator
 try:
@@ -88,7 +100,183 @@ except ImportError as err:
 
 
 # local utilities
-from .utils import *
+from .utils       import *
+from .ServerAuCDB import AuCDBFile, AuCDBSqlite
+
+
+def _comp_av(Mil, TUAK, K, ALG, OP, AMF, SQN, RAND=None):
+    """compute Milenage (ALG 0) or TUAK (ALG 4) functions and return the vector
+    (SQN, RAND, XRES, CK, IK, AK, MAC_A)
+    """
+    # pack SQN from integer to a 48-bit buffer
+    SQNb = pack('>Q', SQN)[2:]
+    #
+    # generate challenge if necessary
+    if RAND is None:
+        RAND = genrand(16)
+    #
+    Alg = Mil if ALG == 0 else TUAK
+    if OP is not None:
+        XRES, CK, IK, AK = Alg.f2345( K, RAND, OP )
+        MAC_A            = Alg.f1( K, RAND, SQNb, AMF, OP )
+    else:
+        XRES, CK, IK, AK = Alg.f2345( K, RAND )
+        MAC_A            = Alg.f1( K, RAND, SQNb, AMF )
+    return SQN, RAND, XRES, CK, IK, AK, MAC_A
+
+
+# Milenage and TUAK instances of the AV pool worker processes
+_AV_POOL_ALG = None
+
+def _av_pool_init(OP, TOP):
+    global _AV_POOL_ALG
+    _AV_POOL_ALG = (Milenage(OP), TUAK(TOP))
+
+def _av_pool_comp(K, ALG, OP, AMF, SQN, num):
+    return [_comp_av(_AV_POOL_ALG[0], _AV_POOL_ALG[1], K, ALG, OP, AMF, SQN + i) \
+            for i in range(num)]
+
+
+class AuCAVPool(object):
+    """pool of Milenage / TUAK output precomputed for the AuC vectors
+    
+    For each subscriber and AMF, AuC.AV_POOL_DEPTH vectors are computed in a batch
+    by worker processes, with a range of SQN reserved in the AuC database at once.
+    Vectors are served in increasing SQN order, and a new batch is requested
+    when half of them are consumed. When the pool is empty, requests wait for
+    the batch being computed (pool miss), up to AuC.AV_POOL_TIMEOUT seconds.
+    All pooled vectors of a subscriber are discarded when its SQN is changed 
+    outside of the pool (resynchronization, or vector with an imposed RAND), 
+    including batches being computed.
+    
+    The number of vectors served from the pool (hit), and of requests which had
+    to wait for a batch (miss) or were not served by the pool (fail) are 
+    returned by get_stats().
+    """
+    
+    def __init__(self, auc):
+        self._auc   = auc
+        self._depth = auc.AV_POOL_DEPTH
+        self._lock  = Lock()
+        # notified when a batch is filled or dropped
+        self._cond  = Condition(self._lock)
+        # (IMSI, AMF) -> deque of vectors
+        self._vec   = {}
+        # (IMSI, AMF) -> generation of the batch being computed
+        self._pend  = {}
+        # IMSI -> generation, incremented when pooled vectors are invalidated
+        self._gen   = {}
+        self._stats = {'hit': 0, 'miss': 0, 'fail': 0}
+        self._proc  = multiprocessing.Pool(auc.AV_POOL_PROC, _av_pool_init, (auc.OP, auc.TOP))
+    
+    def get_stats(self):
+        """return the dict of pool hit, miss and fail counters
+        """
+        with self._lock:
+            return dict(self._stats)
+    
+    def get(self, IMSI, K, ALG, OP, AMF):
+        """return a pooled vector for IMSI and AMF, waiting for the batch being
+        computed if none is available, or None if no batch could be computed
+        in time (the vector must then be computed synchronously)
+        """
+        key = (IMSI, AMF)
+        with self._lock:
+            vecs = self._vec.get(key)
+            if vecs:
+                self._stats['hit'] += 1
+            else:
+                self._stats['miss'] += 1
+                if key not in self._pend:
+                    self._refill(key, K, ALG, OP)
+                T0 = timemod.time()
+                while not vecs and key in self._pend:
+                    wait = self._auc.AV_POOL_TIMEOUT - (timemod.time() - T0)
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                    vecs = self._vec.get(key)
+                if not vecs:
+                    self._stats['fail'] += 1
+                    # vectors being computed would have lower SQN than the one
+                    # computed synchronously
+                    self._invalidate(IMSI)
+                    return None
+            av = vecs.popleft()
+            self._refill(key, K, ALG, OP)
+            return av
+    
+    def refill(self, IMSI, K, ALG, OP, AMF):
+        """request a new batch of vectors for IMSI and AMF if less than half of
+        the pool depth is available
+        """
+        with self._lock:
+            self._refill((IMSI, AMF), K, ALG, OP)
+    
+    def _refill(self, key, K, ALG, OP):
+        # pool lock must be acquired
+        if key in self._pend or len(self._vec.get(key, ())) > self._depth // 2:
+            return
+        # SQN reservation is done under the pool lock, so that batches of
+        # a given IMSI are reserved and queued in the same order
+        SQN = self._auc.db.incr_sqn(key[0], self._depth)
+        if SQN < 0:
+            return
+        gen = self._gen.get(key[0], 0)
+        self._pend[key] = gen
+        self._proc.apply_async(_av_pool_comp, (K, ALG, OP, key[1], SQN, self._depth),
+                               callback=lambda vecs: self._fill(key, gen, vecs),
+                               error_callback=lambda err: self._fail(key, gen, err))
+    
+    def prefill(self, IMSI):
+        """request a batch of vectors for IMSI, for each AuC.AV_POOL_AMF
+        """
+        try:
+            rec = self._auc.db[IMSI]
+        except KeyError:
+            self._auc._log('WNG', '[AVPool] IMSI %s not present in AuC.db' % IMSI)
+            return
+        if rec[1] in (0, 4):
+            for AMF in self._auc.AV_POOL_AMF:
+                self.refill(IMSI, rec[0], rec[1], rec[3] if len(rec) > 3 else None, AMF)
+    
+    def _fill(self, key, gen, vecs):
+        with self._lock:
+            if self._gen.get(key[0], 0) != gen:
+                # vectors invalidated during their computation
+                return
+            self._pend.pop(key, None)
+            if key in self._vec:
+                self._vec[key].extend(vecs)
+            else:
+                self._vec[key] = deque(vecs)
+            self._cond.notify_all()
+    
+    def _fail(self, key, gen, err):
+        self._auc._log('ERR', '[AVPool] IMSI %s, unable to compute vectors: %s' % (key[0], err))
+        with self._lock:
+            if self._gen.get(key[0], 0) == gen:
+                self._pend.pop(key, None)
+                self._cond.notify_all()
+    
+    def invalidate(self, IMSI):
+        """discard all pooled vectors of IMSI, including the ones being computed
+        """
+        with self._lock:
+            self._invalidate(IMSI)
+    
+    def _invalidate(self, IMSI):
+        # pool lock must be acquired
+        self._gen[IMSI] = self._gen.get(IMSI, 0) + 1
+        for key in [k for k in self._vec if k[0] == IMSI]:
+            del self._vec[key]
+        for key in [k for k in self._pend if k[0] == IMSI]:
+            del self._pend[key]
+        self._cond.notify_all()
+    
+    def stop(self):
+        self._proc.terminate()
+        self._proc.join()
 
 
 class AuC:
@@ -110,6 +298,9 @@ class AuC:
     # when rewriting the AuC.db, do a back-up of the last version of the file
     DO_BACKUP = True
     
+    # AuC database backend: AuCDBFile or AuCDBSqlite
+    DB = AuCDBFile
+    
     # MNO OP (Milenage) and TOP (TUAK) diversification parameter
     # The AuC supports also a per-subscriber OP / TOP, to be set optionally in the AuC.db database
     OP  = b'ffffffffffffffff'
@@ -118,6 +309,20 @@ class AuC:
     # SQN incrementation when a resynch is required by a USIM card
     SQN_SYNCH_STEP = 2
     
+    # authentication vectors pool, precomputing Milenage / TUAK output for 3G,
+    # 4G and 5G vectors in worker processes
+    # number of vectors precomputed per subscriber and AMF, 0 disables the pool
+    AV_POOL_DEPTH = 0
+    # number of worker processes
+    AV_POOL_PROC  = 2
+    # subscribers (and AMF) for which vectors are precomputed when the AuC starts,
+    # other subscribers get their vectors precomputed after their first request
+    AV_POOL_IMSI  = []
+    AV_POOL_AMF   = [b'\x80\x00']
+    # maximum time in seconds for waiting for the vectors being computed,
+    # when the pool is empty
+    AV_POOL_TIMEOUT = 1.0
+    
     # PLMN restriction for returning 4G and 5G vectors
     # provide a list of allowed PLMN, or None for disabling the filter
     #PLMN_FILTER = ['20869']
@@ -146,38 +351,15 @@ class AuC:
     def __init__(self):
         """start the AuC
         
-        open AuC.db file
-        parse it into self.db (dict), containing IMSI: (K, SQN [, OP])
+        open the AuC database with the self.DB backend into self.db, which maps
+        IMSI: [K, ALG, SQN [, OP]]
             IMSI: string of digits
             K   : 16 bytes buffer
             ALG : integer (0, 1, 2, 3 or 4, identifies the auth algorithm)
             SQN : unsigned integer
             OP  : subscriber specific OP, distinct from self.OP, optional field
         """
-        self.db = {}
-        try:
-            # get 3G authentication database AuC.db
-            db_fd = open('%sAuC.db' % self.AUC_DB_PATH, 'r')
-            # parse it into a dict object with IMSI as key
-            for line in db_fd.readlines():
-                if line[0] != '#' and line.count(';') >= 3:
-                    fields = line[:-1].split(';')
-                    IMSI   = str( fields[0] )
-                    K      = unhexlify( fields[1].encode('ascii') )
-                    ALG    = int( fields[2] )
-                    SQN    = int( fields[3] )
-                    if len(fields) > 4 and len(fields[4]) == 32:
-                        OP = unhexlify( fields[4].encode('ascii') )
-                    else:
-                        OP = None
-                    self.db[IMSI] = [ K, ALG, SQN, OP ]
-            self._log('INF', 'AuC.db file opened: %i record(s) found' % len(self.db))
-            # close the file
-            db_fd.close()
-        except Exception as err:
-            self._log('ERR', 'unable to read AuC.db, path: %s' % self.AUC_DB_PATH)
-            raise(err)
-        self._save_required = False
+        self.db = self.DB(self)
         #
         # initialize the Milenage algo with the AuC-defined OP
         self.Milenage = Milenage(self.OP)
@@ -185,6 +367,13 @@ class AuC:
         self.TUAK     = TUAK(self.TOP)
         # initialize the SIDF function
         self._init_sidf()
+        # initialize the AV pool
+        if self.AV_POOL_DEPTH > 0:
+            self._AVPool = AuCAVPool(self)
+            for IMSI in self.AV_POOL_IMSI:
+                self._AVPool.prefill(IMSI)
+        else:
+            self._AVPool = None
         #
         self._log('DBG', 'AuC / ARPF / SIDF started')
     
@@ -193,56 +382,41 @@ class AuC:
         for ind, (prof, key) in self.SIDF_ECIES_K.items():
             self._SIDF_ECIES[ind] = ECIES_HN(hn_priv_key=key, profile=prof)
     
-    def _log(self, logtype='DBG', msg=''):
+    def _log(self, logtype='DBG', msg='', *args):
         if logtype in self.DEBUG:
+            if args:
+                msg = msg % args
             log('[%s] [AuC] %s' % (logtype, msg))
     
     def save(self):
+        """write the SQN values updated in self.db into the AuC database
         """
-        optionally save old AuC.db with timestamp suffix (if self.DO_BACKUP is set)
-        write the current content of self.db dict into AuC.db, with updated SQN
-        values
-        """
-        if not self._save_required:
-            return
-        
-        T = timemod.strftime( '20%y%m%d_%H%M', timemod.gmtime() )
-        
-        # get header from original file AuC.db
-        header = []
-        file_db = open('%sAuC.db' % self.AUC_DB_PATH)
-        for line in file_db:
-            if line[0] == '#':
-                header.append( line )
-            else:
-                break
-        header = ''.join(header) + '\n'
-        file_db.close()
-        
-        if self.DO_BACKUP:
-            # save the last current version of AuC.db
-            os.rename( '%sAuC.db' % self.AUC_DB_PATH,
-                       '%sAuC.%s.db' % (self.AUC_DB_PATH, T) )
-            self._log('DBG', 'old AuC.db saved with timestamp')
-        
-        # save the current self.db into a new AuC.db file
-        file_db = open('%s/AuC.db' % self.AUC_DB_PATH, 'w')
-        file_db.write( header )
-        indexes = list(self.db.keys())
-        indexes.sort()
-        for IMSI in indexes:
-            K, ALG, SQN, OP = self.db[IMSI]
-            if OP is not None:
-                # OP additional parameter
-                file_db.write('%s;%s;%i;%i;%s;\n'\
-                    % (IMSI, hexlify(K).decode('ascii'), ALG, SQN, hexlify(OP).decode('ascii')))
-            else:
-                file_db.write('%s;%s;%i;%i;\n'\
-                    % (IMSI, hexlify(K).decode('ascii'), ALG, SQN))
-        file_db.close()
-        self._log('INF', 'current db saved to AuC.db file')
+        self.db.save()
+    
+    def stop(self):
+        if self._AVPool is not None:
+            self._AVPool.stop()
+        self.db.stop()
     
-    stop = save
+    def _get_av(self, IMSI, K, ALG, OP, AMF, RAND):
+        """return the Milenage / TUAK output (SQN, RAND, XRES, CK, IK, AK, MAC_A)
+        for IMSI, from the AV pool when enabled and RAND is not imposed, or by
+        computing it synchronously otherwise
+        """
+        if self._AVPool is None:
+            return _comp_av(self.Milenage, self.TUAK, K, ALG, OP, AMF,
+                            self.db.incr_sqn(IMSI), RAND)
+        #
+        if RAND is not None:
+            # pooled vectors for IMSI would have lower SQN than the one computed
+            self._AVPool.invalidate(IMSI)
+            return _comp_av(self.Milenage, self.TUAK, K, ALG, OP, AMF,
+                            self.db.incr_sqn(IMSI), RAND)
+        av = self._AVPool.get(IMSI, K, ALG, OP, AMF)
+        if av is None:
+            av = _comp_av(self.Milenage, self.TUAK, K, ALG, OP, AMF,
+                          self.db.incr_sqn(IMSI))
+        return av
     
     def make_2g_vector(self, IMSI, RAND=None):
         """
@@ -320,43 +494,16 @@ class AuC:
             K, ALG, SQN = K_ALG_SQN_OP
             OP = None
         #
-        if SQN == -1:
+        if ALG not in (0, 4) or SQN < 0:
             # Milenage / TUAK not supported
             self._log('WNG', '[make_3g_vector] IMSI %s does not support Milenage / TUAK' % IMSI)
             return None
         #
-        # increment SQN counter in the db
-        K_ALG_SQN_OP[2] += 1
-        self._save_required = True
-        #
-        # pack SQN from integer to a 48-bit buffer
-        SQNb = pack('>Q', SQN)[2:]
-        #
-        # generate challenge if necessary
-        if RAND is None:
-            RAND = genrand(16)
-        #
-        if ALG == 0:
-            # compute Milenage functions
-            if OP is not None:
-                XRES, CK, IK, AK = self.Milenage.f2345( K, RAND, OP )
-                MAC_A            = self.Milenage.f1( K, RAND, SQNb, AMF, OP )
-            else:
-                XRES, CK, IK, AK = self.Milenage.f2345( K, RAND )
-                MAC_A            = self.Milenage.f1( K, RAND, SQNb, AMF )
-        elif ALG == 4:
-            # compute TUAK functions
-            if OP is not None:
-                XRES, CK, IK, AK = self.TUAK.f2345( K, RAND, OP )
-                MAC_A            = self.TUAK.f1( K, RAND, SQNb, AMF, OP )
-            else:
-                XRES, CK, IK, AK = self.TUAK.f2345( K, RAND )
-                MAC_A            = self.TUAK.f1( K, RAND, SQNb, AMF )
-        else:
-            # invalid ALG
-            return None
+        # compute Milenage / TUAK functions and increment SQN counter in the db,
+        # or get them from the AV pool
+        SQN, RAND, XRES, CK, IK, AK, MAC_A = self._get_av(IMSI, K, ALG, OP, AMF, RAND)
         #
-        AUTN = xor_buf( SQNb, AK ) + AMF + MAC_A
+        AUTN = xor_buf( pack('>Q', SQN)[2:], AK ) + AMF + MAC_A
         #
         # return auth vector
         self._log('DBG', '[make_3g_vector] IMSI %s, SQN %i: RAND %s, XRES %s, AUTN %s, CK %s, IK %s'\
@@ -399,36 +546,15 @@ class AuC:
             self._log('WNG', '[make_4g_vector] IMSI %s does not support Milenage or TUAK' % IMSI)
             return None
         #
-        # increment SQN counter in the db
-        if SQN >= 0:
-            K_ALG_SQN_OP[2] += 1
-            self._save_required = True
-        #
-        # pack SQN from integer to a 48-bit buffer
-        SQNb = pack('>Q', SQN)[2:]
-        #
-        # generate challenge
-        if RAND is None:
-            RAND = genrand(16)
+        if SQN < 0:
+            self._log('WNG', '[make_4g_vector] IMSI %s has no SQN' % IMSI)
+            return None
         #
-        if ALG == 0:
-            # compute Milenage functions
-            if OP is not None:
-                XRES, CK, IK, AK = self.Milenage.f2345( K, RAND, OP )
-                MAC_A            = self.Milenage.f1( K, RAND, SQNb, AMF, OP )
-            else:
-                XRES, CK, IK, AK = self.Milenage.f2345( K, RAND )
-                MAC_A            = self.Milenage.f1( K, RAND, SQNb, AMF )
-        else:
-            # ALG == 4, compute TUAK functions
-            if OP is not None:
-                XRES, CK, IK, AK = self.TUAK.f2345( K, RAND, OP )
-                MAC_A            = self.TUAK.f1( K, RAND, SQNb, AMF, OP )
-            else:
-                XRES, CK, IK, AK = self.TUAK.f2345( K, RAND )
-                MAC_A            = self.TUAK.f1( K, RAND, SQNb, AMF )
+        # compute Milenage / TUAK functions and increment SQN counter in the db,
+        # or get them from the AV pool
+        SQN, RAND, XRES, CK, IK, AK, MAC_A = self._get_av(IMSI, K, ALG, OP, AMF, RAND)
         #
-        SQN_X_AK = xor_buf( SQNb, AK )
+        SQN_X_AK = xor_buf( pack('>Q', SQN)[2:], AK )
         AUTN = SQN_X_AK + AMF + MAC_A
         # convert to LTE master key
         KASME = conv_401_A2(CK, IK, SN_ID, SQN_X_AK)
@@ -478,36 +604,15 @@ class AuC:
             self._log('WNG', '[make_4g_vector] IMSI %s does not support Milenage or TUAK' % IMSI)
             return None
         #
-        # increment SQN counter in the db
-        if SQN >= 0:
-            K_ALG_SQN_OP[2] += 1
-            self._save_required = True
-        #
-        # pack SQN from integer to a 48-bit buffer
-        SQNb = pack('>Q', SQN)[2:]
-        #
-        # generate challenge
-        if RAND is None:
-            RAND = genrand(16)
+        if SQN < 0:
+            self._log('WNG', '[make_5g_vector] IMSI %s has no SQN' % IMSI)
+            return None
         #
-        if ALG == 0:
-            # compute Milenage functions
-            if OP is not None:
-                XRES, CK, IK, AK = self.Milenage.f2345( K, RAND, OP )
-                MAC_A            = self.Milenage.f1( K, RAND, SQNb, AMF, OP )
-            else:
-                XRES, CK, IK, AK = self.Milenage.f2345( K, RAND )
-                MAC_A            = self.Milenage.f1( K, RAND, SQNb, AMF )
-        else:
-            # ALG == 4, compute TUAK functions
-            if OP is not None:
-                XRES, CK, IK, AK = self.TUAK.f2345( K, RAND, OP )
-                MAC_A            = self.TUAK.f1( K, RAND, SQNb, AMF, OP )
-            else:
-                XRES, CK, IK, AK = self.TUAK.f2345( K, RAND )
-                MAC_A            = self.TUAK.f1( K, RAND, SQNb, AMF )
+        # compute Milenage / TUAK functions and increment SQN counter in the db,
+        # or get them from the AV pool
+        SQN, RAND, XRES, CK, IK, AK, MAC_A = self._get_av(IMSI, K, ALG, OP, AMF, RAND)
         #
-        SQN_X_AK = xor_buf( SQNb, AK )
+        SQN_X_AK = xor_buf( pack('>Q', SQN)[2:], AK )
         AUTN = SQN_X_AK + AMF + MAC_A
         # convert to AUSF master key
         KAUSF = conv_501_A2(CK, IK, SNName, SQN_X_AK)
@@ -581,9 +686,12 @@ class AuC:
             return 1
         #
         # resynchronize local SQN value
-        K_ALG_SQN_OP[2] = SQN_MSi + self.SQN_SYNCH_STEP
-        self._save_required = True
-        self._log('DBG', '[synch_sqn] IMSI %s, SQN resynchronized to %i' % (IMSI, K_ALG_SQN_OP[2]))
+        self.db.set_sqn(IMSI, SQN_MSi + self.SQN_SYNCH_STEP)
+        if self._AVPool is not None:
+            # pooled vectors were computed with SQN from the previous sequence
+            self._AVPool.invalidate(IMSI)
+        self._log('DBG', '[synch_sqn] IMSI %s, SQN resynchronized to %i'\
+                  % (IMSI, SQN_MSi + self.SQN_SYNCH_STEP))
         return 0
     
     def sidf_unconceal(self, hnkid, ephpubk, cipht, mac):
@@ -737,3 +845,46 @@ def test():
             unhexlify('6AC7DAE96AA30A4D')) == unhexlify('00012080f6')
             )
 
+
+
+def bench(num=1000000, vec=100000, path=None, depth=0):
+    """measure the 3G and 4G vectors generation throughput with an AuCDBSqlite
+    database of `num' Milenage subscribers, created in the directory `path'
+    (a temporary one by default), requesting `vec' vectors for random subscribers
+    with an AV pool of `depth' vectors per subscriber
+    """
+    import random
+    import shutil
+    import tempfile
+    tmp = path is None
+    if tmp:
+        path = tempfile.mkdtemp() + os.sep
+    #
+    class AuCBench(AuC):
+        DEBUG       = ('ERR', 'WNG', 'INF')
+        AUC_DB_PATH = path
+        DB          = AuCDBSqlite
+        AV_POOL_DEPTH = depth
+    #
+    try:
+        auc = AuCBench()
+        T0  = timemod.time()
+        if len(auc.db) < num:
+            auc.db.update(('00101%.9i' % i, [genrand(16), 0, 0, None]) for i in range(num))
+        print('database of %i subscribers created in %.3f s' % (num, timemod.time()-T0))
+        #
+        imsis = ['00101%.9i' % random.randrange(num) for i in range(vec)]
+        T0 = timemod.time()
+        for imsi in imsis:
+            auc.make_3g_vector(imsi)
+        T1 = timemod.time()
+        print('3G vectors: %.0f / s' % (vec/(T1-T0)))
+        for imsi in imsis:
+            auc.make_4g_vector(imsi, b'\x00\xf1\x10')
+        T2 = timemod.time()
+        print('4G vectors: %.0f / s' % (vec/(T2-T1)))
+        auc.stop()
+        print('pending SQN updates saved in %.3f s' % (timemod.time()-T2))
+    finally:
+        if tmp:
+            shutil.rmtree(path)
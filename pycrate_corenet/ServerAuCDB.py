@@ -0,0 +1,305 @@
+# −*− coding: UTF−8 −*−
+#/**
+# * Software Name : pycrate
+# * Version : 0.4
+# *
+# * Copyright 2026. Benoit Michau. P1Sec.
+# *
+# * This library is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU Lesser General Public
+# * License as published by the Free Software Foundation; either
+# * version 2.1 of the License, or (at your option) any later version.
+# *
+# * This library is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# * Lesser General Public License for more details.
+# *
+# * You should have received a copy of the GNU Lesser General Public
+# * License along with this library; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, 
+# * MA 02110-1301  USA
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_corenet/ServerAuCDB.py
+# * Created : 2026-10-19
+# * Authors : Benoit Michau 
+# *--------------------------------------------------------
+#*/
+
+"""
+AuC databases backends, mapping IMSI: [K, ALG, SQN [, OP]], see AuC.DB
+
+They do not depend on CryptoMobile, nor on the other corenet modules.
+"""
+
+# filtering exports
+__all__ = ['AuCDBFile', 'AuCDBSqlite']
+
+
+import os
+import sqlite3
+import time as timemod
+from binascii  import hexlify, unhexlify
+from threading import Thread, Lock, Event
+
+
+def _read_auc_db(path):
+    """yield (IMSI, [K, ALG, SQN, OP]) records from the AuC.db CSV file at `path'
+    """
+    with open(path, 'r') as db_fd:
+        for line in db_fd:
+            if line[0] != '#' and line.count(';') >= 3:
+                fields = line.rstrip('\r\n').split(';')
+                if len(fields) > 4 and len(fields[4]) == 32:
+                    OP = unhexlify( fields[4].encode('ascii') )
+                else:
+                    OP = None
+                yield str(fields[0]), [unhexlify( fields[1].encode('ascii') ),
+                                       int( fields[2] ),
+                                       int( fields[3] ),
+                                       OP]
+
+
+class AuCDBFile(dict):
+    """AuC database backend, loading all records of the AuC.db CSV file in memory
+    
+    The whole AuC.db file is rewritten when saved, if any SQN has been updated.
+    """
+    
+    def __init__(self, auc):
+        dict.__init__(self)
+        self._auc  = auc
+        self._path = '%sAuC.db' % auc.AUC_DB_PATH
+        self._lock = Lock()
+        self._save_required = False
+        try:
+            for IMSI, rec in _read_auc_db(self._path):
+                self[IMSI] = rec
+        except Exception as err:
+            auc._log('ERR', 'unable to read AuC.db, path: %s' % auc.AUC_DB_PATH)
+            raise(err)
+        auc._log('INF', 'AuC.db file opened: %i record(s) found' % len(self))
+    
+    def incr_sqn(self, IMSI, num=1):
+        """increment the SQN of IMSI by num if it is positive, and return its 
+        value before incrementation
+        """
+        with self._lock:
+            rec = self[IMSI]
+            SQN = rec[2]
+            if SQN >= 0:
+                rec[2] = SQN + num
+                self._save_required = True
+        return SQN
+    
+    def set_sqn(self, IMSI, SQN):
+        """set the SQN of IMSI
+        """
+        with self._lock:
+            self[IMSI][2] = SQN
+            self._save_required = True
+    
+    def stop(self):
+        self.save()
+    
+    def save(self):
+        """
+        optionally save old AuC.db with timestamp suffix (if AuC.DO_BACKUP is set)
+        write the current content of self into AuC.db, with updated SQN values
+        """
+        if not self._save_required:
+            return
+        
+        T = timemod.strftime( '20%y%m%d_%H%M', timemod.gmtime() )
+        
+        # get header from original file AuC.db
+        header = []
+        file_db = open(self._path)
+        for line in file_db:
+            if line[0] == '#':
+                header.append( line )
+            else:
+                break
+        header = ''.join(header) + '\n'
+        file_db.close()
+        
+        if self._auc.DO_BACKUP:
+            # save the last current version of AuC.db
+            os.rename( self._path,
+                       '%sAuC.%s.db' % (self._auc.AUC_DB_PATH, T) )
+            self._auc._log('DBG', 'old AuC.db saved with timestamp')
+        
+        # save the current records into a new AuC.db file
+        with self._lock:
+            file_db = open(self._path, 'w')
+            file_db.write( header )
+            for IMSI in sorted(self.keys()):
+                K, ALG, SQN = self[IMSI][:3]
+                OP = self[IMSI][3] if len(self[IMSI]) > 3 else None
+                if OP is not None:
+                    # OP additional parameter
+                    file_db.write('%s;%s;%i;%i;%s;\n'\
+                        % (IMSI, hexlify(K).decode('ascii'), ALG, SQN, hexlify(OP).decode('ascii')))
+                else:
+                    file_db.write('%s;%s;%i;%i;\n'\
+                        % (IMSI, hexlify(K).decode('ascii'), ALG, SQN))
+            file_db.close()
+            self._save_required = False
+        self._auc._log('INF', 'current db saved to AuC.db file')
+
+
+class AuCDBSqlite(object):
+    """AuC database backend, storing records in the sqlite3 database AuC.sqlite,
+    indexed by IMSI
+    
+    When AuC.sqlite does not exist, it is created from the AuC.db CSV file.
+    Records are looked up in the database for each request, hence only the ones
+    in use are loaded in memory. SQN updates are kept in memory and written in
+    a single transaction by a background thread, every SYNC_PERIOD seconds or 
+    as soon as SYNC_NUM updates are pending, and when saved. SQN updates lost on
+    a crash are recovered with the standard USIM resynchronization procedure.
+    """
+    
+    # number of pending SQN updates triggering a write to the database
+    SYNC_NUM    = 1024
+    # maximum delay in seconds before writing pending SQN updates to the database
+    SYNC_PERIOD = 1.0
+    
+    def __init__(self, auc):
+        self._auc  = auc
+        self._path = '%sAuC.sqlite' % auc.AUC_DB_PATH
+        self._lock = Lock()
+        # pending SQN updates, IMSI -> SQN
+        self._sqn  = {}
+        #
+        init = not os.path.exists(self._path)
+        try:
+            self._con = sqlite3.connect(self._path, check_same_thread=False)
+            self._con.execute('CREATE TABLE IF NOT EXISTS auc (imsi TEXT PRIMARY KEY, '\
+                              'k BLOB, alg INTEGER, sqn INTEGER, op BLOB)')
+            self._con.commit()
+        except Exception as err:
+            auc._log('ERR', 'unable to open AuC.sqlite, path: %s' % auc.AUC_DB_PATH)
+            raise(err)
+        if init and os.path.exists('%sAuC.db' % auc.AUC_DB_PATH):
+            self.update(_read_auc_db('%sAuC.db' % auc.AUC_DB_PATH))
+            auc._log('INF', 'AuC.sqlite database created from AuC.db')
+        auc._log('INF', 'AuC.sqlite database opened: %i record(s) found' % len(self))
+        #
+        # background thread writing pending SQN updates
+        self._sync_ev   = Event()
+        self._sync_stop = False
+        self._sync_th   = Thread(target=self._sync_loop, daemon=True)
+        self._sync_th.start()
+    
+    def __getitem__(self, IMSI):
+        with self._lock:
+            row = self._con.execute('SELECT k, alg, sqn, op FROM auc WHERE imsi=?',
+                                    (IMSI, )).fetchone()
+            if row is None:
+                raise(KeyError(IMSI))
+            K, ALG, SQN, OP = row
+            if IMSI in self._sqn:
+                SQN = self._sqn[IMSI]
+        return [bytes(K), ALG, SQN, bytes(OP) if OP is not None else None]
+    
+    def __setitem__(self, IMSI, rec):
+        self.update([(IMSI, rec)])
+    
+    def __delitem__(self, IMSI):
+        with self._lock:
+            if self._con.execute('DELETE FROM auc WHERE imsi=?', (IMSI, )).rowcount == 0:
+                raise(KeyError(IMSI))
+            self._con.commit()
+            if IMSI in self._sqn:
+                del self._sqn[IMSI]
+    
+    def __contains__(self, IMSI):
+        with self._lock:
+            return self._con.execute('SELECT 1 FROM auc WHERE imsi=?',
+                                     (IMSI, )).fetchone() is not None
+    
+    def __len__(self):
+        with self._lock:
+            return self._con.execute('SELECT COUNT(*) FROM auc').fetchone()[0]
+    
+    def keys(self):
+        with self._lock:
+            return [row[0] for row in self._con.execute('SELECT imsi FROM auc ORDER BY imsi')]
+    
+    def update(self, recs):
+        """insert or replace the (IMSI, [K, ALG, SQN [, OP]]) records from the
+        iterable `recs', in a single transaction
+        """
+        with self._lock:
+            self._con.executemany('INSERT OR REPLACE INTO auc VALUES (?, ?, ?, ?, ?)',
+                                  self._update_rows(recs))
+            self._con.commit()
+    
+    def _update_rows(self, recs):
+        for IMSI, rec in recs:
+            # written records override pending SQN updates
+            self._sqn.pop(IMSI, None)
+            yield IMSI, rec[0], rec[1], rec[2], rec[3] if len(rec) > 3 else None
+    
+    def incr_sqn(self, IMSI, num=1):
+        """increment the SQN of IMSI by num if it is positive, and return its 
+        value before incrementation
+        """
+        with self._lock:
+            if IMSI in self._sqn:
+                SQN = self._sqn[IMSI]
+            else:
+                row = self._con.execute('SELECT sqn FROM auc WHERE imsi=?', (IMSI, )).fetchone()
+                if row is None:
+                    raise(KeyError(IMSI))
+                SQN = row[0]
+            if SQN >= 0:
+                self._sqn[IMSI] = SQN + num
+                self._sync_req()
+        return SQN
+    
+    def set_sqn(self, IMSI, SQN):
+        """set the SQN of IMSI
+        """
+        with self._lock:
+            self._sqn[IMSI] = SQN
+            self._sync_req()
+    
+    def _sync_req(self):
+        if len(self._sqn) >= self.SYNC_NUM:
+            # wake the background thread up
+            self._sync_ev.set()
+    
+    def _sync_loop(self):
+        while not self._sync_stop:
+            self._sync_ev.wait(self.SYNC_PERIOD)
+            self._sync_ev.clear()
+            with self._lock:
+                self._sync()
+    
+    def _sync(self):
+        if self._sqn:
+            self._con.executemany('UPDATE auc SET sqn=? WHERE imsi=?',
+                                  [(SQN, IMSI) for IMSI, SQN in self._sqn.items()])
+            self._con.commit()
+            self._sqn.clear()
+    
+    def save(self):
+        """write all pending SQN updates to the database
+        """
+        with self._lock:
+            num = len(self._sqn)
+            self._sync()
+        if num:
+            self._auc._log('INF', '%i SQN update(s) saved to AuC.sqlite' % num)
+    
+    def stop(self):
+        """stop the background thread and write all pending SQN updates to the
+        database
+        """
+        self._sync_stop = True
+        self._sync_ev.set()
+        self._sync_th.join()
+        self.save()
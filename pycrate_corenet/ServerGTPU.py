@@ -38,10 +38,13 @@
 #------------------------------------------------------------------------------#
 
 # filtering exports
-__all__ = ['ARPd', 'GTPUd', 'DPI', 'MOD', 'DNSRESP', 'TCPSYNACK']
+__all__ = ['ARPd', 'GTPUd', 'GTPUdShards', 'DPI', 'MOD', 'DNSRESP', 'TCPSYNACK']
 
 import os
 import signal
+import ctypes
+import multiprocessing
+from errno import EAGAIN, EWOULDBLOCK
 #
 if os.name != 'nt':
     from fcntl  import ioctl
@@ -53,6 +56,7 @@ else:
 
 from pycrate_core.elt import Envelope
 from pycrate_ether.IP import *
+from pycrate_mobile.TS29281_GTPU import decode_GTPU_hdr, encode_GTPU_hdr
 from .utils           import *
 
 #------------------------------------------------------------------------------#
@@ -85,6 +89,48 @@ def set_promisc(sk, iff, val=1):
     sk.setsockopt(SOL_PACKET, cmd, mreq)
 
 
+#------------------------------------------------------------------------------#
+# load-balancing packets between sockets                                       #
+#------------------------------------------------------------------------------#
+
+# SO_REUSEPORT is not available on all platforms (and Python versions)
+SO_REUSEPORT              = getattr(socket, 'SO_REUSEPORT', None)
+# Linux values, from linux/if_packet.h and asm-generic/socket.h, not exposed
+# by the socket module
+PACKET_FANOUT             = 18
+PACKET_FANOUT_HASH        = 0
+PACKET_FANOUT_FLAG_DEFRAG = 0x8000
+SO_ATTACH_REUSEPORT_CBPF  = 51
+
+def set_fanout(sk, group_id):
+    """Add the PF_PACKET socket to the fanout group, packets are load-balanced 
+    between all sockets of the group according to their flow hash"""
+    sk.setsockopt(SOL_PACKET, PACKET_FANOUT,
+                  (group_id & 0xffff) | ((PACKET_FANOUT_HASH | PACKET_FANOUT_FLAG_DEFRAG) << 16))
+
+def set_reuseport(sk):
+    """Enable SO_REUSEPORT on the socket, raise CorenetErr if not supported"""
+    if SO_REUSEPORT is None:
+        raise(CorenetErr('SO_REUSEPORT not supported on this platform'))
+    sk.setsockopt(socket.SOL_SOCKET, SO_REUSEPORT, 1)
+
+def set_reuseport_teid(sk, num):
+    """Attach a classic BPF program to the SO_REUSEPORT group of the GTP-U UDP
+    socket, so that packets are load-balanced between the `num' sockets of the
+    group according to their GTP-U TEID, instead of the UDP flow hash
+    
+    The program runs with the UDP payload at offset 0, and returns the index of
+    the socket in the group: TEID % num.
+    """
+    # ld [4] ; mod #num ; ret a
+    prog = pack('HBBI', 0x20, 0, 0, 4) \
+         + pack('HBBI', 0x94, 0, 0, num) \
+         + pack('HBBI', 0x16, 0, 0, 0)
+    buf = ctypes.create_string_buffer(prog, len(prog))
+    sk.setsockopt(socket.SOL_SOCKET, SO_ATTACH_REUSEPORT_CBPF,
+                  pack('HP', len(prog)//8, ctypes.addressof(buf)))
+
+
 #------------------------------------------------------------------------------#
 # ARPd                                                                         #
 #------------------------------------------------------------------------------#
@@ -152,8 +198,10 @@ class ARPd(object):
     #
     CATCH_SIGINT = False
     
-    def __init__(self, opportunist=False):
+    def __init__(self, opportunist=False, responder=True):
         #
+        # responder: if False, ARP requests for our IP_POOL are not answered
+        self._responder     = responder
         self.GGSN_MAC_BUF   = mac_aton(self.GGSN_MAC_ADDR)
         self.GGSN_IP_BUF    = inet_aton(self.GGSN_IP_ADDR)
         self.ROUTER_MAC_BUF = mac_aton(self.ROUTER_MAC_ADDR)
@@ -202,9 +250,11 @@ class ARPd(object):
         #
         # .resolve(ip) method is available for ARP resolution by GTPUd
     
-    def _log(self, logtype='DBG', msg=''):
+    def _log(self, logtype='DBG', msg='', *args):
         # logtype: 'ERR', 'WNG', 'INF', 'DBG'
         if logtype in self.DEBUG:
+            if args:
+                msg = msg % args
             log('[%s] [ARPd] %s' % (logtype, msg))
     
     def set_opportunist(self, state):
@@ -253,7 +303,7 @@ class ARPd(object):
         # this is an ARP request or response:
         arpop = ord(buf[21:22])
         # 1) check if it requests for one of our IP
-        if arpop == 1:
+        if arpop == 1 and self._responder:
             ipreq = inet_ntoa(buf[38:42])
             if ipreq in self.IP_POOL:
                 # reply to it with our MAC ADDR
@@ -268,7 +318,7 @@ class ARPd(object):
                 except Exception as err:
                     self._log('ERR', 'external network error (sendto) on ARP response: %s' % err)
                 else:
-                    self._log('DBG', 'ARP response sent for IP: %s' % ipreq)
+                    self._log('DBG', 'ARP response sent for IP: %s', ipreq)
         # 2) check if it responses something useful for us
         elif arpop == 2:
             ipres_buf = buf[28:32]
@@ -277,7 +327,7 @@ class ARPd(object):
                 if ipres not in self.ARP_RESOLV_TABLE:
                     # WNG: no protection (at all) against ARP cache poisoning
                     self.ARP_RESOLV_TABLE[ipres] = buf[22:28]
-                    self._log('DBG', 'got ARP response for new local IP: %s' % ipres)
+                    self._log('DBG', 'got ARP response for new local IP: %s', ipres)
     
     def _process_ipbuf(self, buf):
         # this is an random IPv4 packet incoming into our interface: 
@@ -290,7 +340,7 @@ class ARPd(object):
             if ipsrc not in self.ARP_RESOLV_TABLE:
                 # WNG: no protection (at all) against ARP cache poisoning
                 self.ARP_RESOLV_TABLE[ipsrc] = buf[6:12]
-                self._log('DBG', 'got MAC address from IPv4 packet for new local IP: %s' % ipsrc)
+                self._log('DBG', 'got MAC address from IPv4 packet for new local IP: %s', ipsrc)
     
     def resolve(self, ip):
         # check if already resolved
@@ -314,7 +364,7 @@ class ARPd(object):
             except Exception as err:
                 self._log('ERR', 'external network error (sendto) on ARP request: %s' % err)
             else:
-                self._log('DBG', 'ARP request sent for local IP: %s' % ip)
+                self._log('DBG', 'ARP request sent for local IP: %s', ip)
             # wait for the answer
             cnt = 0
             while ip not in self.ARP_RESOLV_TABLE:
@@ -380,6 +430,13 @@ class GTPUd(object):
     by looking into the class attribute:
     WL_PORTS = [('UDP', 53), ('UDP', 123), ('TCP', 80), ...]
     This is bypassing the blackholing feature.
+
+    Uplink forwarding decisions (dest MAC address, blackholing and whitelisting)
+    are cached per IP dest address for UL_ROUTE_TTL seconds at most (so that 
+    changes in the ARP resolution table are taken into account), and modules in
+    .MOD are flattened into a single handler per direction. Both are recompiled
+    by the listener when the DPI, MOD, BLACKHOLING or whitelist configuration 
+    changes.
     '''
     #
     # verbosity level: list of log types to display when calling 
@@ -390,6 +447,8 @@ class GTPUd(object):
     BUFLEN        = 2048
     # select loop settings
     SELECT_TO     = 0.1
+    # maximum number of packets read from a single socket at each select() wakeup
+    BATCH_LEN     = 64
     #
     # Gi interface, with GGSN ethernet IF, MAC address and IPv6 /64 network prefix
     EXT_IF        = ARPd.GGSN_ETH_IF
@@ -417,8 +476,24 @@ class GTPUd(object):
     # in incoming GTP-U packet
     DROP_SPOOF    = True
     #
+    # maximum number of IP dest addresses for which UL forwarding decisions
+    # are cached, and maximum duration of the cache in seconds
+    UL_ROUTE_MAX  = 65536
+    UL_ROUTE_TTL  = 30.0
+    #
     # in case we want to stop the listener when typing CTRL+C
     CATCH_SIGINT = False
+    #
+    # socket sharing between several GTPUd instances (see GTPUdShards):
+    # PF_PACKET fanout group id for the Gi interface (IPv4 id, and id+1 for IPv6), 
+    # SO_REUSEPORT for the GTP-U UDP sockets, with the number of sockets in the
+    # group between which GTP-U packets are steered according to their TEID
+    # (0 to keep the kernel UDP flow hash),
+    # and answering ARP requests for the mobiles
+    FANOUT_ID     = None
+    SK_REUSEPORT  = False
+    SK_TEID_STEER = 0
+    ARP_RESPONDER = True
     
     def __init__(self):
         #
@@ -442,28 +517,40 @@ class GTPUd(object):
         self._prot_dict    = {1:'ICMP', 6:'TCP', 17:'UDP'}
         # initialize the list of modules that can act on GTP-U payloads
         self.MOD           = []
+        # and compile the forwarding decisions
+        self.compile()
         #
         # create two RAW PF_PACKET sockets on the `Internet` side (1 for IPv4, 1 for IPv6)
+        # sockets are non-blocking, to be drained by the listener after each select()
         self.sk_ext_v4     = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
-        self.sk_ext_v4.settimeout(0.001)
-        #self.sk_ext_v4.setblocking(0)
+        self.sk_ext_v4.setblocking(0)
         self.sk_ext_v4.bind((self.EXT_IF, 0x0800))
         set_promisc(self.sk_ext_v4, self.EXT_IF, 1)
+        if self.FANOUT_ID is not None:
+            set_fanout(self.sk_ext_v4, self.FANOUT_ID)
         #
         self.sk_ext_v6     = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, ntohs(0x86dd))
-        self.sk_ext_v6.settimeout(0.001)
-        #self.sk_ext_v6.setblocking(0)
+        self.sk_ext_v6.setblocking(0)
         self.sk_ext_v6.bind((self.EXT_IF, 0x86dd))
         set_promisc(self.sk_ext_v6, self.EXT_IF, 1)
+        if self.FANOUT_ID is not None:
+            set_fanout(self.sk_ext_v6, self.FANOUT_ID + 1)
         #
         # create an UDP socket on the RNC / eNB side
         sk_int, sk_int_ind, ind = [], {}, 0
         for gtpip in self.GTP_IF:
             sk = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sk.settimeout(0.001)
-            #sk.setblocking(0)
+            sk.setblocking(0)
             sk.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.SK_REUSEPORT:
+                set_reuseport(sk)
             sk.bind((gtpip, self.GTP_PORT))
+            if self.SK_REUSEPORT and self.SK_TEID_STEER > 1:
+                try:
+                    set_reuseport_teid(sk, self.SK_TEID_STEER)
+                except (OSError, IOError) as err:
+                    self._log('WNG', 'unable to steer GTP-U packets per TEID, '\
+                              'using the UDP flow hash: %s' % err)
             sk_int.append(sk)
             sk_int_ind[gtpip] = ind
             ind += 1
@@ -485,11 +572,13 @@ class GTPUd(object):
         self._log('INF', 'GTP-U tunnels handler started')
         #
         # and finally start ARP resolver
-        self.arpd = ARPd()
+        self.arpd = ARPd(responder=self.ARP_RESPONDER)
     
-    def _log(self, logtype='DBG', msg=''):
+    def _log(self, logtype='DBG', msg='', *args):
         # logtype: 'ERR', 'WNG', 'INF', 'DBG'
         if logtype in self.DEBUG:
+            if args:
+                msg = msg % args
             log('[%s] [GTPUd] %s' % (logtype, msg))
     
     def init_stats(self, ip):
@@ -524,61 +613,69 @@ class GTPUd(object):
                 self._log('ERR', 'socket error: %s' % err)
     
     def listen(self):
+        # preallocated reception buffer, packets are copied out of it only when
+        # they have to be forwarded
+        rbuf = memoryview(bytearray(self.BUFLEN))
         # select() until we receive something on 1 side
         while self._listening:
             r = select(self.sk_list, [], [], self.SELECT_TO)[0]
-            # read ext and int sockets until they are empty
+            # read ext and int sockets until they are empty, or BATCH_LEN packets
+            # have been read from each of them, then process the whole batch
+            ul, dl_v4, dl_v6 = [], [], []
             for sk in r:
                 #
                 if sk == self.sk_ext_v4:
                     # DL IPv4
-                    try:
-                        buf = sk.recvfrom(self.BUFLEN)[0]
-                    #except timeout:
-                    #    pass
-                    except Exception as err:
-                        self._log('ERR', 'sk_ext_v4 IF error (recvfrom): %s' % err)
-                    else:
-                        #self._log('DBG', 'sk_ext_v4, recvfrom()')
-                        if len(buf) >= 34 and buf[:6] == self.EXT_MAC_BUF \
-                        and buf[30:34] in self._mobiles_addr:
-                            # IPv4 of a mobile, transfer over GTP-U
-                            # after removing the Ethernet header
-                            self.transfer_v4_to_int(buf[14:])
-                            #threadit(self.transfer_v4_to_int, buf[14:])
+                    self._recv_ext(sk, rbuf, 34, 30, dl_v4)
                 #
                 elif sk == self.sk_ext_v6:
                     # DL IPv6
-                    try:
-                        buf = sk.recvfrom(self.BUFLEN)[0]
-                    #except timeout:
-                    #    pass
-                    except Exception as err:
-                        self._log('ERR', 'sk_ext_v6 IF error (recvfrom): %s' % err)
-                    else:
-                        #self._log('DBG', 'sk_ext_v6, recvfrom()')
-                        if len(buf) >= 54 and buf[:6] == self.EXT_MAC_BUF \
-                        and buf[46:54] in self._mobiles_addr:
-                            # IPv6 of a mobile, transfer over GTP-U
-                            # after removing the Ethernet header
-                            self.transfer_v6_to_int(buf[14:])
-                            #threadit(self.transfer_v6_to_int, buf[14:])
+                    self._recv_ext(sk, rbuf, 54, 46, dl_v6)
                 #
                 else:
                     #sk in self.sk_int
                     # UL, both IPv4 and IPv6 packets
-                    try:
-                        buf = sk.recv(self.BUFLEN)
-                    #except timeout:
-                    #    pass
-                    except Exception as err:
-                        self._log('ERR', 'sk_int IF error (recv): %s' % err)
-                    else:
-                        self.transfer_to_ext(buf)
-                        #threadit(self.transfer_to_ext, buf)
+                    self._recv_int(sk, rbuf, ul)
+            #
+            if (ul or dl_v4 or dl_v6) and self._get_cfg() != self._cfg:
+                self.compile()
+            if ul and time() >= self._ul_route_exp:
+                self._ul_route.clear()
+                self._ul_route_exp = time() + self.UL_ROUTE_TTL
+            for buf in ul:
+                self.transfer_to_ext(buf)
+            for buf in dl_v4:
+                self.transfer_v4_to_int(buf)
+            for buf in dl_v6:
+                self.transfer_v6_to_int(buf)
         #
         self._log('INF', 'GTPU handler stopped')
     
+    def _recv_ext(self, sk, rbuf, minlen, addroff, bufs):
+        # drain the external socket sk into bufs, keeping only IP packets 
+        # (without their Ethernet header) sent to one of our mobiles
+        for i in range(self.BATCH_LEN):
+            try:
+                l = sk.recv_into(rbuf)
+            except socket.error as err:
+                if err.errno not in (EAGAIN, EWOULDBLOCK):
+                    self._log('ERR', 'sk_ext IF error (recv_into): %s' % err)
+                return
+            if l >= minlen and rbuf[:6] == self.EXT_MAC_BUF \
+            and rbuf[addroff:minlen].tobytes() in self._mobiles_addr:
+                bufs.append(rbuf[14:l].tobytes())
+    
+    def _recv_int(self, sk, rbuf, bufs):
+        # drain the internal GTP-U socket sk into bufs
+        for i in range(self.BATCH_LEN):
+            try:
+                l = sk.recv_into(rbuf)
+            except socket.error as err:
+                if err.errno not in (EAGAIN, EWOULDBLOCK):
+                    self._log('ERR', 'sk_int IF error (recv_into): %s' % err)
+                return
+            bufs.append(rbuf[:l].tobytes())
+    
     def resolve_mac(self, ipdst):
         if len(ipdst) == 4:
             return self.arpd.resolve(inet_ntoa(ipdst))
@@ -586,6 +683,85 @@ class GTPUd(object):
             # TODO: implement a minimal IPv6 NDP service ?
             return self.arpd.ROUTER_MAC_BUF
     
+    #--------------------------------------------------------------------------#
+    # UL forwarding decisions
+    #--------------------------------------------------------------------------#
+    
+    def compile(self):
+        """compiles the uplink forwarding decisions and the modules' chains
+        
+        It is called automatically by the listener each time the DPI, MOD, 
+        BLACKHOLING or whitelist configuration changes.
+        """
+        self._cfg = self._get_cfg()
+        # UL forwarding decision cache
+        # key: IP dest address (4 or 16 bytes)
+        # value: 2-tuple (MAC dest address, forwarding decision)
+        # with the forwarding decision being True (forward), False (drop) 
+        # or None (forward only if whitelisted)
+        self._ul_route = {}
+        self._ul_route_exp = time() + self.UL_ROUTE_TTL
+        # whitelist, as a set of (IP protocol, port)
+        prot_num = dict([(v, k) for k, v in self._prot_dict.items()])
+        self._wl = set([(prot_num[prot], port) for prot, port in self.WL_PORTS \
+                        if prot in prot_num])
+        # modules' chains
+        self._mod_ul = self._compile_mod('handle_ul')
+        self._mod_dl = self._compile_mod('handle_dl')
+    
+    def _get_cfg(self):
+        return (self.DPI, self.BLACKHOLING, self.WL_ACTIVE, tuple(self.WL_PORTS), tuple(self.MOD))
+    
+    def _compile_mod(self, meth):
+        # flattens the modules handlers for a given direction into a single 
+        # callable, or None if no module is loaded
+        if not self.MOD:
+            return None
+        hdl_act = [(mod.TYPE == 0, getattr(mod, meth)) for mod in self.MOD]
+        #
+        def handle(ipbuf):
+            try:
+                for act, hdl in hdl_act:
+                    if act:
+                        ipbuf = hdl(ipbuf)
+                    else:
+                        hdl(ipbuf)
+            except Exception as err:
+                self._log('ERR', 'MOD error: %s' % err)
+            return ipbuf
+        #
+        return handle
+    
+    def _route_ul(self, ipdst):
+        # resolves the dest MAC addr and applies blackholing
+        macdst = self.resolve_mac(ipdst)
+        if not self.BLACKHOLING:
+            fwd = True
+        elif macdst != self.arpd.ROUTER_MAC_BUF:
+            fwd = not self.BLACKHOLING & BLACKHOLE_LAN
+        else:
+            fwd = not self.BLACKHOLING & BLACKHOLE_WAN
+        if not fwd and self.WL_ACTIVE:
+            fwd = None
+        # cache the decision only when the MAC address is stable
+        # (i.e. not a failed local ARP resolution)
+        if macdst != 6*b'\xFF':
+            if len(self._ul_route) >= self.UL_ROUTE_MAX:
+                self._ul_route.clear()
+            self._ul_route[ipdst] = (macdst, fwd)
+        return macdst, fwd
+    
+    def _wl_match(self, ipvers, ipbuf):
+        # returns True if the IP packet is UDP / TCP to a whitelisted port
+        try:
+            if ipvers == 4:
+                prot, pay = ord(ipbuf[9:10]), ipbuf[4*(ord(ipbuf[0:1]) & 0xf):]
+            else:
+                prot, pay = ord(ipbuf[6:7]), ipbuf[40:]
+            return prot in (6, 17) and (prot, unpack('>H', pay[2:4])[0]) in self._wl
+        except Exception:
+            return False
+    
     #--------------------------------------------------------------------------#
     # UL transfer
     #--------------------------------------------------------------------------#
@@ -593,25 +769,29 @@ class GTPUd(object):
     def transfer_to_ext(self, buf):
         try:
             # extract the GTP header
-            flags, msgtype, msglen, teid_ul = unpack('>BBHI', buf[:8])
+            hdr, err = decode_GTPU_hdr(buf)
+            if err:
+                self._log('WNG', 'invalid GTP header from RAN, dropping it')
+                return
+            msgtype, teid_ul = hdr[0], hdr[1]
             ran_info, teid_dl, ipv4buf, ipv6buf, ctx_num = self._mobiles_teid[teid_ul]
             if msgtype != 0xff:
                 # TODO: handle GTP ECHO
-                self._log('WNG', 'unsupported GTP type from RAN: 0x%.2x' % msgtype)
+                self._log('WNG', 'unsupported GTP type from RAN: 0x%.2x', msgtype)
                 return
-            # get the IP packet: use the length in the GTP header to cut the buffer
-            if flags & 0b111:
-                # GTP header extended
-                msglen -= 4
-            ipbuf = buf[-msglen:]
+            # get the IP packet, after the optional header and extension headers
+            # (e.g. PDU Session Container over N3)
+            ipbuf = buf[hdr[5]:hdr[6]]
             # get the IP version
             ipvers = ord(ipbuf[0:1])>>4
             if ipvers == 4:
                 ipsrc = ipbuf[12:16]
                 ipdst = ipbuf[16:20]
+                spoof = ipsrc != ipv4buf
             elif ipvers == 6:
                 ipsrc = ipbuf[8:24]
                 ipdst = ipbuf[24:40]
+                spoof = ipsrc[8:] != ipv6buf
             else:
                 self._log('WNG', 'invalid IP packet from UE, dropping it')
                 return
@@ -619,88 +799,26 @@ class GTPUd(object):
             self._log('WNG', 'invalid GTP / IP packet from RAN / UE, dropping it')
             return
         #
-        if ipvers == 4:
-            if self.DROP_SPOOF and ipsrc != ipv4buf:
-                self._log('WNG', 'spoofed IPv4 src addr, teid_ul 0x%.8x' % teid_ul)
-                return
-            if self.DPI:
+        if spoof and self.DROP_SPOOF:
+            self._log('WNG', 'spoofed IPv%i src addr, teid_ul 0x%.8x', ipvers, teid_ul)
+            return
+        if self.DPI:
+            if ipvers == 4:
                 self._analyze(ipvers, inet_ntoa(ipsrc), ipbuf)
-            if self.MOD:
-                try:
-                    for mod in self.MOD:
-                        if mod.TYPE == 0:
-                            ipbuf = mod.handle_ul(ipbuf)
-                        else:
-                            mod.handle_ul(ipbuf)
-                except Exception as err:
-                    self._log('ERR', 'MOD error: %s' % err)
-            # resolve the dest MAC addr
-            macdst = self.resolve_mac(ipdst)
-            # apply blackholing
-            if self.BLACKHOLING:
-                if macdst != self.arpd.ROUTER_MAC_BUF:
-                    if self.BLACKHOLING & BLACKHOLE_LAN:
-                        drop = True
-                    else:
-                        drop = False
-                else:
-                    if self.BLACKHOLING & BLACKHOLE_WAN:
-                        drop = True
-                    else:
-                        drop = False
-                if drop and self.WL_ACTIVE:
-                    ipdst, prot, pay = DPIv4.get_ip_info(ipbuf)
-                    if prot in (6, 17) and pay:
-                        # UDP / TCP
-                        port = DPIv4.get_port(pay)
-                        if (self._prot_dict[prot], port) in self.WL_PORTS:
-                            self._transfer_v4_to_ext(macdst, ipbuf)
-                        else:
-                            return
             else:
-                self._transfer_v4_to_ext(macdst, ipbuf)
-        #
-        else:
-            #ipvers == 6
-            if self.DROP_SPOOF and ipsrc[8:] != ipv6buf:
-                self._log('WNG', 'spoofed IPv6 src addr, teid_ul 0x%.8x' % teid_ul)
-                return
-            if self.DPI:
                 self._analyze(ipvers, inet_ntop(AF_INET6, ipsrc), ipbuf)
-            if self.MOD:
-                try:
-                    for mod in self.MOD:
-                        if mod.TYPE == 0:
-                            ipbuf = mod.handle_ul(ipbuf)
-                        else:
-                            mod.handle_ul(ipbuf)
-                except Exception as err:
-                    self._log('ERR', 'MOD error: %s' % err)
-            # resolve the dest MAC addr
-            macdst = self.resolve_mac(ipdst)
-            # apply blackholing
-            if self.BLACKHOLING:
-                if macdst != self.arpd.ROUTER_MAC_BUF:
-                    if self.BLACKHOLING & BLACKHOLE_LAN:
-                        drop = True
-                    else:
-                        drop = False
-                else:
-                    if self.BLACKHOLING & BLACKHOLE_WAN:
-                        drop = True
-                    else:
-                        drop = False
-                if drop and self.WL_ACTIVE:
-                    ipdst, prot, pay = DPIv6.get_ip_info(ipbuf)
-                    if prot in (6, 17) and pay:
-                        # UDP / TCP
-                        port = DPIv6.get_port(pay)
-                        if (self._prot_dict[prot], port) in self.WL_PORTS:
-                            self._transfer_v6_to_ext(macdst, ipbuf)
-                        else:
-                            return
+        if self._mod_ul is not None:
+            ipbuf = self._mod_ul(ipbuf)
+        #
+        try:
+            macdst, fwd = self._ul_route[ipdst]
+        except KeyError:
+            macdst, fwd = self._route_ul(ipdst)
+        if fwd or (fwd is None and self._wl_match(ipvers, ipbuf)):
+            if ipvers == 4:
+                self._transfer_v4_to_ext(macdst, ipbuf)
             else:
-                self._transfer_v6_to_ext_v6(macdst, ipbuf)
+                self._transfer_v6_to_ext(macdst, ipbuf)
     
     def _transfer_v4_to_ext(self, macdst, ipbuf):
         # forward to the external PF_PACKET socket, over the Gi interface
@@ -762,57 +880,43 @@ class GTPUd(object):
         #self._log('DBG', 'transfer_v4_to_int()')
         # buf length is guaranteed >= 20 and ipdst in self._mobiles_addr
         #
-        if self.MOD:
+        if self._mod_dl is not None:
             # possibly process the DL GTP-U payload within modules
-            try:
-                for mod in self.MOD:
-                    if mod.TYPE == 0:
-                        buf = mod.handle_dl(buf)
-                    else:
-                        mod.handle_dl(buf)
-            except Exception as err:
-                self._log('ERR', 'MOD error: %s' % err)        
+            buf = self._mod_dl(buf)
         #
         teid_ul = self._mobiles_addr[buf[16:20]]
         ran_info, teid_dl = self._mobiles_teid[teid_ul][:2]
         #
         # prepend GTP header and forward to the RAN IP
         if ran_info and teid_dl is not None:
-            gtphdr = pack('>BBHI', 0x30, 0xff, len(buf), teid_dl)
+            gtphdr = encode_GTPU_hdr(teid_dl, len(buf))
             try:
                 ret = ran_info[2].sendto(gtphdr + buf, (ran_info[1], self.GTP_PORT))
             except Exception as err:
                 self._log('ERR', 'sk_int IF error (sendto): %s' % err)
         else:
-            self._log('WNG', 'teid_ul 0x%.8x, downlink GTP parameters not set' % teid_ul)
+            self._log('WNG', 'teid_ul 0x%.8x, downlink GTP parameters not set', teid_ul)
     
     def transfer_v6_to_int(self, buf):
         #self._log('DBG', 'transfer_v6_to_int()')
         # buf length is guaranteed >= 40 and ipdst in self._mobiles_addr
         #
-        if self.MOD:
+        if self._mod_dl is not None:
             # possibly process the DL GTP-U payload within modules
-            try:
-                for mod in self.MOD:
-                    if mod.TYPE == 0:
-                        buf = mod.handle_dl(buf)
-                    else:
-                        mod.handle_dl(buf)
-            except Exception as err:
-                self._log('ERR', 'MOD error: %s' % err)        
+            buf = self._mod_dl(buf)
         #
         teid_ul = self._mobiles_addr[buf[32:40]]
         ran_info, teid_dl = self._mobiles_teid[teid_ul][:2]
         #
         # prepend GTP header and forward to the RAN IP
         if ran_info and teid_dl is not None:
-            gtphdr = pack('>BBHI', 0x30, 0xff, len(buf), teid_dl)
+            gtphdr = encode_GTPU_hdr(teid_dl, len(buf))
             try:
                 ret = ran_info[2].sendto(gtphdr + buf, (ran_info[1], self.GTP_PORT))
             except Exception as err:
                 self._log('ERR', 'sk_int IF error (sendto): %s' % err)
         else:
-            self._log('WNG', 'teid_ul 0x%.8x, downlink GTP parameters not set' % teid_ul)
+            self._log('WNG', 'teid_ul 0x%.8x, downlink GTP parameters not set', teid_ul)
     
     #--------------------------------------------------------------------------#
     # UE management
@@ -874,8 +978,8 @@ class GTPUd(object):
             if ipv6buf:
                 self._mobiles_addr[ipv6buf] = teid_ul
         #
-        self._log('INF', 'setting GTP-U context for UE with IP %r, teid_ul 0x%.8x'\
-                  % (mobile_addr, teid_ul))
+        self._log('INF', 'setting GTP-U context for UE with IP %r, teid_ul 0x%.8x',
+                  mobile_addr, teid_ul)
     
     def set_mobile_dl(self, teid_ul, ran_ip=None, teid_dl=None):
         # enables to reconfigure the DL parameters (RAN IP, DL TEID)
@@ -931,8 +1035,199 @@ class GTPUd(object):
                     ipaddr = 'IPv4 ' + ipv4addr
                 else:
                     ipaddr = 'IPv6 ' + ipv6addr
-                self._log('DBG', 'deleting GTP-U context for UE with addr %s, teid_ul 0x%.8x'\
-                          % (ipaddr, teid_ul))
+                self._log('DBG', 'deleting GTP-U context for UE with addr %s, teid_ul 0x%.8x',
+                          ipaddr, teid_ul)
+
+
+def _gtpud_shard(cla, conn):
+    # worker process main loop: runs a GTPUd instance and applies the method
+    # calls received over conn
+    # the readiness of the shard is reported first: None, or the init error
+    try:
+        gtpud = cla()
+    except Exception as err:
+        conn.send('%s' % err)
+        return
+    conn.send(None)
+    while True:
+        meth, args = conn.recv()
+        if meth == 'get_stats':
+            conn.send(gtpud.stats)
+            continue
+        elif meth == 'set_cfg':
+            # configuration attribute, taken into account by the listener
+            name, val = args
+            if name == 'MOD':
+                for mod in val:
+                    mod.GTPUd = gtpud
+                val = list(val)
+            setattr(gtpud, name, val)
+            conn.send(None)
+            continue
+        try:
+            ret = getattr(gtpud, meth)(*args)
+        except Exception as err:
+            gtpud._log('ERR', 'shard error on %s: %s' % (meth, err))
+            ret = None
+        conn.send(ret)
+        if meth == 'stop':
+            break
+
+
+class GTPUdShards(object):
+    '''
+    sharded GTP-U forwarder
+    runs SHARDS GTPUd instances, each within its own worker process, to scale
+    the user-plane forwarding with the number of CPU cores.
+    
+    The GTP-U UDP sockets of all shards are bound to the same addresses with
+    SO_REUSEPORT, and a BPF program steers uplink packets between shards 
+    according to their GTP-U TEID, hence the traffic from a single RAN node is
+    spread over all shards (the kernel falls back to the UDP flow hash if the
+    BPF program cannot be attached). The Gi PF_PACKET sockets of all shards are 
+    within the same fanout group: the kernel load-balances downlink packets 
+    between shards according to their flow hash.
+    
+    As any shard can receive a packet for any mobile, the UE management methods
+    .add_mobile(), .set_mobile_dl() and .rem_mobile() are broadcasted to all 
+    shards, and return once all of them have applied the change.
+    
+    The GTPUd class run by each shard is set in the class attribute GTPUD, and
+    configured with its own class attributes. Only the 1st shard answers ARP
+    requests for the mobiles.
+    The DPI, BLACKHOLING, WL_ACTIVE, WL_PORTS and MOD attributes can be changed
+    at runtime, like with a GTPUd instance: they are forwarded to all shards. 
+    MOD must then be set with a new list of modules defined at the top-level
+    of a module (so that they can be passed to the shards).
+    Traffic statistics of all shards are collected with .get_stats().
+    
+    A CorenetErr is raised when a shard fails to start.
+    '''
+    #
+    # verbosity level: list of log types to display when calling 
+    # self._log(logtype, msg)
+    DEBUG   = ('ERR', 'WNG', 'INF', 'DBG')
+    #
+    # GTPUd class run by each shard
+    GTPUD   = GTPUd
+    #
+    # number of shards, default to the number of CPU cores
+    SHARDS  = multiprocessing.cpu_count()
+    #
+    # GTPUd configuration attributes, forwarded to all shards when set
+    _CFG    = ('DPI', 'BLACKHOLING', 'WL_ACTIVE', 'WL_PORTS', 'MOD')
+    
+    def _cfg_attr(name):
+        def get_cfg(self):
+            return self._cfg[name]
+        def set_cfg(self, val):
+            self._broadcast('set_cfg', name, val)
+            self._cfg[name] = val
+        return property(get_cfg, set_cfg)
+    
+    DPI         = _cfg_attr('DPI')
+    BLACKHOLING = _cfg_attr('BLACKHOLING')
+    WL_ACTIVE   = _cfg_attr('WL_ACTIVE')
+    WL_PORTS    = _cfg_attr('WL_PORTS')
+    MOD         = _cfg_attr('MOD')
+    del _cfg_attr
+    
+    def __init__(self):
+        if SO_REUSEPORT is None:
+            raise(CorenetErr('GTP-U tunnels handler requires SO_REUSEPORT for sharding'))
+        # fanout group id, must be unique on the host
+        fanout_id = os.getpid() & 0xfffe
+        nshards   = max(1, self.SHARDS)
+        # 1 shard is made of a worker process and a pipe to control it
+        self._shards = []
+        self._lock   = Lock()
+        try:
+            mp = multiprocessing.get_context('fork')
+        except AttributeError:
+            # Python2
+            mp = multiprocessing
+        for i in range(nshards):
+            cla = type('%s_%i' % (self.GTPUD.__name__, i), (self.GTPUD, ), {
+                'FANOUT_ID'    : fanout_id,
+                'SK_REUSEPORT' : True,
+                'SK_TEID_STEER': nshards,
+                'ARP_RESPONDER': i == 0})
+            conn, conn_shard = mp.Pipe()
+            proc = mp.Process(target=_gtpud_shard, args=(cla, conn_shard))
+            proc.daemon = True
+            proc.start()
+            # only the worker keeps its end open, to get EOFError if it exits
+            conn_shard.close()
+            self._shards.append( (proc, conn) )
+        #
+        # wait for all shards to be ready
+        errs, ready = [], []
+        for i, (proc, conn) in enumerate(self._shards):
+            try:
+                err = conn.recv()
+            except EOFError:
+                err = 'worker process exited'
+            if err is None:
+                ready.append( (proc, conn) )
+            else:
+                errs.append('shard %i: %s' % (i, err))
+                proc.join()
+                conn.close()
+        if errs:
+            self._shards = ready
+            self.stop()
+            raise(CorenetErr('GTP-U tunnels handler failed to start, %s' % ', '.join(errs)))
+        #
+        # runtime configuration, MOD being set per GTPUd instance
+        self._cfg = dict([(name, getattr(self.GTPUD, name)) for name in self._CFG[:-1]])
+        self._cfg['MOD'] = []
+        self._log('INF', 'GTP-U tunnels handler started with %i shards' % len(self._shards))
+    
+    def _log(self, logtype='DBG', msg='', *args):
+        # logtype: 'ERR', 'WNG', 'INF', 'DBG'
+        if logtype in self.DEBUG:
+            if args:
+                msg = msg % args
+            log('[%s] [GTPUdShards] %s' % (logtype, msg))
+    
+    def _broadcast(self, meth, *args):
+        # calls the GTPUd method meth with args in all shards, 
+        # and returns the list of results
+        with self._lock:
+            for proc, conn in self._shards:
+                conn.send( (meth, args) )
+            return [conn.recv() for proc, conn in self._shards]
+    
+    def add_mobile(self, teid_ul, mobile_addr, ran_ip, teid_dl):
+        self._broadcast('add_mobile', teid_ul, mobile_addr, ran_ip, teid_dl)
+    
+    def set_mobile_dl(self, teid_ul, ran_ip=None, teid_dl=None):
+        self._broadcast('set_mobile_dl', teid_ul, ran_ip, teid_dl)
+    
+    def rem_mobile(self, teid_ul):
+        self._broadcast('rem_mobile', teid_ul)
+    
+    def get_stats(self):
+        """returns the traffic statistics of all shards merged together
+        """
+        stats = {}
+        for shard_stats in self._broadcast('get_stats'):
+            for ip, ip_stats in shard_stats.items():
+                if ip not in stats:
+                    stats[ip] = ip_stats
+                else:
+                    for k, v in ip_stats.items():
+                        stats[ip][k].update(v)
+        return stats
+    
+    def stop(self):
+        if self._shards:
+            self._broadcast('stop')
+            for proc, conn in self._shards:
+                proc.join()
+                conn.close()
+            self._shards = []
+            self._log('INF', 'GTP-U tunnels handler stopped')
 
 
 class _DPI(object):
@@ -944,7 +1239,7 @@ class _DPI(object):
         return unpack('!H', pay[2:4])[0]
     
     @staticmethod
-    def __get_dn_req(req):
+    def get_dn_req(req):
         """return the DNS name requested
         """
         # remove fixed DNS header and Type / Class
@@ -960,7 +1255,7 @@ class _DPI(object):
 class DPIv4(_DPI):
     
     @staticmethod
-    def __get_ip_info(ipbuf):
+    def get_ip_info(ipbuf):
         """return a 3-tuple: ipdst (asc), protocol (uint), payload (bytes)
         """
         # returns a 3-tuple: dst IP, protocol, payload buffer
@@ -977,7 +1272,7 @@ class DPIv4(_DPI):
 class DPIv6(_DPI):
     
     @staticmethod
-    def __get_ip_info(ipbuf):
+    def get_ip_info(ipbuf):
         """return a 3-tuple: ipdst (asc), protocol (uint), payload (bytes)
         """
         # returns a 3-tuple: dst IP, protocol, payload buffer
@@ -1007,8 +1302,8 @@ class MOD(object):
     GTPUd = None
     
     @classmethod
-    def _log(self, logtype, msg):
-        self.GTPUd._log(logtype, '[MOD.%s] %s' % (self.__class__.__name__, msg))
+    def _log(self, logtype, msg, *args):
+        self.GTPUd._log(logtype, '[MOD.%s] %s' % (self.__class__.__name__, msg), *args)
     
     @classmethod
     def handle_ul(self, ippuf):
@@ -79,9 +79,11 @@ class SMSd(object):
         self._forward_t  = threadit(self.forward)
         self._log('INF', 'SMS relay started')
     
-    def _log(self, logtype='DBG', msg=''):
+    def _log(self, logtype='DBG', msg='', *args):
         # logtype: 'ERR', 'WNG', 'INF', 'DBG'
         if logtype in self.DEBUG:
+            if args:
+                msg = msg % args
             log('[%s] [SMSd] %s' % (logtype, msg))
     
     def stop(self):
@@ -208,7 +210,7 @@ class SMSd(object):
             # delete the RP procedure
             del rp_procs[ref]
             if rp_msg_name == 'RP-ACK':
-                self._log('DBG', 'process_rp_ack_err: procedure ref (%s, %i) completed' % (num, ref))
+                self._log('DBG', 'process_rp_ack_err: procedure ref (%s, %i) completed', num, ref)
             else:
                 self.Err[num]['RP'].append(rp_req)
                 self._log('INF', 'process_rp_ack_err: procedure ref (%s, %i) in error with cause %r'\
@@ -235,10 +237,10 @@ class SMSd(object):
                     del self.Proc[tp_oa]['TP'][tp_ref]
                     tp_stat = self._create_tp_stat_rep(tp_req, tp_oa, atime, stat)
                     self._inject_tp(tp_stat, tp_oa)
-                    self._log('DBG', 'report_status: delete TP procedure (%s, %i)' % (tp_oa, tp_ref))
+                    self._log('DBG', 'report_status: delete TP procedure (%s, %i)', tp_oa, tp_ref)
                     return
             # no status report was requested, hence we just pass our way
-            self._log('DBG', 'report_status: no SMS SUBMIT requiring status report for %s' % tp_oa)
+            self._log('DBG', 'report_status: no SMS SUBMIT requiring status report for %s', tp_oa)
     
     def _insert_tp(self, tp_msg, num):
         """put the tp_msg within the forwarding queue,
@@ -405,7 +407,7 @@ class SMSd(object):
                                      'RPOriginatorAddress': self.RP_OA})
         rp_msg.set_tpdu(tp_msg)
         self.Proc[num]['RP'][ref] = (rp_msg, tp_ref)
-        self._log('DBG', 'sending TP msg with RP ref %i' % ref)
+        self._log('DBG', 'sending TP msg with RP ref %i', ref)
         self.send_rp(rp_msg, num)
     
     def send_rp(self, rp_msg, num):
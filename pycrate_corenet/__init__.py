@@ -27,7 +27,7 @@
 # *--------------------------------------------------------
 #*/
 
-__all__ = ['utils', 'Server', 'ServerAuC', 'ServerGTPU',
+__all__ = ['utils', 'utils_proc', 'Server', 'ServerAuC', 'ServerAuCDB', 'ServerGTPU', 'LoadGen',
            'HdlrENB', 'HdlrHNB',
            'HdlrUE', 'HdlrUEIu', 'HdlrUEIuCS', 'HdlrUEIuPS', 'HdlrUES1', 'HdlrUESMS',
            'ProcProto', 'ProcCNHnbap', 'ProcCNRua', 'ProcCNRanap', 'ProcCNS1ap',
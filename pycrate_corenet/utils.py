@@ -29,16 +29,21 @@
 #*/
 
 # Python built-ins libraries required
+import os
 import sys
 import socket
 import random
 import re
+import json
+import atexit
 #import traceback
 from select    import select
 from threading import Thread, Lock, Event
 from random    import SystemRandom, randint
 from time      import time, sleep
 from datetime  import datetime
+from collections import deque
+from itertools import count as _count
 from socket    import AF_INET, AF_INET6, AF_PACKET, ntohl, htonl, ntohs, htons
 
 # SCTP support for NGAP / S1AP / HNBAP / RUA interfaces
@@ -66,6 +71,7 @@ Element._SAFE_STAT = True
 Element._SAFE_DYN  = True
 
 from pycrate_corenet.utils_fmt  import *
+from pycrate_corenet.utils_proc import *
 from pycrate_corenet.ProcProto  import SigStack, SigProc
 
 log('pycrate_corenet: loading all ASN.1 and NAS modules, be patient...')
@@ -342,17 +348,153 @@ TRACE_COLOR_START = '\x1b[94m'
 TRACE_COLOR_END = '\x1b[0m'
 
 # logging facility
+#
+# when LOG_ASYNC is enabled, log() only queues the message with its timestamp:
+# the _LogWriter thread formats queued messages and writes them in batch every
+# LOG_PERIOD seconds, keeping log files opened ; pending messages are written
+# when the Python interpreter exits, or when calling log_flush()
+# otherwise, each message is written synchronously
+LOG_ASYNC  = True
+LOG_PERIOD = 0.05
+# maximum number of queued messages: when the writer thread does not keep up,
+# oldest messages are dropped and the number of dropped messages is logged
+LOG_QUEUE_MAX = 1000000
+# format of log files: 'txt', or 'json' for one JSON object per line, with
+# time (float), level (when the message starts with a [XXX] tag) and msg
+LOG_FMT    = 'txt'
+
+_LOG_LVL_RE = re.compile(r'^\[([A-Z]{3})\] ')
+
+
+def _log_fmt_date(t, _cache=[None, '']):
+    # the date string is formatted once per second
+    sec = int(t)
+    if sec != _cache[0]:
+        _cache[0], _cache[1] = sec, datetime.fromtimestamp(sec).strftime('%Y-%m-%d %H:%M:%S')
+    return '%s.%03i' % (_cache[1], int(1000*(t-sec)))
+
+
+def _log_fmt(t, msg, withdate):
+    if LOG_FMT == 'json':
+        m = _LOG_LVL_RE.match(msg)
+        if m:
+            return json.dumps({'time': t, 'level': m.group(1), 'msg': msg[6:]}) + '\n'
+        else:
+            return json.dumps({'time': t, 'msg': msg}) + '\n'
+    elif withdate:
+        return '[%s] %s\n' % (_log_fmt_date(t), msg)
+    else:
+        return msg + '\n'
+
+
+class _LogWriter(Thread):
+    """thread writing queued log messages in batch
+    """
+    
+    def __init__(self):
+        Thread.__init__(self, name='corenet_log')
+        self.daemon = True
+        # queued messages: (time, msg, withdate, tostdio, tofile)
+        self._queue = deque(maxlen=LOG_QUEUE_MAX)
+        self._lock  = Lock()
+        # opened log files
+        self._fds   = {}
+        # dropped messages counter, incremented by log() without locking:
+        # next() on itertools.count is atomic
+        self._drop_cnt  = _count()
+        self._drop_last = -1
+        self.dropped    = 0
+    
+    def run(self):
+        while True:
+            sleep(LOG_PERIOD)
+            self.flush()
+    
+    def flush(self):
+        queue, fds, bufs = self._queue, self._fds, {}
+        with self._lock:
+            # only write messages queued before the flush started, so that
+            # a thread logging continuously cannot hold the writer forever
+            for i in range(len(queue)):
+                t, msg, withdate, tostdio, tofile = queue.popleft()
+                if tostdio:
+                    print('[%s] %s' % (_log_fmt_date(t), msg) if withdate else msg)
+                if tofile:
+                    if tofile in bufs:
+                        bufs[tofile].append(_log_fmt(t, msg, withdate))
+                    else:
+                        bufs[tofile] = [_log_fmt(t, msg, withdate)]
+            drop_cnt = next(self._drop_cnt)
+            dropped, self._drop_last = drop_cnt - self._drop_last - 1, drop_cnt
+            if dropped:
+                self.dropped += dropped
+                msg = '[WNG] log queue full, %i messages dropped' % dropped
+                print(msg)
+                for buf in bufs.values():
+                    buf.append(_log_fmt(time(), msg, True))
+            for tofile, buf in bufs.items():
+                try:
+                    if tofile not in fds:
+                        fds[tofile] = open(tofile, 'a')
+                    fds[tofile].write(''.join(buf))
+                    fds[tofile].flush()
+                except (IOError, OSError) as err:
+                    print('[ERR] unable to write log file %s: %s' % (tofile, err))
+
+
+# the writer thread is started by the first log() call with LOG_ASYNC enabled
+_LogW     = None
+_LogWLock = Lock()
+
+def _log_start():
+    global _LogW
+    with _LogWLock:
+        if _LogW is None:
+            LogW = _LogWriter()
+            LogW.start()
+            _LogW = LogW
+    return _LogW
+
+def _log_reset():
+    global _LogW, _LogWLock
+    _LogW, _LogWLock = None, Lock()
+
+if hasattr(os, 'register_at_fork'):
+    # the writer thread does not exist in forked processes, and the lock may
+    # have been held by another thread when forking
+    os.register_at_fork(after_in_child=_log_reset)
+
+
 def log(msg='', withdate=True, tostdio=False, tofile='/tmp/corenet.log'):
-    if withdate:
-        msg = '[%s] %s\n' % (datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3], msg)
+    if LOG_ASYNC:
+        LogW = _LogW
+        if LogW is None:
+            LogW = _log_start()
+        queue = LogW._queue
+        if len(queue) == queue.maxlen:
+            # the oldest message is going to be dropped
+            next(LogW._drop_cnt)
+        queue.append( (time(), msg, withdate, tostdio, tofile) )
     else:
-        msg = msg + '\n'
-    if tostdio:
-        print(msg[:-1])
-    if tofile:
-        fd = open(tofile, 'a')
-        fd.write(msg)
-        fd.close()
+        if _LogW is not None:
+            # keep messages ordered
+            _LogW.flush()
+        t = time()
+        if tostdio:
+            print('[%s] %s' % (_log_fmt_date(t), msg) if withdate else msg)
+        if tofile:
+            fd = open(tofile, 'a')
+            fd.write(_log_fmt(t, msg, withdate))
+            fd.close()
+
+
+def log_flush():
+    """write all queued log messages
+    """
+    if _LogW is not None:
+        _LogW.flush()
+
+atexit.register(log_flush)
 
 
 #------------------------------------------------------------------------------#
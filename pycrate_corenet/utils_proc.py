@@ -0,0 +1,263 @@
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.4
+# *
+# * Copyright 2026. Benoit Michau. P1Sec.
+# *
+# * This library is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU Lesser General Public
+# * License as published by the Free Software Foundation; either
+# * version 2.1 of the License, or (at your option) any later version.
+# *
+# * This library is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# * Lesser General Public License for more details.
+# *
+# * You should have received a copy of the GNU Lesser General Public
+# * License along with this library; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, 
+# * MA 02110-1301  USA
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_corenet/utils_proc.py
+# * Created : 2026-10-19
+# * Authors : Benoit Michau 
+# *--------------------------------------------------------
+#*/
+
+# this module only depends on the Python standard library, so that procedures
+# timers and metrics can be used without pysctp and CryptoMobile
+
+import os
+from threading import Lock
+from time      import time
+from bisect    import bisect_left
+
+
+__all__ = ['TimerWheel', 'CorenetMetrics']
+
+
+#------------------------------------------------------------------------------#
+# procedures timers
+#------------------------------------------------------------------------------#
+
+class TimerWheel(object):
+    """hashed timing wheel, to schedule timeouts with O(1) arming and cancelling
+    
+    Each timeout is identified by a key (e.g. a signalling procedure), and has 
+    an expiry time and a callback. The wheel has `num' slots of `res' seconds;
+    timeouts further than a complete turn of the wheel stay in their slot until
+    their turn comes.
+    
+    expire() must be called periodically (e.g. every `res' seconds): it removes
+    and returns the callbacks of all timeouts expired.
+    """
+    
+    def __init__(self, res=0.5, num=1024):
+        self.RES    = float(res)
+        self._slots = [dict() for i in range(num)]
+        # key -> slot
+        self._keys  = {}
+        # last tick processed
+        self._tick  = int(time() / self.RES)
+        self._lock  = Lock()
+    
+    def __len__(self):
+        return len(self._keys)
+    
+    def __contains__(self, key):
+        return key in self._keys
+    
+    def arm(self, key, exp, cb):
+        """arms (or re-arms) the timeout `key' to expire at time `exp', calling `cb'
+        """
+        tick = -int(-exp // self.RES)
+        with self._lock:
+            slot = self._keys.pop(key, None)
+            if slot is not None:
+                del slot[key]
+            tick = max(tick, self._tick + 1)
+            slot = self._slots[tick % len(self._slots)]
+            slot[key] = (tick, cb)
+            self._keys[key] = slot
+    
+    def cancel(self, key):
+        """cancels the timeout `key', if armed
+        """
+        with self._lock:
+            slot = self._keys.pop(key, None)
+            if slot is not None:
+                del slot[key]
+    
+    def expire(self, now=None):
+        """removes the timeouts expired at time `now' (default to the current time),
+        and returns the list of their callbacks
+        """
+        if now is None:
+            now = time()
+        tick, num, cbs = int(now / self.RES), len(self._slots), []
+        with self._lock:
+            # go over each slot at most once
+            for t in range(self._tick + 1, min(tick, self._tick + num) + 1):
+                slot = self._slots[t % num]
+                if slot:
+                    for key, (kt, cb) in tuple(slot.items()):
+                        if kt <= tick:
+                            del slot[key], self._keys[key]
+                            cbs.append(cb)
+            self._tick = max(self._tick, tick)
+        return cbs
+
+
+#------------------------------------------------------------------------------#
+# metrics facilities
+#------------------------------------------------------------------------------#
+
+class CorenetMetrics(object):
+    """counters, gauges and latency histograms of the CorenetServer
+    
+    Each metric is identified by its name and a tuple of labels values, whose
+    names are given in LABELS. All metrics are exported by text(), in the 
+    Prometheus text format.
+    
+    Collectors (callables, taking the CorenetMetrics instance as argument) can
+    be added into .Collectors, to set gauges just before exporting metrics.
+    
+    Per-UE metrics (labelled with the UE IMSI) are only set when PER_UE is
+    enabled, as their number of labels values grows with the number of UEs.
+    """
+    
+    # upper bounds of the latency histograms buckets, in seconds
+    BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+               0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    # labels names of the metrics set by the CorenetServer and its procedures
+    LABELS = {
+        'corenet_proc_total'        : ('proc', ),
+        'corenet_proc_inflight'     : ('proc', ),
+        'corenet_proc_timeout_total': ('proc', ),
+        'corenet_proc_seconds'      : ('proc', ),
+        'corenet_asn_seconds'       : ('proto', 'dir'),
+        'corenet_pdu_seconds'       : ('proto', 'pdu', 'type'),
+        'corenet_pdu_err_total'     : ('proto', ),
+        'corenet_ran_ue'            : ('ran', ),
+        'corenet_ran_proc'          : ('ran', ),
+        'corenet_ue_proc_inflight'  : ('ue', ),
+        }
+    
+    # enable per-UE metrics
+    PER_UE = False
+    
+    def __init__(self):
+        self._lock = Lock()
+        # (name, labels) -> value, or list of buckets counts, sum and count for histograms
+        self._val  = {}
+        # name -> 'counter', 'gauge' or 'histogram'
+        self._type = {}
+        self.Collectors = []
+    
+    def reset(self):
+        with self._lock:
+            self._val.clear()
+            self._type.clear()
+    
+    def incr(self, name, labels=(), val=1):
+        """increment the counter `name' with `labels' by `val'
+        """
+        key = (name, labels)
+        with self._lock:
+            try:
+                self._val[key] += val
+            except KeyError:
+                self._val[key], self._type[name] = val, 'counter'
+    
+    def add(self, name, labels=(), val=1, rem=False):
+        """add `val' (possibly negative) to the gauge `name' with `labels'
+        
+        if `rem', the gauge is removed when it gets back to 0
+        """
+        key = (name, labels)
+        with self._lock:
+            try:
+                self._val[key] += val
+            except KeyError:
+                self._val[key], self._type[name] = val, 'gauge'
+            if rem and self._val[key] == 0:
+                del self._val[key]
+    
+    def set(self, name, labels=(), val=0):
+        """set the gauge `name' with `labels' to `val'
+        """
+        with self._lock:
+            self._val[(name, labels)], self._type[name] = val, 'gauge'
+    
+    def observe(self, name, labels=(), dur=0.0):
+        """record the duration `dur' (in seconds) into the histogram `name' with
+        `labels'
+        """
+        key = (name, labels)
+        with self._lock:
+            try:
+                h = self._val[key]
+            except KeyError:
+                h = [0] * (len(self.BUCKETS) + 3)
+                h[-2] = 0.0
+                self._val[key], self._type[name] = h, 'histogram'
+            h[bisect_left(self.BUCKETS, dur)] += 1
+            h[-2] += dur
+            h[-1] += 1
+    
+    def get(self, name, labels=()):
+        """return the value of the counter or gauge `name' with `labels', or
+        the (count, sum) of the histogram `name' with `labels'
+        """
+        with self._lock:
+            val = self._val.get((name, labels), 0)
+            if isinstance(val, list):
+                return val[-1], val[-2]
+            else:
+                return val
+    
+    def _fmt_labels(self, name, labels, ext=''):
+        lnames = self.LABELS.get(name, ['l%i' % i for i in range(len(labels))])
+        lab = ','.join(['%s="%s"' % (n, v) for n, v in zip(lnames, labels)])
+        if ext:
+            lab = '%s,%s' % (lab, ext) if lab else ext
+        return '{%s}' % lab if lab else ''
+    
+    def text(self):
+        """return all metrics in the Prometheus text format
+        """
+        for coll in self.Collectors:
+            coll(self)
+        with self._lock:
+            vals  = sorted(self._val.items(), key=lambda x: (x[0][0], [str(l) for l in x[0][1]]))
+            types = dict(self._type)
+            vals  = [(k, list(v) if isinstance(v, list) else v) for k, v in vals]
+        lines, last = [], None
+        for (name, labels), val in vals:
+            if name != last:
+                lines.append('# TYPE %s %s' % (name, types[name]))
+                last = name
+            if isinstance(val, list):
+                cum = 0
+                for i, le in enumerate(self.BUCKETS):
+                    cum += val[i]
+                    lines.append('%s_bucket%s %i' % (name, self._fmt_labels(name, labels, 'le="%s"' % le), cum))
+                lines.append('%s_bucket%s %i' % (name, self._fmt_labels(name, labels, 'le="+Inf"'), val[-1]))
+                lines.append('%s_sum%s %f' % (name, self._fmt_labels(name, labels), val[-2]))
+                lines.append('%s_count%s %i' % (name, self._fmt_labels(name, labels), val[-1]))
+            else:
+                lines.append('%s%s %s' % (name, self._fmt_labels(name, labels), val))
+        return '\n'.join(lines) + '\n'
+    
+    def dump(self, path):
+        """write all metrics in the Prometheus text format into the file `path'
+        """
+        buf = self.text()
+        with open(path + '.tmp', 'w') as fd:
+            fd.write(buf)
+        os.rename(path + '.tmp', path)
+
@@ -51,6 +51,12 @@ __all__ = [
     'DiameterGeneric',
     # custom AVP generator
     'GenerateAVP',
+    # fast codec
+    'decode_Diameter_hdr',
+    'get_Diameter_avp',
+    'DiameterCodec',
+    'DiameterCodecGeneric',
+    'DiameterFramer',
     # dictionnaries
     'AppID_dict',
     'Cmd_dict',
@@ -67,6 +73,7 @@ __all__ = [
 #------------------------------------------------------------------------------#
 
 import datetime
+from struct import Struct, error as StructErr
 
 from pycrate_core.utils import *
 from pycrate_core.elt   import *
@@ -415,3 +422,265 @@ def GenerateAVP(Code, DataType, M=0, P=0, VendorID=None):
     #
     return AVP
 
+
+#------------------------------------------------------------------------------#
+# fast codec
+#------------------------------------------------------------------------------#
+# Diameter agents (e.g. for routing or load-balancing) do not need to decode
+# messages into Elements: the following functions and DiameterCodec work 
+# directly on buffers with precompiled structs and return Python tuples and
+# values
+
+_DiameterHdr_struct = Struct('>IIIII')
+_AVPHdr_struct      = Struct('>II')
+_Uint32_struct      = Struct('>I')
+_Uint16_struct      = Struct('>H')
+
+_DiameterHdr_unpack = _DiameterHdr_struct.unpack_from
+_AVPHdr_unpack      = _AVPHdr_struct.unpack_from
+_Uint32_unpack      = _Uint32_struct.unpack_from
+_Uint16_unpack      = _Uint16_struct.unpack_from
+
+
+def decode_Diameter_hdr(buf):
+    """decodes the Diameter header at the start of the buffer `buf' and returns
+    a 7-tuple (Vers, Len, Flags, Cmd, AppID, HHID, EEID), Flags being the byte
+    with the R, P, E and T bits
+    
+    raises PycrateErr if `buf' is too short
+    """
+    try:
+        vl, fc, app, hhid, eeid = _DiameterHdr_unpack(buf)
+    except StructErr:
+        raise(PycrateErr('Diameter header too short'))
+    return vl>>24, vl&0xffffff, fc>>24, fc&0xffffff, app, hhid, eeid
+
+
+def get_Diameter_avp(buf, code, vid=None):
+    """returns the data buffer of the 1st top-level AVP with code `code' (and 
+    vendor id `vid', if not None) within the Diameter message `buf' (e.g. 263 
+    for Session-Id, 283 for Destination-Realm), or None
+    
+    the remaining AVPs' data are not decoded
+    
+    raises PycrateErr if `buf' is invalid
+    """
+    end = min(len(buf), decode_Diameter_hdr(buf)[1])
+    off = 20
+    while off + 8 <= end:
+        avp_code, fl_len = _AVPHdr_unpack(buf, off)
+        avp_len = fl_len & 0xffffff
+        if fl_len & 0x80000000:
+            if avp_len < 12 or off + avp_len > end:
+                raise(PycrateErr('invalid AVP length, {0}'.format(avp_len)))
+            if avp_code == code and (vid is None or vid == _Uint32_unpack(buf, off+8)[0]):
+                return buf[off+12:off+avp_len]
+        else:
+            if avp_len < 8 or off + avp_len > end:
+                raise(PycrateErr('invalid AVP length, {0}'.format(avp_len)))
+            if avp_code == code and vid is None:
+                return buf[off+8:off+avp_len]
+        off += avp_len + (-avp_len % 4)
+    return None
+
+
+# AVP Data formats handlers
+# each one is a 2-tuple of functions:
+# - decoder, taking a data buffer and returning a Python value
+# - encoder, taking a Python value and returning a buffer
+
+def _dec_fixed(st):
+    unpack, bl = st.unpack, st.size
+    def dec(buf):
+        if len(buf) != bl:
+            raise(PycrateErr('invalid AVP data length, {0}'.format(len(buf))))
+        return unpack(buf)[0]
+    return dec
+
+def _dec_utf8(buf):
+    try:
+        return bytes(buf).decode('utf8')
+    except Exception as err:
+        raise(PycrateErr('invalid UTF8 AVP data: {0}'.format(err)))
+
+def _dec_addr(buf):
+    if len(buf) < 2:
+        raise(PycrateErr('invalid Address AVP data length, {0}'.format(len(buf))))
+    return _Uint16_unpack(buf)[0], bytes(buf[2:])
+
+def _enc_addr(val):
+    return _Uint16_struct.pack(val[0]) + val[1]
+
+
+# handlers are indexed by the pycrate base classes of the AVP Data formats
+_AVPHandlers = {
+    Uint32      : (_dec_fixed(Struct('>I')), Struct('>I').pack),
+    Uint64      : (_dec_fixed(Struct('>Q')), Struct('>Q').pack),
+    Int32       : (_dec_fixed(Struct('>i')), Struct('>i').pack),
+    Int64       : (_dec_fixed(Struct('>q')), Struct('>q').pack),
+    Float32     : (_dec_fixed(Struct('>f')), Struct('>f').pack),
+    Float64     : (_dec_fixed(Struct('>d')), Struct('>d').pack),
+    UTF8String  : (_dec_utf8, lambda val: val.encode('utf8')),
+    Address     : (_dec_addr, _enc_addr),
+    # bytes are passed through when encoding, whatever the AVP Data format
+    Buf         : (bytes, None),
+    }
+
+# Grouped AVP marker
+_AVPGrouped = 1
+
+
+def _get_avp_handler(fmt):
+    # returns the handler for the AVP Data format class `fmt', going through its
+    # parent classes (e.g. Enumerated -> Int32)
+    for cla in fmt.__mro__:
+        if cla in _AVPHandlers:
+            return _AVPHandlers[cla]
+    return _AVPHandlers[Buf]
+
+
+class DiameterCodec(object):
+    """Diameter messages fast codec, compiled from AVP Data format lookup 
+    tables (e.g. AVPIETF.FMT_LUT for AVPs without vendor id, and a lookup 
+    table per vendor id for vendor-specific AVPs)
+    
+    Messages are decoded to and encoded from a 2-tuple (hdr, avps):
+    - hdr is a 7-tuple (Vers, Len, Flags, Cmd, AppID, HHID, EEID), see 
+      decode_Diameter_hdr(); Len is ignored when encoding
+    - avps is a list of 4-tuple (Code, Flags, VendorID, Data), VendorID being 
+      None when the V bit is not set in Flags, and Data being a Python value 
+      according to the AVP Data format (int, float, str, bytes, 2-tuple for
+      Address, or list of AVPs for Grouped)
+    
+    AVPs are looked up by (VendorID, Code): AVPs not in the lookup tables, or
+    whose data does not fit their fixed format, have their data kept as bytes.
+    Bytes can also be passed as Data for any AVP when encoding.
+    """
+    
+    def __init__(self, fmt_lut, vendor_luts=None):
+        self._fmt_lut = fmt_lut
+        self._vendor_luts = vendor_luts if vendor_luts is not None else {}
+        self.compile()
+    
+    def compile(self):
+        """compiles the (vendor id, AVP code) -> (decoder, encoder) tables
+        
+        must be called again if a lookup table is changed
+        """
+        self._dec, self._enc = {}, {}
+        luts = [(None, self._fmt_lut)] + list(self._vendor_luts.items())
+        for vid, lut in luts:
+            for code, fmt in lut.items():
+                if isinstance(fmt, type) and issubclass(fmt, Sequence):
+                    # Grouped AVP: AVPs are identified by (vendor id, code) 
+                    # whatever their level, hence the same codec is used
+                    self._dec[(vid, code)] = (_AVPGrouped, self)
+                    self._enc[(vid, code)] = (_AVPGrouped, self)
+                else:
+                    dec, enc = _get_avp_handler(fmt)
+                    self._dec[(vid, code)] = dec
+                    if enc is not None:
+                        self._enc[(vid, code)] = enc
+    
+    def decode(self, buf):
+        """decodes the Diameter message in `buf' and returns the 2-tuple 
+        (hdr, avps)
+        
+        raises PycrateErr if `buf' is invalid
+        """
+        hdr = decode_Diameter_hdr(buf)
+        if hdr[1] < 20 or hdr[1] > len(buf):
+            raise(PycrateErr('invalid Diameter length, {0}'.format(hdr[1])))
+        return hdr, self.decode_avps(buf, 20, hdr[1])
+    
+    def decode_avps(self, buf, off=0, end=None):
+        """decodes the AVPs in `buf' between offsets `off' and `end' and returns
+        the list of AVPs
+        """
+        if end is None:
+            end = len(buf)
+        avps, dec = [], self._dec
+        while off < end:
+            if off + 8 > end:
+                raise(PycrateErr('AVP header too short'))
+            code, fl_len = _AVPHdr_unpack(buf, off)
+            avp_end = off + (fl_len & 0xffffff)
+            if fl_len & 0x80000000:
+                if avp_end < off + 12 or avp_end > end:
+                    raise(PycrateErr('invalid AVP length, {0}'.format(fl_len & 0xffffff)))
+                vid, off = _Uint32_unpack(buf, off+8)[0], off+12
+            else:
+                if avp_end < off + 8 or avp_end > end:
+                    raise(PycrateErr('invalid AVP length, {0}'.format(fl_len & 0xffffff)))
+                vid, off = None, off+8
+            hdl = dec.get((vid, code))
+            if hdl is None:
+                val = bytes(buf[off:avp_end])
+            elif hdl.__class__ is tuple:
+                val = hdl[1].decode_avps(buf, off, avp_end)
+            else:
+                try:
+                    val = hdl(buf[off:avp_end])
+                except PycrateErr:
+                    # keep the data which does not fit the AVP format
+                    val = bytes(buf[off:avp_end])
+            avps.append( (code, fl_len>>24, vid, val) )
+            # skip the padding
+            off = avp_end + (-avp_end % 4)
+        return avps
+    
+    def encode(self, hdr, avps):
+        """encodes the Diameter message from its header 7-tuple `hdr' and list
+        of AVPs `avps' and returns the buffer
+        """
+        ba = bytearray(_DiameterHdr_struct.pack(
+                (hdr[0]<<24), (hdr[2]<<24) + hdr[3], hdr[4], hdr[5], hdr[6]))
+        self.encode_avps(ba, avps)
+        _Uint32_struct.pack_into(ba, 0, (hdr[0]<<24) + len(ba))
+        return bytes(ba)
+    
+    def encode_avps(self, ba, avps):
+        """encodes the list of AVPs `avps' at the end of the bytearray `ba'
+        """
+        enc = self._enc
+        for code, flags, vid, val in avps:
+            off = len(ba)
+            if vid is not None:
+                flags |= 0x80
+                ba.extend(pack('>III', code, 0, vid))
+            else:
+                flags &= 0x7f
+                ba.extend(pack('>II', code, 0))
+            if isinstance(val, bytes_types):
+                ba.extend(val)
+            elif (vid, code) in enc:
+                hdl = enc[(vid, code)]
+                if hdl.__class__ is tuple:
+                    hdl[1].encode_avps(ba, val)
+                else:
+                    ba.extend(hdl(val))
+            else:
+                raise(PycrateErr('AVP {0}: invalid value {1!r}'\
+                      .format(code, val)))
+            _Uint32_struct.pack_into(ba, off+4, (flags<<24) + len(ba) - off)
+            ba.extend( (-len(ba) % 4) * b'\0' )
+
+
+DiameterCodecGeneric = DiameterCodec(AVPGeneric.FMT_LUT)
+
+
+class DiameterFramer(StreamFramer):
+    """Diameter messages framer for TCP or SCTP streams, see StreamFramer
+    
+    e.g. DiameterFramer(DiameterCodec3GPP.decode) returns decoded messages
+    """
+    
+    HDR_LEN = 4
+    MSG_MIN = 20
+    MSG_MAX = 0xffffff
+    
+    def _get_len(self, buf, off):
+        vl = _Uint32_unpack(buf, off)[0]
+        if vl >> 24 != 1:
+            raise(PycrateErr('DiameterFramer: invalid version, {0}'.format(vl >> 24)))
+        return vl & 0xffffff
@@ -28,12 +28,15 @@
 #*/
 
 __all__ = [
+    'VENDOR_3GPP',
     'TGPPAVPInfos_dict',
     'FMT_LUT_TS29230',
+    'FMT_LUT_3GPP',
     'AVP3GPPCodes_dict',
     'Grouped',
     'AVP3GPP',
-    'Diameter3GPP'
+    'Diameter3GPP',
+    'DiameterCodec3GPP'
     ]
 
 
@@ -64,6 +67,9 @@ class Grouped(Sequence):
 # 7.1 3GPP specific AVP codes
 #------------------------------------------------------------------------------#
 
+# vendor id of the 3GPP specific AVPs
+VENDOR_3GPP = 10415
+
 TGPPAVPInfos_dict = {
     100 : ('3GPP-WLAN-APN-Id', OctetString),
     101 : ('3GPP-WLAN-QoS-Filter-Rule', UTF8String),
@@ -1581,3 +1587,8 @@ class Diameter3GPP(DiameterGeneric):
         )
 
 
+# 3GPP AVPs only, for the fast codec which distinguishes them from the IETF ones
+# by their vendor id
+FMT_LUT_3GPP = {code: fmt for code, (name, fmt) in TGPPAVPInfos_dict.items()}
+
+DiameterCodec3GPP = DiameterCodec(FMT_LUT_IETF, {VENDOR_3GPP: FMT_LUT_3GPP})
@@ -31,7 +31,8 @@ __all__ = [
     'FMT_LUT_IETF',
     'Grouped',
     'AVPIETF',
-    'DiameterIETF'
+    'DiameterIETF',
+    'DiameterCodecIETF'
     ]
 
 
@@ -395,3 +396,5 @@ class DiameterIETF(DiameterGeneric):
         Sequence('AVPs', GEN=AVPIETF(), hier=1)
         )
 
+
+DiameterCodecIETF = DiameterCodec(AVPIETF.FMT_LUT)
@@ -28,6 +28,7 @@
 #*/
 
 from binascii import unhexlify
+from struct   import Struct
 
 from pycrate_core.utils  import *
 from pycrate_core.repr   import *
@@ -3999,6 +4000,25 @@ def parse_ISUP(buf):
     return Msg, 0
 
 
+#------------------------------------------------------------------------------#
+# ISUP header-only dissection
+#------------------------------------------------------------------------------#
+
+_ISUPHdr_unpack = Struct('<HB').unpack_from
+
+
+def decode_ISUP_hdr(buf):
+    """decodes the header of the ISUP message `buf' and returns a 2-tuple:
+    - 2-tuple (CIC, Type), or None if decoding failed
+    - decoding error code, 0 if decoding succeeded, 1 invalid message type,
+      like parse_ISUP()
+    """
+    if len(buf) < 3 or buf[2] not in ISUPTypeClasses:
+        return None, 1
+    cic, typ = _ISUPHdr_unpack(buf)
+    return (cic & 0xfff, typ), 0
+
+
 '''
 # this is to extract pycrate structure from PDF table from section 4
 
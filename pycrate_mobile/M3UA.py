@@ -59,22 +59,27 @@ __all__ = [
     'ERR_M3UA_BUF_INVALID',
     'ERR_M3UA_TYPE_NONEXIST',
     'ERR_M3UA_MAND_PRM_MISS',
+    'M3UAFramer',
+    'dissect_M3UA',
     ]
 
 
 from enum   import IntEnum
-from struct import unpack
+from struct import unpack, Struct, error as StructErr
 
 from pycrate_core.utils  import *
 from pycrate_core.elt    import *
 from pycrate_core.base   import *
 from pycrate_core.charpy import *
 
+from pycrate_mobile.SCCP    import decode_SCCP_hdr
+from pycrate_mobile.ISUP    import decode_ISUP_hdr
 from pycrate_mobile.SIGTRAN import (
     Param  as SIGTRANParam,
     Params as SIGTRANParams,
     Header as SIGTRANHeader,
     SIGTRAN,
+    SIGTRANFramer,
     )
 
 #------------------------------------------------------------------------------#
@@ -1061,3 +1066,80 @@ def parse_M3UA(buf):
     else:
         return Msg, 0
 
+
+class M3UAFramer(SIGTRANFramer):
+    """M3UA messages framer, returning the 2-tuple from parse_M3UA() for each
+    message by default, see StreamFramer
+    """
+    
+    def __init__(self, dec=parse_M3UA):
+        SIGTRANFramer.__init__(self, dec)
+
+
+#------------------------------------------------------------------------------#
+# M3UA header-only dissection
+#------------------------------------------------------------------------------#
+
+# Signalling transfer points handle tens of thousands of messages per second,
+# and only need the routing label and a few user part fields: dissect_M3UA()
+# extracts them with precompiled structs, without instantiating the M3UA,
+# SCCP or ISUP structures, which can be done afterwards with parse_M3UA() for
+# the messages requiring it.
+#
+# A dissected message is a 9-tuple:
+# (Class, Type, RC, OPC, DPC, SI, SLS, Data, UP)
+# - RC, OPC, DPC, SI, SLS and Data are None for messages other than DATA, RC 
+#   being the 1st routing context, if any
+# - Data is the MTP3 user part buffer, within the Protocol Data parameter
+# - UP is the 4-tuple returned by decode_SCCP_hdr() for SCCP (SI 3), the 
+#   2-tuple returned by decode_ISUP_hdr() for ISUP (SI 5), or None for other
+#   user parts or when they fail to decode
+
+_M3UAHdr_unpack      = Struct('>BBBBI').unpack_from
+_M3UAPrmHdr_unpack   = Struct('>HH').unpack_from
+_M3UAProtData_unpack = Struct('>IIBBBB').unpack_from
+_Uint32_unpack       = Struct('>I').unpack_from
+
+
+def dissect_M3UA(buf):
+    """dissects the buffer `buf' for M3UA message and returns a 2-tuple:
+    - M3UA 9-tuple (Class, Type, RC, OPC, DPC, SI, SLS, Data, UP), or None if
+      dissection failed
+    - dissection error code, 0 if dissection succeeded, > 0 otherwise, like
+      parse_M3UA()
+    """
+    try:
+        vers, _, cls, typ, end = _M3UAHdr_unpack(buf)
+    except StructErr:
+        return None, ERR_M3UA_BUF_TOO_SHORT
+    if vers != 1 or (cls, typ) not in M3UAMsgDispatcher:
+        return None, ERR_M3UA_TYPE_NONEXIST
+    elif end > len(buf):
+        return None, ERR_M3UA_BUF_TOO_SHORT
+    elif end < 8:
+        return None, ERR_M3UA_BUF_INVALID
+    if (cls, typ) != (1, 1):
+        return (cls, typ, None, None, None, None, None, None, None), 0
+    off, rc, pd = 8, None, None
+    while off + 4 <= end:
+        tag, ln = _M3UAPrmHdr_unpack(buf, off)
+        if ln < 4 or off + ln > end:
+            return None, ERR_M3UA_BUF_INVALID
+        if tag == 0x0210:
+            if ln < 16:
+                return None, ERR_M3UA_BUF_INVALID
+            pd = off
+        elif tag == 0x0006 and ln >= 8:
+            rc = _Uint32_unpack(buf, off+4)[0]
+        off += ln + (-ln % 4)
+    if pd is None:
+        return None, ERR_M3UA_MAND_PRM_MISS
+    opc, dpc, si, _, _, sls = _M3UAProtData_unpack(buf, pd+4)
+    data = buf[pd+16:pd+_M3UAPrmHdr_unpack(buf, pd)[1]]
+    if si == 3:
+        up = decode_SCCP_hdr(data)[0]
+    elif si == 5:
+        up = decode_ISUP_hdr(data)[0]
+    else:
+        up = None
+    return (cls, typ, rc, opc, dpc, si, sls, data, up), 0
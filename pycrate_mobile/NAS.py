@@ -178,3 +178,74 @@ def parse_NAS_MT(buf, inner=True, wl2=False):
     #
     return Msg, 0
 
+
+def classify_NAS_MO(buf, names=NASClassifyIEs):
+    """Classifies a Mobile Originated NAS message bytes' buffer, by scanning it 
+    without decoding it; the message can be fully decoded afterwards with 
+    parse_NAS_MO()
+    
+    Args:
+        buf: uplink NAS message bytes' buffer
+        names: set of IE names to be returned, or None for all
+    
+    Returns:
+        desc, err: 2-tuple
+            desc: dict with PD, SecHdr, Type, Class and IEs, if err is null 
+                  (no error), see classify_NASLTE() and classify_NAS5G()
+            desc: None, if err is not null (standard NAS error code)
+    """
+    return _classify_NAS(buf, names, NASMODispatcher, EMMTypeMOClasses)
+
+
+def classify_NAS_MT(buf, names=NASClassifyIEs, wl2=False):
+    """Classifies a Mobile Terminated NAS message bytes' buffer, by scanning it 
+    without decoding it; the message can be fully decoded afterwards with 
+    parse_NAS_MT()
+    
+    Args:
+        buf: downlink NAS message bytes' buffer
+        names: set of IE names to be returned, or None for all
+        wl2: bool, True if the signalling message is a GSM RR with a 
+             L2PseudoLength prefix
+    
+    Returns:
+        desc, err: 2-tuple
+            desc: dict with PD, SecHdr, Type, Class and IEs, if err is null 
+                  (no error), see classify_NASLTE() and classify_NAS5G()
+            desc: None, if err is not null (standard NAS error code)
+    """
+    return _classify_NAS(buf, names, NASMTDispatcher, EMMTypeMTClasses, wl2)
+
+
+def _classify_NAS(buf, names, Dispatcher, EMMTypeClasses, wl2=False):
+    try:
+        if wl2:
+            pd, type = buf[1], buf[2]
+        else:
+            pd, type = buf[0], buf[1]
+    except Exception:
+        # error 111, unspecified protocol error
+        return None, 111
+    if pd & 0xf != 0xe:
+        # 4-bit protocol discriminator
+        pd &= 0xf
+    if pd in (3, 5, 11):
+        type &= 0x3f
+    elif pd in (2, 7):
+        return classify_NASLTE(buf, EMMTypeClasses, names, sec_hdr=True)
+    elif pd in (46, 126):
+        return classify_NAS5G(buf, names, sec_hdr=True)
+    #
+    try:
+        Cls = Dispatcher[pd][type]
+    except KeyError:
+        # error 97, message type non-existent or not implemented
+        return None, 97
+    #
+    try:
+        ies = Cls.scan_bytes(buf, names)
+    except Exception:
+        # error 96, invalid mandatory info
+        return None, 96
+    #
+    return {'PD': pd, 'SecHdr': 0, 'Type': type, 'Class': Cls, 'IEs': ies}, 0
@@ -145,6 +145,86 @@ def parse_NAS5G(buf, inner=True, sec_hdr=True):
     return Msg, 0
 
 
+def classify_NAS5G(buf, names=None, sec_hdr=True):
+    """Classifies a 5G NAS message bytes' buffer, by scanning it without 
+    decoding it; the message can be fully decoded afterwards with parse_NAS5G()
+    
+    Args:
+        buf: 5G NAS message bytes' buffer
+        names: set of IE names to be returned, or None for all
+        sec_hdr: if True, consider the 5GMM security header, and classify the 
+                 NASMessage within the security header when not ciphered
+                 otherwise, just consider the NAS message is in plain text
+    
+    Returns:
+        desc, err: 2-tuple
+            desc: dict with PD, SecHdr, Type (None when ciphered), Class and 
+                  IEs (dict of IE name -> raw value, see Layer3.scan_bytes()), 
+                  if err is null (no error) or for an error within a ciphered
+                  NASMessage
+            desc: None, if err is not null (standard 5G NAS error code)
+    """
+    try:
+        # this corresponds actually only to the layout of the 5GMM header
+        pd, shdr, typ = unpack('>BBB', buf[:3])
+    except Exception:
+        # error 111, unspecified protocol error
+        return None, 111
+    #
+    if pd == 126:
+        # 5GMM
+        if sec_hdr and shdr in (1, 2, 3, 4):
+            # 5GMM security protected NAS message
+            if len(buf) < 7:
+                # error 96, invalid mandatory info
+                return None, 96
+            desc = {'PD': pd, 'SecHdr': shdr, 'Type': None, 
+                    'Class': FGMMSecProtNASMessage, 'IEs': {}}
+            if shdr in (1, 3):
+                # classify clear-text NAS message container
+                cont, err = classify_NAS5G(buf[7:], names)
+                if cont is not None:
+                    cont['SecHdr'] = shdr
+                    return cont, err
+                return desc, err
+            else:
+                return desc, 0
+        else:
+            # sec hdr == 0 or undefined
+            # no security, straight 5GMM message
+            try:
+                Cls = FGMMTypeClasses[typ]
+            except KeyError:
+                # error 97, message type non-existent or not implemented
+                return None, 97
+            shdr = 0
+    #
+    elif pd == 46:
+        # 5GSM
+        try:
+            typ = buf[3]
+        except:
+            # error 111, unspecified protocol error
+            return None, 111
+        try:
+            Cls = FGSMTypeClasses[typ]
+        except KeyError:
+            # error 97, message type non-existent or not implemented
+            return None, 97
+        shdr = 0
+    #
+    else:
+        # error 97: message type non-existent or not implemented
+        return None, 97
+    #
+    try:
+        ies = Cls.scan_bytes(buf, names)
+    except Exception:
+        # error 96, invalid mandatory info
+        return None, 96
+    return {'PD': pd, 'SecHdr': shdr, 'Type': typ, 'Class': Cls, 'IEs': ies}, 0
+
+
 def parse_PayCont(conttype, buf):
     
     if conttype == FGSMMContType.N1SM and len(buf) >= 2:
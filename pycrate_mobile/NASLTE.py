@@ -263,5 +263,114 @@ def parse_NASLTE_MT(buf, inner=True, sec_hdr=True):
         #
         return Msg, err
 
+
+# IE returned by default when classifying NAS messages: mobile identities, 
+# GUTI and causes
+NASClassifyIEs = {
+    'ID', 'EPSID', 'GUTI', 'OldGUTI', 'AddGUTI', '5GSID', 'PDUSessID',
+    'Cause', 'RejectCause', 'GMMCause', 'SMCause', 'EMMCause', 'ESMCause',
+    '5GMMCause', '5GSMCause'
+    }
+
+
+def classify_NASLTE_MO(buf, names=NASClassifyIEs, sec_hdr=True):
+    """Classifies a Mobile Originated LTE NAS message bytes' buffer, without
+    decoding it, see classify_NASLTE()
+    """
+    return classify_NASLTE(buf, EMMTypeMOClasses, names, sec_hdr)
+
+
+def classify_NASLTE_MT(buf, names=NASClassifyIEs, sec_hdr=True):
+    """Classifies a Mobile Terminated LTE NAS message bytes' buffer, without
+    decoding it, see classify_NASLTE()
+    """
+    return classify_NASLTE(buf, EMMTypeMTClasses, names, sec_hdr)
+
+
+def classify_NASLTE(buf, EMMTypeClasses, names=None, sec_hdr=True):
+    """Classifies an LTE NAS message bytes' buffer, by scanning it without 
+    decoding it; the message can be fully decoded afterwards with
+    parse_NASLTE_MO() or parse_NASLTE_MT()
+    
+    Args:
+        buf: LTE NAS message bytes' buffer
+        EMMTypeClasses: dict of EMM message type -> class, for the given direction
+        names: set of IE names to be returned, or None for all
+        sec_hdr: if True, handle the NAS EMM security header, and classify the 
+                 NASMessage within security header when not ciphered
+                 otherwise, just consider the NAS message is in plain text
+    
+    Returns:
+        desc, err: 2-tuple
+            desc: dict with PD, SecHdr, Type (None when ciphered), Class and 
+                  IEs (dict of IE name -> raw value, see Layer3.scan_bytes()), 
+                  if err is null (no error) or for an error within a ciphered
+                  NASMessage
+            desc: None, if err is not null (standard LTE NAS error code)
+    """
+    try:
+        pd = buf[0]
+    except Exception:
+        return None, 111
+    shdr = pd>>4
+    pd  &= 0xf
+    
+    if sec_hdr and shdr in {1, 2, 3, 4}:
+        # EMM security protected NAS message
+        if len(buf) < 6:
+            # error 96, invalid mandatory info
+            return None, 96
+        desc = {'PD': pd, 'SecHdr': shdr, 'Type': None, 
+                'Class': EMMSecProtNASMessage, 'IEs': {}}
+        if shdr in {1, 3}:
+            # classify clear-text NAS message container
+            cont, err = classify_NASLTE(buf[6:], EMMTypeClasses, names)
+            if cont is not None:
+                cont['SecHdr'] = shdr
+                return cont, err
+            return desc, err
+        else:
+            return desc, 0
+    
+    elif sec_hdr and shdr == 12:
+        # EMM service request message
+        Cls, typ = EMMServiceRequest, None
+    
+    elif pd == 7:
+        # EMM
+        try:
+            typ = buf[1]
+        except Exception:
+            return None, 111
+        try:
+            Cls = EMMTypeClasses[typ]
+        except KeyError:
+            # error 97, message type non-existent or not implemented
+            return None, 97
+        shdr = 0
+    
+    elif pd == 2:
+        # ESM
+        try:
+            typ = buf[2]
+        except Exception:
+            return None, 111
+        try:
+            Cls = ESMTypeClasses[typ]
+        except KeyError:
+            return None, 97
+        shdr = 0
+    
+    else:
+        return None, 97
+    #
+    try:
+        ies = Cls.scan_bytes(buf, names)
+    except Exception:
+        # error 96, invalid mandatory info
+        return None, 96
+    return {'PD': pd, 'SecHdr': shdr, 'Type': typ, 'Class': Cls, 'IEs': ies}, 0
+
+
 # TODO: handle decoding of NAS Generic Container (for LCS or LPP)
 # see 24.301, 9.9.3.42 and 43
@@ -29,6 +29,7 @@
 #*/
 
 from binascii import unhexlify
+from struct   import Struct, error as StructErr
 
 from pycrate_core.utils  import *
 from pycrate_core.repr   import *
@@ -1619,3 +1620,107 @@ def parse_SCMG(buf):
     return Msg, 0
 
 
+#------------------------------------------------------------------------------#
+# SCCP header-only dissection
+#------------------------------------------------------------------------------#
+
+# Routing SCCP traffic only requires the message type, the called and calling 
+# party addresses and the user data: the following functions extract them from
+# connectionless messages with precompiled offsets, without instantiating the
+# SCCPMessage structures above.
+#
+# A decoded address is a 4-tuple:
+# (RoutingInd, PC, SSN, GT)
+# - PC and SSN are None when the corresponding indicator is not set
+# - GT is the string of digits of the global title, or its hex-encoded content 
+#   for unknown encoding schemes, or None when there is no global title; BCD
+#   filler and spare values are returned as hex chars (e.g. 'f')
+
+# message type: (offset of the 1st pointer, pointers' size)
+_SCCPPtrs_dict = {
+    9  : (2, 1), # UDT
+    10 : (2, 1), # UDTS
+    17 : (3, 1), # XUDT
+    18 : (3, 1), # XUDTS
+    19 : (3, 2), # LUDT
+    20 : (3, 2), # LUDTS
+    }
+
+_Uint16LE_unpack = Struct('<H').unpack_from
+
+# swaps the 2 nibbles of each byte, to get BCD digits in order with hex()
+_BCDSwap = bytes(((i & 0xf) << 4) | (i >> 4) for i in range(256))
+
+
+def _decode_bcd(buf, odd):
+    digits = bytes(buf).translate(_BCDSwap).hex()
+    return digits[:-1] if odd else digits
+
+
+def decode_SCCP_addr(buf):
+    """decodes the SCCP called or calling party address value `buf' (without 
+    its length prefix) and returns a 4-tuple (RoutingInd, PC, SSN, GT)
+    
+    raises IndexError or StructErr if `buf' is too short
+    """
+    ai, off, pc, ssn, gt = buf[0], 1, None, None, None
+    if ai & 0x01:
+        pc = _Uint16LE_unpack(buf, off)[0] & 0x3fff
+        off += 2
+    if ai & 0x02:
+        ssn = buf[off]
+        off += 1
+    gti = (ai >> 2) & 0xf
+    if gti == 1:
+        gt = _decode_bcd(buf[off+1:], buf[off] & 0x80)
+    elif gti in (3, 4):
+        es = buf[off+1] & 0xf
+        off += 2 if gti == 3 else 3
+        if es in (1, 2):
+            gt = _decode_bcd(buf[off:], es == 1)
+        else:
+            gt = bytes(buf[off:]).hex()
+    elif gti == 2:
+        gt = bytes(buf[off+1:]).hex()
+    elif gti:
+        gt = bytes(buf[off:]).hex()
+    return (ai >> 6) & 1, pc, ssn, gt
+
+
+def decode_SCCP_hdr(buf):
+    """decodes the header of the SCCP message `buf' and returns a 2-tuple:
+    - 4-tuple (Type, Called, Calling, Data), or None if decoding failed, with
+      Called and Calling the 4-tuple returned by decode_SCCP_addr() and Data 
+      the user data buffer, or None for connection-oriented messages
+    - decoding error code, 0 if decoding succeeded, 1 invalid message type, 
+      2 message decoding failed, like parse_SCCP()
+    """
+    if not buf or buf[0] not in SCCPTypeClasses:
+        return None, 1
+    typ = buf[0]
+    if typ not in _SCCPPtrs_dict:
+        return (typ, None, None, None), 0
+    off, ptrl = _SCCPPtrs_dict[typ]
+    try:
+        prms = []
+        for i in range(3):
+            if ptrl == 1:
+                poff = off + buf[off]
+            else:
+                poff = off + _Uint16LE_unpack(buf, off)[0]
+            if i < 2:
+                pend = poff + 1 + buf[poff]
+                prms.append( decode_SCCP_addr(buf[poff+1:pend]) )
+            elif typ in (19, 20):
+                # long data, with a 2-byte length prefix
+                pend = poff + 2 + _Uint16LE_unpack(buf, poff)[0]
+                prms.append( buf[poff+2:pend] )
+            else:
+                pend = poff + 1 + buf[poff]
+                prms.append( buf[poff+1:pend] )
+            if pend > len(buf):
+                return None, 2
+            off += ptrl
+    except (IndexError, StructErr):
+        return None, 2
+    return (typ, prms[0], prms[1], prms[2]), 0
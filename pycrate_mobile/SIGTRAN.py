@@ -28,6 +28,8 @@
 # *--------------------------------------------------------
 #*/
 
+from struct import Struct
+
 from pycrate_core.utils  import *
 from pycrate_core.elt    import *
 from pycrate_core.base   import *
@@ -577,6 +579,24 @@ class SIGTRAN(Envelope):
             self[1]._from_char(char)
 
 
+_Uint32_unpack = Struct('>I').unpack_from
+
+
+class SIGTRANFramer(StreamFramer):
+    """SIGTRAN messages framer for SCTP (or TCP) streams, see StreamFramer
+    
+    Supports all formats with the SIGTRAN common header (M3UA, M2UA, M2PA...)
+    """
+    
+    HDR_LEN = 8
+    MSG_MIN = 8
+    
+    def _get_len(self, buf, off):
+        if _Uint32_unpack(buf, off)[0] >> 24 != 1:
+            raise(PycrateErr('SIGTRANFramer: invalid version'))
+        return _Uint32_unpack(buf, off+4)[0]
+
+
 class M2PA(Envelope):
     """M2PA message structure, including the common message header, the M2PA header
     and user data, as defined in RFC 4165, section 2
@@ -46,8 +46,7 @@ from binascii import hexlify
 # release 13 (d00)
 #------------------------------------------------------------------------------#
 
-from pycrate_core.utils  import pack_val, TYPE_UINT, PycrateErr, bytes_lshift
-from pycrate_core.charpy import Charpy
+from pycrate_core.utils  import pack, unpack, PycrateErr
 from pycrate_core.elt    import Envelope
 from pycrate_core.base   import Uint
 
@@ -553,6 +552,130 @@ _GSM7bExtLUTInv = {
 _GSM7bExtTab = '\x0c\x11^\x0e{}\\[~]|€'
 
 
+# Septets are packed and unpacked 8 by 8, each group of 8 septets being handled
+# as a single 64-bit integer in which the 7-bit lanes are compacted (packing) or
+# expanded (unpacking) with a few shift and mask operations
+
+# translation table from unicode chars to strings of septets
+_GSM7bEncTab = {}
+# ensure ascii chars that are not part of the alphabet are translated to
+# invalid septets
+for i in range(128):
+    _GSM7bEncTab[i] = '\x80'
+for c, v in _GSM7bExtLUTInv.items():
+    _GSM7bEncTab[ord(c)] = '\x1b' + chr(v)
+for c, v in _GSM7bLUTInv.items():
+    _GSM7bEncTab[ord(c)] = chr(v)
+del i, c, v
+
+
+def _pack_sept(x):
+    # compacts 8 septets from 8-bit lanes to 7-bit lanes
+    x = (x & 0x007f007f007f007f) | ((x & 0x7f007f007f007f00) >> 1)
+    x = (x & 0x00003fff00003fff) | ((x & 0x3fff00003fff0000) >> 2)
+    return (x & 0x000000000fffffff) | ((x & 0x0fffffff00000000) >> 4)
+
+
+def _unpack_sept(x):
+    # expands 8 septets from 7-bit lanes to 8-bit lanes
+    x = (x & 0x000000000fffffff) | ((x & 0x00fffffff0000000) << 4)
+    x = (x & 0x00003fff00003fff) | ((x & 0x0fffc0000fffc000) << 2)
+    return (x & 0x007f007f007f007f) | ((x & 0x3f803f803f803f80) << 1)
+
+
+def _encode_sept(txt):
+    # returns the buffer of septets (1 per byte) for the unicode string `txt'
+    try:
+        return txt.translate(_GSM7bEncTab).encode('ascii')
+    except UnicodeEncodeError:
+        for c in txt:
+            if ord(c) not in _GSM7bEncTab or _GSM7bEncTab[ord(c)] == '\x80':
+                raise(PycrateErr('invalid GSM 7 bit char: %r' % c))
+
+
+def _decode_sept(sept):
+    # returns the unicode string for the buffer of septets (1 per byte) `sept'
+    if 27 not in sept:
+        chars = sept.decode('ascii').translate(_GSM7bTab)
+        if chars and chars[-1] in ('@', '\r'):
+            # strip the last character corresponding to the last 7-bit padding 
+            # (being 0x00 or 0x13)
+            return chars[:-1]
+        else:
+            return chars
+    # escape chars are processed from the end of the string
+    arr, chars = bytearray(reversed(sept)), []
+    for i, v in enumerate(arr):
+        if v == 27:
+            # escape char, replace last char with extended content
+            try:
+                chars[-1] = _GSM7bExtLUT[arr[i-1]]
+            except (KeyError, IndexError):
+                chars.append(' ')
+        else:
+            chars.append(_GSM7bTab[v])
+    if chars and chars[0] in ('@', '\r'):
+        return ''.join(reversed(chars[1:]))
+    else:
+        return ''.join(reversed(chars))
+
+
+def _pack_sepb(septs, off):
+    # packs the list of buffers of septets `septs' (1 per byte), each of them 
+    # starting at bit offset `off', and returns the list of packed buffers
+    grp, lens = [], []
+    for sept in septs:
+        cnt   = len(sept)
+        padbl = (-off-cnt*7) % 8
+        if padbl == 7:
+            # pad with a \r, to avoid including a padding septet that would 
+            # decode as @
+            sept += b'\r'
+        sept += (-len(sept) % 8) * b'\0'
+        # length of the encoded buffer, and of the packed groups of septets
+        lens.append( ((off + 7*cnt + padbl) >> 3, 7 * (len(sept) >> 3)) )
+        grp.append( sept )
+    grp = b''.join(grp)
+    num = len(grp) >> 3
+    buf = bytearray(pack('<%iQ' % num, *map(_pack_sept, unpack('<%iQ' % num, grp))))
+    # keep 7 bytes out of each 8
+    del buf[7::8]
+    ret, i = [], 0
+    for l, grpl in lens:
+        if off:
+            ret.append( (int.from_bytes(buf[i:i+grpl], 'little') << off).to_bytes(l, 'little') )
+        else:
+            ret.append( bytes(buf[i:i+l]) )
+        i += grpl
+    return ret
+
+
+def _unpack_sepb(bufs, off):
+    # unpacks the list of buffers `bufs', each of them starting at bit offset 
+    # `off', and returns the list of buffers of septets (1 per byte)
+    grp, cnts = bytearray(), []
+    for buf in bufs:
+        l   = len(buf)
+        cnt = max(0, ((l << 3) - off) // 7)
+        if off:
+            buf = (int.from_bytes(buf, 'little') >> off).to_bytes(l, 'little')
+        num = -(-cnt // 8)
+        # spread each 7 bytes over 8
+        ext = bytearray(8 * num)
+        buf = bytes(buf[:7*num]) + (7*num - l) * b'\0'
+        for i in range(7):
+            ext[i::8] = buf[i::7]
+        grp.extend(ext)
+        cnts.append(cnt)
+    num = len(grp) >> 3
+    sept = pack('<%iQ' % num, *map(_unpack_sept, unpack('<%iQ' % num, grp)))
+    ret, i = [], 0
+    for cnt in cnts:
+        ret.append( sept[i:i+cnt] )
+        i += 8 * (-(-cnt // 8))
+    return ret
+
+
 def encode_7b(txt, off=0):
     """translates the unicode string `txt' to a GSM 7 bit characters buffer
     Enables the encoded buffer to start at a non-null bit offset `off' as it is the case
@@ -565,31 +688,8 @@ def encode_7b(txt, off=0):
     Returns:
         encoded buffer and septet count (bytes, uint)
     """
-    arr, cnt = [], 0
-    for c in reversed(txt):
-        try:
-            arr.append( (TYPE_UINT, _GSM7bLUTInv[c], 7) )
-        except KeyError:
-            try:
-                arr.append( (TYPE_UINT, _GSM7bExtLUTInv[c], 7) )
-            except KeyError:
-                raise(PycrateErr('invalid GSM 7 bit char: %r' % c))
-            else:
-                # add the extension escape char
-                arr.append( (TYPE_UINT, 27, 7) )
-                cnt += 2
-        else:
-            cnt += 1
-    # add fill bits at the front (for the UDH to align on septets)
-    arr.append((TYPE_UINT, 0, off))
-    # add fill bits at the end (to align on a byte boundary)
-    padbl = (-off-cnt*7) % 8
-    if padbl == 7:
-        # pad with a \r, to avoid including a padding septet that would decode as @
-        arr.insert(0, (TYPE_UINT, 13, 7))
-    else:
-        arr.insert(0, (TYPE_UINT, 0, padbl))
-    return bytes(reversed(pack_val(*arr)[0])), cnt
+    sept = _encode_sept(txt)
+    return _pack_sepb([sept], off)[0], len(sept)
 
 
 def decode_7b(buf, off=0):
@@ -604,33 +704,57 @@ def decode_7b(buf, off=0):
     Returns:
         decoded text string (utf8 str)
     """
-    char = Charpy(bytes(reversed(buf)))
-    #
-    # get the size and number of characters
-    buf_bl    = len(buf) << 3
-    chars_bl  = buf_bl - off
-    chars_num = chars_bl // 7
-    # jump over the fill bits (from the UDH)
-    char._cur = chars_bl - (7 * chars_num)
-    #
-    # get all chars
-    arr = [char.get_uint(7) for i in range(chars_num)]
-    chars = []
-    for i, v in enumerate(arr):
-        if v == 27:
-            # escape char, replace last char with extended content
-            try:
-                chars[-1] = _GSM7bExtLUT[arr[i-1]]
-            except KeyError:
-                chars.append(' ')
-        else:
-            chars.append(_GSM7bLUT[v])
-    #
-    if chars and chars[0] in ('@', '\r'):
-        # strip the last character corresponding to the last 7-bit padding (being 0x00 or 0x13)
-        return ''.join(reversed(chars[1:]))
-    else:
-        return ''.join(reversed(chars))
+    return _decode_sept(_unpack_sepb([buf], off)[0])
+
+
+def encode_7b_batch(txts, off=0):
+    """translates the list of unicode strings `txts' to GSM 7 bit characters
+    buffers, all of them starting at bit offset `off', see encode_7b()
+    
+    Septets of all strings are packed at once, which is faster than calling
+    encode_7b() for each of them
+    
+    Returns:
+        list of encoded buffer and septet count (bytes, uint)
+    """
+    septs = list(map(_encode_sept, txts))
+    return list(zip(_pack_sepb(septs, off), map(len, septs)))
+
+
+def decode_7b_batch(bufs, off=0):
+    """translates the list of GSM 7 bit characters buffers `bufs' to unicode
+    strings, all of them starting at bit offset `off', see decode_7b()
+    
+    Septets of all buffers are unpacked at once, which is faster than calling
+    decode_7b() for each of them
+    
+    Returns:
+        list of decoded text string (utf8 str)
+    """
+    return list(map(_decode_sept, _unpack_sepb(bufs, off)))
+
+
+def encode_ucs2(txt):
+    """translates the unicode string `txt' to an UCS2 characters buffer
+    
+    Returns:
+        encoded buffer and character count (bytes, uint)
+    """
+    try:
+        buf = txt.encode('utf-16-be')
+    except UnicodeEncodeError as err:
+        raise(PycrateErr('invalid UCS2 char: %s' % err))
+    return buf, len(buf) >> 1
+
+
+def decode_ucs2(buf):
+    """translates the UCS2 characters buffer `buf' to an unicode string,
+    ignoring a trailing odd byte and invalid surrogates
+    
+    Returns:
+        decoded text string (utf8 str)
+    """
+    return str(buf[:len(buf) & ~1], 'utf-16-be', 'replace')
 
 
 def decode_7b_gmr(buf):
@@ -54,7 +54,8 @@ __all__ = [
 from binascii import hexlify
 
 from pycrate_core.utils  import *
-from pycrate_core.elt    import Element, Envelope, EltErr, CharpyErr, REPR_RAW, REPR_HEX, REPR_BIN
+from pycrate_core.elt    import Element, Atom, Envelope, EltErr, CharpyErr, \
+                                REPR_RAW, REPR_HEX, REPR_BIN
 from pycrate_core.base   import *
 from pycrate_core.repr   import *
 from pycrate_csn1.csnobj import CSN1Obj
@@ -65,6 +66,142 @@ from pycrate_csn1.csnobj import CSN1Obj
 # TS 24.007, section 11.2.1
 #------------------------------------------------------------------------------#
 
+def _get_opts_desc(content):
+    """returns the description of the optional part of a Layer3 message content:
+    - list of (content index, tag length, tag value) for each optional IE
+    - content index of the rest octets, or None
+    - IEI dispatch table: dict of 8-bit tag -> tuple of indexes in the list of
+      optional IE which can be matched by this tag, in order
+    """
+    opts, rest = [], None
+    for i, ie in enumerate(content):
+        if isinstance(ie, (Type1TV, Type2, Type3TV, Type4TLV, Type6TLVE)):
+            # optional IE
+            T = ie[0]
+            opts.append( (i, T.get_bl(), T()) )
+        elif isinstance(ie, RestOctets):
+            # rest octets
+            rest = i
+    disp = {}
+    for T8 in range(256):
+        # opt[1] is the tag length: 4 or 8
+        # opt[2] is the tag value: 0 <= T <= 255
+        match = tuple([j for j, opt in enumerate(opts) \
+                       if (opt[1] == 4 and opt[2] == T8>>4) or opt[2] == T8])
+        if match:
+            disp[T8] = match
+    return opts, rest, disp
+
+
+def _get_fixed_bl(elt):
+    """returns the bit length of a mandatory element which does not depend on
+    the buffer it is decoded from, or None
+    """
+    if elt._transauto is not None:
+        return None
+    elif elt.get_trans():
+        return 0
+    elif isinstance(elt, IE):
+        if isinstance(elt, (Type1V, Type3V)) and elt._V is not None \
+        and elt._V._blauto is None and elt._V._bl is not None:
+            return elt._V._bl
+        else:
+            return None
+    elif isinstance(elt, Atom):
+        if elt._blauto is None and elt._bl is not None:
+            return elt._bl
+        else:
+            return None
+    elif isinstance(elt, Envelope) and not isinstance(elt, TI) \
+    and elt.__class__._from_char == Envelope._from_char:
+        bl = 0
+        for e in elt._content:
+            ebl = _get_fixed_bl(e)
+            if ebl is None:
+                return None
+            bl += ebl
+        return bl
+    else:
+        return None
+
+
+def _get_scan_desc(content, opts):
+    """returns the description of a Layer3 message content for scanning a 
+    buffer without decoding it, or None if the content has no such simple layout:
+    - list of (name, kind, bit length) for each mandatory element, kind being 
+      0 for fixed-length elements, 1 for TI, 4 for LV and 6 for LV-E
+    - list of (name, kind, byte length) for each optional IE, in the order of 
+      the description returned by _get_opts_desc(), kind being 1 for TV with 
+      4 bit tag, 2 for T, 3 for TV, 4 for TLV and 6 for TLV-E
+    """
+    mand, opt, off, i = [], [], 0, 0
+    for elt in content:
+        if isinstance(elt, (Type1TV, Type2, Type3TV, Type4TLV, Type6TLVE, RestOctets)):
+            break
+        i += 1
+        if isinstance(elt, (Type4LV, Type6LVE)):
+            if off % 8:
+                return None
+            mand.append( (elt._name, 4 if isinstance(elt, Type4LV) else 6, None) )
+        elif isinstance(elt, Envelope) and not isinstance(elt, IE) and elt._content \
+        and isinstance(elt._content[0], TI) and not elt._content[0].get_trans() \
+        and elt.__class__._from_char == Envelope._from_char:
+            # standard header starting with a TI
+            if off % 8 or _get_fixed_bl(elt._content[0][2]) != 4:
+                return None
+            mand.append( (elt._content[0]._name, 1, None) )
+            for e in elt._content[1:]:
+                bl = _get_fixed_bl(e)
+                if bl is None:
+                    return None
+                elif bl:
+                    mand.append( (e._name, 0, bl) )
+                    off += bl
+        else:
+            bl = _get_fixed_bl(elt)
+            if bl is None:
+                return None
+            elif bl:
+                mand.append( (elt._name, 0, bl) )
+                off += bl
+    if off % 8:
+        return None
+    for elt in content[i:]:
+        # all mandatory elements must be before the optional part
+        if not isinstance(elt, (Type1TV, Type2, Type3TV, Type4TLV, Type6TLVE, RestOctets)):
+            return None
+    for (j, bl, T) in opts:
+        ie = content[j]
+        if isinstance(ie, Type1TV):
+            opt.append( (ie._name, 1, 0) )
+        elif isinstance(ie, Type2):
+            opt.append( (ie._name, 2, 0) )
+        elif isinstance(ie, Type3TV):
+            if ie._V is None or ie._V._blauto is not None:
+                return None
+            elif ie._V._bl is None:
+                # V takes the remaining of the buffer
+                opt.append( (ie._name, 3, None) )
+            elif ie._V._bl % 8:
+                return None
+            else:
+                opt.append( (ie._name, 3, ie._V._bl>>3) )
+        elif isinstance(ie, Type4TLV):
+            opt.append( (ie._name, 4, None) )
+        else:
+            opt.append( (ie._name, 6, None) )
+    return mand, opt
+
+
+def _get_bits(buf, off, bl):
+    """returns the unsigned integer value of bl bits at bit offset off in buf
+    """
+    o, r = off>>3, off&7
+    if off + bl > 8*len(buf):
+        raise(CharpyErr('not enough bits in buffer'))
+    return bytes_to_uint(buf[o:1+o+((r+bl)>>3)], r+bl) & ((1<<bl)-1)
+
+
 class Layer3(Envelope):
     
     ENV_SEL_TRANS = False
@@ -73,6 +210,14 @@ class Layer3(Envelope):
     # this needs to be set to True for 2G RR signaling message (due to rest octets)
     DEC_BREAK_ON_UNK_IE = False
     
+    # description of the optional part, built once per class at its first
+    # instantiation, see _get_opts_desc()
+    _opts_desc = None
+    
+    # description of the whole content for scanning buffers, built once per 
+    # class at its first scan, see _get_scan_desc()
+    _scan_desc = None
+    
     def __init__(self, *args, **kw):
         if 'val' in kw:
             val = kw['val']
@@ -87,39 +232,35 @@ class Layer3(Envelope):
             sec = None
         Envelope.__init__(self, *args, **kw)
         self._sec = sec
-        # build a list of (tag length, tag value) for the optional part
-        # configure IE set by **kw as non-transparent and set their value
-        self._opts, self._rest = [], None
-        if val is None:
-            # go faster by just looking for optional IE
-            for ie in self._content:
-                if isinstance(ie, (Type1TV, Type2, Type3TV, Type4TLV, Type6TLVE)):
-                    # optional IE
-                    T = ie[0]
-                    self._opts.append( (T.get_bl(), T(), ie) )
-                elif isinstance(ie, RestOctets):
-                    # rest octets
-                    self._rest = ie
+        # build a list of (tag length, tag value, IE) for the optional part
+        content = self._content
+        if 'GEN' in kw:
+            opts, rest, self._opts_disp = _get_opts_desc(content)
         else:
-            for ie in self._content:
-                if isinstance(ie, (Type1V, Type3V, Type4LV, Type6LVE)) and ie._name in val:
+            try:
+                opts, rest, self._opts_disp = self.__class__.__dict__['_opts_desc']
+            except KeyError:
+                desc = _get_opts_desc(content)
+                self.__class__._opts_desc = desc
+                opts, rest, self._opts_disp = desc
+        self._opts = [(bl, T, content[i]) for (i, bl, T) in opts]
+        self._rest = content[rest] if rest is not None else None
+        # configure IE set by **kw as non-transparent and set their value
+        if val is not None:
+            for ie in content:
+                if ie._name not in val:
+                    continue
+                elif isinstance(ie, (Type1V, Type3V, Type4LV, Type6LVE)):
                     # setting value for non-optional IE
                     ie.set_val({'V': val[ie._name]})
                 elif isinstance(ie, (Type1TV, Type3TV, Type4TLV, Type6TLVE)):
                     # optional IE
-                    T = ie[0]
-                    self._opts.append( (T.get_bl(), T(), ie) )
-                    if ie._name in val:
-                        ie._trans = False
-                        ie.set_val({'V': val[ie._name]})
+                    ie._trans = False
+                    ie.set_val({'V': val[ie._name]})
                 elif isinstance(ie, Type2):
                     # optional Tag-only IE
-                    self._opts.append( (8, ie[0](), ie) )
-                    if ie._name in val:
-                        ie._trans = False
-                elif isinstance(ie, RestOctets):
-                    self._rest = ie
-                elif ie._name in val:
+                    ie._trans = False
+                elif not isinstance(ie, RestOctets):
                     ie.set_val(val[ie._name])
     
     def reset_opts(self):
@@ -132,6 +273,147 @@ class Layer3(Envelope):
         """
         return [opt[2] for opt in self._opts]
     
+    @classmethod
+    def scan_bytes(cls, buf, names=None):
+        """scans a bytes' buffer containing a message of this class and returns 
+        the raw values of its IE, without instantiating the message nor 
+        decoding its content
+        
+        Args:
+            buf: bytes' buffer
+            names: set of element names to be returned, or None for all
+        
+        Returns:
+            ies: dict of element name -> raw value (V part only for IE), 
+                 int for elements shorter than 8 bits, bytes otherwise
+        
+        Raises:
+            CharpyErr: if buf is too short
+        
+        When the content of the class has no simple layout (e.g. with CSN.1 
+        or alternative elements), the message is fully decoded instead
+        """
+        try:
+            desc = cls.__dict__['_scan_desc']
+        except KeyError:
+            try:
+                Msg = cls()
+            except Exception:
+                desc = None
+            else:
+                opts, rest, disp = cls.__dict__['_opts_desc']
+                desc = _get_scan_desc(Msg._content, opts)
+                if desc is not None:
+                    if rest is not None:
+                        rest = Msg._content[rest]._name
+                    desc = desc + (disp, rest)
+            cls._scan_desc = desc
+        if desc is None:
+            return cls._scan_dec(buf, names)
+        mand, opts, disp, rest = desc
+        brk = rest is not None or cls.DEC_BREAK_ON_UNK_IE
+        ies, off = {}, 0
+        # 1) mandatory part
+        for (name, kind, bl) in mand:
+            if kind == 0:
+                if bl < 8 or bl % 8 or off % 8:
+                    val = _get_bits(buf, off, bl)
+                else:
+                    val = buf[off>>3:(off+bl)>>3]
+                    if len(val) < bl>>3:
+                        raise(CharpyErr('%s [scan_bytes]: buffer too short' % cls.__name__))
+            elif kind == 1:
+                # TI, extended when TIO is 7 and some more bytes are available
+                val, bl = _get_bits(buf, off+1, 3), 8
+                if val == 7 and len(buf) > 1 + (off>>3):
+                    val, bl = _get_bits(buf, off+9, 7), 16
+            else:
+                # LV or LV-E
+                lbl = 8 if kind == 4 else 16
+                bl  = lbl + 8*_get_bits(buf, off, lbl)
+                val = buf[(off+lbl)>>3:(off+bl)>>3]
+                if len(val) < (bl-lbl)>>3:
+                    raise(CharpyErr('%s [scan_bytes]: buffer too short' % cls.__name__))
+            if names is None or name in names:
+                ies[name] = val
+            off += bl
+        # 2) optional part
+        off, done, buflen, dec = off>>3, 0, len(buf), False
+        try:
+            while off < buflen:
+                T8, dec = buf[off], False
+                if T8 in disp:
+                    for i in disp[T8]:
+                        if not done & (1<<i):
+                            done |= 1<<i
+                            break
+                    else:
+                        i = None
+                else:
+                    i = None
+                if i is None:
+                    # unknown IEI
+                    if brk:
+                        break
+                    off += cls._scan_unk_ie(T8, buf, off)
+                    continue
+                name, kind, l = opts[i]
+                if kind == 1:
+                    val, off = T8 & 0xf, off + 1
+                elif kind == 2:
+                    val, off = b'', off + 1
+                elif kind == 3:
+                    if l is None:
+                        l = buflen-off-1
+                    val, off = buf[off+1:off+1+l], off+1+l
+                elif kind == 4:
+                    l = buf[off+1]
+                    val, off = buf[off+2:off+2+l], off+2+l
+                else:
+                    l = (buf[off+1]<<8) + buf[off+2]
+                    val, off = buf[off+3:off+3+l], off+3+l
+                if names is None or name in names:
+                    ies[name] = val
+                dec = True
+        except IndexError:
+            off = buflen + 1
+        if off > buflen:
+            raise(CharpyErr('%s [scan_bytes]: buffer too short' % cls.__name__))
+        # 3) rest octets
+        if not dec and rest is not None and (names is None or rest in names):
+            ies[rest] = buf[off:]
+        return ies
+    
+    @classmethod
+    def _scan_dec(cls, buf, names):
+        # decodes the message and returns the raw values of its elements
+        Msg = cls()
+        Msg.from_bytes(buf)
+        ies = {}
+        for elt in Msg._content:
+            if elt.get_trans() or (names is not None and elt._name not in names):
+                continue
+            elif isinstance(elt, IE):
+                if elt._V is None:
+                    ies[elt._name] = b''
+                elif isinstance(elt, (Type1V, Type1TV)):
+                    ies[elt._name] = elt._V.get_val()
+                else:
+                    ies[elt._name] = elt._V.to_bytes()
+            elif elt.get_bl() < 8:
+                ies[elt._name] = elt.to_uint()
+            else:
+                ies[elt._name] = elt.to_bytes()
+        return ies
+    
+    @classmethod
+    def _scan_unk_ie(cls, T8, buf, off):
+        # returns the byte length of an unknown IE, see _dec_unk_ie()
+        if T8 & 0x80:
+            return 1
+        else:
+            return 2 + buf[off+1]
+    
     def _from_char(self, char):
         # in case some optional IE are set (with transparency enabled)
         # they are decoded as much as the char buffer allows it
@@ -142,19 +424,20 @@ class Layer3(Envelope):
             self.DEC_BREAK_ON_UNK_IE = True
         Envelope._from_char(self, char)
         # 2) decode optional part
-        opts, dec = self._opts[:], False
+        # the IEI dispatch table provides the optional IEs matching a given tag,
+        # each optional IE being decoded at most once
+        opts, disp, done, dec = self._opts, self._opts_disp, 0, False
         while char.len_bit() >= 8:
-            T4, T8, dec = char.to_uint(4), char.to_uint(8), False
-            for i, opt in enumerate(opts):
-                # check the list of optional IEs in order
-                # opt[0] is the tag length: 4 or 8
-                # opt[1] is the tag value: 0 <= T <= 255
-                if (opt[0] == 4 and opt[1] == T4) or opt[1] == T8:
-                    opt[2]._trans = False
-                    opt[2]._from_char(char)
-                    dec = True
-                    del opts[i]
-                    break
+            T8, dec = char.to_uint(8), False
+            if T8 in disp:
+                for i in disp[T8]:
+                    if not done & (1<<i):
+                        done |= 1<<i
+                        opt = opts[i][2]
+                        opt._trans = False
+                        opt._from_char(char)
+                        dec = True
+                        break
             if not dec:
                 # unknown IEI
                 if self.DEC_BREAK_ON_UNK_IE:
@@ -202,6 +485,15 @@ class Layer3(Envelope):
 
 class Layer3E(Layer3):
     
+    @classmethod
+    def _scan_unk_ie(cls, T8, buf, off):
+        if T8 & 0x80:
+            return 1
+        elif T8 & 0x70 == 0x70:
+            return 3 + (buf[off+1]<<8) + buf[off+2]
+        else:
+            return 2 + buf[off+1]
+    
     def _dec_unk_ie(self, T8, char):
         if T8 & 0x80:
             # Type1TV IE, could also be a Type2 IE
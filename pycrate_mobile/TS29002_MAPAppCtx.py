@@ -27,6 +27,9 @@
 # *--------------------------------------------------------
 #*/
 
+from time import time
+
+from pycrate_core.utils             import PycrateErr
 from pycrate_asn1dir.TCAP_MAPv2v3   import GLOBAL as GLOBAL_MAPv2v3
 
 
@@ -104,20 +107,7 @@ def get_operation_pkgs(opcode, mode='S'):
     
     mode:  'S' for Supplier (initiator) or 'C' for Consumer (responder)
     """
-    ret = {}
-    key = 'Supplier' if mode in ('s', 'S') else 'Consumer' 
-    for opname in list_operation_pkg_names():
-        opval = GLOBAL_MAPv2v3.MOD['MAPv2v3-Application'][opname]._val
-        if key not in opval:
-            continue
-        for oval in opval[key].getv():
-            if oval['operationCode'] == ('local', opcode):
-                if opname in ret:
-                    assert(ret[opname] == opval)
-                    pass
-                else:
-                    ret[opname] = opval
-    return ret
+    return dict(_OperationPkgsInd.get((opcode, 'S' if mode in ('s', 'S') else 'C'), ()))
 
 
 def get_application_ctx(oid):
@@ -139,35 +129,377 @@ def get_application_ctxs(opcode, mode='I'):
     
     mode: 'I' for Initiator or 'R' for Responder
     """
-    ret    = {}
-    key    = ('Symmetric', 'InitiatorConsumerOf') if mode in ('I', 'i') else ('Symmetric', 'ResponderConsumerOf')
-    keyrev = ('Symmetric', 'ResponderConsumerOf') if mode in ('I', 'i') else ('Symmetric', 'InitiatorConsumerOf') 
-    for acname in list_application_ctx_names():
-        acval = GLOBAL_MAPv2v3.MOD['MAPv2v3-Application'][acname]._val
-        # looking at Supplier within the Initiator potential operation-package
-        for k in key:
-            if k in acval:
-                for opval in acval[k].getv():
-                    # here, we look at "Supplier" within the operation-package
-                    if 'Supplier' in opval:
-                        for oval in opval['Supplier'].getv():
-                            if oval['operationCode'] == ('local', opcode):
-                                if acname in ret:
-                                    assert(ret[acname] == acval)
-                                else:
-                                    ret[acname] = acval
-        #
-        # looking at Consumer within the Responder potential operation-package
-        for k in keyrev:
-            if k in acval:
-                for opval in acval[k].getv():
-                    if 'Consumer' in opval:
-                        for oval in opval['Consumer'].getv():
-                            if oval['operationCode'] == ('local', opcode):
-                                if acname in ret:
-                                    assert(ret[acname] == acval)
-                                else:
-                                    ret[acname] = acval
-    #
-    return ret
+    return dict(_ApplicationCtxsInd.get((opcode, 'I' if mode in ('I', 'i') else 'R'), ()))
+
+
+# the lookups above are served from the following dicts, indexed once at import
+# with (opcode, mode) keys and (name, value) items, in the order of definition
+
+def _index_ops(ind, name, val, opset, modes):
+    for oval in opset.getv():
+        t, opcode = oval['operationCode']
+        if t != 'local':
+            continue
+        for mode in modes:
+            if (opcode, mode) not in ind:
+                ind[(opcode, mode)] = {name: val}
+            elif name not in ind[(opcode, mode)]:
+                ind[(opcode, mode)][name] = val
+
+
+_OperationPkgsInd = {}
+for opname in list_operation_pkg_names():
+    opval = GLOBAL_MAPv2v3.MOD['MAPv2v3-Application'][opname]._val
+    for key, mode in (('Supplier', 'S'), ('Consumer', 'C')):
+        if key in opval:
+            _index_ops(_OperationPkgsInd, opname, opval, opval[key], (mode, ))
+
+_ApplicationCtxsInd = {}
+for acname in list_application_ctx_names():
+    acval = GLOBAL_MAPv2v3.MOD['MAPv2v3-Application'][acname]._val
+    # Supplier of the Initiator operation-packages are invoked by the initiator,
+    # Consumer of them by the responder, and conversely for the Responder ones
+    for key, sup_modes, con_modes in (
+        ('Symmetric', ('I', 'R'), ('I', 'R')),
+        ('InitiatorConsumerOf', ('I', ), ('R', )),
+        ('ResponderConsumerOf', ('R', ), ('I', ))):
+        if key in acval:
+            for opval in acval[key].getv():
+                if 'Supplier' in opval:
+                    _index_ops(_ApplicationCtxsInd, acname, acval, opval['Supplier'], sup_modes)
+                if 'Consumer' in opval:
+                    _index_ops(_ApplicationCtxsInd, acname, acval, opval['Consumer'], con_modes)
+
+del opname, opval, acname, acval, key, mode, sup_modes, con_modes
+
+
+#------------------------------------------------------------------------------#
+# MAP over TCAP fast decoding
+#------------------------------------------------------------------------------#
+# TCAP messages, dialogue and component headers are decoded with a minimal BER
+# parser, and the MAP parameters are only decoded with the ASN.1 runtime for
+# the operations selected by the caller
+
+# TCAP message types
+_TCAPMsgType_dict = {
+    0x61 : 'unidirectional',
+    0x62 : 'begin',
+    0x64 : 'end',
+    0x65 : 'continue',
+    0x67 : 'abort'
+    }
+
+# TCAP component types
+_TCAPCompType_dict = {
+    0xa1 : 'invoke',
+    0xa2 : 'returnResultLast',
+    0xa3 : 'returnError',
+    0xa4 : 'reject',
+    0xa7 : 'returnResultNotLast'
+    }
+
+# ASN.1 objects for decoding MAP parameters
+# opcode -> list of ASN.1 objects, one per MAP version
+_OpArgTypes, _OpResTypes = {}, {}
+# opcode -> set of local errcodes, for all MAP versions
+_OpErrCodes = {}
+for oval in Operations._val.getv():
+    t, opcode = oval['operationCode']
+    if t == 'local':
+        for key, lut in (('ArgumentType', _OpArgTypes), ('ResultType', _OpResTypes)):
+            if key in oval and all(oval[key] is not Obj for Obj in lut.get(opcode, ())):
+                lut.setdefault(opcode, []).append(oval[key])
+        if 'Errors' in oval:
+            _OpErrCodes.setdefault(opcode, set()).update(
+                [errval['errorCode'][1] for errval in oval['Errors'].getv() \
+                 if errval['errorCode'][0] == 'local'])
+
+# errcode -> list of ASN.1 objects, one per MAP version
+_ErrParamTypes = {}
+for errcode, errvals in Errors.items():
+    for errval in errvals:
+        if 'ParameterType' in errval and \
+        all(errval['ParameterType'] is not Obj for Obj in _ErrParamTypes.get(errcode, ())):
+            _ErrParamTypes.setdefault(errcode, []).append(errval['ParameterType'])
+
+del oval, t, opcode, key, lut, errcode, errvals, errval
+
+
+def _ber_tlv(buf, off, end):
+    # returns the tag (1st byte), value offset, value end and TLV end of the BER
+    # TLV at offset `off' in `buf'
+    if off + 2 > end:
+        raise(PycrateErr('BER TLV too short'))
+    tag = buf[off]
+    off += 1
+    if tag & 0x1f == 0x1f:
+        # multi-bytes tag
+        while off < end and buf[off] & 0x80:
+            off += 1
+        off += 1
+        if off >= end:
+            raise(PycrateErr('BER TLV too short'))
+    l = buf[off]
+    off += 1
+    if l == 0x80:
+        # indefinite length form, the value ends with the end-of-contents octets
+        if not tag & 0x20:
+            raise(PycrateErr('invalid BER indefinite length for a primitive value'))
+        vend = _ber_eoc(buf, off, end)
+        return tag, off, vend, vend + 2
+    elif l & 0x80:
+        l &= 0x7f
+        if l > 4:
+            raise(PycrateErr('unsupported BER length prefix, {0}'.format(l)))
+        elif off + l > end:
+            raise(PycrateErr('BER TLV too short'))
+        off, l = off + l, int.from_bytes(buf[off:off+l], 'big')
+    if off + l > end:
+        raise(PycrateErr('BER value overflow'))
+    return tag, off, off + l, off + l
+
+
+def _ber_eoc(buf, off, end):
+    # returns the offset of the end-of-contents octets terminating the value 
+    # at offset `off' in `buf'
+    while off + 2 <= end:
+        if buf[off] == 0 and buf[off+1] == 0:
+            return off
+        off = _ber_tlv(buf, off, end)[3]
+    raise(PycrateErr('BER end-of-contents octets missing'))
+
+
+def _ber_int(buf):
+    return int.from_bytes(buf, 'big', signed=True)
+
+
+def _ber_oid(buf):
+    arcs, v = [], 0
+    for b in buf:
+        v = (v << 7) | (b & 0x7f)
+        if not b & 0x80:
+            arcs.append(v)
+            v = 0
+    if not arcs:
+        return ()
+    elif arcs[0] < 80:
+        return (arcs[0] // 40, arcs[0] % 40) + tuple(arcs[1:])
+    else:
+        return (2, arcs[0] - 80) + tuple(arcs[1:])
+
+
+def _ber_code(tag, buf):
+    # local (INTEGER) or global (OBJECT IDENTIFIER) operation or error code
+    return _ber_int(buf) if tag == 0x02 else _ber_oid(buf)
+
+
+def _decode_dlg(buf, off, end):
+    # returns the application-context name from a TCAP dialogue portion
+    tag, off, end, _ = _ber_tlv(buf, off, end)
+    if tag != 0x28:
+        # not an EXTERNAL
+        return None
+    while off < end:
+        tag, voff, vend, nxt = _ber_tlv(buf, off, end)
+        if tag == 0xa0:
+            # single-ASN1-type, containing a DialoguePDU or UniDialoguePDU
+            tag, voff, vend, _ = _ber_tlv(buf, voff, vend)
+            while voff < vend:
+                tag, aoff, aend, anxt = _ber_tlv(buf, voff, vend)
+                if tag == 0xa1:
+                    tag, aoff, aend, _ = _ber_tlv(buf, aoff, aend)
+                    if tag == 0x06:
+                        return _ber_oid(buf[aoff:aend])
+                voff = anxt
+            return None
+        off = nxt
+    return None
+
+
+def _decode_comp(buf, off, end):
+    # returns (CompType, InvokeID, Code, Param) for a TCAP component
+    comp_type, off, end, _ = _ber_tlv(buf, off, end)
+    if comp_type not in _TCAPCompType_dict:
+        raise(PycrateErr('invalid TCAP component tag, 0x{0:02x}'.format(comp_type)))
+    tag, voff, vend, off = _ber_tlv(buf, off, end)
+    iid  = _ber_int(buf[voff:vend]) if tag == 0x02 else None
+    code, param = None, None
+    if comp_type == 0xa1:
+        # invoke
+        tag, voff, vend, off = _ber_tlv(buf, off, end)
+        if tag == 0x80:
+            # linkedId
+            tag, voff, vend, off = _ber_tlv(buf, off, end)
+        code = _ber_code(tag, buf[voff:vend])
+    elif comp_type in (0xa2, 0xa7):
+        # returnResult
+        if off < end:
+            tag, off, end, _ = _ber_tlv(buf, off, end)
+            tag, voff, vend, off = _ber_tlv(buf, off, end)
+            code = _ber_code(tag, buf[voff:vend])
+    elif comp_type == 0xa3:
+        # returnError
+        tag, voff, vend, off = _ber_tlv(buf, off, end)
+        code = _ber_code(tag, buf[voff:vend])
+    if off < end:
+        # parameter, or problem in case of reject
+        param = bytes(buf[off:_ber_tlv(buf, off, end)[3]])
+    return comp_type, iid, code, param
+
+
+def decode_TCAP_MAP_hdr(buf):
+    """decodes the TCAP message `buf' without decoding the MAP parameters, and 
+    returns a 5-tuple (MsgType, OTID, DTID, ACN, Comps)
+    
+    MsgType is the TCAP message tag (e.g. 0x62 for begin), OTID and DTID are the
+    transaction ids buffers or None, ACN is the application-context name OID or
+    None, and Comps is the list of components, each one being a 4-tuple
+    (CompType, InvokeID, Code, Param) with CompType the component tag (e.g. 0xa1
+    for invoke), Code the operation or error code, and Param the encoded MAP
+    parameter buffer or None
+    
+    raises PycrateErr if `buf' is invalid
+    """
+    msg_type, off, end, _ = _ber_tlv(buf, 0, len(buf))
+    if msg_type not in _TCAPMsgType_dict:
+        raise(PycrateErr('invalid TCAP message tag, 0x{0:02x}'.format(msg_type)))
+    otid, dtid, acn, comps = None, None, None, []
+    while off < end:
+        tag, voff, vend, nxt = _ber_tlv(buf, off, end)
+        if tag == 0x48:
+            otid = bytes(buf[voff:vend])
+        elif tag == 0x49:
+            dtid = bytes(buf[voff:vend])
+        elif tag == 0x6b:
+            acn = _decode_dlg(buf, voff, vend)
+        elif tag == 0x6c:
+            while voff < vend:
+                comp_end = _ber_tlv(buf, voff, vend)[3]
+                comps.append( _decode_comp(buf, voff, comp_end) )
+                voff = comp_end
+        off = nxt
+    return msg_type, otid, dtid, acn, comps
+
+
+def decode_MAP_param(comp_type, code, param):
+    """decodes the encoded MAP parameter `param' from a TCAP component of type
+    `comp_type' and operation or error code `code', as returned within Comps by
+    decode_TCAP_MAP_hdr(), and returns its ASN.1 value
+    
+    when several MAP versions define the operation or error, the 1st one 
+    successfully decoding `param' is used
+    
+    raises PycrateErr if `param' cannot be decoded
+    """
+    if comp_type == 0xa1:
+        objs = _OpArgTypes.get(code, ())
+    elif comp_type in (0xa2, 0xa7):
+        objs = _OpResTypes.get(code, ())
+    elif comp_type == 0xa3:
+        objs = _ErrParamTypes.get(code, ())
+    else:
+        objs = ()
+    for Obj in objs:
+        try:
+            Obj.from_ber(param)
+        except PycrateErr:
+            pass
+        else:
+            return Obj.get_val()
+    raise(PycrateErr('unable to decode MAP parameter for code {0!r}'.format(code)))
+
+
+class MAPDecoder(object):
+    """TCAP / MAP decoder, for batches of TCAP messages (e.g. SCCP user data)
+    
+    only TCAP headers are decoded, and MAP parameters are decoded only for the
+    operations (and their errors) set in OPS
+    
+    attributes:
+        OPS: None to decode the MAP parameters for all operations, or set of 
+            local opcodes
+        Stats: dict of counters, updated by decode_batch()
+    
+    the errors of the operations in OPS are looked up at initialization, hence 
+    OPS must not be changed afterwards
+    """
+    
+    OPS = None
+    
+    def __init__(self, ops=None):
+        if ops is not None:
+            self.OPS = set(ops)
+        if self.OPS is not None:
+            # returnError components carry an errcode, not the opcode
+            self._errs = set()
+            for opcode in self.OPS:
+                self._errs.update(_OpErrCodes.get(opcode, ()))
+        else:
+            self._errs = None
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """resets the throughput statistics
+        """
+        self.Stats = {'msg': 0, 'err': 0, 'bytes': 0, 'comp': 0, 'param': 0, 'time': 0.0}
+    
+    def get_stats(self):
+        """returns the throughput statistics, with the rates of messages and 
+        bytes decoded per second
+        """
+        stats, t = dict(self.Stats), self.Stats['time']
+        stats['msg_rate']  = stats['msg'] / t if t else 0.0
+        stats['byte_rate'] = stats['bytes'] / t if t else 0.0
+        return stats
+    
+    def decode(self, buf):
+        """decodes the TCAP message `buf' like decode_TCAP_MAP_hdr(), and also
+        the MAP parameters of the selected operations
+        
+        Returns:
+            5-tuple (MsgType, OTID, DTID, ACN, Comps), each component being a 
+            5-tuple (CompType, InvokeID, Code, Param, Val) with Val the decoded
+            MAP parameter value or None
+        
+        Raises:
+            PycrateErr if `buf' is invalid
+        """
+        msg_type, otid, dtid, acn, comps = decode_TCAP_MAP_hdr(buf)
+        ops, errs, ret = self.OPS, self._errs, []
+        for comp_type, iid, code, param in comps:
+            if param is not None and comp_type != 0xa4 and \
+            (ops is None or code in (errs if comp_type == 0xa3 else ops)):
+                ret.append( (comp_type, iid, code, param, decode_MAP_param(comp_type, code, param)) )
+            else:
+                ret.append( (comp_type, iid, code, param, None) )
+        return msg_type, otid, dtid, acn, ret
+    
+    def decode_batch(self, bufs):
+        """decodes the iterable of TCAP messages `bufs' with decode(), and 
+        updates the throughput statistics
+        
+        Returns:
+            list of decoded messages, with None for each invalid message
+        """
+        ret, dec, err, byt, comp, param = [], self.decode, 0, 0, 0, 0
+        t0 = time()
+        for buf in bufs:
+            byt += len(buf)
+            try:
+                msg = dec(buf)
+            except PycrateErr:
+                ret.append(None)
+                err += 1
+            else:
+                ret.append(msg)
+                comp += len(msg[4])
+                param += sum(1 for c in msg[4] if c[4] is not None)
+        stats = self.Stats
+        stats['time']  += time() - t0
+        stats['msg']   += len(ret)
+        stats['err']   += err
+        stats['bytes'] += byt
+        stats['comp']  += comp
+        stats['param'] += param
+        return ret
 
@@ -70,9 +70,11 @@ __all__ = [
 
 import re
 from enum   import IntEnum
+from struct import pack_into
 
 from pycrate_core.utils     import *
 from pycrate_core.elt       import *
+from pycrate_core.elt       import _with_json
 from pycrate_core.base      import *
 from pycrate_core.charpy    import *
 
@@ -153,11 +155,39 @@ class BitFlags(Envelope):
         Envelope._from_char(self, char)
 
 
+def _get_data_buf(elt, char, minlen):
+    """returns the bytes' buffer to be decoded by the fixed-format IE `elt`, 
+    according to its length automation, and ensures it is at least `minlen`
+    bytes long
+    """
+    if elt._blauto is not None:
+        bl = elt._blauto()
+        if bl > char.len_bit():
+            raise(EltErr('{0} [_from_char]: bit length overflow'.format(elt._name)))
+        buf = char.get_bytes(bl)
+    else:
+        buf = char.get_bytes()
+    if len(buf) < minlen:
+        raise(CharpyErr('{0} [_from_char]: buffer too short'.format(elt._name)))
+    return buf
+
+
+# Some fixed-format IEs which are found many times in PFCP sessions' messages
+# (e.g. within PDR, FAR, URR and QER) have their _from_char() method unpacking
+# their buffer directly with struct, instead of dispatching the decoding to each
+# element of their content
+
 class _IEExtUint32(Envelope):
     _GEN = (
         Uint32('Val'),
         Buf('ext', val=b'', rep=REPR_HEX)
         )
+    
+    def _from_char(self, char):
+        if self.get_trans():
+            return
+        buf = _get_data_buf(self, char, 4)
+        self._content[0]._val, self._content[1]._val = unpack('>I', buf[:4])[0], buf[4:]
 
 
 class _LU8V(Envelope):
@@ -489,10 +519,138 @@ PFCPIEType_dict = {
 PFCPIEType = IntEnum('PFCPIEType', {strip_name(v): k for k, v in PFCPIEType_dict.items()})
 
 
-class PFCPIE(Envelope):
+# Information Elements with a Data part decoded lazily, and sequences of them 
+# indexed by IE identifier, shared with GTPv2-C (see TS29274_GTPC)
+
+class _LazyIE(Envelope):
+    """Information Element which Data part can be kept as raw bytes when 
+    decoding the IE, and decoded with its dedicated object only when it is 
+    accessed
+    
+    subclasses set the index and hierarchy level of the Data part in their 
+    content in _DATA_IND and _DATA_HIER, the keys of the header fields that can
+    be accessed without decoding the Data part in _HDR_KEYS, and implement 
+    _set_data_cls()
+    """
+    
+    # this is to keep the Data part as raw bytes when decoding the IE, and to
+    # decode it with its dedicated object only when it is accessed
+    DEC_LAZY = True
+    
+    _lazy = False
+    
+    _DATA_IND  = 1
+    _DATA_HIER = 0
+    _HDR_KEYS  = (0, )
+    
+    def _init_data_attr(self):
+        data = self._content[self._DATA_IND]
+        if isinstance(data, Buf):
+            self._data_raw = data
+            self._data_cls = None
+        else:
+            self._data_raw = None
+            self._data_cls = data
+    
+    def _set_data_raw(self):
+        if not hasattr(self, '_data_raw'):
+            self._init_data_attr()
+        data = self._content[self._DATA_IND]
+        if self._data_raw is None:
+            self._data_raw = Buf('Data', rep=REPR_HEX, hier=self._DATA_HIER)
+            self._data_raw.set_blauto(lambda: self._get_data_len())
+        if data != self._data_raw:
+            self.replace(data, self._data_raw)
+    
+    def _dec_lazy(self):
+        self._lazy = False
+        buf = self._content[self._DATA_IND].get_val()
+        # 1st try decoding with the structured Data
+        self._set_data_cls()
+        if self._content[self._DATA_IND] is not self._data_raw:
+            try:
+                self._content[self._DATA_IND].from_bytes(buf)
+            except PycrateErr:
+                # 2nd keep the raw Data
+                self._set_data_raw()
+    
+    # all methods accessing the Data part need to decode it first when lazy,
+    # except length computation and encoding which are done with the raw Data
+    
+    def __getitem__(self, key):
+        if self._lazy and key not in self._HDR_KEYS:
+            self._dec_lazy()
+        return Envelope.__getitem__(self, key)
+    
+    def __setitem__(self, key, val):
+        if self._lazy:
+            self._dec_lazy()
+        return Envelope.__setitem__(self, key, val)
+    
+    def __iter__(self):
+        if self._lazy:
+            self._dec_lazy()
+        return Envelope.__iter__(self)
+    
+    def get_bl(self):
+        if self._lazy:
+            return sum([elt.get_bl() for elt in self._content])
+        else:
+            return Envelope.get_bl(self)
+    
+    def clone(self):
+        if self._lazy:
+            self._dec_lazy()
+        return Envelope.clone(self)
+    
+    def repr(self):
+        if self._lazy:
+            self._dec_lazy()
+        return Envelope.repr(self)
+    
+    __repr__ = repr
+    
+    if _with_json:
+        
+        def _from_jval(self, val):
+            if self._lazy:
+                self._dec_lazy()
+            Envelope._from_jval(self, val)
+        
+        def _to_jval(self):
+            if self._lazy:
+                self._dec_lazy()
+            return Envelope._to_jval(self)
+
+
+class _IndexedIEs(Sequence):
+    """Sequence of Information Elements, indexed by IE identifier once decoded
+    
+    subclasses implement _get_ie_id(), returning the identifier of an IE
+    """
+    
+    _ie_ind = None
+    
+    def _index_ies(self):
+        ind, get_ie_id = {}, self._get_ie_id
+        for ie in self._content:
+            ind.setdefault(get_ie_id(ie), []).append(ie)
+        return ind
+    
+    def _get_ies(self, ie_id):
+        if self._ie_ind is None:
+            self._ie_ind = self._index_ies()
+        return self._ie_ind.get(ie_id, [])
+
+
+class PFCPIE(_LazyIE):
     """PFCP Information Element
     """
     
+    _DATA_IND  = 3
+    _DATA_HIER = 0
+    _HDR_KEYS  = (0, 1, 2, 'Type', 'Len', 'EID')
+    
     _GEN = (
         Uint16('Type', val=0, dic=PFCPIEType_dict),
         Uint16('Len'),
@@ -520,23 +678,6 @@ class PFCPIE(Envelope):
         else:
             return self[1].get_val() << 3
     
-    def _init_data_attr(self):
-        if isinstance(self[3], Buf):
-            self._data_raw = self[3]
-            self._data_cls = None
-        else:
-            self._data_raw = None
-            self._data_cls = self[3]
-    
-    def _set_data_raw(self):
-        if not hasattr(self, '_data_raw'):
-            self._init_data_attr()
-        if self._data_raw is None:
-            self._data_raw = Buf('Data', rep=REPR_HEX)
-            self._data_raw.set_blauto(lambda: self._get_data_len())
-        if self[3] != self._data_raw:
-            self.replace(self[3], self._data_raw)
-    
     def _set_data_cls(self):
         if not hasattr(self, '_data_cls'):
             self._init_data_attr()
@@ -565,6 +706,8 @@ class PFCPIE(Envelope):
     # - bytes, assigned to the Buf raw object
     # - dedicated type, assigned to the dedicated object
     def set_val(self, val):
+        if self._lazy:
+            self._dec_lazy()
         if isinstance(val, (tuple, list)) and 1 <= len(val) <= 4:
             self[0].set_val(val[0])
             if len(val) > 1:
@@ -597,12 +740,26 @@ class PFCPIE(Envelope):
     
     # _from_char() method attempts to decode Data with the dedicated object
     # and fallbacks to the Buf raw object if failing with the former.
+    # With DEC_LAZY, Data is decoded as raw bytes and the dedicated object is
+    # used only when the IE content is accessed, see _dec_lazy().
     def _from_char(self, char):
         if self.get_trans():
             return
-        self[0]._from_char(char)
-        self[1]._from_char(char)
-        self[2]._from_char(char)
+        self._lazy = False
+        ie_type, ie_len, ie_eid = self._content[0:3]
+        if char.len_bit() < 32:
+            raise(CharpyErr('{0} [_from_char]: buffer too short'.format(self._name)))
+        ie_type._val, ie_len._val = unpack('>HH', char.get_bytes(32))
+        if ie_type._val & 0x8000:
+            # EID present
+            ie_eid._from_char(char)
+        if self.DEC_LAZY:
+            self._set_data_raw()
+            self._content[3]._from_char(char)
+            if ie_type._val in PFCPIELUT:
+                self._name = PFCPIELUT[ie_type._val].__name__
+                self._lazy = True
+            return
         # 1st try decoding with the structured Data
         char_cur = char._cur
         self._set_data_cls()
@@ -613,9 +770,35 @@ class PFCPIE(Envelope):
             char._cur = char_cur
             self._set_data_raw()
             self[3]._from_char(char)
+    
+    def _write(self, ba):
+        # encodes the IE at the end of the bytearray `ba'
+        if self.get_trans():
+            return
+        ie_type, ie_len, ie_eid, data = self._content
+        off, t = len(ba), ie_type.get_val()
+        if not ie_eid.get_trans():
+            ba.extend(pack('>HHH', t, 0, ie_eid.get_val()))
+        else:
+            ba.extend(pack('>HH', t, 0))
+        if isinstance(data, PFCPIEs):
+            data._write(ba)
+        else:
+            ba.extend(data.to_bytes())
+        if ie_len._val is not None:
+            pack_into('>H', ba, off+2, ie_len._val)
+        else:
+            pack_into('>H', ba, off+2, len(ba)-off-4)
+    
+    def _to_pack(self):
+        if self.get_trans():
+            return []
+        ba = bytearray()
+        self._write(ba)
+        return [(TYPE_BYTES, bytes(ba), len(ba)<<3)]
 
 
-class PFCPIEs(Sequence):
+class PFCPIEs(_IndexedIEs):
     """PFCP Grouped Information Element
     """
     
@@ -636,6 +819,7 @@ class PFCPIEs(Sequence):
     MAND = set()
     OPT  = set()
     
+    # Each decoded sequence of IEs is indexed by Type, see get_ie() and get_ies()
     
     def __init__(self, *args, **kwargs):
         Sequence.__init__(self, *args, **kwargs)
@@ -644,6 +828,7 @@ class PFCPIEs(Sequence):
             self.init_ies(wopt=False)
     
     def set_val(self, vals):
+        self._ie_ind = None
         Sequence.set_val(self, vals)
         if self._SET_MAND:
             # ensure at least all mandatory IEs are there
@@ -662,22 +847,55 @@ class PFCPIEs(Sequence):
         if self._content:
             # reinitialize the Sequence to an empty one
             self.clear()
+        self._ie_ind, self._ie_mand = None, set()
         # decode the sequence of IEs, whatever they are
         Sequence._from_char(self, char)
         #
-        # eventually verify mandatory IE
-        if self.VERIF_MAND:
-            self._ie_mand = set(self.MAND)
-            for ie in self:
-                self._ie_mand.discard( ie[0].get_val() )
-            if self._ie_mand:
-                raise(PFCPDecErr('{0}: missing mandatory IE(s), {1}'\
-                      .format(self._name, ', '.join(['%i (%s)' % (i, PFCPIEType_dict[i]) for i in self._ie_mand]))))
+        # index IEs, and eventually verify mandatory IE
+        self._ie_ind = self._index_ies()
+        self._ie_mand = set(self.MAND).difference(self._ie_ind)
+        if self.VERIF_MAND and self._ie_mand:
+            raise(PFCPDecErr('{0}: missing mandatory IE(s), {1}'\
+                  .format(self._name, ', '.join(['%i (%s)' % (i, PFCPIEType_dict[i]) for i in self._ie_mand]))))
+    
+    def _get_ie_id(self, ie):
+        return ie._content[0].get_val()
+    
+    def get_ie(self, ie_type):
+        """returns the first IE of given type `ie_type`, or None
+        """
+        ies = self._get_ies(ie_type)
+        return ies[0] if ies else None
+    
+    def get_ies(self, ie_type):
+        """returns the list of IEs of given type `ie_type`
+        """
+        return self._get_ies(ie_type)
+    
+    def _write(self, ba):
+        # encodes the sequence of IEs at the end of the bytearray `ba'
+        if not self.get_trans():
+            for ie in self._content:
+                ie._write(ba)
+    
+    def _to_pack(self):
+        if self.get_trans():
+            return []
+        ba = bytearray()
+        self._write(ba)
+        return [(TYPE_BYTES, bytes(ba), len(ba)<<3)]
+    
+    if _with_json:
+        
+        def _from_jval(self, val):
+            self._ie_ind = None
+            Sequence._from_jval(self, val)
     
     def add_ie(self, ie_type, val=None):
         """add the IE of given type `ie_type` and sets the value `val` (raw bytes 
         buffer or structured data) into its data part
         """
+        self._ie_ind = None
         v = {'Type': ie_type}
         if val is not None:
             v['Data'] = val
@@ -687,6 +905,7 @@ class PFCPIEs(Sequence):
     def rem_ie(self, ie_type):
         """remove the IE of given type `ie_type`
         """
+        self._ie_ind = None
         for ie in self._content[::-1]:
             if ie['Type'].get_val() == ie_type:
                 self._content.remove(ie)
@@ -2123,6 +2342,31 @@ class FTEID(Envelope):
         self['IPv4Addr'].set_transauto(lambda: False if self['V4'].get_val() and not self['CH'].get_val() else True)
         self['IPv6Addr'].set_transauto(lambda: False if self['V6'].get_val() and not self['CH'].get_val() else True)
         self['CHOOSE_ID'].set_transauto(lambda: False if self['CHID'].get_val() else True)
+    
+    def _from_char(self, char):
+        if self.get_trans():
+            return
+        buf = _get_data_buf(self, char, 1)
+        spare, chid, ch, v6, v4, teid, ipv4, ipv6, chooseid, ext = self._content
+        flags = ord(buf[:1])
+        spare._val, chid._val, ch._val, v6._val, v4._val = \
+            flags>>4, (flags>>3)&1, (flags>>2)&1, (flags>>1)&1, flags&1
+        off = 1
+        if not ch._val:
+            if len(buf) < 5:
+                raise(CharpyErr('{0} [_from_char]: buffer too short'.format(self._name)))
+            teid._val, off = unpack('>I', buf[1:5])[0], 5
+            if v4._val:
+                ipv4._val, off = buf[off:off+4], off+4
+            if v6._val:
+                ipv6._val, off = buf[off:off+16], off+16
+        if chid._val:
+            chooseid._val, off = buf[off:off+1], off+1
+        if off > len(buf):
+            raise(CharpyErr('{0} [_from_char]: buffer too short'.format(self._name)))
+        if chid._val:
+            chooseid._val = ord(chooseid._val)
+        ext._val = buf[off:]
 
 
 #------------------------------------------------------------------------------#
@@ -2707,6 +2951,12 @@ class PDRID(Envelope):
         Uint16('Val'),
         Buf('ext', val=b'', rep=REPR_HEX)
         )
+    
+    def _from_char(self, char):
+        if self.get_trans():
+            return
+        buf = _get_data_buf(self, char, 2)
+        self._content[0]._val, self._content[1]._val = unpack('>H', buf[:2])[0], buf[2:]
 
 
 #------------------------------------------------------------------------------#
@@ -2732,6 +2982,22 @@ class FSEID(Envelope):
         Envelope.__init__(self, *args, **kwargs)
         self['IPv4Addr'].set_transauto(lambda: False if self['V4'].get_val() else True)
         self['IPv6Addr'].set_transauto(lambda: False if self['V6'].get_val() else True)
+    
+    def _from_char(self, char):
+        if self.get_trans():
+            return
+        buf = _get_data_buf(self, char, 9)
+        spare, v4, v6, seid, ipv4, ipv6, ext = self._content
+        flags, seid._val = unpack('>BQ', buf[:9])
+        spare._val, v4._val, v6._val = flags>>2, (flags>>1)&1, flags&1
+        off = 9
+        if v4._val:
+            ipv4._val, off = buf[off:off+4], off+4
+        if v6._val:
+            ipv6._val, off = buf[off:off+16], off+16
+        if off > len(buf):
+            raise(CharpyErr('{0} [_from_char]: buffer too short'.format(self._name)))
+        ext._val = buf[off:]
 
 
 #------------------------------------------------------------------------------#
@@ -3238,6 +3504,34 @@ class UEIPAddress(Envelope):
         self['IPv6Addr'].set_transauto(lambda: False if self['V6'].get_val() else True)
         self['IPv6PrefDeleg'].set_transauto(lambda: False if self['IPv6D'].get_val() else True)
         self['IPv6PrefLen'].set_transauto(lambda: False if self['IP6PL'].get_val() else True)
+    
+    def _from_char(self, char):
+        if self.get_trans():
+            return
+        buf = _get_data_buf(self, char, 1)
+        spare, ip6pl, chv6, chv4, ipv6d, sd, v4, v6, ipv4, ipv6, prefdeleg, preflen, ext = \
+            self._content
+        flags = ord(buf[:1])
+        spare._val, ip6pl._val, chv6._val, chv4._val = \
+            flags>>7, (flags>>6)&1, (flags>>5)&1, (flags>>4)&1
+        ipv6d._val, sd._val, v4._val, v6._val = \
+            (flags>>3)&1, (flags>>2)&1, (flags>>1)&1, flags&1
+        off = 1
+        if v4._val:
+            ipv4._val, off = buf[off:off+4], off+4
+        if v6._val:
+            ipv6._val, off = buf[off:off+16], off+16
+        if ipv6d._val:
+            prefdeleg._val, off = buf[off:off+1], off+1
+        if ip6pl._val:
+            preflen._val, off = buf[off:off+1], off+1
+        if off > len(buf):
+            raise(CharpyErr('{0} [_from_char]: buffer too short'.format(self._name)))
+        if ipv6d._val:
+            prefdeleg._val = ord(prefdeleg._val)
+        if ip6pl._val:
+            preflen._val = ord(preflen._val)
+        ext._val = buf[off:]
 
 
 #------------------------------------------------------------------------------#
@@ -6081,16 +6375,22 @@ def parse_PFCP(buf):
     try:
         Msg.from_bytes(buf)
     except PFCPDecErr:
+        if Msg[1].__dict__.get('_ie_mand'):
+            # all IEs have been decoded before the verification of mandatory IEs
+            # in the PFCPIEs part, which ends the decoding of the message
+            return Msg, ERR_PFCP_MAND_IE_MISS
+        # otherwise, the error comes from an IE (e.g. a grouped IE decoded 
+        # eagerly), try again without verifying mandatory IEs
         PFCPIEs.VERIF_MAND = False
         Msg = Msg.__class__()
         try:
             Msg.from_bytes(buf)
-            PFCPIEs.VERIF_MAND = True
         except Exception:
-            PFCPIEs.VERIF_MAND = True
             return None, ERR_PFCP_BUF_INVALID
         else:
             return Msg, ERR_PFCP_MAND_IE_MISS
+        finally:
+            PFCPIEs.VERIF_MAND = True
     else:
         # TODO: support piggy-backed PFCP message (FO flag)
         return Msg, 0
@@ -42,6 +42,7 @@ from enum   import IntEnum
 
 from pycrate_core.utils import *
 from pycrate_core.elt   import *
+from pycrate_core.elt   import _with_json
 from pycrate_core.base  import *
 
 from pycrate_ether.IP   import IPAddr
@@ -52,6 +53,8 @@ from pycrate_mobile.TS29244_PFCP    import (
     TimerUnit_dict,
     _Timer,
     _IEExtUint32,
+    _LazyIE,
+    _IndexedIEs,
     )
 from pycrate_mobile.TS24301_IE      import (
     TAI,
@@ -3864,10 +3867,14 @@ class GTPCIEHdr(Envelope):
         self[4].set_transauto(lambda: self[0].get_val() != 254)
 
 
-class GTPCIE(Envelope):
+class GTPCIE(_LazyIE):
     """GTPv2-C Information Element
     """
     
+    _DATA_IND  = 1
+    _DATA_HIER = 1
+    _HDR_KEYS  = (0, 'Hdr')
+    
     _GEN = (
         GTPCIEHdr('Hdr'),
         Buf('Data', rep=REPR_HEX, hier=1)
@@ -3908,23 +3915,6 @@ class GTPCIE(Envelope):
         else:
             self[0][0].set_val(t)
     
-    def _init_data_attr(self):
-        if isinstance(self[1], Buf):
-            self._data_raw = self[1]
-            self._data_cls = None
-        else:
-            self._data_raw = None
-            self._data_cls = self[1]
-    
-    def _set_data_raw(self):
-        if not hasattr(self, '_data_raw'):
-            self._init_data_attr()
-        if self._data_raw is None:
-            self._data_raw = Buf('Data', rep=REPR_HEX, hier=1)
-            self._data_raw.set_blauto(lambda: self._get_data_len())
-        if self[1] != self._data_raw:
-            self.replace(self[1], self._data_raw)
-    
     def _set_data_cls(self):
         if not hasattr(self, '_data_cls'):
             self._init_data_attr()
@@ -3968,6 +3958,8 @@ class GTPCIE(Envelope):
     # - bytes, assigned to the Buf raw object
     # - dedicated type, assigned to the dedicated object
     def set_val(self, val):
+        if self._lazy:
+            self._dec_lazy()
         if isinstance(val, (tuple, list)) and 1<= len(val) <= 2:
             self[0].set_val(val[0])
             if len(val) == 2:
@@ -3995,10 +3987,21 @@ class GTPCIE(Envelope):
     
     # _from_char() method attempts to decode Data with the dedicated object
     # and fallbacks to the Buf raw object if failing with the former.
+    # With DEC_LAZY, Data is decoded as raw bytes and the dedicated object is
+    # used only when the IE content is accessed, see _dec_lazy().
     def _from_char(self, char):
         if self.get_trans():
             return
+        self._lazy = False
         self[0]._from_char(char)
+        if self.DEC_LAZY:
+            ie_cls, ie_desc = self._select_ie(self.get_type(), self[0]['Inst'].get_val())
+            self._set_data_raw()
+            self[1]._from_char(char)
+            if ie_cls is not None:
+                self._name = ie_desc
+                self._lazy = True
+            return
         # 1st try decoding with the structured Data
         char_cur = char._cur
         self._set_data_cls()
@@ -4009,9 +4012,17 @@ class GTPCIE(Envelope):
             char._cur = char_cur
             self._set_data_raw()
             self[1]._from_char(char)
+    
+    def _to_pack(self):
+        if self._lazy:
+            pl = []
+            [pl.extend(elt._to_pack()) for elt in self._content]
+            return pl
+        else:
+            return Envelope._to_pack(self)
 
 
-class GTPCIEs(Sequence):
+class GTPCIEs(_IndexedIEs):
     """GTPv2-C Grouped Information Element
     """
     
@@ -4041,12 +4052,16 @@ class GTPCIEs(Sequence):
     # this is due to locally defined grouped IEs for certain message types
     
     
+    # Each decoded sequence of IEs is indexed by (Type, Inst) identifier, see
+    # get_ie() and get_ies()
+    
     def __init__(self, *args, **kwargs):
         Sequence.__init__(self, *args, **kwargs)
         if 'val' not in kwargs:
             self.init_ies(wopt=False, wpriv=False)
     
     def set_val(self, vals):
+        self._ie_ind = None
         Sequence.set_val(self, vals)
         if self._SET_MAND:
             # ensure at least all mandatory IEs are there
@@ -4068,19 +4083,34 @@ class GTPCIEs(Sequence):
         # decode the sequence of IEs, whatever they are
         Sequence._from_char(self, char)
         #
-        # eventually verify mandatory IE
-        if self.VERIF_MAND:
-            self._ie_mand = set(self.MAND)
-            for ie in self:
-                self._ie_mand.discard( (ie[0]['Type'].get_val(), ie[0]['Inst'].get_val()) )
-            if self._ie_mand:
-                raise(GTPCDecErr('{0}: missing mandatory IE(s), {1}'\
-                      .format(self._name, ', '.join([self.MAND[k][1] for k in self._ie_mand]))))
+        # index IEs, and eventually verify mandatory IE
+        self._ie_ind = self._index_ies()
+        self._ie_mand = set(self.MAND).difference(self._ie_ind)
+        if self.VERIF_MAND and self._ie_mand:
+            raise(GTPCDecErr('{0}: missing mandatory IE(s), {1}'\
+                  .format(self._name, ', '.join([self.MAND[k][1] for k in self._ie_mand]))))
+    
+    def _get_ie_id(self, ie):
+        hdr = ie._content[0]
+        return (hdr[0].get_val(), hdr[3].get_val())
+    
+    def get_ie(self, ie_type, ie_inst=0):
+        """returns the first IE of given type `ie_type` and instance `ie_inst`,
+        or None
+        """
+        ies = self._get_ies((ie_type, ie_inst))
+        return ies[0] if ies else None
+    
+    def get_ies(self, ie_type, ie_inst=0):
+        """returns the list of IEs of given type `ie_type` and instance `ie_inst`
+        """
+        return self._get_ies((ie_type, ie_inst))
     
     def add_ie(self, ie_type, ie_inst=0, val=None):
         """add the IE of given type `ie_type` and instance `ie_inst` and sets the
         value `val` (raw bytes buffer or structured data) into its data part
         """
+        self._ie_ind = None
         v = {'Hdr': {'Type': ie_type, 'Inst': ie_inst}}
         if val is not None:
             v['Data'] = val
@@ -4090,10 +4120,17 @@ class GTPCIEs(Sequence):
     def rem_ie(self, ie_type, ie_inst=0):
         """remove the IE of given type `ie_type` and instance `ie_inst`
         """
+        self._ie_ind = None
         for ie in self._content[::-1]:
             if (ie[0]['Type'].get_val(), ie[0]['Inst'].get_val()) == (ie_type, ie_inst):
                 self._content.remove(ie)
                 break
+    
+    if _with_json:
+        
+        def _from_jval(self, val):
+            self._ie_ind = None
+            Sequence._from_jval(self, val)
         
     def init_ies(self, wopt=False, wpriv=False):
         """re-initialize all IEs that are mandatory,
@@ -7604,16 +7641,9 @@ def parse_GTPC(buf):
     try:
         Msg.from_bytes(buf)
     except GTPCDecErr:
-        GTPCIEs.VERIF_MAND = False
-        Msg = Msg.__class__()
-        try:
-            Msg.from_bytes(buf)
-            GTPCIEs.VERIF_MAND = True
-        except Exception:
-            GTPCIEs.VERIF_MAND = True
-            return None, ERR_GTPC_BUF_INVALID
-        else:
-            return Msg, ERR_GTPC_MAND_IE_MISS
+        # all IEs have been decoded before the verification of mandatory IEs
+        # in the GTPCIEs part, which ends the decoding of the message
+        return Msg, ERR_GTPC_MAND_IE_MISS
     else:
         # TODO: support piggy-backed GTP-C message (see 5.5.1 and P flag)
         return Msg, 0
@@ -42,7 +42,13 @@ __all__ = [
     'parse_GTPU',
     'ERR_GTPU_BUF_TOO_SHORT',
     'ERR_GTPU_BUF_INVALID',
-    'ERR_GTPU_TYPE_NONEXIST'
+    'ERR_GTPU_TYPE_NONEXIST',
+    # GTPU header fast path
+    'decode_GTPU_hdr',
+    'encode_GTPU_hdr',
+    'decap_GTPU',
+    'encap_GTPU',
+    'get_GTPU_ext'
     ]
 
 
@@ -52,7 +58,8 @@ __all__ = [
 # release 16 (h10)
 #------------------------------------------------------------------------------#
 
-from enum import IntEnum
+from enum   import IntEnum
+from struct import Struct, error as StructErr
 
 from pycrate_core.utils import *
 from pycrate_core.elt   import *
@@ -429,3 +436,175 @@ def parse_GTPU(buf):
     else:
         return Msg, 0
 
+
+
+#------------------------------------------------------------------------------#
+# GTP-U header fast path
+#------------------------------------------------------------------------------#
+
+# The user plane cannot afford instantiating the Element structures above for
+# each packet: the following functions decode and encode GTP-U headers with
+# precompiled structs, working on bytes, bytearray or memoryview buffers, and
+# only returning tuples and slices of the initial buffer.
+#
+# A decoded header is a 7-tuple:
+# (Type, TEID, SeqNum, NPDUNum, ExtHdrs, Off, End)
+# - SeqNum and NPDUNum are None when the corresponding flag is not set
+# - ExtHdrs is a tuple of 2-tuple (next extension header type, content), the
+#   content excluding the length and next extension header type octets
+# - the payload of the message is buf[Off:End]
+
+_GTPUHdr_struct     = Struct('>BBHI')
+_GTPUHdrOpt_struct  = Struct('>HBB')
+_Uint8_struct       = Struct('>B')
+
+_GTPUHdr_unpack     = _GTPUHdr_struct.unpack_from
+_GTPUHdr_pack       = _GTPUHdr_struct.pack
+_GTPUHdr_pack_into  = _GTPUHdr_struct.pack_into
+_GTPUHdrOpt_unpack  = _GTPUHdrOpt_struct.unpack_from
+_GTPUHdrOpt_pack    = _GTPUHdrOpt_struct.pack
+_Uint8_unpack       = _Uint8_struct.unpack_from
+_Uint8_pack         = _Uint8_struct.pack
+
+
+def decode_GTPU_hdr(buf):
+    """decodes the GTP-U header at the start of the buffer `buf' and returns a 
+    2-tuple:
+    - GTP-U header 7-tuple, (Type, TEID, SeqNum, NPDUNum, ExtHdrs, Off, End), 
+      or None if decoding failed
+    - decoding error code, 0 if decoding succeeded, > 0 otherwise
+    """
+    try:
+        flags, typ, ln, teid = _GTPUHdr_unpack(buf)
+    except StructErr:
+        return None, ERR_GTPU_BUF_TOO_SHORT
+    if flags & 0xf0 != 0x30:
+        # not GTP version 1, or GTP prime
+        return None, ERR_GTPU_BUF_INVALID
+    end = 8 + ln
+    if end > len(buf):
+        return None, ERR_GTPU_BUF_TOO_SHORT
+    if not flags & 0x07:
+        return (typ, teid, None, None, (), 8, end), 0
+    elif end < 12:
+        return None, ERR_GTPU_BUF_INVALID
+    sn, npdu, nxt = _GTPUHdrOpt_unpack(buf, 8)
+    off = 12
+    if flags & 0x04 and nxt:
+        exts = []
+        while nxt:
+            # extension header length is in units of 4 octets
+            if off >= end:
+                return None, ERR_GTPU_BUF_INVALID
+            ext_end = off + (_Uint8_unpack(buf, off)[0] << 2)
+            if ext_end == off or ext_end > end:
+                return None, ERR_GTPU_BUF_INVALID
+            exts.append( (nxt, buf[off+1:ext_end-1]) )
+            nxt, off = _Uint8_unpack(buf, ext_end-1)[0], ext_end
+        exts = tuple(exts)
+    else:
+        exts = ()
+    return (typ,
+            teid,
+            sn if flags & 0x02 else None,
+            npdu if flags & 0x01 else None,
+            exts,
+            off,
+            end), 0
+
+
+def _encode_GTPU_ext(exts):
+    # returns the buffer for the list of extension headers `exts', and the type
+    # of the 1st of them
+    bufs = []
+    for i, (nxt, cont) in enumerate(exts):
+        # pad the content so that the extension header is 4-octet aligned
+        pad = -(len(cont) + 2) % 4
+        ln  = (len(cont) + 2 + pad) >> 2
+        if ln > 255:
+            raise(PycrateErr('GTP-U extension header too long'))
+        bufs.extend( (_Uint8_pack(ln), bytes(cont), pad * b'\0') )
+        if i < len(exts) - 1:
+            bufs.append( _Uint8_pack(exts[i+1][0]) )
+        else:
+            bufs.append( b'\0' )
+    return b''.join(bufs), exts[0][0]
+
+
+def encode_GTPU_hdr(teid, paylen, typ=255, sn=None, npdu=None, exts=()):
+    """returns the GTP-U header buffer for a message of type `typ', with tunnel 
+    id `teid', payload length `paylen' and optional sequence number `sn', 
+    N-PDU number `npdu' and sequence of extension headers `exts', each being a
+    2-tuple (extension header type, content)
+    
+    extension headers' content are padded with null bytes when required
+    """
+    if sn is None and npdu is None and not exts:
+        return _GTPUHdr_pack(0x30, typ, paylen, teid)
+    flags = 0x30
+    if exts:
+        flags |= 0x04
+        ext, nxt = _encode_GTPU_ext(exts)
+    else:
+        ext, nxt = b'', 0
+    if sn is not None:
+        flags |= 0x02
+    else:
+        sn = 0
+    if npdu is not None:
+        flags |= 0x01
+    else:
+        npdu = 0
+    return b''.join((_GTPUHdr_pack(flags, typ, 4 + len(ext) + paylen, teid),
+                     _GTPUHdrOpt_pack(sn, npdu, nxt),
+                     ext))
+
+
+def decap_GTPU(bufs):
+    """decodes each GTP-U header of the list of buffers `bufs' and returns the
+    list of 2-tuple (GTP-U header 7-tuple, payload), or (None, None) for each
+    buffer failing to decode
+    
+    payloads are slices of the initial buffers: use memoryview buffers to 
+    avoid copying them
+    """
+    ret = []
+    for buf in bufs:
+        hdr, err = decode_GTPU_hdr(buf)
+        if err:
+            ret.append( (None, None) )
+        else:
+            ret.append( (hdr, buf[hdr[5]:hdr[6]]) )
+    return ret
+
+
+def encap_GTPU(teid, pays, typ=255, sn=None, npdu=None, exts=()):
+    """encapsulates each payload of the list `pays' within a GTP-U header with
+    tunnel id `teid' (see encode_GTPU_hdr()) and returns the list of resulting
+    buffers
+    
+    when set, the sequence number `sn' is incremented for each payload
+    """
+    if sn is not None:
+        return [encode_GTPU_hdr(teid, len(pay), typ, (sn+i) & 0xffff, npdu, exts) + bytes(pay) \
+                for i, pay in enumerate(pays)]
+    # the header is only built once, and its length field patched for each 
+    # payload
+    hdr = bytearray(encode_GTPU_hdr(teid, 0, typ, sn, npdu, exts))
+    ln  = len(hdr) - 8
+    ret = []
+    for pay in pays:
+        _GTPUHdr_pack_into(hdr, 0, hdr[0], typ, ln + len(pay), teid)
+        ret.append( bytes(hdr) + bytes(pay) )
+    return ret
+
+
+def get_GTPU_ext(hdr, ext_type):
+    """returns the content of the 1st extension header of type `ext_type' (e.g.
+    133 for PDU Session Container) within the GTP-U header 7-tuple `hdr', or 
+    None
+    """
+    for nxt, cont in hdr[4]:
+        if nxt == ext_type:
+            return cont
+    return None
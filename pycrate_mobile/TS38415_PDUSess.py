@@ -28,7 +28,9 @@
 #*/
 
 __all__ = [
-    'PDUSessInfo'
+    'PDUSessInfo',
+    'decode_PDUSessInfo_qfi',
+    'encode_PDUSessInfo_qfi'
     ]
 
 
@@ -173,3 +175,36 @@ class PDUSessInfo(Envelope):
             )
         )
 
+
+#------------------------------------------------------------------------------#
+# PDU Session Container fast path
+#------------------------------------------------------------------------------#
+
+# to be used with the GTP-U header fast path from TS29281_GTPU, which returns
+# the content of the extension header (i.e. without its length and next
+# extension header type octets)
+
+def decode_PDUSessInfo_qfi(buf):
+    """returns the 3-tuple (Type, QFI, RQI) from the PDU Session Container 
+    content `buf', RQI being always 0 for UL PDU Session Information
+    
+    raises PycrateErr if `buf' is too short
+    """
+    if len(buf) < 2:
+        raise(PycrateErr('PDU Session Container too short'))
+    typ, info = bytes(buf[:2])
+    typ >>= 4
+    if typ == 0:
+        return 0, info & 0x3f, (info >> 6) & 1
+    else:
+        return typ, info & 0x3f, 0
+
+
+def encode_PDUSessInfo_qfi(typ, qfi, rqi=0):
+    """returns the PDU Session Container content for a DL (`typ' 0) or UL (`typ'
+    1) PDU Session Information with only the QFI `qfi' and RQI `rqi' set
+    """
+    if typ == 0:
+        return bytes((0, ((rqi & 1) << 6) | (qfi & 0x3f)))
+    else:
+        return bytes(((typ & 0xf) << 4, qfi & 0x3f))
@@ -47,6 +47,8 @@ setup(
         "tools/pycrate_gtp_type_info.py",
         "tools/pycrate_map_op_info.py",
         "tools/pycrate_extnas_demo.py",
+        "tools/pycrate_gtpu_bench.py",
+        "tools/pycrate_corenet_loadgen.py",
         ],
     
     # potential dependencies
@@ -41,6 +41,8 @@ from pycrate_asn1rt.asnobj_str       import *
 from pycrate_asn1rt.asnobj_construct import *
 from pycrate_asn1rt.asnobj_class     import *
 from pycrate_asn1rt.asnobj_ext       import *
+from pycrate_asn1rt.profiler         import ASN1Profiler
+from pycrate_asn1rt.template         import ASN1Template
 #from pycrate_asn1rt.init             import init_modules
 from pycrate_asn1rt.codecs           import _with_json
 
@@ -2115,9 +2117,126 @@ def _test_rt_base():
     
     return 0
 
+def _test_rt_enc_cache():
+    Mod = GLOBAL.MOD['Test-Asn1rt']
+    Cache = ASN1Obj._ENC_CACHE
+    
+    for name, val in (('Seq01', {'boo': False, 'int': 1024, 'enu': 'cake'}),
+                      ('Seq02', ['un', 'gros', 'pterodactyle']),
+                      ('Set01', {'boo': True, 'cho': ('enu', 'cake'), 'enu': 'cheese', 'int': 5565})):
+        Obj = Mod[name]
+        Obj.set_val(val)
+        encs = [Obj.to_aper(), Obj.to_uper(), Obj.to_ber(), Obj.to_cer(), Obj.to_der(),
+                Obj.to_oer(), Obj.to_coer()]
+        Obj.set_enc_cache()
+        Cache.clear()
+        for i in range(3):
+            Obj.set_val(val)
+            assert( [Obj.to_aper(), Obj.to_uper(), Obj.to_ber(), Obj.to_cer(), Obj.to_der(),
+                     Obj.to_oer(), Obj.to_coer()] == encs )
+        assert( Cache.get_stats()['hits'] == 14 )
+        Obj.set_enc_cache(False)
+        Obj.set_val(val)
+        assert( Obj.to_aper() == encs[0] )
+        assert( Cache.get_stats()['hits'] == 14 )
+    Cache.clear()
+    
+    # APER: no caching when the encoding does not start on an octet boundary
+    Seq, Int = Mod['Seq01'], Mod['Seq01']._cont['int']
+    Seq.set_val({'boo': True, 'int': 1024, 'enu': 'cake'})
+    enc = Seq.to_aper()
+    Int.set_enc_cache()
+    assert( Seq.to_aper() == Seq.to_aper() == enc )
+    assert( len(Cache) == 0 )
+    Int.set_enc_cache(False)
+    
+    return 0
+
+def _test_rt_template():
+    Mod = GLOBAL.MOD['Test-Asn1rt']
+    
+    for name, val, paths in (
+        ('Seq01', {'boo': False, 'int': 1024, 'enu': 'cake'}, [['boo'], ['int'], ['enu']]),
+        ('Set01', {'boo': True, 'cho': ('enu', 'cake'), 'enu': 'cheese', 'int': 5565},
+                  [['boo'], ['int'], ['cho', 'enu']])):
+        Obj = Mod[name]
+        for codec in ASN1Template.CODECS:
+            Tpl = ASN1Template(Obj, val, paths, codec)
+            if codec in ('ber', 'cer', 'der'):
+                assert( Tpl.get_patchable() == [] )
+            else:
+                assert( Tpl.get_patchable() == paths )
+            # last one changes the length of the INTEGER encoding
+            for vals in ((True, 1025, 'cheese'), (False, 5565, 'cake'), (True, 1, 'cake')):
+                assert( Tpl.encode(*vals) == Tpl.encode_full(*vals) )
+            Obj.set_val(val)
+            assert( Tpl.encode(*[Obj.get_val_at(p) for p in paths]) == getattr(Obj, 'to_' + codec)() )
+            # patching fields leaves the global codec settings unchanged
+            aligned, canonical = ASN1CodecPER.ALIGNED, ASN1CodecOER.CANONICAL
+            ASN1CodecPER.ALIGNED, ASN1CodecOER.CANONICAL = (codec == 'uper'), (codec == 'oer')
+            try:
+                Tpl.encode(True, 1025, 'cheese')
+                assert( ASN1CodecPER.ALIGNED == (codec == 'uper') )
+                assert( ASN1CodecOER.CANONICAL == (codec == 'oer') )
+            finally:
+                ASN1CodecPER.ALIGNED, ASN1CodecOER.CANONICAL = aligned, canonical
+    
+    return 0
+
+def _test_rt_profiler():
+    Mod = GLOBAL.MOD['Test-Asn1rt']
+    Seq = Mod['Seq01']
+    Seq.set_val({'boo': True, 'int': 1024, 'enu': 'cake'})
+    meth = Seq.__class__._from_per
+    
+    Prof = ASN1Profiler()
+    Prof.enable()
+    try:
+        assert( ASN1Profiler._ENABLED is Prof )
+        try:
+            ASN1Profiler().enable()
+        except ASN1Err:
+            pass
+        else:
+            assert()
+        # statistics recorded again after a reset
+        Seq.from_aper(Seq.to_aper())
+        Prof.reset()
+        assert( Prof.get_stats() == {} )
+        for i in range(10):
+            Seq.from_aper(Seq.to_aper())
+            Seq.from_ber(Seq.to_ber())
+    finally:
+        Prof.disable()
+    assert( Seq.__class__._from_per is meth )
+    
+    stats = Prof.get_stats()
+    key   = 'Test-Asn1rt.Seq01'
+    assert( stats[(key, 'APER', 'dec')][0] == 10 )
+    assert( 10 * (len(Seq.to_aper())-1) < stats[(key, 'APER', 'dec')][3] <= 10 * len(Seq.to_aper()) )
+    assert( stats[(key, 'BER', 'dec')][3] == 10 * (len(Seq.to_ber())-2) )
+    assert( stats[(key, 'BER', 'enc')][0] == 10 )
+    assert( stats[(key + '.int', 'APER', 'enc')][0] == 10 )
+    for calls, cum, slf, byt in stats.values():
+        assert( 0 <= slf <= cum )
+    assert( key in Prof.report(limit=5) )
+    for line in Prof.get_collapsed().splitlines():
+        path, us = line.rsplit(' ', 1)
+        assert( path.split(';')[1] == key and int(us) > 0 )
+    
+    # nothing recorded once disabled
+    Prof.reset()
+    Seq.from_aper(Seq.to_aper())
+    assert( Prof.get_stats() == {} )
+    
+    return 0
+
 def test_rt_base():
     _load_rt_base()
     _test_rt_base()
+    _test_rt_enc_cache()
+    _test_rt_template()
+    _test_rt_profiler()
 
 
 pkts_rrc3g = tuple(map(unhexlify, (
@@ -2345,6 +2464,11 @@ def _test_lteran():
             txt = S1PDU.to_jer()
             S1PDU.from_jer(txt)
             assert( S1PDU() == val )
+        # template, with all IE values as fields
+        paths = [path for (path, _) in S1PDU.get_val_paths() if path[-2] == 'value']
+        Tpl = ASN1Template(S1PDU, val, paths)
+        S1PDU.set_val(val)
+        assert( Tpl.encode(*[S1PDU.get_val_at(path) for path in paths]) == p )
     #
     X2PDU = GLOBAL.MOD['X2AP-PDU-Descriptions']['X2AP-PDU']
     for p in pkts_x2ap:
@@ -2531,10 +2655,35 @@ def _test_tcap_map_rt():
     M.reset_val()
 
 
+def _test_tcap_map_budget():
+    M = GLOBAL.MOD['TCAP-MAP-Messages']['TCAP-MAP-Message']
+    B = DecBudget()
+    Element._DEC_BUDGET = B
+    try:
+        for p in pkts_tcap_map:
+            M.from_ber(p)
+            val = M()
+            M.from_ber_ws(p)
+            assert( M() == val )
+            assert( B.depth == 0 and B.bytes == len(p) )
+        # deeply nested constructed TLVs
+        buf = b''
+        for i in range(100):
+            buf = b'\x30\x82' + uint_to_bytes(len(buf), 16) + buf
+        try:
+            M.from_ber(b'\x62\x82' + uint_to_bytes(len(buf), 16) + buf)
+        except DecBudgetErr:
+            assert( B.depth == 0 )
+        else:
+            assert()
+    finally:
+        Element._DEC_BUDGET = None
+
 def test_tcap_map():
     _load_tcap_map()
     _test_tcap_map()
     _test_tcap_map_rt()
+    _test_tcap_map_budget()
 
 
 # https://wiki.wireshark.org/SampleCaptures?action=AttachFile&do=get&target=camel.pcap
@@ -28,6 +28,7 @@
 #*/
 
 from timeit import timeit
+from threading import Thread, Event, current_thread
 
 from pycrate_core.utils  import *
 from pycrate_core.charpy import *
@@ -661,6 +662,70 @@ def test_elt_4():
         assert( ls.get_val() == lsv )
 
 
+def test_dec_budget():
+    
+    S = Sequence('S', GEN=Envelope('E', GEN=(Uint8('a'), Uint8('b'))))
+    # each Envelope within the Sequence accounts for 2 nodes
+    B = DecBudget(max_nodes=128)
+    Element._DEC_BUDGET = B
+    try:
+        S.from_bytes(100*b'\0')
+        assert( S.get_num() == 50 and B.depth == 0 and B.bytes == 100 )
+        S.from_bytes(200*b'\0')
+    except DecBudgetErr:
+        assert( B.nodes == 128 and B.depth == 0 )
+    else:
+        assert()
+    finally:
+        Element._DEC_BUDGET = None
+    S.from_bytes(200*b'\0')
+    assert( S.get_num() == 100 )
+
+
+def test_dec_budget_threads():
+    
+    # a decoding running in a thread is paused in its 1st Envelope, while 
+    # another decoding runs and fails in the main thread
+    ev_paused, ev_resume = Event(), Event()
+    class E(Envelope):
+        _GEN = (Uint8('a'), Uint8('b'))
+        def _from_char(self, char):
+            if current_thread().name == 'dec_budget' and not ev_resume.is_set():
+                ev_paused.set()
+                ev_resume.wait(5)
+            Envelope._from_char(self, char)
+    #
+    B, res = DecBudget(max_nodes=128), []
+    def dec():
+        S = Sequence('S', GEN=E('E'))
+        try:
+            S.from_bytes(100*b'\0')
+        except DecBudgetErr as err:
+            res.append(err)
+        else:
+            res.append((S.get_num(), B.nodes, B.bytes))
+    Element._DEC_BUDGET = B
+    try:
+        th = Thread(target=dec, name='dec_budget')
+        th.start()
+        assert( ev_paused.wait(5) )
+        S = Sequence('S', GEN=E('E'))
+        try:
+            S.from_bytes(200*b'\0')
+        except DecBudgetErr:
+            assert( B.nodes == 128 )
+        else:
+            assert()
+        ev_resume.set()
+        th.join()
+        # the decoding in the thread has its own counters, the same as when
+        # it runs alone
+        dec()
+        assert( len(res) == 2 and res[0] == res[1] and res[0][0] == 50 )
+    finally:
+        Element._DEC_BUDGET = None
+
+
 #------------------------------------------------------------------------------#
 # performance tests
 #------------------------------------------------------------------------------#
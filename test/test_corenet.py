@@ -0,0 +1,376 @@
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.4
+# *
+# * Copyright 2026. Benoit Michau. P1Sec.
+# *
+# * This library is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU Lesser General Public
+# * License as published by the Free Software Foundation; either
+# * version 2.1 of the License, or (at your option) any later version.
+# *
+# * This library is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# * Lesser General Public License for more details.
+# *
+# * You should have received a copy of the GNU Lesser General Public
+# * License along with this library; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+# * MA 02110-1301  USA
+# *
+# *--------------------------------------------------------
+# * File Name : test/test_corenet.py
+# * Created : 2026-10-19
+# * Authors : Benoit Michau
+# *--------------------------------------------------------
+#*/
+
+import os
+import shutil
+import sqlite3
+import tempfile
+from timeit    import timeit
+from threading import Thread, Event
+from time      import time, sleep
+
+from pycrate_corenet.ServerAuCDB import AuCDBFile, AuCDBSqlite
+from pycrate_corenet.utils_proc  import TimerWheel, CorenetMetrics
+
+# pycrate_corenet requires pysctp and CryptoMobile
+try:
+    from pycrate_corenet.ProcProto import NASSigProc
+    from pycrate_corenet.ProcCNEMM import EMMAuthentication, EMMIdentification
+    from pycrate_corenet.ServerAuC import AuC
+except ImportError:
+    _with_corenet = False
+else:
+    _with_corenet = True
+
+
+class _Server(object):
+    def __init__(self):
+        self.ProcTimers = TimerWheel(res=0.1, num=64)
+
+
+class _UE(object):
+    IMSI = '001010000000001'
+    def __init__(self):
+        self.Server = _Server()
+
+
+class _EMMd(object):
+    # minimal UEEMMd, to run EMM procedures outside of a CorenetServer
+    T3460 = 6
+    T3470 = 6
+    def __init__(self):
+        self.UE    = _UE()
+        self.S1    = None
+        self.Proc  = []
+        self.ready = Event()
+        self.ready.set()
+    def _log(self, logtype, msg, *args):
+        pass
+
+
+def test_timer_wheel():
+    T0 = time()
+    Timers, cbs = TimerWheel(res=0.1, num=16), []
+    for i in range(10):
+        Timers.arm(i, T0 + 0.5*i, i)
+    assert( len(Timers) == 10 and 3 in Timers )
+    # re-arming moves the timeout, cancelling removes it
+    Timers.arm(0, T0 + 1.0, 0)
+    Timers.cancel(1)
+    Timers.cancel(1)
+    assert( len(Timers) == 9 and 1 not in Timers )
+    assert( Timers.expire(T0 - 1.0) == [] )
+    # expiry times are rounded up to the next tick ;
+    # timeouts further than a turn of the wheel (1.6s) wait for their turn
+    cbs.extend( Timers.expire(T0 + 1.25) )
+    assert( sorted(cbs) == [0, 2] )
+    cbs.extend( Timers.expire(T0 + 3.25) )
+    assert( sorted(cbs) == [0, 2, 3, 4, 5, 6] )
+    # a late call expires all remaining timeouts
+    cbs.extend( Timers.expire(T0 + 60.0) )
+    assert( sorted(cbs) == [0, 2, 3, 4, 5, 6, 7, 8, 9] )
+    assert( len(Timers) == 0 )
+    # a timeout in the past is armed for the next tick
+    Timers.arm('past', T0 - 10.0, 'past')
+    assert( Timers.expire(T0 + 60.0 + 2*Timers.RES) == ['past'] )
+
+
+def test_corenet_metrics():
+    M, lab = CorenetMetrics(), ('EMMAttach', )
+    M.incr('corenet_proc_total', lab)
+    M.incr('corenet_proc_total', lab, 2)
+    M.add('corenet_proc_inflight', lab)
+    M.add('corenet_proc_inflight', lab, -1)
+    M.set('corenet_ran_ue', ('001.01', ), 4)
+    M.add('corenet_ue_proc_inflight', ('001010000000001', ))
+    M.add('corenet_ue_proc_inflight', ('001010000000001', ), -1, rem=True)
+    for dur in (0.0002, 0.003, 20.0):
+        M.observe('corenet_proc_seconds', lab, dur)
+    assert( M.get('corenet_proc_total', lab) == 3 )
+    assert( M.get('corenet_proc_inflight', lab) == 0 )
+    assert( M.get('corenet_ran_ue', ('001.01', )) == 4 )
+    assert( M.get('corenet_proc_seconds', lab)[0] == 3 )
+    assert( abs(M.get('corenet_proc_seconds', lab)[1] - 20.0032) < 1e-9 )
+    M.Collectors.append(lambda M: M.set('corenet_ran_proc', ('001.01', ), 1))
+    txt = M.text().splitlines()
+    assert( '# TYPE corenet_proc_total counter' in txt )
+    assert( 'corenet_proc_total{proc="EMMAttach"} 3' in txt )
+    assert( 'corenet_proc_inflight{proc="EMMAttach"} 0' in txt )
+    assert( 'corenet_ran_proc{ran="001.01"} 1' in txt )
+    # a per-UE gauge back to 0 is removed
+    assert( not [l for l in txt if l.startswith('corenet_ue_proc_inflight{')] )
+    assert( '# TYPE corenet_proc_seconds histogram' in txt )
+    assert( 'corenet_proc_seconds_bucket{proc="EMMAttach",le="0.00025"} 1' in txt )
+    assert( 'corenet_proc_seconds_bucket{proc="EMMAttach",le="10.0"} 2' in txt )
+    assert( 'corenet_proc_seconds_bucket{proc="EMMAttach",le="+Inf"} 3' in txt )
+    assert( 'corenet_proc_seconds_count{proc="EMMAttach"} 3' in txt )
+    M.reset()
+    assert( M.get('corenet_proc_total', lab) == 0 )
+
+
+def test_proc_abort_metrics():
+    if not _with_corenet:
+        print('[+] pycrate_corenet not available, skipping the NAS procedures abort test')
+        return
+    Metrics, NASSigProc.Metrics = NASSigProc.Metrics, CorenetMetrics()
+    NASSigProc.Metrics.PER_UE = True
+    try:
+        M, emmd = NASSigProc.Metrics, _EMMd()
+        ue_lab = (_UE.IMSI, )
+        Timers = emmd.UE.Server.ProcTimers
+        # a parent procedure, with a nested one
+        Proc = EMMAuthentication(emmd, emm_preempt=True)
+        emmd.Proc.append(Proc)
+        Proc.init_timer()
+        ProcNest = EMMIdentification(emmd)
+        emmd.Proc.append(ProcNest)
+        ProcNest.init_timer()
+        assert( len(Timers) == 2 )
+        assert( M.get('corenet_proc_inflight', ('EMMAuthentication', )) == 1 )
+        assert( M.get('corenet_proc_inflight', ('EMMIdentification', )) == 1 )
+        assert( M.get('corenet_ue_proc_inflight', ue_lab) == 2 )
+        # aborting the parent aborts and releases the nested procedure too
+        Proc.abort()
+        assert( emmd.Proc == [] and emmd.ready.is_set() )
+        assert( len(Timers) == 0 )
+        assert( M.get('corenet_proc_inflight', ('EMMAuthentication', )) == 0 )
+        assert( M.get('corenet_proc_inflight', ('EMMIdentification', )) == 0 )
+        assert( M.get('corenet_proc_seconds', ('EMMIdentification', ))[0] == 1 )
+        assert( M.get('corenet_ue_proc_inflight', ue_lab) == 0 )
+        # a late timeout has no effect
+        ProcNest.timeout()
+        assert( M.get('corenet_proc_timeout_total', ('EMMIdentification', )) == 0 )
+        assert( M.get('corenet_proc_seconds', ('EMMIdentification', ))[0] == 1 )
+        # a timeout releases the procedure and all its nested ones
+        Proc = EMMAuthentication(emmd)
+        emmd.Proc.append(Proc)
+        Proc.init_timer()
+        ProcNest = EMMIdentification(emmd)
+        emmd.Proc.append(ProcNest)
+        ProcNest.init_timer()
+        for cb in Timers.expire(time() + 7):
+            cb()
+        assert( emmd.Proc == [] and len(Timers) == 0 )
+        assert( M.get('corenet_proc_inflight', ('EMMAuthentication', )) == 0 )
+        assert( M.get('corenet_proc_inflight', ('EMMIdentification', )) == 0 )
+        assert( M.get('corenet_proc_timeout_total', ('EMMAuthentication', )) == 1 )
+        assert( M.get('corenet_ue_proc_inflight', ue_lab) == 0 )
+    finally:
+        NASSigProc.Metrics = Metrics
+
+
+class _AuC(object):
+    # minimal AuC, to run AuC databases outside of an AuC
+    DO_BACKUP = False
+    def __init__(self, path):
+        self.AUC_DB_PATH = path
+    def _log(self, logtype, msg, *args):
+        pass
+
+
+class _AuCDBSqlite(AuCDBSqlite):
+    SYNC_NUM    = 1024
+    SYNC_PERIOD = 0.05
+
+
+class _AuCDBSqliteNum(AuCDBSqlite):
+    SYNC_NUM    = 4
+    SYNC_PERIOD = 60.0
+
+
+def _wait_for(cond, timeout=2.0):
+    T0 = time()
+    while not cond():
+        if time() - T0 > timeout:
+            return False
+        sleep(0.01)
+    return True
+
+
+def _aucdb_sqn(path, IMSI):
+    # SQN written in the AuC.sqlite file, as read after a restart
+    con = sqlite3.connect(path + 'AuC.sqlite')
+    try:
+        return con.execute('SELECT sqn FROM auc WHERE imsi=?', (IMSI, )).fetchone()[0]
+    finally:
+        con.close()
+
+
+def test_aucdb(num=20):
+    path = tempfile.mkdtemp() + os.sep
+    with open(path + 'AuC.db', 'w') as fd:
+        fd.write('# IMSI;K;ALG;SQN;OP;\n')
+        for i in range(num):
+            if i % 2:
+                fd.write('00101%.9i;%s;0;%i;%s;\n' % (i, 16*('%.2x' % i), 32*i, 16*('%.2x' % (i+1))))
+            else:
+                fd.write('00101%.9i;%s;%i;%i;\n' % (i, 16*('%.2x' % i), 4 if i % 4 else 0, 32*i))
+    auc = _AuC(path)
+    dbs, dbf = _AuCDBSqlite(auc), AuCDBFile(auc)
+    try:
+        # AuC.sqlite created from AuC.db, with the same records and updates
+        IMSIs = sorted(dbf.keys())
+        assert( dbs.keys() == IMSIs and len(dbs) == num )
+        for IMSI in IMSIs:
+            assert( dbs[IMSI] == dbf[IMSI] )
+            assert( dbs.incr_sqn(IMSI, 3) == dbf.incr_sqn(IMSI, 3) )
+        dbs.set_sqn(IMSIs[0], 5)
+        dbf.set_sqn(IMSIs[0], 5)
+        assert( [dbs[IMSI] for IMSI in IMSIs] == [dbf[IMSI] for IMSI in IMSIs] )
+        #
+        # concurrent updates, each SQN being returned a single time
+        IMSI, sqns = IMSIs[1], []
+        SQN = dbs[IMSI][2]
+        def incr():
+            for i in range(200):
+                sqns.append( dbs.incr_sqn(IMSI) )
+        ths = [Thread(target=incr) for i in range(4)]
+        [th.start() for th in ths]
+        [th.join() for th in ths]
+        assert( sorted(sqns) == list(range(SQN, SQN+800)) and dbs[IMSI][2] == SQN+800 )
+        #
+        # pending SQN updates written in background, and found after a crash
+        assert( _wait_for(lambda: _aucdb_sqn(path, IMSI) == SQN+800) )
+        dbs.incr_sqn(IMSIs[2], 10)
+        assert( _wait_for(lambda: _aucdb_sqn(path, IMSIs[2]) == dbs[IMSIs[2]][2]) )
+        #
+        # rewritten record overrides its pending SQN update
+        dbs.incr_sqn(IMSI)
+        dbs[IMSI] = [16*b'\xff', 0, 7, None]
+        assert( dbs[IMSI] == [16*b'\xff', 0, 7, None] )
+        sleep(0.1)
+        assert( _aucdb_sqn(path, IMSI) == 7 )
+        #
+        # all SQN updates kept after a restart
+        for IMSI in IMSIs[2:]:
+            dbs.incr_sqn(IMSI, 2)
+            dbf.incr_sqn(IMSI, 2)
+        vals = dict([(IMSI, dbs[IMSI]) for IMSI in IMSIs])
+        dbs.stop()
+        dbs = AuCDBSqlite(auc)
+        assert( dict([(IMSI, dbs[IMSI]) for IMSI in IMSIs]) == vals )
+        dbf.stop()
+        dbf = AuCDBFile(auc)
+        assert( [dbf[IMSI] for IMSI in IMSIs[3:]] == [vals[IMSI] for IMSI in IMSIs[3:]] )
+        #
+        # SYNC_NUM pending SQN updates are written without waiting SYNC_PERIOD
+        dbs.stop()
+        dbs = _AuCDBSqliteNum(auc)
+        for IMSI in IMSIs[:3]:
+            dbs.incr_sqn(IMSI)
+        sleep(0.1)
+        assert( _aucdb_sqn(path, IMSIs[0]) == vals[IMSIs[0]][2] )
+        dbs.incr_sqn(IMSIs[3])
+        assert( _wait_for(lambda: _aucdb_sqn(path, IMSIs[0]) == vals[IMSIs[0]][2] + 1) )
+    finally:
+        dbs.stop()
+        dbf.stop()
+        shutil.rmtree(path)
+
+
+def test_auc_av_pool(depth=32, num=200, thr=4):
+    if not _with_corenet:
+        print('[+] pycrate_corenet not available, skipping the AuC AV pool test')
+        return
+    path = tempfile.mkdtemp() + os.sep
+    with open(path + 'AuC.db', 'w') as fd:
+        fd.write('001010000000001;%s;0;32;\n' % (32*'0'))
+    class _AuCPool(AuC):
+        DEBUG           = ()
+        AUC_DB_PATH     = path
+        DO_BACKUP       = False
+        AV_POOL_DEPTH   = depth
+        AV_POOL_TIMEOUT = 10.0
+    IMSI, AMF = '001010000000001', b'\x80\x00'
+    auc = _AuCPool()
+    Pool = auc._AVPool
+    try:
+        K, ALG, SQN0, OP = auc.db[IMSI]
+        sqns = [[] for i in range(thr)]
+        def get_av(sqn):
+            for i in range(num):
+                sqn.append( auc._get_av(IMSI, K, ALG, OP, AMF, None)[0] )
+        ths = [Thread(target=get_av, args=(sqn, )) for sqn in sqns]
+        [th.start() for th in ths]
+        [th.join() for th in ths]
+        assert( _wait_for(lambda: not Pool._pend) )
+        SQN1 = auc.db[IMSI][2]
+        # SQN served in increasing order, each a single time and without gap
+        # in the range reserved in the database
+        for sqn in sqns:
+            assert( sqn == sorted(sqn) )
+        served = sorted(sum(sqns, []))
+        pooled = [av[0] for av in Pool._vec.get((IMSI, AMF), ())]
+        assert( served + pooled == list(range(SQN0, SQN1)) )
+        assert( SQN1 - SQN0 <= thr*num + 2*depth )
+        # pool misses only when all threads wait for the same batch
+        stats = Pool.get_stats()
+        assert( stats['hit'] + stats['miss'] == thr*num and stats['fail'] == 0 )
+        assert( stats['miss'] <= thr * (SQN1 - SQN0) // depth )
+        #
+        # vector with an imposed RAND: pooled vectors are discarded
+        SQN = auc._get_av(IMSI, K, ALG, OP, AMF, 16*b'\0')[0]
+        assert( SQN == SQN1 and (IMSI, AMF) not in Pool._vec )
+        assert( auc._get_av(IMSI, K, ALG, OP, AMF, None)[0] == SQN + 1 )
+        assert( Pool.get_stats()['miss'] == stats['miss'] + 1 )
+    finally:
+        auc.stop()
+        shutil.rmtree(path)
+
+
+def test_perf_corenet():
+
+    print('[+] procedures timers and metrics')
+    Tt = timeit(test_timer_wheel, number=100)
+    print('test_timer_wheel: {0:.4f}'.format(Tt))
+    Tm = timeit(test_corenet_metrics, number=100)
+    print('test_corenet_metrics: {0:.4f}'.format(Tm))
+
+    print('[+] AuC databases')
+    Tb = timeit(test_aucdb, number=5)
+    print('test_aucdb: {0:.4f}'.format(Tb))
+
+    if not _with_corenet:
+        print('[+] pycrate_corenet not available, skipping NAS procedures')
+        Ta = 0.0
+    else:
+        print('[+] NAS procedures abort and metrics')
+        Ta = timeit(test_proc_abort_metrics, number=200)
+        print('test_proc_abort_metrics: {0:.4f}'.format(Ta))
+        print('[+] AuC vectors pool')
+        Tc = timeit(test_auc_av_pool, number=1)
+        print('test_auc_av_pool: {0:.4f}'.format(Tc))
+        Ta += Tc
+
+    print('[+] test_corenet total time: {0:.4f}'.format(Tt+Tm+Ta+Tb))
+
+
+if __name__ == '__main__':
+    test_perf_corenet()
+
@@ -27,27 +27,36 @@
 # *--------------------------------------------------------
 #*/
 
-from binascii   import unhexlify
+from binascii   import hexlify, unhexlify
 from timeit     import timeit
+from struct     import pack
 
 #from pycrate_core.elt               import Element
 #Element._SAFE_STAT = False
 #Element._SAFE_DYN  = False
 
 from pycrate_mobile.GSMTAP          import *
-from pycrate_mobile.NAS             import parse_NAS_MO, parse_NAS_MT, parse_NAS5G
-from pycrate_mobile.SIGTRAN         import SIGTRAN
-from pycrate_mobile.M3UA            import parse_M3UA
-from pycrate_mobile.SCCP            import parse_SCCP
-from pycrate_mobile.ISUP            import parse_ISUP
+from pycrate_mobile.NAS             import parse_NAS_MO, parse_NAS_MT, parse_NAS5G, \
+                                           classify_NAS_MO, classify_NAS_MT, classify_NASLTE_MT
+from pycrate_mobile.TS24007         import IE, Type1V, Type1TV
+from pycrate_mobile.TS24301_EMM     import EMMAttachReject
+from pycrate_mobile.SIGTRAN         import SIGTRAN, SIGTRANFramer
+from pycrate_mobile.M3UA            import parse_M3UA, M3UAFramer, dissect_M3UA
+from pycrate_mobile.SCCP            import parse_SCCP, decode_SCCP_hdr
+from pycrate_mobile.TS29002_MAPAppCtx import decode_TCAP_MAP_hdr, MAPDecoder
+from pycrate_asn1dir.TCAP_MAPv2v3   import TCAP_MAP_Messages
+from pycrate_mobile.ISUP            import parse_ISUP, decode_ISUP_hdr
 from pycrate_mobile.TS0960_GTPv0    import parse_GTPv0
 from pycrate_mobile.TS29060_GTP     import parse_GTP
-from pycrate_mobile.TS29281_GTPU    import parse_GTPU
-from pycrate_mobile.TS29274_GTPC    import parse_GTPC
-from pycrate_mobile.TS29244_PFCP    import parse_PFCP
-from pycrate_diameter.Diameter      import DiameterGeneric
-from pycrate_diameter.DiameterIETF  import DiameterIETF
-from pycrate_diameter.Diameter3GPP  import Diameter3GPP
+from pycrate_mobile.TS29281_GTPU    import parse_GTPU, decode_GTPU_hdr, encode_GTPU_hdr, \
+                                           decap_GTPU, encap_GTPU, get_GTPU_ext, ERR_GTPU_BUF_TOO_SHORT
+from pycrate_mobile.TS38415_PDUSess import decode_PDUSessInfo_qfi, encode_PDUSessInfo_qfi
+from pycrate_mobile.TS29274_GTPC    import parse_GTPC, GTPCIE, ERR_GTPC_MAND_IE_MISS
+from pycrate_mobile.TS29244_PFCP    import parse_PFCP, PFCPIE, ERR_PFCP_MAND_IE_MISS
+from pycrate_diameter.Diameter      import DiameterGeneric, DiameterCodecGeneric, \
+                                           decode_Diameter_hdr, get_Diameter_avp, DiameterFramer
+from pycrate_diameter.DiameterIETF  import DiameterIETF, DiameterCodecIETF
+from pycrate_diameter.Diameter3GPP  import Diameter3GPP, DiameterCodec3GPP, FMT_LUT_3GPP
 from pycrate_mobile.TS48006_BSSAP   import BSSAP
 from pycrate_mobile.TS48008_BSSMAP  import BSSMAP
 from pycrate_mobile.TS24501_IE      import (
@@ -56,6 +65,7 @@ from pycrate_mobile.TS24501_IE      import (
     FGSIDFMT,
     )
 #
+from pycrate_core.utils             import PycrateErr
 from pycrate_core.elt               import _with_json
 
 
@@ -192,6 +202,17 @@ sccp_pdu = tuple(map(unhexlify, (
     '098003101b0d120600710421435503483814710b120700120419530218522066626448046d5307026b1e281c060700118605010101a011600f80020780a1090607040000010001036c3ca13a0201000201023032040821431589431915f4810791195302185220040791195302185220a60880020780850205e0ad0a80086835613051868427', # SCCP UDT anonymized
     )))
 
+# TCAP-MAP messages
+tcap_map_pdu = tuple(map(unhexlify, (
+    '626a48042f3b46026b3a2838060700118605010101a02d602b80020780a109060704000001001302be1a2818060704000001010101a00da00b80099656051124006913f66c26a12402010102013b301c04010f040eaa180da682dd6c31192d36bbdd468007917267415827f2',
+    '626448046d5307026b1e281c060700118605010101a011600f80020780a1090607040000010001036c3ca13a0201000201023032040821431559116230f7810791907334250186040791907334250186a60880020780850205e0ad0a80086835613051868427',
+    '624548049a37020e6b1e281c060700118605010101a011600f80020780a109060704000001001b036c1da11b020101020143a313040821038177392457f18107916005328636f5',
+    '643d4904485a072d6b262824060700118605010101a0196117a109060704000001000103a203020100a305a1030201006c0da30b02010002012230030a0101',
+    '6250480465424d9f6b1e281c060700118605010101a011600f80020780a1090607040000010020036c28a126020101020117301e040862002103576065f30407912143550903f9040504d7765924a0028300',
+    '6581d74804102b2e0f4904100108736c81c8a181c50201020201073081bca781b9a309040111840105810101a309040112840105820102a30b0401418401053003830110a30b0401418401043003820110a30b0401418401043003820118a306040114840100a01d0401293018300683011084010430068201108401043006820118840104a01d04012a3018300683011084010430068201108401043006820118840104a01d04012b3018300683011084010430068201108401043006820118840104a015040121301030068301108401043006820110840104',
+    '642b49046d5307026c23a20f020100300a02010230050403912143a3080201010201013000a406020102810101', # TCAP End with returnResult, returnError and reject
+    )))
+
 # ISUP messages
 isup_pdu = tuple(map(unhexlify, (
     'ad03010060010a00020a0884100081066153010a0884130061002099091d038090a3310200643f0884930031750740090801003a06430001ff0000390631d03ad03fc000', # ISUP Initial Address
@@ -338,6 +359,54 @@ def test_nas_5g(nas_pdu=nas_5g_pdu):
             assert( m.get_val() == v )
 
 
+def test_nas_opts():
+    # optional IEs decoded whatever their order
+    pdu = unhexlify('0741020bf602f8107500e0c301732f04e060c04000240202d011d1271d8080211001000010810600000000830600000000000d00000a000010005c0a003103e5e0341302f810040511035758a65d0100c1')
+    m, e = parse_NAS_MO(pdu)
+    assert( e == 0 )
+    opts = [ie for ie in m.get_opts() if not ie.get_trans()]
+    assert( [ie._name for ie in opts] == ['DRXParam', 'MSNetCap', 'OldLAI', 'MSCm2',
+                                          'VoiceDomPref', 'MSNetFeatSupp'] )
+    mand = pdu[:len(pdu)-sum([ie.get_len() for ie in opts])]
+    m2, e = parse_NAS_MO(mand + b''.join([ie.to_bytes() for ie in reversed(opts)]))
+    assert( e == 0 )
+    assert( [ie.get_val() for ie in m2.get_opts() if not ie.get_trans()] == [ie.get_val() for ie in opts] )
+    # duplicated optional IE and unknown IE, appended to the message
+    m, e = parse_NAS_MT(unhexlify('0761430383c634430383c6342102abcd4623'))
+    assert( e == 0 )
+    assert( [ie._name for ie in m.get_opts() if not ie.get_trans()] == ['NetFullName', 'LocalTimeZone'] )
+    assert( [ie._name for ie in m[-2:]] == ['_T_43', '_T_21'] )
+
+
+
+def test_nas_classify(nas_pdu=((nas_pdu_mo + nas_5g_pdu, parse_NAS_MO, classify_NAS_MO),
+                               (nas_pdu_mt, parse_NAS_MT, classify_NAS_MT))):
+    # NAS message scanned without being decoded, compared to the full decoding
+    for pdus, parse, classify in nas_pdu:
+        for pdu in pdus:
+            m, e = parse(pdu)
+            d, e = classify(pdu, names=None)
+            assert( e == 0 )
+            if d['SecHdr'] in (2, 4):
+                # ciphered NAS message
+                assert( d['Class'] is m.__class__ and d['IEs'] == {} )
+                continue
+            elif d['SecHdr'] in (1, 3):
+                m = m[3]
+            assert( d['Class'] is m.__class__ )
+            for ie in m._content:
+                if isinstance(ie, IE) and not ie.get_trans():
+                    if isinstance(ie, (Type1V, Type1TV)):
+                        assert( d['IEs'][ie._name] == ie._V.get_val() )
+                    elif ie._V is not None:
+                        assert( d['IEs'][ie._name] == ie._V.to_bytes() )
+    # selected IEs only
+    d, e = classify_NAS_MT(unhexlify('074400'))
+    assert( e == 0 and d['Class'] is EMMAttachReject and d['IEs'] == {'EMMCause': b'\x00'} )
+    assert( classify_NASLTE_MT(unhexlify('074400')) == (d, e) )
+    d, e = classify_NAS_MO(unhexlify('7e00417900'))
+    assert( e == 96 and d is None )
+
 fgsid_vals = (
     {'Type': FGSIDTYPE.NO},
     {'Type': FGSIDTYPE.SUPI, 'Fmt': FGSIDFMT.IMSI, 'Value': {'PLMN': '20869', 'RoutingInd': '1234', 'Output': '1234567890'}},
@@ -444,6 +513,85 @@ def test_isup(isup_pdu=isup_pdu):
             assert( m.get_val() == v )
 
 
+def test_tcap_map_hdr(tcap_map_pdu=tcap_map_pdu):
+    M = TCAP_MAP_Messages.TCAP_MAP_Message
+    D = MAPDecoder()
+    for pdu, (msg_type, otid, dtid, acn, comps) in zip(tcap_map_pdu, D.decode_batch(tcap_map_pdu)):
+        M.from_ber(pdu)
+        v = M()[1]
+        assert( (otid, dtid) == (v.get('otid'), v.get('dtid')) )
+        if 'dialoguePortion' in v:
+            assert( acn == v['dialoguePortion']['encoding'][1][1][1]['application-context-name'] )
+        assert( len(comps) == len(v.get('components', [])) )
+        for (comp_type, iid, code, param, val), (_, (typ, cv)) in zip(comps, v.get('components', [])):
+            if typ == 'invoke':
+                assert( (code, val) == (cv['opcode'][1], cv['argument'][1]) )
+            elif typ == 'returnResult':
+                assert( (code, val) == (cv['result']['opcode'][1], cv['result']['result'][1]) )
+            elif typ == 'returnError':
+                assert( (code, val) == (cv['errcode'][1], cv['parameter'][1]) )
+            else:
+                assert( val is None )
+    stats = D.get_stats()
+    assert( stats['msg'] == len(tcap_map_pdu) and stats['err'] == 0 )
+    # MAP parameters only decoded for selected operations
+    D = MAPDecoder(ops={59})
+    assert( [c[2] for c in D.decode(tcap_map_pdu[0])[4] if c[4] is not None] == [59] )
+    assert( [c[2] for c in D.decode(tcap_map_pdu[1])[4] if c[4] is not None] == [] )
+    assert( D.decode_batch([tcap_map_pdu[0][:-1]]) == [None] and D.get_stats()['err'] == 1 )
+    # returnError parameters decoded for the errors of selected operations
+    D = MAPDecoder(ops={2})
+    comps = D.decode(tcap_map_pdu[6])[4]
+    assert( comps[1][:3] == (0xa3, 1, 1) and comps[1][4] is not None )
+    assert( MAPDecoder(ops={59}).decode(tcap_map_pdu[6])[4][1][4] is None )
+    # indefinite length form, for the message, component portion, component
+    # and parameter
+    h = hexlify(tcap_map_pdu[2]).decode()
+    i = h.index('6c1da11b020101020143a313')
+    pdu = unhexlify('6280' + h[4:i] + '6c80a180020101020143a380' + h[i+24:] + 8*'00')
+    D = MAPDecoder()
+    M.from_ber(pdu)
+    ref, msg = D.decode(tcap_map_pdu[2]), D.decode(pdu)
+    assert( msg[:4] == ref[:4] and len(msg[4]) == len(ref[4]) == 1 )
+    assert( msg[4][0][:3] + msg[4][0][4:] == ref[4][0][:3] + ref[4][0][4:] )
+    assert( msg[4][0][4] == M()[1]['components'][0][1][1]['argument'][1] )
+    assert( D.decode_batch([pdu[:-2]]) == [None] )
+    # TCAP carried in SCCP
+    m, e = parse_SCCP(sccp_pdu[5])
+    msg_type, otid, dtid, acn, comps = decode_TCAP_MAP_hdr(m['Data']['Value'].get_val())
+    assert( msg_type == 0x62 and acn == (0, 4, 0, 0, 1, 0, 1, 3) and comps[0][:3] == (0xa1, 0, 2) )
+
+
+def _m3ua_data(opc, dpc, si, sls, data, rc=1):
+    pd  = pack('>IIBBBB', opc, dpc, si, 2, 0, sls) + data
+    prm = pack('>HHIHH', 6, 8, rc, 0x210, 4+len(pd)) + pd + (-len(pd) % 4) * b'\0'
+    return pack('>BBBBI', 1, 0, 1, 1, 8+len(prm)) + prm
+
+def _sccp_addr(addr):
+    ai, gt = addr[0], addr[3]
+    return (ai['RoutingInd'].get_val(),
+            None if addr['PC'].get_trans() else addr['PC'].get_val() & 0x3fff,
+            None if addr['SSN'].get_trans() else addr['SSN'].get_val(),
+            gt.get_alt().get_addr() if ai['GTInd'].get_val() else None)
+
+def test_m3ua_dissect(m3ua_pdu=m3ua_pdu, sccp_pdu=sccp_pdu, isup_pdu=isup_pdu):
+    for pdu in m3ua_pdu:
+        r, e = dissect_M3UA(pdu)
+        assert( e == 0 and r[:2] == tuple(parse_M3UA(pdu)[0][0][2:4].get_val()) )
+    assert( dissect_M3UA(m3ua_pdu[-1][:-1])[1] > 0 )
+    # synthetic M3UA DATA traffic
+    for i, pdu in enumerate(sccp_pdu):
+        (cls, typ, rc, opc, dpc, si, sls, data, up), e = dissect_M3UA(_m3ua_data(i, 2*i, 3, i%16, pdu, i))
+        assert( e == 0 and (rc, opc, dpc, si, sls, data) == (i, i, 2*i, 3, i%16, pdu) )
+        m = parse_SCCP(pdu)[0]
+        assert( up == (9, _sccp_addr(m[3][1]), _sccp_addr(m[4][1]), m[5][1].to_bytes()) )
+    for pdu in isup_pdu:
+        (cls, typ, rc, opc, dpc, si, sls, data, up), e = dissect_M3UA(_m3ua_data(1, 2, 5, 0, pdu))
+        m = parse_ISUP(pdu)[0]
+        assert( e == 0 and up == (m[0].get_val(), m[1].get_val()) == decode_ISUP_hdr(pdu)[0] )
+    assert( decode_SCCP_hdr(sccp_pdu[0][:-1])[1] == 2 )
+
+
 def test_gtpv0(gtp_pdu=gtpv0_pdu):
     for pdu in gtp_pdu:
         m, e = parse_GTPv0(pdu)
@@ -492,6 +640,29 @@ def test_gtpu(gtpu_pdu=gtpu_pdu):
             assert( m.get_val() == v )
 
 
+def test_gtpu_hdr(gtpu_pdu=gtpu_pdu):
+    for pdu in gtpu_pdu:
+        m, e = parse_GTPU(pdu)
+        h, e = decode_GTPU_hdr(pdu)
+        assert( e == 0 )
+        assert( h[0] == m[0]['Type'].get_val() and h[1] == m[0]['TEID'].get_val() )
+        assert( h[5] == m[0].get_len() and h[6] == len(pdu) )
+        assert( encode_GTPU_hdr(h[1], h[6]-h[5], h[0], h[2], h[3], h[4]) == pdu[:h[5]] )
+    assert( decode_GTPU_hdr(gtpu_pdu[0][:7]) == (None, ERR_GTPU_BUF_TOO_SHORT) )
+    # GTP-U header with PDU Session Container
+    assert( decode_PDUSessInfo_qfi(get_GTPU_ext(decode_GTPU_hdr(gtpu_pdu[2])[0], 133)) == (1, 1, 0) )
+    # batch of payloads
+    pays = [b'', 20*b'A', 1400*b'B']
+    exts = [(133, encode_PDUSessInfo_qfi(0, 9, 1))]
+    for sn in (None, 0xfffe):
+        bufs = encap_GTPU(0x1234, pays, sn=sn, exts=exts)
+        for (h, pay), buf, ref in zip(decap_GTPU(map(memoryview, bufs)), bufs, pays):
+            assert( pay == ref and h[1] == 0x1234 )
+            assert( decode_PDUSessInfo_qfi(get_GTPU_ext(h, 133)) == (0, 9, 1) )
+            assert( parse_GTPU(buf)[0][1].get_val() == ref )
+        if sn is not None:
+            assert( [h[2] for h, pay in decap_GTPU(bufs)] == [0xfffe, 0xffff, 0] )
+
 def test_gtpc(gtpc_pdu=gtpc_pdu):
     for pdu in gtpc_pdu:
         m, e = parse_GTPC(pdu)
@@ -508,6 +679,32 @@ def test_gtpc(gtpc_pdu=gtpc_pdu):
             assert( m.get_val() == v )
 
 
+def _test_lazy_ies(parse, ie_cls, pdus, pdu, ie_id, err, ie_mand):
+    # IE data decoded on access are the same as the ones decoded eagerly
+    for buf in pdus:
+        ie_cls.DEC_LAZY = False
+        try:
+            m, e = parse(buf)
+        finally:
+            ie_cls.DEC_LAZY = True
+        v = m.get_val()
+        m, e = parse(buf)
+        assert( m.to_bytes() == buf )
+        assert( m.get_val() == v )
+    # IE index, and missing mandatory IE reported after a single decoding
+    m, e = parse(pdu)
+    ie = m[1].get_ie(*ie_id)
+    assert( ie is not None and m[1].get_ies(*ie_id) == [ie] )
+    buf = pdu.replace(ie.to_bytes(), b'')
+    m, e = parse(buf[:2] + (len(buf)-4).to_bytes(2, 'big') + buf[4:])
+    assert( e == err and m[1]._ie_mand == ie_mand )
+
+def test_gtpc_ies(gtpc_pdu=gtpc_pdu):
+    _test_lazy_ies(parse_GTPC, GTPCIE, gtpc_pdu, gtpc_pdu[0], (71, 0),
+                   ERR_GTPC_MAND_IE_MISS, {(71, 0)})
+    m, e = parse_GTPC(gtpc_pdu[0])
+    assert( m[1].get_ie(71, 1) is None )
+
 def test_diameter(diam_pdu=diam_pdu):
     for dm in (DiameterGeneric(), DiameterIETF(), Diameter3GPP()):
         for pdu in diam_pdu:
@@ -525,6 +722,83 @@ def test_diameter(diam_pdu=diam_pdu):
                 assert( dm.get_val() == v )
 
 
+def test_diameter_codec(diam_pdu=diam_pdu):
+    for codec, dm in ((DiameterCodecGeneric, DiameterGeneric()),
+                      (DiameterCodecIETF, DiameterIETF()),
+                      (DiameterCodec3GPP, Diameter3GPP())):
+        for pdu in diam_pdu:
+            dm.from_bytes(pdu)
+            hdr, avps = codec.decode(pdu)
+            assert( hdr == decode_Diameter_hdr(pdu) )
+            assert( hdr[3] == dm[0]['Cmd'].get_val() and hdr[5] == dm[0]['HHID'].get_val() )
+            assert( len(avps) == dm[1].get_num() )
+            for avp, elt in zip(avps, dm[1]):
+                assert( avp[0] == elt[0]['Code'].get_val() )
+                # Diameter3GPP looks AVPs up by code only, hence decodes IETF
+                # AVPs with the format of 3GPP AVPs having the same code
+                if not isinstance(avp[3], (list, tuple)) and \
+                not (avp[2] is None and avp[0] in FMT_LUT_3GPP):
+                    assert( avp[3] == elt[1].get_val() )
+            assert( codec.encode(hdr, avps) == pdu )
+            assert( codec.decode(memoryview(pdu)) == (hdr, avps) )
+    # Session-Id extraction without decoding
+    assert( get_Diameter_avp(diam_pdu[6], 263) == b'mme.localdomain;1560950849;18;app_s6a' )
+    assert( get_Diameter_avp(diam_pdu[0], 263) is None )
+    # Gx CCR-I like message built from Python values
+    hdr  = (1, 0, 0xc0, 272, 16777238, 1, 2)
+    avps = [(263, 0x40, None, u'pgw;1;2'),
+            (416, 0x40, None, 1),
+            (415, 0x40, None, 0),
+            (443, 0x40, None, [(450, 0x40, None, 1), (444, 0x40, None, u'001010000000001')]),
+            (1027, 0xc0, 10415, 5)]
+    buf = DiameterCodec3GPP.encode(hdr, avps)
+    assert( DiameterCodec3GPP.decode(buf) == ((1, len(buf)) + hdr[2:], avps) )
+    dm = Diameter3GPP()
+    dm.from_bytes(buf)
+    assert( dm.to_bytes() == buf )
+    # Gy CCR-U like message, with AVPs looked up by (vendor id, code): 3GPP
+    # vendor AVP 5 (3GPP-GPRS-Negotiated-QoS-Profile) is not the IETF NAS-Port
+    hdr  = (1, 0, 0xc0, 272, 4, 3, 4)
+    avps = [(263, 0x40, None, u'pgw;1;3'),
+            (416, 0x40, None, 2),
+            (415, 0x40, None, 1),
+            (873, 0xc0, 10415, [(874, 0xc0, 10415, [(5, 0x80, 10415, b'08-4A020000000')])]),
+            (5, 0x40, None, 1)]
+    buf = DiameterCodec3GPP.encode(hdr, avps)
+    assert( DiameterCodec3GPP.decode(buf)[1] == avps )
+    # AVPs which do not fit their format are kept as bytes
+    avps = [(416, 0x40, None, b'\0\0\2'), (5, 0x80, 99, b'\0\0\0\0\1')]
+    buf = DiameterCodec3GPP.encode(hdr, avps)
+    assert( DiameterCodec3GPP.decode(buf)[1] == avps )
+
+def test_framer(sigtran_pdu=sigtran_pdu + m3ua_pdu, diam_pdu=diam_pdu):
+    for Framer, pdus in ((SIGTRANFramer, sigtran_pdu), (DiameterFramer, diam_pdu)):
+        stream = b''.join(pdus)
+        # whole stream at once
+        assert( Framer().feed(stream) == list(pdus) )
+        # stream in small chunks, passed from a reused reception buffer
+        fr, rbuf, msgs, off, i = Framer(), bytearray(16), [], 0, 0
+        while off < len(stream):
+            l = min(1 + i % 16, len(stream) - off)
+            rbuf[:l] = stream[off:off+l]
+            msgs.extend( fr.feed(memoryview(rbuf)[:l]) )
+            off, i = off + l, i + 1
+        assert( msgs == list(pdus) and fr.get_pending() == 0 )
+        # incomplete message kept, and invalid length
+        fr = Framer()
+        assert( fr.feed(stream[:-1]) == list(pdus[:-1]) and fr.get_pending() == len(pdus[-1]) - 1 )
+        try:
+            fr.feed(stream[-1:] + 8*b'\x01\0\0\0')
+        except PycrateErr:
+            pass
+        else:
+            assert()
+    # decoding framer
+    for (m, e), pdu in zip(M3UAFramer().feed_iter([b''.join(m3ua_pdu)]), m3ua_pdu):
+        assert( e == 0 and m.to_bytes() == pdu )
+    hdrs = DiameterFramer(decode_Diameter_hdr).feed(b''.join(diam_pdu))
+    assert( [hdr[1] for hdr in hdrs] == list(map(len, diam_pdu)) )
+
 def test_pfcp(pfcp_pdu=pfcp_pdu):
     for pdu in pfcp_pdu:
         m, e = parse_PFCP(pdu)
@@ -540,6 +814,33 @@ def test_pfcp(pfcp_pdu=pfcp_pdu):
             m.from_json(t)
             assert( m.get_val() == v )
 
+def test_pfcp_ies(pfcp_pdu=pfcp_pdu):
+    _test_lazy_ies(parse_PFCP, PFCPIE, pfcp_pdu, pfcp_pdu[6], (57, ),
+                   ERR_PFCP_MAND_IE_MISS, {57})
+    m, e = parse_PFCP(pfcp_pdu[6])
+    assert( m[1].get_ie(0xffff) is None )
+    assert( m[1].get_ie(1)[3].get_ie(56) is not None )
+
+def test_pfcp_n4(pfcp_pdu=pfcp_pdu, num=833):
+    # N4 Session Establishment Request with `num` Create PDR / Create FAR
+    # (60 kB for 833), built from the one in pfcp_pdu
+    m, e = parse_PFCP(pfcp_pdu[6])
+    pdr, far = m[1].get_ie(1), m[1].get_ie(3)
+    ies = [m[1].get_ie(60).to_bytes(), m[1].get_ie(57).to_bytes()]
+    for i in range(1, num+1):
+        pdr[3].get_ie(56)[3]['Val'].set_val(i)
+        pdr[3].get_ie(108)[3]['Val'].set_val(i)
+        far[3].get_ie(108)[3]['Val'].set_val(i)
+        ies.extend( (pdr.to_bytes(), far.to_bytes()) )
+    m[0]['Len'].set_val(12 + sum(map(len, ies)))
+    pdu = m[0].to_bytes() + b''.join(ies)
+    # decoding it, and accessing only a few IEs
+    m, e = parse_PFCP(pdu)
+    assert( e == 0 and m.to_bytes() == pdu )
+    pdrs, fars = m[1].get_ies(1), m[1].get_ies(3)
+    assert( len(pdrs) == len(fars) == num )
+    assert( fars[-1][3].get_ie(108)[3]['Val'].get_val() == num )
+
 
 def test_bssap(bssap_pdu=bssap_pdu):
     
@@ -591,6 +892,14 @@ def test_perf_mobile():
     Tc = timeit(test_nas_5g, number=40)
     print('test_nas_5g: {0:.4f}'.format(Tc))
     
+    print('[+] NAS optional IEs decoding')
+    To = timeit(test_nas_opts, number=200)
+    print('test_nas_opts: {0:.4f}'.format(To))
+    
+    print('[+] NAS classification')
+    Tn = timeit(test_nas_classify, number=20)
+    print('test_nas_classify: {0:.4f}'.format(Tn))
+    
     print('[+] 5GSID decoding and re-encoding')
     Tl = timeit(test_5gsid, number=300)
     print('test_5gsid: {0:.4f}'.format(Tl))
@@ -611,6 +920,14 @@ def test_perf_mobile():
     Tj = timeit(test_isup, number=60)
     print('test_isup: {0:.4f}'.format(Tj))
     
+    print('[+] M3UA / SCCP / ISUP header-only dissection')
+    Tmd = timeit(test_m3ua_dissect, number=20)
+    print('test_m3ua_dissect: {0:.4f}'.format(Tmd))
+    
+    print('[+] TCAP-MAP headers and selected parameters decoding')
+    Tt = timeit(test_tcap_map_hdr, number=50)
+    print('test_tcap_map_hdr: {0:.4f}'.format(Tt))
+    
     print('[+] GTPv0 decoding and re-encoding')
     Tl = timeit(test_gtpv0, number=200)
     print('test_gtpv0: {0:.4f}'.format(Tl))
@@ -623,23 +940,47 @@ def test_perf_mobile():
     Tf = timeit(test_gtpu, number=300)
     print('test_gtpu: {0:.4f}'.format(Tf))
     
+    print('[+] GTP-U header fast path')
+    Tfh = timeit(test_gtpu_hdr, number=300)
+    print('test_gtpu_hdr: {0:.4f}'.format(Tfh))
+    
     print('[+] GTPv2-C decoding and re-encoding')
     Tg = timeit(test_gtpc, number=25)
     print('test_gtpc: {0:.4f}'.format(Tg))
     
+    print('[+] GTPv2-C IEs lazy decoding and index')
+    Tgi = timeit(test_gtpc_ies, number=10)
+    print('test_gtpc_ies: {0:.4f}'.format(Tgi))
+    
     print('[+] Diameter decoding and re-encoding')
     Th = timeit(test_diameter, number=8)
     print('test_diameter: {0:.4f}'.format(Th))
     
+    print('[+] Diameter fast codec')
+    Thc = timeit(test_diameter_codec, number=20)
+    print('test_diameter_codec: {0:.4f}'.format(Thc))
+    
+    print('[+] SIGTRAN and Diameter stream framing')
+    Tfr = timeit(test_framer, number=20)
+    print('test_framer: {0:.4f}'.format(Tfr))
+    
     print('[+] PFCP decoding and re-encoding')
     Ti = timeit(test_pfcp, number=50)
     print('test_pfcp: {0:.4f}'.format(Ti))
     
+    print('[+] PFCP IEs lazy decoding and index')
+    Tp = timeit(test_pfcp_ies, number=10)
+    print('test_pfcp_ies: {0:.4f}'.format(Tp))
+    
+    print('[+] PFCP N4 Session Establishment Request with 833 PDR / FAR')
+    Tpn = timeit(test_pfcp_n4, number=5)
+    print('test_pfcp_n4: {0:.4f}'.format(Tpn))
+    
     print('[+] BSSAP / BSSMAP decoding / re-encoding')
-    Tn = timeit(test_bssap, number=200)
-    print('test_bssap: {0:.4f}'.format(Tn))
+    Tbs = timeit(test_bssap, number=200)
+    print('test_bssap: {0:.4f}'.format(Tbs))
     
-    print('[+] test_mobile total time: {0:.4f}'.format(Ta+Tb+Tc+Td+Te+Tf+Tg+Th+Ti+Tj+Tk+Tl+Tm+Tn))
+    print('[+] test_mobile total time: {0:.4f}'.format(Ta+Tb+Tc+To+Td+Te+Tf+Tfh+Tg+Tgi+Th+Thc+Tfr+Ti+Tp+Tpn+Tj+Tk+Tl+Tm+Tn+Tbs+Tt+Tmd))
 
 
 if __name__ == '__main__':
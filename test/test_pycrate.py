@@ -45,7 +45,9 @@ from test.test_sms    import *
 from test.test_crypto import *
 from test.test_gmr1   import *
 from test.test_sedebugmux  import *
+from test.test_corenet import *
 from pycrate_asn1c.specdir import ASN_SPECS
+from pycrate_asn1c.tokenizer import tokenize_text
 from pycrate_asn1c.asnproc import (
     compile_text,
     compile_spec,
@@ -85,6 +87,8 @@ class TestPycrate(unittest.TestCase):
         test_elt_2()
         test_elt_3()
         test_elt_4()
+        test_dec_budget()
+        test_dec_budget_threads()
     
     # fmt_media objects
     def test_media(self):
@@ -112,6 +116,10 @@ class TestPycrate(unittest.TestCase):
         fd = open('./test/res/Hardcore.asn', 'r')
         asntext = fd.read()
         fd.close()
+        # tokenize the Hardcore ASN.1 module
+        mods = tokenize_text(asntext)
+        assert( list(mods.keys()) == ['HardcoreSyntax'] )
+        assert( len(mods['HardcoreSyntax']['_obj_']) == 116 )
         fd_init = open('./test_asn_todelete/__init__.py', 'w')
         fd_init.write('__all__ = [')
         compile_text(asntext)
@@ -177,15 +185,25 @@ class TestPycrate(unittest.TestCase):
         test_nas_mo()
         test_nas_mt()
         test_nas_5g()
+        test_nas_opts()
+        test_nas_classify()
         test_sigtran()
         test_sccp()
         test_isup()
+        test_m3ua_dissect()
+        test_tcap_map_hdr()
         test_gtpv0()
         test_gtp()
         test_gtpu()
+        test_gtpu_hdr()
         test_gtpc()
+        test_gtpc_ies()
         test_diameter()
+        test_diameter_codec()
+        test_framer()
         test_pfcp()
+        test_pfcp_ies()
+        test_pfcp_n4()
         test_bssap()
     
     # mobile / GSM RR
@@ -199,6 +217,7 @@ class TestPycrate(unittest.TestCase):
     def test_sms(self):
         print('[<>] testing SMS TP-UDH in pycrate_mobile')
         test_tpudh()
+        test_7b()
     
     # GMR-1 RR protocol
     def test_gmr(self):
@@ -214,6 +233,15 @@ class TestPycrate(unittest.TestCase):
     def test_crypto(self):
         print('[<>] testing pycrate_crypto')
         test_ikev2()
+    
+    # corenet signalling procedures
+    def test_corenet(self):
+        print('[<>] testing pycrate_corenet')
+        test_timer_wheel()
+        test_corenet_metrics()
+        test_aucdb()
+        test_auc_av_pool()
+        test_proc_abort_metrics()
 
 
 def test_perf_all():
@@ -236,6 +264,7 @@ def test_perf_all():
     test_perf_gmr()
     test_perf_sedebugmux()
     test_perf_crypto()
+    test_perf_corenet()
     print('[<<<>>>] test_perf_all total time: %.4f' % (time.time() - T0))
 
 
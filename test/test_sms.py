@@ -31,6 +31,7 @@ from binascii   import unhexlify
 from timeit     import timeit
 
 from pycrate_mobile.TS23040_SMS import *
+from pycrate_mobile.TS23038     import *
 
 # SMS 7 bit character together with UDH requires complex alignment and padding
 # Here is a harness test to ensure everything gets encoded / decoded properly
@@ -58,11 +59,38 @@ def test_tpudh(I=28, J=8):
 # gsm_sms.dis_field_udh.gsm.fill_bits == 0x0 and gsm_sms.ie_identifier != 0x00
 
 
+def test_7b(I=40):
+    # trailing @ and CR are ambiguous with the padding septet, hence are avoided
+    txts = ['', '@.', 'hello\r.', '{€}[~]|^\\', 'Ññ ÆæßÉ ΔΦΓΛΩΠΨΣΘΞ @£$¥ èéùìòÇØøÅå_']
+    txts.extend( (i*'{A@z0\n' + 'end')[:i+1].rstrip('@') for i in range(I) )
+    for off in range(0, 7):
+        encs = encode_7b_batch(txts, off)
+        assert( encs == [encode_7b(txt, off) for txt in txts] )
+        decs = decode_7b_batch([enc[0] for enc in encs], off)
+        assert( decs == [decode_7b(enc[0], off) for enc in encs] )
+        for txt, (buf, cnt), dec in zip(txts, encs, decs):
+            assert( len(buf) == -(-(off + 7*cnt) // 8) )
+            assert( dec in (txt, txt+'\r') )
+    assert( encode_7b('hello') == (unhexlify('e8329bfd06'), 5) )
+    assert( decode_7b(unhexlify('e8329bfd06')) == 'hello' )
+    try:
+        encode_7b('hello`')
+    except PycrateErr:
+        pass
+    else:
+        assert()
+    assert( decode_ucs2(encode_ucs2(txts[4])[0]) == txts[4] )
+
+
 def test_perf_sms():
     
     print('[+] SMS_SUBMIT encoding and decoding with GSM 7-bit and TP-UDH')
     Ta = timeit(test_tpudh, number=5)
     print('test_tpudh: {0:.4f}'.format(Ta))
+    
+    print('[+] GSM 7-bit encoding and decoding, per message and in batch')
+    Tb = timeit(test_7b, number=20)
+    print('test_7b: {0:.4f}'.format(Tb))
 
 
 if __name__ == '__main__':
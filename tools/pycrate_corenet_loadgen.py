@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.4
+# *
+# * Copyright 2026. Benoit Michau. P1Sec.
+# *
+# * This program is free software: you can redistribute it and/or modify
+# * it under the terms of the GNU General Public License version 2 as published
+# * by the Free Software Foundation.
+# *
+# * This program is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# * GNU General Public License for more details.
+# *
+# * You will find a copy of the terms and conditions of the GNU General Public
+# * License version 2 in the "license.txt" file or
+# * see http://www.gnu.org/licenses/ or write to the Free Software Foundation,
+# * Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_corenet_loadgen.py
+# * Created : 2026-10-19
+# * Authors : Benoit Michau
+# *--------------------------------------------------------
+#*/
+
+import sys
+import argparse
+from binascii import unhexlify
+
+
+DESC = '''load a running CorenetServer instance (pycrate_corenet.Server) with
+simulated eNodeBs and LTE UEs
+
+Each UE runs a script of flows among attach, release (S1 release to idle mode),
+service (service request from idle mode) and detach. The number of successful
+and failed flows, their rate and their latency percentiles are reported at the
+end.
+
+The simulated UEs must be provisioned in the AuC.db of the CorenetServer, and
+allowed by its UE_ATTACH_FILTER and ConfigUE; their AuC.db lines can be printed
+with --auc, e.g.:
+    pycrate_corenet_loadgen.py -n 10000 --auc >> pycrate_corenet/AuC.db
+    pycrate_corenet_loadgen.py -n 10000 -c 500 -s 10.2.1.1 -l 10.2.1.2
+'''
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=DESC,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-s', dest='server', type=str, default='10.2.1.1',
+                        help='CorenetServer S1AP IP address')
+    parser.add_argument('-p', dest='port', type=int, default=36412,
+                        help='CorenetServer S1AP SCTP port')
+    parser.add_argument('-g', dest='gnb', type=str, default='10.3.1.1',
+                        help='CorenetServer NGAP IP address')
+    parser.add_argument('-l', dest='local', type=str, default=None,
+                        help='local IP address for the RAN nodes')
+    parser.add_argument('-e', dest='enb_num', type=int, default=1,
+                        help='number of simulated eNodeBs')
+    parser.add_argument('--gnb-num', dest='gnb_num', type=int, default=0,
+                        help='number of simulated gNodeBs, only running NGSetup')
+    parser.add_argument('--plmn', dest='plmn', type=str, default='00101',
+                        help='PLMN of the RAN nodes')
+    parser.add_argument('-n', dest='ue_num', type=int, default=1000,
+                        help='number of simulated UEs')
+    parser.add_argument('-c', dest='conc', type=int, default=100,
+                        help='maximum number of UEs running their script concurrently')
+    parser.add_argument('-i', dest='imsi', type=str, default='001010000000001',
+                        help='IMSI of the first UE')
+    parser.add_argument('-k', dest='K', type=str, default='0123456789abcdef0123456789abcdef',
+                        help='UEs authentication key (hex)')
+    parser.add_argument('-o', dest='OP', type=str, default=None,
+                        help='UEs subscriber-specific OP (hex)')
+    parser.add_argument('--script', dest='script', type=str, default='attach,release,service,detach',
+                        help='comma-separated list of flows run by each UE')
+    parser.add_argument('--cycles', dest='cycles', type=int, default=1,
+                        help='number of release / service cycles, when running the default script')
+    parser.add_argument('-t', dest='timeout', type=float, default=10.0,
+                        help='flow timeout in seconds')
+    parser.add_argument('-d', dest='dur', type=float, default=0,
+                        help='maximum duration of the run in seconds')
+    parser.add_argument('--auc', action='store_true',
+                        help='print the AuC.db lines for the simulated UEs and exit')
+    #
+    args = parser.parse_args()
+    #
+    from pycrate_corenet.LoadGen import LoadGen
+    Gen = LoadGen()
+    Gen.SERVER_ENB  = {'IP': args.server, 'port': args.port}
+    Gen.SERVER_GNB  = {'IP': args.gnb, 'port': 38412}
+    Gen.LOCAL_IP    = args.local
+    Gen.ENB_NUM     = args.enb_num
+    Gen.GNB_NUM     = args.gnb_num
+    Gen.PLMN        = args.plmn
+    Gen.UE_NUM      = args.ue_num
+    Gen.CONCURRENCY = args.conc
+    Gen.IMSI_BASE   = args.imsi
+    Gen.K           = unhexlify(args.K)
+    Gen.OP          = unhexlify(args.OP) if args.OP else None
+    Gen.TIMEOUT     = args.timeout
+    Gen.DURATION    = args.dur
+    script = args.script.split(',')
+    if script == ['attach', 'release', 'service', 'detach']:
+        script = ['attach'] + args.cycles * ['release', 'service'] + ['detach']
+    Gen.SCRIPT = tuple(script)
+    #
+    if args.auc:
+        print(Gen.get_auc_db(), end='')
+        return 0
+    #
+    try:
+        Gen.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        Gen.disconnect()
+    print(Gen.report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
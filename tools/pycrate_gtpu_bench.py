@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.4
+# *
+# * Copyright 2026. Benoit Michau. P1Sec.
+# *
+# * This program is free software: you can redistribute it and/or modify
+# * it under the terms of the GNU General Public License version 2 as published
+# * by the Free Software Foundation.
+# *
+# * This program is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# * GNU General Public License for more details.
+# *
+# * You will find a copy of the terms and conditions of the GNU General Public
+# * License version 2 in the "license.txt" file or
+# * see http://www.gnu.org/licenses/ or write to the Free Software Foundation,
+# * Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_gtpu_bench.py
+# * Created : 2026-10-19
+# * Authors : Benoit Michau
+# *--------------------------------------------------------
+#*/
+
+import sys
+import socket
+import argparse
+from struct    import pack, unpack
+from threading import Thread, Event
+from time      import time, sleep
+
+
+DESC = '''measure the packet rate of a running GTPUd instance (pycrate_corenet.ServerGTPU)
+
+The GTPUd instance must have a single mobile configured with the IPv4 address,
+uplink and downlink TEIDs, and RAN IP address passed to this benchmark. Its
+external interface (GTPUd.EXT_IF) can be one end of a veth pair, whose other end
+is passed to this benchmark, e.g.:
+    ip link add gi0 type veth peer name gi1
+    ip link set gi0 up; ip link set gi1 up
+and GTPUd.EXT_IF = 'gi0', GTPUd.GTP_IF = ('127.0.0.1', ), then, with 127.0.0.2 as
+RAN IP address:
+    pycrate_gtpu_bench.py -i gi1 -m ul
+    pycrate_gtpu_bench.py -i gi1 -m dl
+
+In uplink, GTP-U packets are sent to the GTP-U interface of GTPUd, and IPv4
+packets forwarded by GTPUd are counted on the external interface.
+In downlink, Ethernet frames are sent on the external interface to the MAC
+address of GTPUd, and GTP-U packets forwarded by GTPUd are counted on the RAN IP
+address.
+'''
+
+
+def build_ipv4(src, dst, paylen):
+    # IPv4 / UDP packet with an empty payload of paylen bytes, without checksums
+    udp = pack('>HHHH', 10000, 10000, 8+paylen, 0) + paylen*b'\0'
+    return pack('>BBHHHBBH4s4s', 0x45, 0, 20+len(udp), 0, 0x4000, 64, 17, 0,
+                socket.inet_aton(src), socket.inet_aton(dst)) + udp
+
+
+class Sender(Thread):
+
+    def __init__(self, sk, buf, addr, stop):
+        Thread.__init__(self)
+        self.sk, self.buf, self.addr, self.stop, self.cnt = sk, buf, addr, stop, 0
+
+    def run(self):
+        sk, buf, addr, stop, cnt = self.sk, self.buf, self.addr, self.stop, 0
+        while not stop.is_set():
+            for i in range(64):
+                try:
+                    sk.sendto(buf, addr)
+                except socket.error:
+                    # socket buffer full
+                    sleep(0.0001)
+                else:
+                    cnt += 1
+        self.cnt = cnt
+
+
+def count(sk, dur, match):
+    # count packets received on sk matching the match function during dur seconds
+    sk.settimeout(0.1)
+    buf = bytearray(2048)
+    cnt, end = 0, time() + dur
+    while time() < end:
+        try:
+            l = sk.recv_into(buf)
+        except socket.timeout:
+            continue
+        if match(buf, l):
+            cnt += 1
+    return cnt
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=DESC,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-i', dest='iface', type=str, required=True,
+                        help='network interface connected to the GTPUd external interface')
+    parser.add_argument('-m', dest='mode', type=str, default='ul', choices=('ul', 'dl'),
+                        help='direction to benchmark')
+    parser.add_argument('-g', dest='gtp', type=str, default='127.0.0.1',
+                        help='GTPUd GTP-U IP address')
+    parser.add_argument('-r', dest='ran', type=str, default='127.0.0.2',
+                        help='RAN IP address')
+    parser.add_argument('-u', dest='ue', type=str, default='192.168.1.201',
+                        help='mobile IPv4 address')
+    parser.add_argument('--teid-ul', dest='teid_ul', type=int, default=1,
+                        help='uplink TEID')
+    parser.add_argument('--teid-dl', dest='teid_dl', type=int, default=1,
+                        help='downlink TEID')
+    parser.add_argument('--mac', dest='mac', type=str, default='08:00:00:01:02:03',
+                        help='GTPUd external MAC address')
+    parser.add_argument('-s', dest='size', type=int, default=64,
+                        help='UDP payload size of the mobile packets')
+    parser.add_argument('-t', dest='dur', type=float, default=5.0,
+                        help='benchmark duration in seconds')
+    #
+    args = parser.parse_args()
+    ipbuf  = build_ipv4(args.ue, '192.168.1.1', args.size)
+    uebuf  = socket.inet_aton(args.ue)
+    stop   = Event()
+    #
+    if args.mode == 'ul':
+        sk_snd = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sk_snd.setblocking(0)
+        sk_snd.bind((args.ran, 0))
+        sk_rcv = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.ntohs(0x0800))
+        sk_rcv.bind((args.iface, 0x0800))
+        gtpbuf = pack('>BBHI', 0x30, 0xff, len(ipbuf), args.teid_ul) + ipbuf
+        snd    = Sender(sk_snd, gtpbuf, (args.gtp, 2152), stop)
+        match  = lambda buf, l: l >= 34 and buf[26:30] == uebuf
+    else:
+        sk_snd = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
+        sk_snd.setblocking(0)
+        sk_snd.bind((args.iface, 0x0800))
+        sk_rcv = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sk_rcv.bind((args.ran, 2152))
+        macbuf = bytes(bytearray([int(b, 16) for b in args.mac.split(':')]))
+        ethbuf = macbuf + b'\x02\0\0\0\0\x01\x08\0' + build_ipv4('192.168.1.1', args.ue, args.size)
+        teid   = pack('>I', args.teid_dl)
+        snd    = Sender(sk_snd, ethbuf, (args.iface, 0x0800), stop)
+        match  = lambda buf, l: l >= 8 and buf[4:8] == teid
+    #
+    snd.start()
+    try:
+        rcv = count(sk_rcv, args.dur, match)
+    finally:
+        stop.set()
+        snd.join()
+        sk_snd.close()
+        sk_rcv.close()
+    #
+    print('%s: %i packets sent (%.0f pps), %i packets forwarded (%.0f pps), %.1f %% lost'\
+          % (args.mode.upper(), snd.cnt, snd.cnt/args.dur, rcv, rcv/args.dur,
+             100.0*(snd.cnt-rcv)/snd.cnt if snd.cnt else 0.0))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())